@@ -201,6 +201,11 @@ def _setup_runtime(monkeypatch):
     target_module = importlib.import_module("adaos.services.skill.runtime")
     monkeypatch.setattr(target_module, "run_skill_handler_sync", stub_skill_handler)
 
+    async def _stub_async(skill: str, topic: str, payload: Mapping[str, object], **_):
+        return stub_skill_handler(skill, topic, payload)
+
+    monkeypatch.setattr(target_module, "run_skill_handler", _stub_async)
+
 
 def test_morning_routine_generates_message():
     runtime = ScenarioRuntime()
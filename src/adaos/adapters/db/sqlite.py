@@ -73,7 +73,7 @@ def list_entities(entity: Entity, installed_only: bool = True) -> List[Dict[str,
         raise ValueError("entity must be 'skills' or 'scenarios'")
     sql = get_ctx().sql
     where = "WHERE installed=1" if installed_only else ""
-    with sql.connect() as con:
+    with sql.read() as con:
         cur = con.execute(
             f"""
             SELECT name, active_version, repo_url, installed,
@@ -126,7 +126,7 @@ def get_skill_versions(name: str) -> List[Dict[str, Any]]:
     Формат элементов: {'version': str, 'path': str, 'status': str, 'created_at': str}
     """
     sql = get_ctx().sql
-    with sql.connect() as con:
+    with sql.read() as con:
         cur = con.execute(
             "SELECT version, path, status, COALESCE(created_at, CURRENT_TIMESTAMP) " "FROM skill_versions WHERE skill_name=? ORDER BY created_at DESC, version DESC",
             (name,),
@@ -141,7 +141,7 @@ def list_versions(name: str) -> Optional[str]:
     Старый CLI ожидает одиночное значение.
     """
     sql = get_ctx().sql
-    with sql.connect() as con:
+    with sql.read() as con:
         cur = con.execute("SELECT active_version FROM skills WHERE name=?", (name,))
         row = cur.fetchone()
     return row[0] if row and row[0] else None
@@ -152,7 +152,7 @@ def idem_get(key: str, method: str, path: str, principal_id: str, body_hash: str
         return None
     sql = get_ctx().sql
     now = int(time.time())
-    with sql.connect() as con:
+    with sql.read() as con:
         cur = con.execute(
             """
             SELECT status_code, body_json, event_id, server_time_utc
@@ -284,7 +284,7 @@ def subnet_get_or_create(owner_id: str) -> dict:
 
 def device_get_by_fingerprint(subnet_id: str, fingerprint: str) -> dict | None:
     sql = get_ctx().sql
-    with sql.connect() as con:
+    with sql.read() as con:
         cur = con.execute(
             """
             SELECT device_id, subnet_id, role, fingerprint, cert_pem, issued_at, expires_at
@@ -370,7 +370,7 @@ def pair_issue(bot_id: str, hub_id: str | None, *, ttl_sec: int = 600) -> dict:
 
 def pair_get(code: str) -> dict | None:
     sql = get_ctx().sql
-    with sql.connect() as con:
+    with sql.read() as con:
         cur = con.execute(
             "SELECT code, bot_id, hub_id, expires_at, state, created_at FROM pair_codes WHERE code=?",
             (code,),
@@ -449,7 +449,7 @@ def binding_upsert(platform: str, user_id: str, bot_id: str, *, hub_id: str | No
 
 def get_binding_by_user(platform: str, user_id: str, bot_id: str) -> dict | None:
     sql = get_ctx().sql
-    with sql.connect() as con:
+    with sql.read() as con:
         cur = con.execute(
             """
             SELECT platform, user_id, bot_id, ada_user_id, hub_id, created_at, last_seen
@@ -13,7 +13,7 @@ class SqliteScenarioRegistry:
         ensure_schema(self.sql)
 
     def list(self) -> list[SkillRecord]:
-        with self.sql.connect() as con:
+        with self.sql.read() as con:
             cur = con.execute(
                 "SELECT name, active_version, repo_url, installed, " "strftime('%s', COALESCE(last_updated, CURRENT_TIMESTAMP)) " "FROM scenarios WHERE installed = 1 ORDER BY name"
             )
@@ -30,7 +30,7 @@ class SqliteScenarioRegistry:
         ]
 
     def get(self, name: str) -> SkillRecord | None:
-        with self.sql.connect() as con:
+        with self.sql.read() as con:
             cur = con.execute(
                 "SELECT name, active_version, repo_url, installed, " "strftime('%s', COALESCE(last_updated, CURRENT_TIMESTAMP)) " "FROM scenarios WHERE name = ?", (name,)
             )
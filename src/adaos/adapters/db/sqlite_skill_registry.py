@@ -15,7 +15,7 @@ class SqliteSkillRegistry:
         ensure_schema(self.sql)
 
     def list(self) -> list[SkillRecord]:
-        with self.sql.connect() as con:
+        with self.sql.read() as con:
             cur = con.execute(
                 "SELECT name, active_version, repo_url, installed, " "strftime('%s', COALESCE(last_updated, CURRENT_TIMESTAMP)) " "FROM skills WHERE installed = 1 ORDER BY name"
             )
@@ -34,7 +34,7 @@ class SqliteSkillRegistry:
         return out
 
     def get(self, name: str) -> SkillRecord | None:
-        with self.sql.connect() as con:
+        with self.sql.read() as con:
             cur = con.execute(
                 "SELECT name, active_version, repo_url, installed, " "strftime('%s', COALESCE(last_updated, CURRENT_TIMESTAMP)) " "FROM skills WHERE name = ?", (name,)
             )
@@ -1,33 +1,273 @@
 # src\adaos\adapters\db\sqlite_store.py
 # соединение SQLite (SQLite) + простое KV (SQLiteKV)
 from __future__ import annotations
-import sqlite3, json
+import atexit, sqlite3, json, os, threading, weakref
+from collections import OrderedDict
 from pathlib import Path
-from typing import Any, Optional, Final
+from typing import Any, Dict, Final, Iterable, Mapping, Optional
 from adaos.ports import KV, SQL
 from adaos.ports.paths import PathProvider
 
 _DB_FILE = "adaos.db"
+_STATEMENT_CACHE = 256
+
+
+class _Lease:
+    """Контекст выдачи пулового соединения.
+
+    Для писателя: держит блокировку писателя, на выходе из самого внешнего
+    ``with`` делает commit (rollback при исключении). Соединение не закрывается —
+    оно возвращается в пул вместе с кэшем подготовленных выражений.
+    """
+
+    __slots__ = ("_owner", "_write", "_con")
+
+    def __init__(self, owner: "SQLite", write: bool) -> None:
+        self._owner = owner
+        self._write = write
+        self._con: sqlite3.Connection | None = None
+
+    def __enter__(self) -> sqlite3.Connection:
+        self._con = self._owner._acquire(self._write)
+        return self._con
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self._owner._release(self._con, self._write, exc_type is not None)
+        self._con = None
+
+
+class _ReaderSlot:
+    """Соединение-читатель потока. Живёт в threading.local, поэтому освобождается
+    вместе с потоком — финализатор закрывает соединение (короткие потоки не копят дескрипторы)."""
+
+    __slots__ = ("con", "generation", "__weakref__")
+
+    def __init__(self, con: sqlite3.Connection, generation: int) -> None:
+        self.con = con
+        self.generation = generation
+
+
+def _close_reader(readers: Dict[int, sqlite3.Connection], lock: threading.Lock, key: int, con: sqlite3.Connection) -> None:
+    with lock:
+        readers.pop(key, None)
+    try:
+        con.close()
+    except Exception:
+        pass
 
 
 class SQLite(SQL):
+    """Менеджер соединений SQLite.
+
+    ``connect()`` — одно постоянное соединение-писатель (сериализуется RLock),
+    ``read()`` — по постоянному соединению на поток для чтения. Все соединения
+    открываются один раз: WAL, ``synchronous=NORMAL``, ``foreign_keys=ON``,
+    кэш подготовленных выражений. ``close()`` закрывает пул (при следующем
+    обращении он поднимется заново).
+    """
+
     def __init__(self, paths: PathProvider):
         self._db_path: Final[Path] = Path(paths.state_dir()) / _DB_FILE
         self._db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.RLock()
+        self._depth = 0
+        self._writer: sqlite3.Connection | None = None
+        self._local = threading.local()
+        self._readers: Dict[int, sqlite3.Connection] = {}
+        self._readers_lock = threading.Lock()
+        self._generation = 0
+        self._pid = os.getpid()
         # ленивое создание файла
-        with sqlite3.connect(self._db_path) as con:
+        with self.connect() as con:
             con.execute("PRAGMA journal_mode=WAL")
 
-    def connect(self) -> sqlite3.Connection:
-        con = sqlite3.connect(self._db_path)
+    @property
+    def path(self) -> Path:
+        return self._db_path
+
+    def _open(self) -> sqlite3.Connection:
+        con = sqlite3.connect(self._db_path, check_same_thread=False, cached_statements=_STATEMENT_CACHE, timeout=5.0)
         con.execute("PRAGMA foreign_keys=ON")
+        con.execute("PRAGMA synchronous=NORMAL")
         return con
 
+    def _check_fork(self) -> None:
+        # соединения нельзя наследовать через fork — в дочернем процессе открываем свои
+        if self._pid != os.getpid():
+            self._pid = os.getpid()
+            self._writer = None
+            self._local = threading.local()
+            self._readers = {}
+            self._generation += 1
+
+    def connect(self) -> _Lease:
+        """Соединение-писатель: ``with sql.connect() as con: ...`` (commit на выходе)."""
+        return _Lease(self, True)
+
+    def read(self) -> _Lease:
+        """Соединение для чтения текущего потока (в WAL не блокирует писателя)."""
+        return _Lease(self, False)
+
+    def _acquire(self, write: bool) -> sqlite3.Connection:
+        self._check_fork()
+        if write:
+            self._lock.acquire()
+            try:
+                if self._writer is None:
+                    self._writer = self._open()
+            except BaseException:
+                self._lock.release()
+                raise
+            self._depth += 1
+            return self._writer
+        slot = getattr(self._local, "slot", None)
+        if slot is None or slot.generation != self._generation:
+            con = self._open()
+            slot = _ReaderSlot(con, self._generation)
+            with self._readers_lock:
+                self._readers[id(slot)] = con
+            weakref.finalize(slot, _close_reader, self._readers, self._readers_lock, id(slot), con)
+            self._local.slot = slot
+        return slot.con
+
+    def _release(self, con: sqlite3.Connection | None, write: bool, failed: bool) -> None:
+        if not write:
+            if con is not None and con.in_transaction:
+                # чтение не должно держать снимок/транзакцию между вызовами
+                if failed:
+                    con.rollback()
+                else:
+                    con.commit()
+            return
+        try:
+            self._depth -= 1
+            if con is not None and self._depth == 0 and con.in_transaction:
+                if failed:
+                    con.rollback()
+                else:
+                    con.commit()
+        finally:
+            self._lock.release()
+
+    def data_version(self) -> int | None:
+        """``PRAGMA data_version`` писателя.
+
+        Меняется только при коммитах *других* соединений (в т.ч. других процессов),
+        поэтому годится для проверки внешних изменений кэшами. None — писатель
+        сейчас занят другим потоком и ждать его не хотим.
+        """
+        if not self._lock.acquire(blocking=False):
+            return None
+        try:
+            self._check_fork()
+            if self._writer is None:
+                self._writer = self._open()
+            return int(self._writer.execute("PRAGMA data_version").fetchone()[0])
+        finally:
+            self._lock.release()
+
+    def close(self) -> None:
+        """Закрыть все соединения пула (shutdown)."""
+        with self._lock:
+            if self._writer is not None:
+                try:
+                    self._writer.close()
+                except Exception:
+                    pass
+                self._writer = None
+            with self._readers_lock:
+                readers, self._readers = list(self._readers.values()), {}
+                self._generation += 1
+            for con in readers:
+                try:
+                    con.close()
+                except Exception:
+                    pass
+
+
+_ABSENT = object()  # ключа нет в БД (отрицательная запись кэша)
+_DELETED = object()  # отложенное удаление в режиме write-behind
+_IN_CHUNK = 500
+
+
+def _decode(raw: Any) -> Any:
+    try:
+        return json.loads(raw)
+    except Exception:
+        return raw
+
+
+def _prefix_upper(prefix: str) -> str | None:
+    """Наименьшая строка больше всех строк с данным префиксом (для k >= ? AND k < ?)."""
+    while prefix:
+        last = ord(prefix[-1])
+        if last < 0x10FFFF:
+            return prefix[:-1] + chr(last + 1)
+        prefix = prefix[:-1]
+    return None
+
+
+class _KVState:
+    """Общее состояние всех SQLiteKV одного соединения и namespace.
+
+    ``items`` — LRU ключ -> (значение, json-текст | None): скаляры отдаются как
+    есть, контейнеры декодируются из текста заново (вызывающий может их менять).
+    ``pending`` — отложенные записи write-behind (json-текст или _DELETED).
+    ``gen`` растёт при каждой записи: чтение из БД не кладёт в кэш результат,
+    если за это время ключи успели поменяться.
+    """
+
+    def __init__(self, size: int) -> None:
+        self.size = max(0, int(size))
+        self.lock = threading.RLock()
+        self.items: "OrderedDict[str, tuple[Any, str | None]]" = OrderedDict()
+        self.version: int | None = None
+        self.gen = 0
+        self.pending: Dict[str, Any] = {}
+        self.timer: threading.Timer | None = None
+        self.atexit = False
+        self.stats = {"hits": 0, "misses": 0, "flushes": 0, "coalesced": 0}
+
+    def store(self, key: str, value: Any, raw: str | None) -> None:
+        if not self.size:
+            return
+        self.items[key] = (value, raw)
+        self.items.move_to_end(key)
+        while len(self.items) > self.size:
+            self.items.popitem(last=False)
+
+
+_STATES: "weakref.WeakKeyDictionary[Any, Dict[str, _KVState]]" = weakref.WeakKeyDictionary()
+_STATES_LOCK = threading.Lock()
+
+
+def _state_for(sql: Any, ns: str, size: int) -> _KVState:
+    with _STATES_LOCK:
+        try:
+            per_sql = _STATES.setdefault(sql, {})
+        except TypeError:  # объект без weakref — кэш на экземпляр
+            per_sql = {}
+        state = per_sql.get(ns)
+        if state is None:
+            state = per_sql[ns] = _KVState(size)
+        return state
+
 
 class SQLiteKV(KV):
-    def __init__(self, sql: SQLite, namespace: str = "kv"):
+    """KV поверх таблицы ``kv(ns, k, v)``.
+
+    Чтения обслуживаются LRU-кэшем (общим для всех экземпляров с тем же
+    соединением и namespace), который сбрасывается при внешних коммитах
+    (``SQLite.data_version``). ``write_behind`` (секунды) включает отложенную
+    запись: серии ``set``/``delete`` копятся в памяти и коммитятся одной
+    транзакцией раз в интервал или по ``flush()``.
+    """
+
+    def __init__(self, sql: SQLite, namespace: str = "kv", *, cache_size: int = 1024, write_behind: float | None = None):
         self.sql = sql
         self.ns = namespace
+        self.write_behind = float(write_behind) if write_behind and write_behind > 0 else None
+        self._state = _state_for(sql, namespace, cache_size)
         self._ensure()
 
     def _ensure(self) -> None:
@@ -43,33 +283,219 @@ class SQLiteKV(KV):
             """
             )
 
+    # ------------------------------------------------------------------ cache
+    def _cache_valid(self) -> bool:
+        """Сверить кэш с data_version; False — проверить нельзя, читаем из БД."""
+        st = self._state
+        if not st.size:
+            return False
+        probe = getattr(self.sql, "data_version", None)
+        version = probe() if probe else None
+        if version is None:
+            return False
+        with st.lock:
+            if version != st.version:
+                st.items.clear()
+                st.version = version
+                st.gen += 1
+        return True
+
+    def _lookup(self, key: str, use_items: bool) -> Any:
+        """Значение из pending/кэша, _ABSENT если ключа нет, _DELETED если кэш не знает."""
+        st = self._state
+        with st.lock:
+            if key in st.pending:
+                raw = st.pending[key]
+                return _ABSENT if raw is _DELETED else _decode(raw)
+            entry = st.items.get(key) if use_items else None
+            if entry is None:
+                st.stats["misses"] += 1
+                return _DELETED
+            st.items.move_to_end(key)
+            st.stats["hits"] += 1
+        value, raw = entry
+        return value if raw is None else _decode(raw)
+
+    def _remember(self, key: str, raw: Any, gen: int) -> None:
+        st = self._state
+        with st.lock:
+            if gen == st.gen and key not in st.pending:
+                self._state_store(key, _DELETED if raw is _ABSENT else raw)
+
+    def _written(self, items: Dict[str, Any]) -> None:
+        """Обновить кэш после записи: items — key -> json-текст или _DELETED."""
+        st = self._state
+        with st.lock:
+            st.gen += 1
+            for key, raw in items.items():
+                self._state_store(key, raw)
+
+    def _state_store(self, key: str, raw: Any) -> None:
+        if raw is _DELETED:
+            self._state.store(key, _ABSENT, None)
+            return
+        value = _decode(raw)
+        self._state.store(key, value, raw if isinstance(value, (dict, list)) else None)
+
+    def invalidate(self, prefix: str = "") -> None:
+        """Сбросить кэш namespace (или только ключи с префиксом)."""
+        st = self._state
+        with st.lock:
+            st.gen += 1
+            if not prefix:
+                st.items.clear()
+            else:
+                for key in [k for k in st.items if k.startswith(prefix)]:
+                    del st.items[key]
+
+    def cache_stats(self) -> Dict[str, Any]:
+        st = self._state
+        with st.lock:
+            return {**st.stats, "size": len(st.items), "pending": len(st.pending), "capacity": st.size}
+
+    # ------------------------------------------------------------------ reads
     def get(self, key: str, default: Any = None) -> Any:
-        with self.sql.connect() as con:
+        use_items = self._cache_valid()
+        if use_items or self._state.pending:
+            found = self._lookup(key, use_items)
+            if found is _ABSENT:
+                return default
+            if found is not _DELETED:
+                return found
+        gen = self._state.gen
+        with self.sql.read() as con:
             cur = con.execute("SELECT v FROM kv WHERE ns=? AND k=?", (self.ns, key))
             row = cur.fetchone()
-            if not row:
-                return default
-            try:
-                return json.loads(row[0])
-            except Exception:
-                return row[0]
+        self._remember(key, row[0] if row else _ABSENT, gen)
+        if not row:
+            return default
+        return _decode(row[0])
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, Any]:
+        """Значения существующих ключей одним проходом (кэш + ``IN (...)`` порциями)."""
+        out: Dict[str, Any] = {}
+        missing: list[str] = []
+        use_items = self._cache_valid()
+        use_cache = use_items or bool(self._state.pending)
+        for key in dict.fromkeys(keys):
+            found = self._lookup(key, use_items) if use_cache else _DELETED
+            if found is _DELETED:
+                missing.append(key)
+            elif found is not _ABSENT:
+                out[key] = found
+        if not missing:
+            return out
+        gen = self._state.gen
+        rows: Dict[str, Any] = {}
+        with self.sql.read() as con:
+            for i in range(0, len(missing), _IN_CHUNK):
+                chunk = missing[i : i + _IN_CHUNK]
+                marks = ",".join("?" * len(chunk))
+                cur = con.execute(f"SELECT k, v FROM kv WHERE ns=? AND k IN ({marks})", (self.ns, *chunk))
+                rows.update(cur.fetchall())
+        for key in missing:
+            raw = rows.get(key, _ABSENT)
+            self._remember(key, raw, gen)
+            if raw is not _ABSENT:
+                out[key] = _decode(raw)
+        return out
+
+    def list(self, prefix: str = "") -> list[str]:
+        self.flush()
+        upper = _prefix_upper(prefix)
+        with self.sql.read() as con:
+            if upper is None:
+                cur = con.execute("SELECT k FROM kv WHERE ns=? AND k >= ? ORDER BY k", (self.ns, prefix))
+            else:
+                cur = con.execute("SELECT k FROM kv WHERE ns=? AND k >= ? AND k < ? ORDER BY k", (self.ns, prefix, upper))
+            return [row[0] for row in cur.fetchall()]
 
+    # ------------------------------------------------------------------ writes
     def set(self, key: str, value: Any) -> None:
-        data = json.dumps(value, ensure_ascii=False)
+        self.set_many({key: value})
+
+    def set_many(self, items: Mapping[str, Any]) -> None:
+        """Записать несколько ключей одной транзакцией."""
+        encoded = {key: json.dumps(value, ensure_ascii=False) for key, value in items.items()}
+        if not encoded:
+            return
+        if self.write_behind:
+            self._defer(encoded)
+            return
         with self.sql.connect() as con:
-            con.execute(
+            con.executemany(
                 "INSERT INTO kv(ns,k,v) VALUES(?,?,?) ON CONFLICT(ns,k) DO UPDATE SET v=excluded.v",
-                (self.ns, key, data),
+                [(self.ns, key, data) for key, data in encoded.items()],
             )
             con.commit()
+        self._written(encoded)
 
     def delete(self, key: str) -> None:
+        if self.write_behind:
+            self._defer({key: _DELETED})
+            return
         with self.sql.connect() as con:
             con.execute("DELETE FROM kv WHERE ns=? AND k=?", (self.ns, key))
             con.commit()
+        self._written({key: _DELETED})
 
-    def list(self, prefix: str = "") -> list[str]:
-        pattern = f"{prefix}%" if prefix else "%"
+    def delete_prefix(self, prefix: str) -> int:
+        """Удалить все ключи с префиксом (диапазон по первичному ключу). Возвращает число строк."""
+        self.flush()
+        upper = _prefix_upper(prefix)
         with self.sql.connect() as con:
-            cur = con.execute("SELECT k FROM kv WHERE ns=? AND k LIKE ?", (self.ns, pattern))
-            return [row[0] for row in cur.fetchall()]
+            if upper is None:
+                cur = con.execute("DELETE FROM kv WHERE ns=? AND k >= ?", (self.ns, prefix))
+            else:
+                cur = con.execute("DELETE FROM kv WHERE ns=? AND k >= ? AND k < ?", (self.ns, prefix, upper))
+            con.commit()
+            removed = cur.rowcount
+        self.invalidate(prefix)
+        return removed
+
+    # ------------------------------------------------------------------ write-behind
+    def _defer(self, items: Dict[str, Any]) -> None:
+        st = self._state
+        with st.lock:
+            st.stats["coalesced"] += sum(1 for key in items if key in st.pending)
+            st.pending.update(items)
+            self._written(items)
+            if st.timer is None:
+                st.timer = threading.Timer(self.write_behind, self._flush_timer)
+                st.timer.daemon = True
+                st.timer.start()
+            if not st.atexit:
+                atexit.register(self.flush)
+                st.atexit = True
+
+    def _flush_timer(self) -> None:
+        with self._state.lock:
+            self._state.timer = None
+        try:
+            self.flush()
+        except Exception:
+            pass
+
+    def flush(self) -> None:
+        """Закоммитить отложенные записи write-behind одной транзакцией."""
+        st = self._state
+        with st.lock:
+            if not st.pending:
+                return
+            pending, st.pending = st.pending, {}
+        upserts = [(self.ns, key, raw) for key, raw in pending.items() if raw is not _DELETED]
+        deletes = [(self.ns, key) for key, raw in pending.items() if raw is _DELETED]
+        try:
+            with self.sql.connect() as con:
+                if upserts:
+                    con.executemany("INSERT INTO kv(ns,k,v) VALUES(?,?,?) ON CONFLICT(ns,k) DO UPDATE SET v=excluded.v", upserts)
+                if deletes:
+                    con.executemany("DELETE FROM kv WHERE ns=? AND k=?", deletes)
+        except Exception:
+            with st.lock:
+                # вернуть неудавшиеся записи, не затирая более свежие
+                for key, raw in pending.items():
+                    st.pending.setdefault(key, raw)
+            raise
+        with st.lock:
+            st.stats["flushes"] += 1
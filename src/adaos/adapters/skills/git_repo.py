@@ -3,9 +3,10 @@ from __future__ import annotations
 import os
 import re
 import shutil
+import threading
 from dataclasses import dataclass
 from pathlib import Path
-from typing import List, Optional
+from typing import Dict, Iterable, Optional
 
 import yaml
 
@@ -67,6 +68,18 @@ def _has_conflict_markers(skill_dir: Path) -> bool:
     return False
 
 
+def _mtime_ns(path: Path) -> Optional[int]:
+    try:
+        return path.stat().st_mtime_ns
+    except OSError:
+        return None
+
+
+def _manifest_stamp(skill_dir: Path) -> tuple:
+    # mtime каталога ловит появление/замену манифеста, mtime файлов — правку на месте
+    return (_mtime_ns(skill_dir),) + tuple(_mtime_ns(skill_dir / fname) for fname in _MANIFEST_NAMES)
+
+
 def _read_manifest(skill_dir: Path) -> SkillMeta:
     for fname in _MANIFEST_NAMES:
         p = skill_dir / fname
@@ -81,6 +94,126 @@ def _read_manifest(skill_dir: Path) -> SkillMeta:
     return SkillMeta(id=SkillId(sid), name=sid, version="0.0.0", path=str(skill_dir.resolve()))
 
 
+class _ManifestIndex:
+    """In-memory skill id -> SkillMeta map over the candidate roots.
+
+    Built once and rebuilt only when a root directory mtime changes or after an
+    explicit ``invalidate``; single entries are re-read when their manifest stamp
+    changes, so ``get`` costs a few ``stat`` calls instead of a YAML parse.
+    When the shared file watch service runs with OS events, the index subscribes
+    to the roots and manifests and skips the ``stat`` calls altogether.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._roots_stamp: Optional[tuple] = None
+        self._entries: list[tuple[Path, tuple, SkillMeta]] = []
+        self._by_id: dict[str, int] = {}
+        self._handles: list = []
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._roots_stamp = None
+
+    def _on_change(self, _: Path) -> None:
+        self._roots_stamp = None
+
+    def _trusted(self) -> bool:
+        handles = self._handles
+        # все подписки из одного сервиса: достаточно проверить, что он всё ещё тот же
+        return bool(handles) and handles[-1].active
+
+    def _refresh(self, roots: list[Path]) -> None:
+        if self._roots_stamp is not None and self._trusted():
+            return
+        stamp = tuple((str(root), _mtime_ns(root)) for root in roots)
+        if stamp == self._roots_stamp:
+            return
+        with self._lock:
+            if stamp == self._roots_stamp:
+                return
+            entries: list[tuple[Path, tuple, SkillMeta]] = []
+            by_id: dict[str, int] = {}
+            direct: dict[str, int] = {}
+            for root in roots:
+                if not root.exists():
+                    continue
+                for child in sorted(root.iterdir()):
+                    if not child.is_dir() or child.name.startswith("."):
+                        continue
+                    entry_stamp = _manifest_stamp(child)
+                    meta = _read_manifest(child)
+                    sid = meta.id.value
+                    by_id.setdefault(sid, len(entries))
+                    # как и раньше, каталог с именем skill_id приоритетнее совпадения по манифесту
+                    if child.name == sid:
+                        direct.setdefault(sid, len(entries))
+                    entries.append((child, entry_stamp, meta))
+            by_id.update(direct)
+            self._entries, self._by_id, self._roots_stamp = entries, by_id, stamp
+            self._subscribe(roots)
+
+    def _subscribe(self, roots: list[Path]) -> None:
+        from adaos.services.file_watch import file_watch_active, get_file_watch
+
+        for handle in self._handles:
+            handle.cancel()
+        self._handles = []
+        if not file_watch_active():
+            return
+        watch = get_file_watch()
+        handles = [watch.watch(root, self._on_change) for root in roots]
+        for skill_dir, _, _ in self._entries:
+            handles.extend(watch.watch(skill_dir / fname, self._on_change) for fname in _MANIFEST_NAMES)
+        # отсутствующий корень опрашивается сервисом, его появление тоже придёт событием
+        if not all(h.active or not h.path.exists() for h in handles):
+            # часть существующих путей только опрашивается — остаёмся на сверке mtime
+            for handle in handles:
+                handle.cancel()
+            return
+        self._handles = handles
+        # правка между чтением и подпиской не должна потеряться
+        stale = tuple((str(root), _mtime_ns(root)) for root in roots) != self._roots_stamp or any(
+            _manifest_stamp(skill_dir) != entry_stamp for skill_dir, entry_stamp, _ in self._entries
+        )
+        if stale:
+            self._roots_stamp = None
+
+    def _fresh(self, idx: int) -> SkillMeta:
+        skill_dir, stamp, meta = self._entries[idx]
+        if self._trusted():
+            return meta
+        current = _manifest_stamp(skill_dir)
+        if current != stamp:
+            if current[0] is None:
+                # каталог исчез, а mtime корня ещё не успел смениться
+                self._roots_stamp = None
+                return meta
+            meta = _read_manifest(skill_dir)
+            self._entries[idx] = (skill_dir, current, meta)
+            if meta.id.value not in self._by_id:
+                self._roots_stamp = None
+        return meta
+
+    def list(self, roots: list[Path]) -> list[SkillMeta]:
+        self._refresh(roots)
+        return [self._fresh(idx) for idx in range(len(self._entries))]
+
+    def get(self, roots: list[Path], skill_id: str) -> Optional[SkillMeta]:
+        self._refresh(roots)
+        idx = self._by_id.get(skill_id)
+        if idx is None:
+            return None
+        meta = self._fresh(idx)
+        if meta.id.value != skill_id:
+            # манифест сменил id — пересобираем индекс и ищем заново
+            self._roots_stamp = None
+            self._refresh(roots)
+            idx = self._by_id.get(skill_id)
+            return self._entries[idx][2] if idx is not None else None
+        return meta
+
+
 @dataclass
 class GitSkillRepository(SkillRepository):
     """Skill repository backed by a monorepo workspace with sparse-checkout."""
@@ -97,6 +230,9 @@ class GitSkillRepository(SkillRepository):
         self.git = git
         self.monorepo_url = monorepo_url
         self.monorepo_branch = monorepo_branch
+        self._index = _ManifestIndex()
+        self._roots: Optional[list[Path]] = None
+        self._ensured = False
 
     def _candidate_roots(self) -> list[Path]:
         roots: list[Path] = []
@@ -151,34 +287,29 @@ class GitSkillRepository(SkillRepository):
             self._ensure_monorepo()
         else:
             self.paths.workspace_dir().mkdir(parents=True, exist_ok=True)
+        self._ensured = True
+
+    def invalidate(self, skill_id: Optional[str] = None) -> None:
+        """Drop the manifest index (called after install/uninstall/update)."""
+        self._roots = None
+        self._index.invalidate()
+
+    def _indexed_roots(self) -> list[Path]:
+        # ensure() может звать git — на горячем пути достаточно одного успешного вызова
+        if not self._ensured:
+            self.ensure()
+        roots = self._roots
+        if roots is None:
+            roots = self._roots = self._candidate_roots()
+        return roots
 
     # --- listing / get
 
     def list(self) -> list[SkillMeta]:
-        self.ensure()
-        result: List[SkillMeta] = []
-        for root in self._candidate_roots():
-            if not root.exists():
-                continue
-            for child in sorted(root.iterdir()):
-                if not child.is_dir() or child.name.startswith("."):
-                    continue
-                meta = _read_manifest(child)
-                result.append(meta)
-        return result
+        return self._index.list(self._indexed_roots())
 
     def get(self, skill_id: str) -> Optional[SkillMeta]:
-        self.ensure()
-        for root in self._candidate_roots():
-            direct = root / skill_id
-            if direct.exists():
-                m = _read_manifest(direct)
-                if m and m.id.value == skill_id:
-                    return m
-        for m in self.list():
-            if m.id.value == skill_id:
-                return m
-        return None
+        return self._index.get(self._indexed_roots(), skill_id)
 
     # --- install
 
@@ -191,6 +322,46 @@ class GitSkillRepository(SkillRepository):
     ) -> SkillMeta:
         """Install a skill from monorepo: ensure sparse checkout and pull the subdir."""
 
+        try:
+            return self._install(ref, branch=branch, dest_name=dest_name)
+        finally:
+            self.invalidate(ref.strip())
+
+    def install_many(self, refs: Iterable[str]) -> Dict[str, SkillMeta | Exception]:
+        """Install several skills with a single sparse-checkout update and one pull.
+
+        Returns the manifest (or the error) per skill so one broken skill does
+        not fail the whole batch; a failed sync/pull is reported for every skill.
+        """
+        names: list[str] = []
+        for ref in refs:
+            name = ref.strip()
+            if not _NAME_RE.match(name):
+                raise ValueError(f"invalid skill name: {ref!r}")
+            if name not in names:
+                names.append(name)
+        results: Dict[str, SkillMeta | Exception] = {}
+        if not names:
+            return results
+        try:
+            try:
+                self.ensure()
+                workspace_root = self.paths.workspace_dir()
+                sparse = SparseWorkspace(self.git, workspace_root)
+                sparse.update(add=[f"skills/{name}" for name in names])
+                self.git.pull(str(workspace_root))
+            except Exception as exc:
+                return {name: exc for name in names}
+            for name in names:
+                try:
+                    results[name] = self._materialize(name, sparse, workspace_root)
+                except Exception as exc:
+                    results[name] = exc
+        finally:
+            self.invalidate()
+        return results
+
+    def _install(self, ref: str, *, branch: Optional[str] = None, dest_name: Optional[str] = None) -> SkillMeta:
         self.ensure()
         name = ref.strip()
         if not _NAME_RE.match(name):
@@ -201,7 +372,10 @@ class GitSkillRepository(SkillRepository):
         target = f"skills/{name}"
         sparse.update(add=[target])
         self.git.pull(str(workspace_root))
+        return self._materialize(name, sparse, workspace_root)
 
+    def _materialize(self, name: str, sparse: SparseWorkspace, workspace_root: Path) -> SkillMeta:
+        target = f"skills/{name}"
         skill_dir: Path = self.paths.skills_dir() / name
         try:
             wait_for_materialized(skill_dir, files=_MANIFEST_NAMES)
@@ -237,6 +411,12 @@ class GitSkillRepository(SkillRepository):
         return _read_manifest(skill_dir)
 
     def uninstall(self, skill_id: str) -> None:
+        try:
+            self._uninstall(skill_id)
+        finally:
+            self.invalidate(skill_id)
+
+    def _uninstall(self, skill_id: str) -> None:
         self.ensure()
         workspace_root = self.paths.workspace_dir()
         sparse = SparseWorkspace(self.git, workspace_root)
@@ -4,12 +4,12 @@ from fastapi import APIRouter, HTTPException, Depends, Request
 from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 from typing import Any, Dict, List, AsyncIterator
-import json, time
+import gzip, json, time
 from pathlib import Path
 
 from adaos.apps.api.auth import require_token
 from adaos.services.agent_context import get_ctx
-from adaos.services.observe import _log_path, BROADCAST, pass_filters
+from adaos.services.observe import BROADCAST, pass_filters, replay_since, tail_events, write_events
 from adaos.sdk.data import bus
 
 router = APIRouter(tags=["observe"], dependencies=[Depends(require_token)])
@@ -21,20 +21,26 @@ class IngestBatch(BaseModel):
 
 
 @router.post("/ingest", dependencies=[Depends(require_token)])
-async def observe_ingest(batch: IngestBatch):
-    """Приём батчей логов с member-нод (hub-only). Также публикуем в SSE."""
+async def observe_ingest(request: Request):
+    """Приём батчей логов с member-нод (hub-only). Также публикуем в SSE.
+
+    Тело — IngestBatch в JSON, допускается Content-Encoding: gzip.
+    """
     conf = get_ctx().config
     if conf.role != "hub":
         raise HTTPException(status_code=403, detail="only hub accepts logs")
+    raw = await request.body()
+    try:
+        if request.headers.get("content-encoding", "").lower() == "gzip":
+            raw = gzip.decompress(raw)
+        batch = IngestBatch(**json.loads(raw))
+    except Exception:
+        raise HTTPException(status_code=400, detail="invalid ingest batch")
 
-    logf = _log_path()
-    ingested = 0
-    with logf.open("a", encoding="utf-8") as f:
-        for e in batch.events:
-            # гарантируем наличие node_id (берём из батча — доверяем member)
-            e.setdefault("node_id", batch.node_id)
-            f.write(json.dumps(e, ensure_ascii=False) + "\n")
-            ingested += 1
+    for e in batch.events:
+        # гарантируем наличие node_id (берём из батча — доверяем member)
+        e.setdefault("node_id", batch.node_id)
+    ingested = write_events(batch.events)
     # Публикуем полученные события (чтобы зрители SSE видели ленту)
     for e in batch.events:
         await BROADCAST.publish(e)
@@ -42,65 +48,54 @@ async def observe_ingest(batch: IngestBatch):
 
 
 @router.get("/tail", dependencies=[Depends(require_token)])
-async def observe_tail(lines: int = 200, topic_prefix: str | None = None, node_id: str | None = None):
-    """Последние N строк, можно фильтровать по topic_prefix и node_id (hub/member)."""
-    logf = _log_path()
-    if not logf.exists():
-        return {"ok": True, "lines": []}
-    # грубый tail без mmap
-    with logf.open("rb") as f:
-        f.seek(0, 2)
-        size = f.tell()
-        block = 4096
-        data = b""
-        while size > 0 and data.count(b"\n") <= lines:
-            step = min(block, size)
-            size -= step
-            f.seek(size)
-            data = f.read(step) + data
-        out = [line.decode("utf-8", errors="ignore") for line in data.splitlines()[-lines:]]
-    if not (topic_prefix or node_id):
-        return {"ok": True, "lines": out}
-    # фильтрация по JSON‑полям
-    filtered: List[str] = []
-    for ln in out:
-        try:
-            obj = json.loads(ln)
-            if pass_filters(obj, topic_prefix, node_id, None):
-                filtered.append(ln)
-        except Exception:
-            pass
-    return {"ok": True, "lines": filtered}
+async def observe_tail(lines: int = 200, topic_prefix: str | None = None, node_id: str | None = None, cursor: str | None = None):
+    """
+    Последние N строк, можно фильтровать по topic_prefix и node_id (hub/member).
+    Ответ содержит cursor: передайте его обратно, чтобы получить предыдущую страницу
+    (None — история исчерпана).
+    """
+    try:
+        out, next_cursor = await asyncio.to_thread(tail_events, lines, topic_prefix=topic_prefix, node_id=node_id, cursor=cursor)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="invalid cursor")
+    return {"ok": True, "lines": out, "cursor": next_cursor}
+
+
+_REPLAY_SINCE_MAX = 5000
 
 
 async def _sse_iter(topic_prefix: str | None, node_id: str | None, since: float | None, replay_lines: int | None = 5) -> AsyncIterator[bytes]:
     """
-    Итератор для SSE. Не держим старую историю (кроме опционального since для фильтра).
+    Итератор для SSE. История берётся из индекса журнала: при since — все события
+    начиная с since (не более _REPLAY_SINCE_MAX), иначе — последние replay_lines.
     """
     q = BROADCAST.subscribe(topic_prefix=topic_prefix, node_id=node_id, since_ts=since)
     # шлём комментарий раз в 15с, чтобы соединение не засыпало
     heartbeat_at = time.time()
-    if replay_lines and not since:
-        # прочитаем хвост и отправим их как "исторические"
-        from adaos.services.observe import _log_path
-
+    replayed_ts = 0.0
+    history: List[str] = []
+    try:
+        if since:
+            history = await asyncio.to_thread(replay_since, since, topic_prefix=topic_prefix, node_id=node_id, limit=_REPLAY_SINCE_MAX)
+        elif replay_lines:
+            history, _ = await asyncio.to_thread(tail_events, int(replay_lines), topic_prefix=topic_prefix, node_id=node_id)
+    except Exception:
+        history = []
+    for ln in history:
         try:
-            with _log_path().open("r", encoding="utf-8") as f:
-                tail = f.readlines()[-int(replay_lines) :]
-            for ln in tail:
-                try:
-                    obj = json.loads(ln)
-                    if pass_filters(obj, topic_prefix, node_id, None):
-                        data = json.dumps(obj, ensure_ascii=False).encode("utf-8")
-                        yield b"event: adaos\n" + b"data: " + data + b"\n\n"
-                except Exception:
-                    pass
+            obj = json.loads(ln)
         except Exception:
-            pass
+            continue
+        replayed_ts = max(replayed_ts, float(obj.get("ts") or 0.0))
+        data = json.dumps(obj, ensure_ascii=False).encode("utf-8")
+        yield b"event: adaos\n" + b"data: " + data + b"\n\n"
     try:
         while True:
             try:
                 evt = await asyncio.wait_for(q.get(), timeout=5.0)  # type: ignore[name-defined]
+                # событие могло попасть и в журнал, и в очередь подписки до окончания реплея
+                if replayed_ts and float(evt.get("ts") or 0.0) <= replayed_ts:
+                    continue
                 if pass_filters(evt, topic_prefix, node_id, since):
                     data = json.dumps(evt, ensure_ascii=False).encode("utf-8")
                     yield b"event: adaos\n" + b"data: " + data + b"\n\n"
@@ -138,6 +133,13 @@ async def observe_stream(
     return StreamingResponse(_sse_iter(topic_prefix, node_id, since, replay_lines), media_type="text/event-stream", headers=headers)
 
 
+@router.get("/bus", dependencies=[Depends(require_token)])
+async def observe_bus():
+    """Очереди корутинных подписчиков LocalEventBus: глубина, потери, задержки."""
+    stats = getattr(get_ctx().bus, "dispatch_stats", None)
+    return {"ok": True, "handlers": stats() if callable(stats) else []}
+
+
 @router.post("/test", dependencies=[Depends(require_token)])
 async def observe_test(kind: str = "ping", note: str | None = None, topic: str | None = None):
     """
@@ -17,6 +17,8 @@ from adaos.services.bootstrap import run_boot_sequence, shutdown, is_ready
 from adaos.services.observe import start_observer, stop_observer
 from adaos.services.agent_context import get_ctx
 from adaos.services.router import RouterService
+from adaos.services.file_watch import stop_file_watch
+from adaos.services.skill.tool_workers import start_tool_workers, stop_tool_workers
 from adaos.services.registry.subnet_directory import get_directory
 from adaos.services.agent_context import get_ctx as _get_ctx
 from adaos.services.io_console import print_text
@@ -68,6 +70,11 @@ async def lifespan(app: FastAPI):
     except Exception:
         pass
     await run_boot_sequence(app)
+    # тёплые процессы для /api/tools/call (CLI остаётся in-process)
+    try:
+        start_tool_workers(app.state.ctx.settings)
+    except Exception:
+        pass
     try:
         await router_service.start()
     except Exception:
@@ -185,6 +192,8 @@ async def lifespan(app: FastAPI):
             await router_service.stop()
         except Exception:
             pass
+        stop_file_watch()
+        stop_tool_workers()
         # On graceful shutdown, notify Telegram if it was enabled
         try:
             if tg_enabled:
@@ -9,6 +9,7 @@ from adaos.adapters.db import SqliteSkillRegistry
 from adaos.apps.api.auth import require_token
 from adaos.services.agent_context import AgentContext, get_ctx
 from adaos.services.skill.manager import SkillManager
+from adaos.services.skill.runtime import handler_cache_stats
 from adaos.apps.yjs.webspace import default_webspace_id
 
 
@@ -221,6 +222,11 @@ async def runtime_status(name: str, mgr: SkillManager = Depends(_get_manager)):
     return {"ok": True, "state": state}
 
 
+@router.get("/runtime/handlers/cache")
+async def runtime_handler_cache():
+    return {"ok": True, "stats": handler_cache_stats()}
+
+
 @router.post("/runtime/setup")
 async def runtime_setup(body: RuntimeSetupReq, mgr: SkillManager = Depends(_get_manager)):
     result = mgr.setup_skill(body.name)
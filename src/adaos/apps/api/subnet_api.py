@@ -35,11 +35,15 @@ class RegisterResponse(BaseModel):
 class HeartbeatRequest(BaseModel):
     node_id: str
     capacity: Dict[str, Any] | None = None
+    # хэш capacity ноды; полная capacity присылается только при его изменении
+    capacity_hash: str | None = None
 
 
 class HeartbeatResponse(BaseModel):
     ok: bool
     lease_seconds: int = LEASE_SECONDS_DEFAULT
+    # hub не знает присланный capacity_hash — нода должна прислать полную capacity
+    capacity_required: bool = False
 
 
 class CtxValue(BaseModel):
@@ -96,11 +100,11 @@ async def heartbeat(body: HeartbeatRequest):
         raise HTTPException(status_code=403, detail="only hub node accepts heartbeats")
 
     directory = get_directory()
-    # Если нода неизвестна — 404 (сохраняем поведение)
-    if not directory.repo.get_node(body.node_id):
+    # Если нода неизвестна — 404 (сохраняем поведение); проверка по памяти, без SQL
+    if not directory.is_known(body.node_id):
         raise HTTPException(status_code=404, detail="node not registered")
-    directory.on_heartbeat(body.node_id, body.capacity or None)
-    return HeartbeatResponse(ok=True, lease_seconds=LEASE_SECONDS_DEFAULT)
+    required = directory.on_heartbeat(body.node_id, body.capacity or None, capacity_hash=body.capacity_hash)
+    return HeartbeatResponse(ok=True, lease_seconds=LEASE_SECONDS_DEFAULT, capacity_required=required)
 
 
 @router.post("/subnet/deregister", dependencies=[Depends(require_token)])
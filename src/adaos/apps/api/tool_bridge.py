@@ -2,12 +2,13 @@
 from fastapi import APIRouter, HTTPException, Depends, Request, Response
 from pydantic import BaseModel, Field
 from typing import Any, Dict
+import asyncio
 import requests
 
 from adaos.apps.api.auth import require_token
 from adaos.services.observe import attach_http_trace_headers
-from adaos.services.agent_context import get_ctx, AgentContext
-from adaos.services.eventbus import emit
+from adaos.services.agent_context import get_ctx, AgentContext, use_ctx
+from adaos.services.eventbus import LoopBoundBus, emit
 from adaos.services.skill.manager import SkillManager
 from adaos.adapters.db import SqliteSkillRegistry
 from adaos.services.registry.subnet_directory import get_directory
@@ -43,25 +44,31 @@ async def call_tool(body: ToolCall, request: Request, response: Response, ctx: A
     if not skill_name or not public_tool:
         raise HTTPException(status_code=400, detail="invalid tool spec")
 
+    # Инструмент исполняется в потоке: его события (и события воркеров) возвращаем в цикл сервера
+    bus = getattr(ctx, "bus", None)
+    if bus is not None:
+        bus = LoopBoundBus(bus, asyncio.get_running_loop())
+        ctx = ctx.with_overrides(bus=bus)
+
     # Используем общий путь исполнения как в CLI (SkillManager.run_tool)
-    mgr = SkillManager(
-        repo=ctx.skills_repo,
-        registry=SqliteSkillRegistry(ctx.sql),
-        git=ctx.git,
-        paths=ctx.paths,
-        bus=getattr(ctx, "bus", None),
-        caps=ctx.caps,
-        settings=ctx.settings,
-    )
+    with use_ctx(ctx):
+        mgr = SkillManager(
+            repo=ctx.skills_repo,
+            registry=SqliteSkillRegistry(ctx.sql),
+            git=ctx.git,
+            paths=ctx.paths,
+            bus=bus,
+            caps=ctx.caps,
+            settings=ctx.settings,
+        )
 
     trace = attach_http_trace_headers(request.headers, response.headers)
     payload: Dict[str, Any] = body.arguments or {}
     # Пробуем локально; если навык отсутствует на узле-хабе — проксируем на member
     try:
-        if body.dev:
-            result = mgr.run_dev_tool(skill_name, public_tool, payload, timeout=body.timeout)
-        else:
-            result = mgr.run_tool(skill_name, public_tool, payload, timeout=body.timeout)
+        # синхронный вызов навыка не должен блокировать event loop
+        run = mgr.run_dev_tool if body.dev else mgr.run_tool
+        result = await asyncio.to_thread(run, skill_name, public_tool, payload, timeout=body.timeout)
     except (FileNotFoundError, RuntimeError, KeyError) as e:
         # Если локально не найден навык/слот — попробуем проксировать на участника подсети (только если роль hub)
         try:
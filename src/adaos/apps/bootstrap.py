@@ -6,7 +6,7 @@ from threading import RLock
 from adaos.services.settings import Settings
 from adaos.services.agent_context import AgentContext
 from adaos.adapters.fs.path_provider import PathProvider
-from adaos.services.eventbus import LocalEventBus
+from adaos.services.eventbus import DispatchConfig, LocalEventBus
 from adaos.services.logging import setup_logging, attach_event_logger
 from adaos.adapters.git.cli_git import CliGitClient
 from adaos.adapters.db import SQLite, SQLiteKV
@@ -23,7 +23,7 @@ from adaos.services.sandbox.runner import ProcSandbox
 from adaos.services.sandbox.service import SandboxService
 
 from adaos.services.agent_context import set_ctx
-from adaos.services.node_config import load_config
+from adaos.services.node_config import current_config
 
 
 class _CtxHolder:
@@ -79,7 +79,14 @@ class _CtxHolder:
         except Exception:
             pass
 
-        bus = LocalEventBus()
+        dispatch = None
+        if settings.bus_overflow:
+            dispatch = DispatchConfig(
+                maxsize=settings.bus_queue_size,
+                workers=settings.bus_workers,
+                overflow=settings.bus_overflow,
+            )
+        bus = LocalEventBus(dispatch=dispatch)
         root_logger = setup_logging(paths)
         attach_event_logger(bus, root_logger.getChild("events"))
 
@@ -111,7 +118,7 @@ class _CtxHolder:
 
         proc = AsyncProcessManager(bus=bus)
         sql = SQLite(paths)
-        kv = SQLiteKV(sql, namespace="adaos")
+        kv = SQLiteKV(sql, namespace="adaos", cache_size=settings.kv_cache_size, write_behind=settings.kv_write_behind)
 
         # Secrets: keyring primary; file vault fallback (ключ в keyring)
         try:
@@ -169,7 +176,7 @@ class _CtxHolder:
 
         # Attach NodeConfig once; consumers should use ctx.config instead of calling load_config repeatedly
         try:
-            object.__setattr__(ctx, "config", load_config(ctx=ctx))
+            current_config(ctx)  # общий экземпляр: save_config обновляет его на месте
         except Exception:
             pass
         return ctx
@@ -30,7 +30,7 @@ def _known_skills() -> list[str]:
     runtime_root = _skills_root() / ".runtime"
     if not runtime_root.exists():
         return []
-    return sorted([p.name for p in runtime_root.iterdir() if p.is_dir()])
+    return sorted([p.name for p in runtime_root.iterdir() if p.is_dir() and not p.name.startswith(".")])
 
 
 def _service_for(skill: str | None) -> SecretsService:
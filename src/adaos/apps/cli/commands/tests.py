@@ -10,6 +10,7 @@ from adaos.apps.cli.i18n import _
 from adaos.services.sandbox.bootstrap import ensure_dev_venv
 from adaos.services.agent_context import get_ctx
 from adaos.services.skill.manager import SkillManager
+from adaos.services.skill.dep_cache import vendor_paths
 from adaos.adapters.db import SqliteSkillRegistry
 from adaos.ports.sandbox import ExecLimits
 
@@ -227,8 +228,9 @@ def _run_one_group(
                 # add unique entries, preserve order (src first)
                 if str(src_dir) not in pp_entries:
                     pp_entries.append(str(src_dir))
-                if vendor.exists() and str(vendor) not in pp_entries:
-                    pp_entries.append(str(vendor))
+                for entry in vendor_paths(vendor):
+                    if str(entry) not in pp_entries:
+                        pp_entries.append(str(entry))
                 # try to infer skill name from src/skills/<name>
                 skills_dir = src_dir / "skills"
                 for child in skills_dir.iterdir() if skills_dir.exists() else []:
@@ -7,7 +7,7 @@ import sqlite3
 
 from adaos.services.agent_context import get_ctx
 
-from adaos.apps.yjs.y_store import ystore_path_for_webspace
+from adaos.apps.yjs.y_store import drop_ystore_for_webspace, ystore_path_for_webspace
 from adaos.apps.yjs.webspace import default_webspace_id
 
 
@@ -121,9 +121,7 @@ def delete_workspace(workspace_id: str) -> None:
         con.execute("DELETE FROM y_workspaces WHERE workspace_id=?", (workspace_id,))
         con.commit()
     try:
-        path = ystore_path_for_webspace(workspace_id)
-        if path.exists():
-            path.unlink()
+        drop_ystore_for_webspace(workspace_id)
     except Exception:
         pass
 
@@ -13,6 +13,9 @@ from .y_store import AdaosMemoryYStore, get_ystore_for_webspace
 
 _log = logging.getLogger("adaos.yjs.bootstrap")
 
+# Одна проверка засева на webspace за раз: шторм переподключений ждёт первую.
+_SEED_LOCKS: dict[str, asyncio.Lock] = {}
+
 
 def _scenario_manager() -> ScenarioManager:
     ctx = get_ctx()
@@ -21,13 +24,31 @@ def _scenario_manager() -> ScenarioManager:
 
 
 async def ensure_webspace_seeded_from_scenario(
-    ystore: AdaosMemoryYStore, webspace_id: str, default_scenario_id: str = "web_desktop"
+    ystore: AdaosMemoryYStore,
+    webspace_id: str,
+    default_scenario_id: str = "web_desktop",
+    *,
+    ydoc: Y.YDoc | None = None,
 ) -> None:
     """
     If the YDoc has no ui.application yet, try to seed it from a scenario
     package (.adaos/workspace/scenarios/<id>/scenario.json). If not found or
     invalid, fall back to the static SEED.
+
+    Once a webspace is known to be seeded the check is a flag lookup on the
+    cached store. ``ydoc`` may be the live ``YRoom.ydoc``; then it is inspected
+    directly instead of replaying the store history into a fresh document.
     """
+    if ystore.seeded:
+        return
+    lock = _SEED_LOCKS.setdefault(webspace_id, asyncio.Lock())
+    async with lock:
+        if ystore.seeded:
+            return
+        await _seed_if_empty(ystore, webspace_id, default_scenario_id, ydoc)
+
+
+async def _seed_if_empty(ystore: AdaosMemoryYStore, webspace_id: str, default_scenario_id: str, ydoc: Y.YDoc | None) -> None:
     _log.debug("ensure_webspace_seeded_from_scenario start webspace=%s scenario=%s", webspace_id, default_scenario_id)
 
     try:
@@ -36,11 +57,12 @@ async def ensure_webspace_seeded_from_scenario(
         _log.warning("ystore.start() failed for webspace=%s: %s", webspace_id, exc, exc_info=True)
         return
 
-    ydoc = Y.YDoc()
-    try:
-        await ystore.apply_updates(ydoc)
-    except Exception as exc:
-        _log.warning("apply_updates failed for webspace=%s (treating as empty): %s", webspace_id, exc, exc_info=True)
+    if ydoc is None:
+        ydoc = Y.YDoc()
+        try:
+            await ystore.apply_updates(ydoc)
+        except Exception as exc:
+            _log.warning("apply_updates failed for webspace=%s (treating as empty): %s", webspace_id, exc, exc_info=True)
 
     ui_map = ydoc.get_map("ui")
     data_map = ydoc.get_map("data")
@@ -52,12 +74,14 @@ async def ensure_webspace_seeded_from_scenario(
             list(ui_map.keys()),
             list(data_map.keys()),
         )
+        ystore.seeded = True
         return
 
     try:
         mgr = _scenario_manager()
         _log.info("seeding webspace %s from scenario %s", webspace_id, default_scenario_id)
         await mgr.sync_to_yjs_async(default_scenario_id, webspace_id)
+        ystore.seeded = True
         return
     except Exception as exc:
         _log.warning(
@@ -79,6 +103,7 @@ async def ensure_webspace_seeded_from_scenario(
 
     try:
         await ystore.encode_state_as_update(ydoc)
+        ystore.seeded = True
         _log.info(
             "webspace %s seeded via SEED (ui keys=%s, data keys=%s)",
             webspace_id,
@@ -49,6 +49,8 @@ class WorkspaceWebsocketServer(WebsocketServer):
                     interval=6000.0,
                     topic="sys.ystore.backup",
                     payload={"webspace_id": webspace_id},
+                    # разносим бэкапы разных webspace во времени
+                    jitter=300.0,
                 )
             except Exception:
                 _ylog.warning("failed to register YStore backup job for webspace=%s", webspace_id, exc_info=True)
@@ -104,13 +106,18 @@ async def start_y_server() -> None:
 
 
 async def ensure_webspace_ready(webspace_id: str, scenario_id: str | None = None) -> None:
-    ensure_workspace(webspace_id)
     ystore = get_ystore_for_webspace(webspace_id)
+    if ystore.seeded:
+        # уже проверен в этом процессе: ни SQL, ни повторного чтения истории
+        return
+    ensure_workspace(webspace_id)
+    live = y_server.rooms.get(webspace_id)
     try:
         await ensure_webspace_seeded_from_scenario(
             ystore,
             webspace_id=webspace_id,
             default_scenario_id=scenario_id or "web_desktop",
+            ydoc=live.ydoc if live is not None else None,
         )
     finally:
         try:
@@ -161,33 +168,63 @@ class FastAPIWebsocketAdapter:
         return b""
 
 
-async def _update_device_presence(webspace_id: str, device_id: str) -> None:
-    """
-    Project basic device presence into the Yjs doc under devices/<device_id>.
-    """
-    room = await y_server.get_room(webspace_id)
-    ydoc = room.ydoc
-    now_ms = int(time.time() * 1000)
+# Окно, в котором отметки присутствия одного webspace сливаются в одну транзакцию.
+PRESENCE_COALESCE_SEC = 0.25
+_presence_pending: Dict[str, Dict[str, int]] = {}
+_presence_tasks: Dict[str, asyncio.Task] = {}
+
 
+def _apply_device_presence(ydoc: Y.YDoc, seen: Dict[str, int]) -> None:
     with ydoc.begin_transaction() as txn:
         devices = ydoc.get_map("devices")
-        current = devices.get(device_id)
-        node = dict(current or {}) if isinstance(current, dict) else {}
+        for device_id, now_ms in seen.items():
+            current = devices.get(device_id)
+            node = dict(current or {}) if isinstance(current, dict) else {}
+
+            meta = dict(node.get("meta") or {})
+            if "created_at" not in meta:
+                meta["created_at"] = now_ms
+            meta["kind"] = "browser"
+
+            presence = dict(node.get("presence") or {})
+            presence["online"] = True
+            presence.setdefault("since", now_ms)
+            presence["lastSeen"] = now_ms
+
+            node["meta"] = meta
+            node["presence"] = presence
 
-        meta = dict(node.get("meta") or {})
-        if "created_at" not in meta:
-            meta["created_at"] = now_ms
-        meta["kind"] = "browser"
+            devices.set(txn, device_id, node)
 
-        presence = dict(node.get("presence") or {})
-        presence["online"] = True
-        presence.setdefault("since", now_ms)
-        presence["lastSeen"] = now_ms
 
-        node["meta"] = meta
-        node["presence"] = presence
+async def _flush_device_presence(webspace_id: str) -> None:
+    try:
+        await asyncio.sleep(PRESENCE_COALESCE_SEC)
+    finally:
+        # всё, что придёт дальше, уйдёт следующей пачкой
+        _presence_tasks.pop(webspace_id, None)
+        seen = _presence_pending.pop(webspace_id, {})
+    if not seen:
+        return
+    try:
+        room = y_server.rooms.get(webspace_id) or await y_server.get_room(webspace_id)
+        _apply_device_presence(room.ydoc, seen)
+    except Exception:
+        _ylog.warning("device presence update failed for webspace=%s", webspace_id, exc_info=True)
+
 
-        devices.set(txn, device_id, node)
+async def _update_device_presence(webspace_id: str, device_id: str) -> None:
+    """
+    Project basic device presence into the Yjs doc under devices/<device_id>.
+
+    Updates are coalesced per webspace: all devices seen within
+    ``PRESENCE_COALESCE_SEC`` are written in a single transaction.
+    """
+    _presence_pending.setdefault(webspace_id, {})[device_id] = int(time.time() * 1000)
+    if webspace_id not in _presence_tasks:
+        _presence_tasks[webspace_id] = asyncio.create_task(
+            _flush_device_presence(webspace_id), name=f"device-presence-{webspace_id}"
+        )
 
 
 async def _yws_impl(websocket: WebSocket, room: str | None) -> None:
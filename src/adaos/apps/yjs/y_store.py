@@ -1,9 +1,14 @@
 from __future__ import annotations
 
+import asyncio
+import atexit
 import logging
+import os
+import struct
+import threading
 import time
 from pathlib import Path
-from typing import AsyncIterator, Dict, List, Tuple
+from typing import AsyncIterator, Dict, List, Optional, Tuple
 
 import anyio
 import y_py as Y
@@ -16,33 +21,167 @@ from adaos.sdk.core.decorators import subscribe
 
 _log = logging.getLogger("adaos.yjs.ystore")
 
+# Порог, после которого in-memory история сжимается в одно состояние.
+COMPACT_UPDATES = 500
+COMPACT_BYTES = 1 << 20
+# Журнал обновлений пишется и fsync'ится пачками.
+LOG_BATCH_UPDATES = 32
+LOG_FLUSH_INTERVAL = 0.2
 
-def _persist_snapshot(path: Path, updates: List[Tuple[bytes, bytes, float]]) -> None:
+_LEN = struct.Struct(">I")
+
+
+def _squash(updates: List[bytes]) -> bytes:
+    ydoc = Y.YDoc()
+    for update in updates:
+        Y.apply_update(ydoc, update)  # type: ignore[arg-type]
+    return Y.encode_state_as_update(ydoc)  # type: ignore[arg-type]
+
+
+def read_update_log(path: Path) -> List[bytes]:
+    """
+    Read length-prefixed updates from an append-only log, dropping a torn tail.
+    """
+    try:
+        raw = path.read_bytes()
+    except FileNotFoundError:
+        return []
+    updates: List[bytes] = []
+    pos = 0
+    while pos + _LEN.size <= len(raw):
+        (size,) = _LEN.unpack_from(raw, pos)
+        end = pos + _LEN.size + size
+        if end > len(raw):
+            _log.warning("YStore log %s has a torn tail at offset %d", path, pos)
+            break
+        updates.append(raw[pos + _LEN.size : end])
+        pos = end
+    return updates
+
+
+class YUpdateLog:
+    """
+    Append-only on-disk log of Y updates for one webspace.
+
+    ``append`` only buffers; a daemon thread writes and fsyncs the buffer once
+    it holds ``LOG_BATCH_UPDATES`` updates or ``LOG_FLUSH_INTERVAL`` seconds
+    have passed, so a crash loses at most one small batch. ``rotate`` moves the
+    current file aside before a snapshot is taken; the rotated file is removed
+    once the snapshot covering it is on disk.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self.rotated = Path(str(path) + ".old")
+        self._cond = threading.Condition()
+        self._pending: List[bytes] = []
+        self._thread: Optional[threading.Thread] = None
+        self._closed = False
+
+    def append(self, update: bytes) -> None:
+        with self._cond:
+            self._pending.append(_LEN.pack(len(update)) + update)
+            if self._thread is None or not self._thread.is_alive():
+                self._closed = False
+                self._thread = threading.Thread(target=self._run, name=f"ystore-log-{self.path.stem}", daemon=True)
+                self._thread.start()
+            if len(self._pending) >= LOG_BATCH_UPDATES:
+                self._cond.notify()
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                if not self._pending and not self._closed:
+                    self._cond.wait(LOG_FLUSH_INTERVAL)
+                if self._closed and not self._pending:
+                    return
+                if len(self._pending) < LOG_BATCH_UPDATES and not self._closed:
+                    # добираем пачку до таймаута
+                    self._cond.wait(LOG_FLUSH_INTERVAL)
+                try:
+                    self._write_locked()
+                except Exception as exc:  # pragma: no cover - IO errors are logged only
+                    _log.warning("failed to append YStore log %s: %s", self.path, exc, exc_info=True)
+
+    def _write_locked(self) -> None:
+        if not self._pending:
+            return
+        chunk = b"".join(self._pending)
+        self._pending.clear()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.path, "ab") as fh:
+            fh.write(chunk)
+            fh.flush()
+            os.fsync(fh.fileno())
+
+    def flush(self) -> None:
+        with self._cond:
+            self._write_locked()
+
+    def rotate(self) -> None:
+        """Flush and move the live log aside (appending to an existing rotated file)."""
+        with self._cond:
+            self._write_locked()
+            if not self.path.exists():
+                return
+            if self.rotated.exists():
+                # предыдущее сжатие не дошло до конца — склеиваем, ничего не теряя
+                with open(self.rotated, "ab") as dst:
+                    dst.write(self.path.read_bytes())
+                    dst.flush()
+                    os.fsync(dst.fileno())
+                self.path.unlink()
+            else:
+                os.replace(self.path, self.rotated)
+
+    def drop_rotated(self) -> None:
+        try:
+            self.rotated.unlink()
+        except FileNotFoundError:
+            pass
+
+    def read_all(self) -> List[bytes]:
+        with self._cond:
+            self._write_locked()
+        return read_update_log(self.rotated) + read_update_log(self.path)
+
+    def close(self) -> None:
+        with self._cond:
+            self._closed = True
+            self._write_locked()
+            self._cond.notify()
+
+
+def _persist_snapshot(path: Path, updates: List[Tuple[bytes, bytes, float]]) -> Optional[bytes]:
     """
     Heavy snapshot encoding/writing performed in a worker thread.
+
+    Returns the squashed state so the caller can replace its in-memory history.
     """
     if not updates:
         try:
             path.unlink()
         except FileNotFoundError:
-            return
+            return None
         except Exception as exc:
             _log.warning("failed to remove stale YStore snapshot %s: %s", path, exc, exc_info=True)
-        return
+        return None
 
-    ydoc = Y.YDoc()
-    for update, _meta, _ts in updates:
-        Y.apply_update(ydoc, update)  # type: ignore[arg-type]
-    snapshot = Y.encode_state_as_update(ydoc)  # type: ignore[arg-type]
+    snapshot = _squash([update for update, _meta, _ts in updates])
 
     tmp = Path(str(path) + ".tmp")
     try:
         path.parent.mkdir(parents=True, exist_ok=True)
-        tmp.write_bytes(snapshot)
+        with open(tmp, "wb") as fh:
+            fh.write(snapshot)
+            fh.flush()
+            os.fsync(fh.fileno())
         tmp.replace(path)
         _log.debug("YStore snapshot written for webspace=%s path=%s", path.name.removesuffix(".sqlite3"), path)
     except Exception as exc:
         _log.warning("failed to write YStore snapshot %s: %s", path, exc, exc_info=True)
+        raise
+    return snapshot
 
 
 def ystores_root() -> Path:
@@ -68,15 +207,25 @@ def ystore_path_for_webspace(webspace_id: str) -> Path:
     return ystores_root() / f"{safe}.sqlite3"
 
 
-class AdaosMemoryYStore(BaseYStore):
+def ystore_log_path_for_webspace(webspace_id: str) -> Path:
     """
-    In-memory YStore with optional periodic snapshots to disk.
+    Append-only update log that complements the snapshot of a webspace.
+    """
+    return ystore_path_for_webspace(webspace_id).with_suffix(".ylog")
+
 
-    - All Y updates are kept in-memory in the current process.
-    - `read()` replays the in-memory log or, on first access, a persisted
-      snapshot from disk (if present).
-    - `backup_to_disk()` compresses the current log into a single
-      `Y.encode_state_as_update(ydoc)` blob and writes it atomically.
+class AdaosMemoryYStore(BaseYStore):
+    """
+    In-memory YStore backed by a snapshot plus an append-only update log.
+
+    - Y updates are kept in-memory and appended to ``<webspace>.ylog``, which
+      is fsynced in small batches.
+    - Once the in-memory history exceeds ``COMPACT_UPDATES`` updates or
+      ``COMPACT_BYTES`` bytes, a background compaction squashes it into a
+      single state update, writes it as the snapshot and drops the covered
+      part of the log.
+    - `read()` on first access recovers snapshot + log tail from disk.
+    - `backup_to_disk()` runs the same compaction on demand.
     """
 
     def __init__(self, path: str, *, document_ttl: float | None = None):
@@ -86,7 +235,15 @@ class AdaosMemoryYStore(BaseYStore):
         self.document_ttl = document_ttl
         self._lock: Lock = Lock()
         self._updates: List[Tuple[bytes, bytes, float]] = []
+        self._bytes = 0
         self._loaded_from_disk = False
+        self._log_file: Optional[YUpdateLog] = None
+        self._compacting = False
+        self._compact_task: Optional[asyncio.Task] = None
+        # сжатия выполняются строго по одному: иначе хвост/ротированный журнал теряются
+        self._compact_lock: Lock = Lock()
+        # выставляется y_bootstrap, когда документ проверен/засеян — повторно не перечитываем
+        self.seeded = False
         self._started: Event | None = None
         self._starting: bool = False
         self._task_group = None
@@ -105,38 +262,62 @@ class AdaosMemoryYStore(BaseYStore):
 
     def stop(self) -> None:
         self._running = False
+        if self._log_file is not None:
+            self._log_file.flush()
+
+    @property
+    def update_log(self) -> YUpdateLog:
+        if self._log_file is None:
+            self._log_file = YUpdateLog(ystore_log_path_for_webspace(self.path))
+        return self._log_file
 
     async def write(self, data: bytes) -> None:  # type: ignore[override]
         """
-        Append an update to the in-memory log, with optional TTL-based squashing.
+        Append an update to the in-memory history and the on-disk log.
         """
+        await self._load_from_disk_if_needed()
         metadata = await self.get_metadata()
         now = time.time()
         async with self._lock:
-            if self.document_ttl is not None and self._updates:
+            self.update_log.append(data)
+            if self.document_ttl is not None and self._updates and not self._compacting:
                 last_ts = self._updates[-1][2]
                 if now - last_ts > self.document_ttl:
                     # Squash history into a single snapshot.
-                    ydoc = Y.YDoc()
-                    for update, _meta, _ts in self._updates:
-                        Y.apply_update(ydoc, update)  # type: ignore[arg-type]
-                    self._updates.clear()
-                    squashed = Y.encode_state_as_update(ydoc)  # type: ignore[arg-type]
-                    self._updates.append((squashed, metadata, now))
+                    squashed = _squash([update for update, _meta, _ts in self._updates] + [data])
+                    self._updates = [(squashed, metadata, now)]
+                    self._bytes = len(squashed)
                     return
 
             self._updates.append((data, metadata, now))
+            self._bytes += len(data)
+            if len(self._updates) > COMPACT_UPDATES or self._bytes > COMPACT_BYTES:
+                self._schedule_compaction()
+
+    def _schedule_compaction(self) -> None:
+        if self._compacting:
+            return
+        self._compacting = True
+        try:
+            self._compact_task = asyncio.get_running_loop().create_task(self._compact_in_background())
+        except RuntimeError:
+            # нет asyncio-loop (например, trio) — сожмёмся при следующем backup_to_disk
+            self._compacting = False
+
+    async def _compact_in_background(self) -> None:
+        try:
+            await self.backup_to_disk()
+        except Exception as exc:  # pragma: no cover - defensive logging
+            _log.warning("YStore compaction failed for webspace=%s: %s", self.path, exc, exc_info=True)
 
     async def _load_from_disk_if_needed(self) -> None:
         if self._loaded_from_disk:
             return
         path = ystore_path_for_webspace(self.path)
-        if not path.exists():
-            self._loaded_from_disk = True
-            return
-
+        log = self.update_log
         try:
-            data = path.read_bytes()
+            data = await anyio.to_thread.run_sync(lambda: path.read_bytes() if path.exists() else None)
+            tail = await anyio.to_thread.run_sync(log.read_all)
         except Exception as exc:  # pragma: no cover - IO errors are logged only
             _log.warning("failed to read YStore snapshot %s: %s", path, exc, exc_info=True)
             self._loaded_from_disk = True
@@ -145,9 +326,13 @@ class AdaosMemoryYStore(BaseYStore):
         metadata = await self.get_metadata()
         now = time.time()
         async with self._lock:
-            if not self._updates:
-                self._updates.append((data, metadata, now))
-        self._loaded_from_disk = True
+            if self._loaded_from_disk:
+                return
+            recovered = ([data] if data else []) + tail
+            # восстановленное идёт перед тем, что успели записать до загрузки
+            self._updates[:0] = [(update, metadata, now) for update in recovered]
+            self._bytes += sum(len(update) for update in recovered)
+            self._loaded_from_disk = True
 
     async def read(self) -> AsyncIterator[tuple[bytes, bytes]]:  # type: ignore[override]
         """
@@ -164,15 +349,47 @@ class AdaosMemoryYStore(BaseYStore):
 
     async def backup_to_disk(self) -> None:
         """
-        Persist the current YDoc state as a single update snapshot.
+        Compact: persist the current YDoc state as a single update snapshot,
+        drop the log entries it covers and squash the in-memory history.
         """
+        await self._load_from_disk_if_needed()
+        async with self._compact_lock:
+            self._compacting = True
+            try:
+                await self._compact_locked()
+            finally:
+                self._compacting = False
+
+    async def _compact_locked(self) -> None:
         # Быстро копируем актуальные обновления под локом и освобождаем его,
-        # чтобы не блокировать live-запись из YRoom.
+        # чтобы не блокировать live-запись из YRoom. Журнал ротируется тут же:
+        # всё, что пишется дальше, попадёт уже в новый файл.
         async with self._lock:
             updates = list(self._updates)
+            await anyio.to_thread.run_sync(self.update_log.rotate)
 
         path = ystore_path_for_webspace(self.path)
-        await anyio.to_thread.run_sync(_persist_snapshot, path, updates)
+        snapshot = await anyio.to_thread.run_sync(_persist_snapshot, path, updates)
+        self.update_log.drop_rotated()
+        if snapshot is None:
+            return
+        async with self._lock:
+            # хвост, пришедший во время сжатия, сохраняем как есть
+            rest = self._updates[len(updates) :]
+            metadata = updates[-1][1]
+            self._updates = [(snapshot, metadata, time.time())] + rest
+            self._bytes = len(snapshot) + sum(len(update) for update, _meta, _ts in rest)
+
+    async def compact(self) -> None:
+        """
+        Scheduled backup: reuse an in-flight background compaction instead of
+        starting a second one (updates written meanwhile are already in the log).
+        """
+        task = self._compact_task
+        if task is not None and not task.done():
+            await asyncio.shield(task)
+            return
+        await self.backup_to_disk()
 
 
 _YSTORE_CACHE: Dict[str, AdaosMemoryYStore] = {}
@@ -192,6 +409,39 @@ def get_ystore_for_webspace(webspace_id: str) -> AdaosMemoryYStore:
     return store
 
 
+def drop_ystore_for_webspace(webspace_id: str) -> None:
+    """
+    Forget the cached store of a deleted webspace and remove its files.
+    """
+    store = _YSTORE_CACHE.pop(webspace_id, None)
+    if store is not None and store._log_file is not None:
+        store._log_file.close()
+    path = ystore_path_for_webspace(webspace_id)
+    log_path = ystore_log_path_for_webspace(webspace_id)
+    for candidate in (path, log_path, Path(str(log_path) + ".old")):
+        try:
+            candidate.unlink()
+        except FileNotFoundError:
+            pass
+        except Exception as exc:  # pragma: no cover - defensive logging
+            _log.warning("failed to remove %s: %s", candidate, exc)
+
+
+def flush_ystore_logs() -> None:
+    """
+    Write out buffered log entries of all cached stores (used on shutdown).
+    """
+    for store in list(_YSTORE_CACHE.values()):
+        if store._log_file is not None:
+            try:
+                store._log_file.close()
+            except Exception:  # pragma: no cover - defensive logging
+                _log.warning("failed to flush YStore log for webspace=%s", store.path, exc_info=True)
+
+
+atexit.register(flush_ystore_logs)
+
+
 @subscribe("sys.ystore.backup")
 async def _on_ystore_backup(payload: dict) -> None:
     """
@@ -204,7 +454,7 @@ async def _on_ystore_backup(payload: dict) -> None:
     webspace_id = str(payload.get("webspace_id") or payload.get("workspace_id") or "default")
     try:
         store = get_ystore_for_webspace(webspace_id)
-        await store.backup_to_disk()
+        await store.compact()
     except Exception as exc:  # pragma: no cover - defensive logging
         _log.warning("YStore backup failed for webspace=%s: %s", webspace_id, exc, exc_info=True)
 
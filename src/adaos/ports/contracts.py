@@ -5,6 +5,7 @@ from adaos.domain import Event, ProcessSpec, SkillId
 class EventBus(Protocol):
     def publish(self, event: Event) -> None: ...
     def subscribe(self, type_prefix: str, handler: Callable[[Event], None]) -> None: ...
+    def unsubscribe(self, type_prefix: str, handler: Callable[[Event], None]) -> bool: ...
 
 class Process(Protocol):
     async def start(self, spec: ProcessSpec) -> str: ...
@@ -26,9 +27,14 @@ class KV(Protocol):
     def set(self, key: str, value: Any) -> None: ...
     def delete(self, key: str) -> None: ...
     def list(self, prefix: str = "") -> list[str]: ...
+    def get_many(self, keys: Iterable[str]) -> dict[str, Any]: ...
+    def set_many(self, items: Mapping[str, Any]) -> None: ...
+    def delete_prefix(self, prefix: str) -> int: ...
 
 class SQL(Protocol):
     def connect(self) -> Any: ...
+    def read(self) -> Any: ...
+    def close(self) -> None: ...
 
 class Secrets(Protocol):
     def put(self, name: str, value: bytes, scope: str) -> None: ...
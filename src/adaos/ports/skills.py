@@ -10,3 +10,4 @@ class SkillRepository(Protocol):
     def get(self, skill_id: str) -> Optional[SkillMeta]: ...
     def install(self, name: str, *, branch: Optional[str] = None, dest_name: Optional[str] = None) -> SkillMeta: ...
     def uninstall(self, skill_id: str) -> None: ...
+    def invalidate(self, skill_id: Optional[str] = None) -> None: ...
@@ -53,11 +53,12 @@ async def register_subscriptions():
                 )
                 continue
             handlers_for_skill[topic] = f"{fn.__module__}.{fn.__name__}"
+        skill_root = _resolve_skill_root(fn, skill_name)
 
         if inspect.iscoroutinefunction(fn):
 
-            async def _wrap(evt, _fn=fn, _skill=skill_name):
-                pushed = _maybe_push_skill(_fn, _skill)
+            async def _wrap(evt, _fn=fn, _skill=skill_name, _root=skill_root):
+                pushed = _maybe_push_skill(_skill, _root)
                 try:
                     return await _fn(evt)
                 finally:
@@ -66,8 +67,8 @@ async def register_subscriptions():
 
         else:
 
-            async def _wrap(evt, _fn=fn, _skill=skill_name):
-                pushed = _maybe_push_skill(_fn, _skill)
+            async def _wrap(evt, _fn=fn, _skill=skill_name, _root=skill_root):
+                pushed = _maybe_push_skill(_skill, _root)
                 try:
                     _fn(evt)
                 finally:
@@ -175,41 +176,57 @@ def _infer_skill_name(fn: Callable) -> Optional[str]:
     return None
 
 
-def _maybe_push_skill(fn: Callable, skill_name: Optional[str]) -> bool:
-    """
-    ��⠭����� CurrentSkill �� �६� �맮�� ��ࠡ��稪�.
+def _handler_skill_root(fn: Callable) -> Optional[Path]:
+    """Корень навыка по пути файла обработчика: .../skills/<skill> или .../skills/.runtime/<skill>."""
+    try:
+        parts = list(Path(inspect.getfile(fn)).resolve().parts)
+    except Exception:
+        return None
+    for idx in range(len(parts) - 1, -1, -1):
+        if parts[idx] == "skills" and idx + 1 < len(parts):
+            if parts[idx + 1] == ".runtime" and idx + 2 < len(parts):
+                return Path(*parts[: idx + 3])
+            return Path(*parts[: idx + 2])
+    return None
 
-    1) ��⠥��� �१ SkillContextService (set_current_skill).
-    2) �᫨ ���뮪 �� ������ � registry, ����塞 ���� � skill root
-       �� 䠩�� ������� � ��뢠�� ctx.skill_ctx.set(...) �������.
+
+def _resolve_skill_root(fn: Callable, skill_name: Optional[str]) -> Optional[Path]:
+    """
+    Один раз при регистрации: путь навыка из skills_repo, иначе — по файлу обработчика.
+    Так на каждое событие не нужно ходить в репозиторий и разбирать манифест.
     """
     if not skill_name:
-        return False
-
+        return None
     try:
-        if set_current_skill(skill_name):
-            return True
+        meta = require_ctx("sdk.core.decorators").skills_repo.get(skill_name)
+        if meta:
+            return Path(meta.path)
     except SdkRuntimeNotInitialized:
-        _LOG.debug("AgentContext not available when setting skill=%s", skill_name)
+        _LOG.debug("AgentContext not available when resolving skill=%s", skill_name)
     except Exception:
-        _LOG.warning("set_current_skill failed for %s", skill_name, exc_info=True)
+        _LOG.warning("skills_repo lookup failed for %s", skill_name, exc_info=True)
+    return _handler_skill_root(fn)
+
 
+def _maybe_push_skill(skill_name: Optional[str], skill_root: Optional[Path]) -> bool:
+    """Установить CurrentSkill на время вызова обработчика (корень навыка уже известен)."""
+    if not skill_name:
+        return False
+    if skill_root is None:
+        try:
+            return bool(set_current_skill(skill_name))
+        except SdkRuntimeNotInitialized:
+            _LOG.debug("AgentContext not available when setting skill=%s", skill_name)
+        except Exception:
+            _LOG.warning("set_current_skill failed for %s", skill_name, exc_info=True)
+        return False
     try:
-        ctx = require_ctx("sdk.data.skill_memory")
-        handler_path = Path(inspect.getfile(fn)).resolve()
-        parts = list(handler_path.parts)
-        skill_root: Path | None = None
-        for idx in range(len(parts) - 1, -1, -1):
-            part = parts[idx]
-            if part == "skills" and idx + 1 < len(parts):
-                skill_root = Path(*parts[: idx + 2])  # .../skills/<skill_name>
-                break
-        if skill_root is None:
-            return False
-        skill_ctx = getattr(ctx, "skill_ctx", None)
+        skill_ctx = getattr(require_ctx("sdk.data.skill_memory"), "skill_ctx", None)
         if not skill_ctx:
             return False
         return bool(skill_ctx.set(skill_name, skill_root))
+    except SdkRuntimeNotInitialized:
+        _LOG.debug("AgentContext not available when setting skill=%s", skill_name)
     except Exception:
-        _LOG.debug("fallback skill_ctx.set failed for %s", skill_name, exc_info=True)
-        return False
+        _LOG.debug("skill_ctx.set failed for %s", skill_name, exc_info=True)
+    return False
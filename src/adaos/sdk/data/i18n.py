@@ -9,7 +9,7 @@ from pathlib import Path
 from typing import Any, Dict, Optional
 
 from adaos.services.agent_context import get_ctx
-from adaos.services.i18n.service import DEFAULT_LANG, I18nService
+from adaos.services.i18n.service import DEFAULT_LANG
 
 from .context import get_current_skill
 
@@ -47,7 +47,8 @@ class I18n:
             except Exception:
                 return text
 
-        svc = I18nService(ctx)
+        # каталоги общие для процесса, поэтому берём сервис из контекста
+        svc = ctx.i18n
         cur = get_current_skill()
         skill_path: Optional[Path] = getattr(cur, "path", None) if cur else None
         skill_id: Optional[str] = getattr(cur, "name", None) if cur else None
@@ -1,20 +1,25 @@
-"""Local JSON-backed storage scoped to the active skill context."""
+"""Local JSON-backed storage scoped to the active skill context.
+
+Values live in a process-wide in-memory view (see
+:mod:`adaos.services.skill.memory_store`) that is written back atomically
+shortly after changes.
+"""
 
 from __future__ import annotations
 
-import json
 import os
 from pathlib import Path
 from typing import Any
 
 from adaos.sdk.core._ctx import require_ctx
 from adaos.sdk.core.errors import SdkRuntimeNotInitialized
+from adaos.services.skill.memory_store import current_skill_env_path, flush_skill_memory, get_skill_memory
 
-__all__ = ["get", "set"]
+__all__ = ["get", "set", "flush"]
 
 
 def _memory_path() -> Path:
-    override = os.getenv("ADAOS_SKILL_ENV_PATH")
+    override = current_skill_env_path() or os.getenv("ADAOS_SKILL_ENV_PATH")
     if override:
         path = Path(override)
     else:
@@ -28,27 +33,13 @@ def _memory_path() -> Path:
 
 
 def get(key: str, default: Any | None = None) -> Any:
-    mem_file = _memory_path()
-    if mem_file.exists():
-        try:
-            data = json.loads(mem_file.read_text(encoding="utf-8"))
-        except Exception:
-            data = {}
-        if isinstance(data, dict):
-            return data.get(key, default)
-    return default
+    return get_skill_memory(_memory_path()).get(key, default)
 
 
 def set(key: str, value: Any) -> None:
-    mem_file = _memory_path()
-    if mem_file.exists():
-        try:
-            data = json.loads(mem_file.read_text(encoding="utf-8"))
-        except Exception:
-            data = {}
-    else:
-        data = {}
-    if not isinstance(data, dict):
-        data = {}
-    data[key] = value
-    mem_file.write_text(json.dumps(data, indent=2, ensure_ascii=False), encoding="utf-8")
+    get_skill_memory(_memory_path()).set(key, value)
+
+
+def flush() -> None:
+    """Write pending changes of the current skill memory to disk immediately."""
+    flush_skill_memory(_memory_path())
@@ -2,16 +2,22 @@
 
 from __future__ import annotations
 
+from contextvars import ContextVar
 from dataclasses import dataclass, field
+from inspect import isawaitable
 from pathlib import Path
 from types import SimpleNamespace
-from typing import Any, Callable, Dict, Iterable, List, Mapping, MutableMapping, Optional
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Mapping, MutableMapping, Optional, Union
+import asyncio
 import contextlib
+import copy
 import io
 import logging
 import os
 import re
 import json
+import sys
+import threading
 
 import yaml
 
@@ -19,7 +25,7 @@ from adaos.sdk.core.logging import setup_scenario_logger
 from adaos.sdk.data import memory
 
 
-ActionHandler = Callable[[Mapping[str, Any]], Any]
+ActionHandler = Callable[[Mapping[str, Any]], Union[Any, Awaitable[Any]]]
 
 
 class ActionRegistry:
@@ -32,7 +38,32 @@ class ActionRegistry:
     def call(self, route: str, args: Mapping[str, Any]) -> Any:
         if route not in self._actions:
             raise RuntimeError(f"unknown route: {route}")
-        return self._actions[route](args)
+        result = self._actions[route](args)
+        if isawaitable(result):
+            try:
+                asyncio.get_running_loop()
+            except RuntimeError:
+                return asyncio.run(_await(result))
+            if asyncio.iscoroutine(result):
+                result.close()
+            raise RuntimeError(f"route '{route}' is asynchronous; use ScenarioRuntime.arun() inside an event loop")
+        return result
+
+    async def acall(self, route: str, args: Mapping[str, Any]) -> Any:
+        """Call a route from a coroutine.
+
+        Coroutine handlers are awaited on the caller's loop; plain handlers run in a
+        worker thread so that parallel branches do not block each other.
+        """
+        handler = self._actions.get(route)
+        if handler is None:
+            raise RuntimeError(f"unknown route: {route}")
+        if _is_async_handler(handler):
+            return await handler(args)
+        result = await asyncio.to_thread(handler, args)
+        if isawaitable(result):
+            result = await result
+        return result
 
     def has(self, route: str) -> bool:
         return route in self._actions
@@ -41,7 +72,30 @@ class ActionRegistry:
         return tuple(self._actions)
 
 
+async def _await(awaitable: Awaitable[Any]) -> Any:
+    return await awaitable
+
+
+def _is_async_handler(handler: Callable[..., Any]) -> bool:
+    return asyncio.iscoroutinefunction(handler) or asyncio.iscoroutinefunction(getattr(handler, "__call__", None))
+
+
 _PLACEHOLDER_RE = re.compile(r"\$\{([^{}]+)\}")
+_DURATION_RE = re.compile(r"^\s*(\d+(?:\.\d+)?)\s*(ms|s|m|h|d)?\s*$")
+_DURATION_UNITS = {"ms": 0.001, "s": 1.0, "m": 60.0, "h": 3600.0, "d": 86400.0}
+
+
+def _parse_duration(value: Any) -> Optional[float]:
+    """``"250ms"``, ``"3s"``, ``"5m"`` or a number of seconds -> seconds."""
+    if value is None or isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return float(value) if value > 0 else None
+    match = _DURATION_RE.match(str(value))
+    if not match:
+        raise ValueError(f"invalid duration: {value!r}")
+    seconds = float(match.group(1)) * _DURATION_UNITS[match.group(2) or "s"]
+    return seconds if seconds > 0 else None
 
 
 @dataclass(slots=True)
@@ -53,6 +107,9 @@ class ScenarioStep:
     save_as: Optional[str] = None
     set_values: Dict[str, Any] = field(default_factory=dict)
     children: List["ScenarioStep"] = field(default_factory=list)
+    parallel: List["ScenarioStep"] = field(default_factory=list)
+    timeout: Optional[float] = None
+    max_concurrency: Optional[int] = None
 
     @classmethod
     def from_mapping(cls, data: Mapping[str, Any]) -> "ScenarioStep":
@@ -61,6 +118,9 @@ class ScenarioStep:
         set_values = data.get("set") or {}
         children_raw = data.get("do") or []
         children = [cls.from_mapping(item) for item in children_raw if isinstance(item, Mapping)]
+        parallel_raw = data.get("parallel") or []
+        parallel = [cls.from_mapping(item) for item in parallel_raw if isinstance(item, Mapping)]
+        limit = data.get("max_concurrency")
         return cls(
             name=name,
             when=data.get("when"),
@@ -69,6 +129,9 @@ class ScenarioStep:
             save_as=data.get("save_as"),
             set_values=dict(set_values) if isinstance(set_values, Mapping) else {},
             children=children,
+            parallel=parallel,
+            timeout=_parse_duration(data.get("timeout")),
+            max_concurrency=int(limit) if limit else None,
         )
 
 
@@ -79,6 +142,14 @@ class ScenarioModel:
     trigger: Optional[str]
     vars: Dict[str, Any]
     steps: List[ScenarioStep]
+    _plan: Optional["ScenarioPlan"] = field(default=None, repr=False, compare=False)
+
+    def plan(self) -> "ScenarioPlan":
+        """Return the compiled execution plan, compiling it on first use."""
+        plan = self._plan
+        if plan is None:
+            plan = self._plan = compile_scenario(self)
+        return plan
 
     @classmethod
     def from_payload(cls, payload: Mapping[str, Any], *, fallback_id: str) -> "ScenarioModel":
@@ -98,10 +169,11 @@ from adaos.services.agent_context import get_ctx, AgentContext
 
 
 class ScenarioRuntime:
-    def __init__(self, registry: Optional[ActionRegistry] = None) -> None:
+    def __init__(self, registry: Optional[ActionRegistry] = None, *, max_concurrency: Optional[int] = None) -> None:
         self._registry = registry or default_registry()
         self._logger: Optional[logging.Logger] = None
         self._log_path: Optional[Path] = None
+        self.max_concurrency = max_concurrency
         self.ctx: AgentContext = get_ctx()
 
     def _log(self, level: int, message: str, *, extra: Optional[Mapping[str, Any]] = None) -> None:
@@ -110,18 +182,49 @@ class ScenarioRuntime:
         payload = {"extra": dict(extra) if extra else {}}
         self._logger.log(level, message, extra=payload)
 
-    def run(self, scenario: ScenarioModel, *, bag: Optional[MutableMapping[str, Any]] = None) -> Dict[str, Any]:
+    def _prepare_state(self, scenario: ScenarioModel, bag: Optional[MutableMapping[str, Any]]) -> Dict[str, Any]:
         state: Dict[str, Any] = bag if bag is not None else {}
-        state.setdefault("vars", dict(scenario.vars))
+        if "vars" not in state:
+            # модель может быть общей (кэш load_scenario) — вложенные vars не должны утекать между запусками
+            state["vars"] = copy.deepcopy(scenario.vars)
         state.setdefault("steps", {})
         if self._log_path is not None:
             state.setdefault("meta", {})["log_file"] = str(self._log_path)
+        return state
+
+    def run(self, scenario: ScenarioModel, *, bag: Optional[MutableMapping[str, Any]] = None) -> Dict[str, Any]:
+        """Run a scenario synchronously.
+
+        Outside an event loop this drives :meth:`arun`, so ``parallel:`` blocks,
+        timeouts and coroutine actions behave the same. Inside a running loop the
+        steps are executed inline and sequentially (use ``await arun(...)`` there).
+        """
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return asyncio.run(self.arun(scenario, bag=bag))
+        state = self._prepare_state(scenario, bag)
         self._log(logging.INFO, "scenario.start", extra={"scenario_id": scenario.id})
-        for step in scenario.steps:
+        for step in scenario.plan().steps:
             self._execute_step(step, state)
         self._log(logging.INFO, "scenario.finish", extra={"scenario_id": scenario.id})
         return state
 
+    async def arun(self, scenario: ScenarioModel, *, bag: Optional[MutableMapping[str, Any]] = None) -> Dict[str, Any]:
+        """Run a scenario on the current event loop.
+
+        Steps of a ``parallel:`` block are executed concurrently; ``timeout`` is
+        enforced per step and ``max_concurrency`` (runtime-wide and per block)
+        bounds the number of actions in flight.
+        """
+        state = self._prepare_state(scenario, bag)
+        limit = asyncio.Semaphore(self.max_concurrency) if self.max_concurrency else None
+        self._log(logging.INFO, "scenario.start", extra={"scenario_id": scenario.id})
+        for step in scenario.plan().steps:
+            await self._aexecute_step(step, state, limit)
+        self._log(logging.INFO, "scenario.finish", extra={"scenario_id": scenario.id})
+        return state
+
     def validate(self, scenario: ScenarioModel) -> List[str]:
         errors: List[str] = []
         seen: set[str] = set()
@@ -133,55 +236,135 @@ class ScenarioRuntime:
                 seen.add(step.name)
             if step.call and not self._registry.has(step.call):
                 errors.append(f"unknown route '{step.call}' in step '{step.name}'")
-            for child in step.children:
+            for child in (*step.parallel, *step.children):
                 _check(child)
 
         for step in scenario.steps:
             _check(step)
         return errors
 
-    def _execute_step(self, step: ScenarioStep, bag: MutableMapping[str, Any]) -> None:
-        if not _evaluate_condition(step.when, bag):
+    # ------------------------------------------------------------------
+    # step execution
+    # ------------------------------------------------------------------
+    def _apply_set(self, plan: "_StepPlan", bag: MutableMapping[str, Any]) -> None:
+        for key, resolve in plan.set_values:
+            bag[key] = resolve(bag)
+        self._log(logging.INFO, "step.set", extra={"step": plan.step.name, "keys": list(plan.step.set_values.keys())})
+
+    def _call_args(self, plan: "_StepPlan", bag: MutableMapping[str, Any]) -> Mapping[str, Any]:
+        args = plan.args(bag)
+        return args if isinstance(args, Mapping) else {}
+
+    def _record_result(self, step: ScenarioStep, bag: MutableMapping[str, Any], args: Mapping[str, Any], result: Any) -> None:
+        if step.save_as:
+            bag[step.save_as] = result
+        bag.setdefault("steps", {})[step.name] = {
+            "route": step.call,
+            "args": args,
+            "result": result,
+        }
+        self._log(
+            logging.INFO,
+            "step.call.success",
+            extra={"step": step.name, "route": step.call},
+        )
+
+    def _record_error(self, step: ScenarioStep, bag: MutableMapping[str, Any], args: Mapping[str, Any], error: str) -> None:
+        bag.setdefault("steps", {})[step.name] = {
+            "route": step.call,
+            "args": args,
+            "error": error,
+        }
+        self._log(
+            logging.ERROR,
+            "step.call.error",
+            extra={"step": step.name, "route": step.call, "error": error},
+        )
+
+    def _execute_step(self, plan: "_StepPlan", bag: MutableMapping[str, Any]) -> None:
+        if plan.when is not None and not plan.when(bag):
             return
+        step = plan.step
         self._log(logging.INFO, "step.start", extra={"step": step.name})
-        if step.set_values:
-            for key, value in step.set_values.items():
-                bag[key] = _resolve_value(value, bag)
-            self._log(logging.INFO, "step.set", extra={"step": step.name, "keys": list(step.set_values.keys())})
+        if plan.set_values:
+            self._apply_set(plan, bag)
         if step.call:
-            args = _resolve_value(step.args, bag)
-            if not isinstance(args, Mapping):
-                args = {}
+            args = self._call_args(plan, bag)
             try:
                 result = self._registry.call(step.call, args)
-                if step.save_as:
-                    bag[step.save_as] = result
-                bag.setdefault("steps", {})[step.name] = {
-                    "route": step.call,
-                    "args": args,
-                    "result": result,
-                }
-                self._log(
-                    logging.INFO,
-                    "step.call.success",
-                    extra={"step": step.name, "route": step.call},
-                )
             except Exception as exc:
-                bag.setdefault("steps", {})[step.name] = {
-                    "route": step.call,
-                    "args": args,
-                    "error": str(exc),
-                }
-                self._log(
-                    logging.ERROR,
-                    "step.call.error",
-                    extra={"step": step.name, "route": step.call, "error": str(exc)},
-                )
+                self._record_error(step, bag, args, str(exc))
                 raise
-        for child in step.children:
+            self._record_result(step, bag, args, result)
+        for child in (*plan.parallel, *plan.children):
             self._execute_step(child, bag)
         self._log(logging.INFO, "step.finish", extra={"step": step.name})
 
+    async def _aexecute_step(self, plan: "_StepPlan", bag: MutableMapping[str, Any], limit: Optional[asyncio.Semaphore]) -> None:
+        if plan.when is not None and not plan.when(bag):
+            return
+        step = plan.step
+        if plan.timeout is None:
+            await self._astep_body(plan, bag, limit)
+            return
+        try:
+            await asyncio.wait_for(self._astep_body(plan, bag, limit), plan.timeout)
+        except asyncio.TimeoutError:
+            error = f"step '{step.name}' timed out after {plan.timeout:g}s"
+            if step.call:
+                entry = bag.setdefault("steps", {}).get(step.name)
+                if not entry or "result" not in entry:
+                    self._record_error(step, bag, entry.get("args", {}) if entry else {}, error)
+            self._log(logging.ERROR, "step.timeout", extra={"step": step.name, "timeout": plan.timeout})
+            raise TimeoutError(error) from None
+
+    async def _astep_body(self, plan: "_StepPlan", bag: MutableMapping[str, Any], limit: Optional[asyncio.Semaphore]) -> None:
+        step = plan.step
+        self._log(logging.INFO, "step.start", extra={"step": step.name})
+        if plan.set_values:
+            self._apply_set(plan, bag)
+        if step.call:
+            args = self._call_args(plan, bag)
+            # аргументы видны в steps даже если шаг оборвётся по таймауту
+            bag.setdefault("steps", {})[step.name] = {"route": step.call, "args": args}
+            try:
+                if limit is None:
+                    result = await self._registry.acall(step.call, args)
+                else:
+                    async with limit:
+                        result = await self._registry.acall(step.call, args)
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:
+                self._record_error(step, bag, args, str(exc))
+                raise
+            self._record_result(step, bag, args, result)
+        if plan.parallel:
+            await self._aparallel(plan, bag, limit)
+        for child in plan.children:
+            await self._aexecute_step(child, bag, limit)
+        self._log(logging.INFO, "step.finish", extra={"step": step.name})
+
+    async def _aparallel(self, plan: "_StepPlan", bag: MutableMapping[str, Any], limit: Optional[asyncio.Semaphore]) -> None:
+        block = asyncio.Semaphore(plan.max_concurrency) if plan.max_concurrency else None
+
+        async def _branch(child: "_StepPlan") -> None:
+            if block is None:
+                await self._aexecute_step(child, bag, limit)
+                return
+            async with block:
+                await self._aexecute_step(child, bag, limit)
+
+        tasks = [asyncio.ensure_future(_branch(child)) for child in plan.parallel]
+        try:
+            # первая ошибка отменяет соседние ветки и пробрасывается как есть
+            await asyncio.gather(*tasks)
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            raise
+
     def run_from_file(self, path: str | Path) -> Dict[str, Any]:
         model = load_scenario(path)
         base_dir = self.ctx.paths.base_dir()
@@ -192,75 +375,190 @@ class ScenarioRuntime:
             "scenario.loaded",
             extra={"scenario_id": model.id, "path": str(path)},
         )
-        state: Dict[str, Any] = {"vars": dict(model.vars)}
+        state: Dict[str, Any] = {"vars": copy.deepcopy(model.vars)}
         state.setdefault("meta", {})["log_file"] = str(self._log_path)
         result = self.run(model, bag=state)
         return result
 
 
+# resolved scenario.yaml -> ((mtime_ns, size), model); повторные запуски не парсят YAML заново
+_SCENARIO_CACHE: Dict[Path, tuple[tuple[int, int], ScenarioModel]] = {}
+_SCENARIO_CACHE_LOCK = threading.Lock()
+
+
 def load_scenario(path: Path | str) -> ScenarioModel:
-    """load scenario.yaml"""
-    scenario_path = Path(path).expanduser().resolve() / "scenario.yaml"
+    """load scenario.yaml (compiled plan included), cached by path + mtime"""
+    scenario_path = Path(path).expanduser().resolve()
+    if not scenario_path.is_file():
+        scenario_path = scenario_path / "scenario.yaml"
+    st = scenario_path.stat()
+    stamp = (st.st_mtime_ns, st.st_size)
+    cached = _SCENARIO_CACHE.get(scenario_path)
+    if cached is not None and cached[0] == stamp:
+        return cached[1]
     payload = yaml.safe_load(scenario_path.read_text(encoding="utf-8")) or {}
-    return ScenarioModel.from_payload(payload, fallback_id=scenario_path.stem)
+    model = ScenarioModel.from_payload(payload, fallback_id=scenario_path.stem)
+    model.plan()
+    with _SCENARIO_CACHE_LOCK:
+        _SCENARIO_CACHE[scenario_path] = (stamp, model)
+    return model
+
+
+def clear_scenario_cache() -> None:
+    with _SCENARIO_CACHE_LOCK:
+        _SCENARIO_CACHE.clear()
+
+
+# ---------------------------------------------------------------------------
+# Execution plans
+# ---------------------------------------------------------------------------
+
+Resolver = Callable[[Mapping[str, Any]], Any]
+
+
+@dataclass(slots=True)
+class _StepPlan:
+    step: ScenarioStep
+    when: Optional[Callable[[Mapping[str, Any]], bool]]
+    set_values: tuple[tuple[str, Resolver], ...]
+    args: Resolver
+    children: tuple["_StepPlan", ...]
+    parallel: tuple["_StepPlan", ...]
+    timeout: Optional[float]
+    max_concurrency: Optional[int]
+
+
+@dataclass(slots=True)
+class ScenarioPlan:
+    """Scenario steps with templates, references and conditions pre-compiled."""
+
+    scenario_id: str
+    steps: tuple[_StepPlan, ...]
+
+
+def compile_scenario(scenario: ScenarioModel) -> ScenarioPlan:
+    return ScenarioPlan(scenario_id=scenario.id, steps=tuple(_compile_step(step) for step in scenario.steps))
+
+
+def _compile_step(step: ScenarioStep) -> _StepPlan:
+    return _StepPlan(
+        step=step,
+        when=_compile_condition(step.when),
+        set_values=tuple((key, _compile_value(value)[1]) for key, value in step.set_values.items()),
+        args=_compile_value(step.args)[1],
+        children=tuple(_compile_step(child) for child in step.children),
+        parallel=tuple(_compile_step(child) for child in step.parallel),
+        timeout=step.timeout,
+        max_concurrency=step.max_concurrency,
+    )
 
 
 def _is_placeholder(value: str) -> bool:
     return value.startswith("${") and value.endswith("}")
 
 
-def _resolve_reference(expr: str, bag: Mapping[str, Any]) -> Any:
-    current: Any = bag
-    for part in expr.split("."):
-        key = part.strip()
-        if not key:
-            return None
-        if isinstance(current, Mapping):
-            current = current.get(key)
-        else:
-            current = getattr(current, key, None)
-        if current is None:
-            return None
-    return current
+def _compile_reference(expr: str) -> Resolver:
+    keys = tuple(part.strip() for part in expr.split("."))
+    if not all(keys):
+        return lambda bag: None
 
+    def resolve(bag: Mapping[str, Any]) -> Any:
+        current: Any = bag
+        for key in keys:
+            if isinstance(current, Mapping):
+                current = current.get(key)
+            else:
+                current = getattr(current, key, None)
+            if current is None:
+                return None
+        return current
 
-def _substitute_string(template: str, bag: Mapping[str, Any]) -> str:
-    def repl(match: re.Match[str]) -> str:
-        inner = match.group(1).strip()
-        resolved = _resolve_reference(inner, bag)
-        return "" if resolved is None else str(resolved)
+    return resolve
 
-    return _PLACEHOLDER_RE.sub(repl, template)
 
+def _resolve_reference(expr: str, bag: Mapping[str, Any]) -> Any:
+    return _compile_reference(expr)(bag)
+
+
+def _compile_placeholder(inner: str) -> Resolver:
+    if inner.startswith("not "):
+        ref = _compile_reference(inner[4:])
+        return lambda bag: not bool(ref(bag))
+    return _compile_reference(inner)
+
+
+def _compile_template(template: str) -> Optional[Resolver]:
+    """Interpolated string -> resolver; None when there is nothing to substitute."""
+    parts: List[Any] = []
+    pos = 0
+    for match in _PLACEHOLDER_RE.finditer(template):
+        if match.start() > pos:
+            parts.append(template[pos : match.start()])
+        parts.append(_compile_reference(match.group(1).strip()))
+        pos = match.end()
+    if not parts:
+        return None
+    if pos < len(template):
+        parts.append(template[pos:])
+    pieces = tuple(parts)
+
+    def render(bag: Mapping[str, Any]) -> str:
+        out = []
+        for piece in pieces:
+            if isinstance(piece, str):
+                out.append(piece)
+            else:
+                resolved = piece(bag)
+                out.append("" if resolved is None else str(resolved))
+        return "".join(out)
 
-def _resolve_value(value: Any, bag: Mapping[str, Any]) -> Any:
+    return render
+
+
+def _compile_value(value: Any) -> tuple[bool, Resolver]:
+    """Compile a value tree into ``(is_constant, resolver)``.
+
+    Constant subtrees are returned as-is on every run instead of being rebuilt.
+    """
     if isinstance(value, Mapping):
-        return {k: _resolve_value(v, bag) for k, v in value.items()}
+        items = [(k, _compile_value(v)) for k, v in value.items()]
+        if all(const for _, (const, _) in items):
+            return True, lambda bag: value
+        resolvers = tuple((k, fn) for k, (_, fn) in items)
+        return False, lambda bag: {k: fn(bag) for k, fn in resolvers}
     if isinstance(value, list):
-        return [_resolve_value(v, bag) for v in value]
+        compiled = [_compile_value(v) for v in value]
+        if all(const for const, _ in compiled):
+            return True, lambda bag: value
+        fns = tuple(fn for _, fn in compiled)
+        return False, lambda bag: [fn(bag) for fn in fns]
     if isinstance(value, str):
         if _is_placeholder(value):
-            inner = value[2:-1].strip()
-            if inner.startswith("not "):
-                return not bool(_resolve_reference(inner[4:], bag))
-            return _resolve_reference(inner, bag)
-        return _substitute_string(value, bag)
-    return value
+            return False, _compile_placeholder(value[2:-1].strip())
+        render = _compile_template(value)
+        if render is not None:
+            return False, render
+    return True, lambda bag: value
 
 
-def _evaluate_condition(value: Any, bag: Mapping[str, Any]) -> bool:
+def _resolve_value(value: Any, bag: Mapping[str, Any]) -> Any:
+    return _compile_value(value)[1](bag)
+
+
+def _compile_condition(value: Any) -> Optional[Callable[[Mapping[str, Any]], bool]]:
+    """None means the step always runs."""
     if value is None:
-        return True
-    if isinstance(value, bool):
-        return value
+        return None
     if isinstance(value, str) and _is_placeholder(value):
-        inner = value[2:-1].strip()
-        if inner.startswith("not "):
-            return not bool(_resolve_reference(inner[4:], bag))
-        return bool(_resolve_reference(inner, bag))
-    if isinstance(value, str):
-        return bool(value)
-    return bool(value)
+        resolve = _compile_placeholder(value[2:-1].strip())
+        return lambda bag: bool(resolve(bag))
+    result = bool(value)
+    return lambda bag: result
+
+
+def _evaluate_condition(value: Any, bag: Mapping[str, Any]) -> bool:
+    check = _compile_condition(value)
+    return True if check is None else check(bag)
 
 
 class _InMemoryKV:
@@ -347,12 +645,55 @@ def _locate_base_dir(scenario_path: Path) -> Path:
     return scenario_path.parent
 
 
+# stdout текущей задачи/потока; contextlib.redirect_stdout глобален и смешал бы вывод параллельных веток
+_STDOUT_CAPTURE: ContextVar[Optional[io.StringIO]] = ContextVar("adaos_scenario_stdout", default=None)
+_STDOUT_LOCK = threading.Lock()
+_STDOUT_USERS = 0
+
+
+class _ContextStdout(io.TextIOBase):
+    """sys.stdout proxy writing to the capture buffer of the current context, if any."""
+
+    def __init__(self, target: Any) -> None:
+        self._target = target
+
+    def write(self, text: str) -> int:
+        buf = _STDOUT_CAPTURE.get()
+        return (buf if buf is not None else self._target).write(text)
+
+    def flush(self) -> None:
+        buf = _STDOUT_CAPTURE.get()
+        (buf if buf is not None else self._target).flush()
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._target, name)
+
+
+@contextlib.contextmanager
+def _capture_stdout():
+    global _STDOUT_USERS
+    with _STDOUT_LOCK:
+        if not isinstance(sys.stdout, _ContextStdout):
+            sys.stdout = _ContextStdout(sys.stdout)
+        _STDOUT_USERS += 1
+    buf = io.StringIO()
+    token = _STDOUT_CAPTURE.set(buf)
+    try:
+        yield buf
+    finally:
+        _STDOUT_CAPTURE.reset(token)
+        with _STDOUT_LOCK:
+            _STDOUT_USERS -= 1
+            if _STDOUT_USERS == 0 and isinstance(sys.stdout, _ContextStdout):
+                sys.stdout = sys.stdout._target
+
+
 def default_registry() -> ActionRegistry:
     registry = ActionRegistry()
 
     from adaos.services.io_console import print as console_print
     from adaos.services.io_voice_mock import stt_listen, tts_speak
-    from adaos.services.skill.runtime import run_skill_handler_sync
+    from adaos.services.skill.runtime import run_skill_handler
 
     def _console(args: Mapping[str, Any]) -> Mapping[str, bool]:
         text = args.get("text")
@@ -380,7 +721,7 @@ def default_registry() -> ActionRegistry:
         memory.put(key, value)
         return value
 
-    def _skills_run(args: Mapping[str, Any]) -> Mapping[str, Any]:
+    async def _skills_run(args: Mapping[str, Any]) -> Mapping[str, Any]:
         skill = args.get("skill") or args.get("name") or args.get("skill_id")
         if not isinstance(skill, str) or not skill:
             raise ValueError("skill identifier is required")
@@ -390,9 +731,8 @@ def default_registry() -> ActionRegistry:
         payload = args.get("payload") or {}
         if not isinstance(payload, Mapping):
             raise ValueError("payload must be a mapping")
-        buf = io.StringIO()
-        with contextlib.redirect_stdout(buf):
-            result = run_skill_handler_sync(skill, topic, dict(payload))
+        with _capture_stdout() as buf:
+            result = await run_skill_handler(skill, topic, dict(payload))
         stdout = buf.getvalue().strip()
         return {"result": result, "stdout": stdout}
 
@@ -410,7 +750,10 @@ def default_registry() -> ActionRegistry:
 __all__ = [
     "ActionRegistry",
     "ScenarioModel",
+    "ScenarioPlan",
     "ScenarioRuntime",
+    "clear_scenario_cache",
+    "compile_scenario",
     "default_registry",
     "ensure_runtime_context",
     "load_scenario",
@@ -1,6 +1,6 @@
 # src/adaos/services/agent_context.py
 from __future__ import annotations
-from dataclasses import dataclass, field
+from dataclasses import dataclass, field, replace
 from typing import Any, Optional, TYPE_CHECKING
 import sys, subprocess, os
 
@@ -112,6 +112,16 @@ class AgentContext:
             object.__setattr__(self, "_skill_ctx_port", port)
         return port
 
+    def with_overrides(self, **changes: Any) -> "AgentContext":
+        """Поверхностная копия контекста с заменёнными полями (для use_ctx на время вызова).
+
+        Кэши (config, репозитории, skill_ctx, i18n) разделяются с исходным контекстом.
+        """
+        clone = replace(self, **changes)
+        for name in ("config", "_i18n", "_skills_repo", "_scenarios_repo", "_skill_ctx_port"):
+            object.__setattr__(clone, name, getattr(self, name))
+        return clone
+
     def reload_repos(self) -> None:
         object.__setattr__(self, "_skills_repo", None)
         object.__setattr__(self, "_scenarios_repo", None)
@@ -120,6 +130,8 @@ class AgentContext:
     def i18n(self) -> I18nService:
         svc = self._i18n
         if svc is None:
+            from adaos.services.i18n.service import I18nService  # циклический импорт
+
             svc = I18nService(self)
             object.__setattr__(self, "_i18n", svc)
         return svc
@@ -680,6 +680,7 @@ class BootstrapService:
 
 # --- модульные фасады (синглтон) ---
 from adaos.services.heartbeat_requests import RequestsHeartbeat
+from adaos.services.hub_http import close_hub_http
 from adaos.services.skills_loader_importlib import ImportlibSkillsLoader
 from adaos.services.subnet_registry_mem import get_subnet_registry
 
@@ -704,6 +705,15 @@ async def run_boot_sequence(app: Any) -> None:
 
 async def shutdown() -> None:
     await _svc().shutdown()
+    await close_hub_http()
+    try:
+        ctx = get_ctx()
+        flush = getattr(ctx.kv, "flush", None)
+        if flush:
+            flush()
+        ctx.sql.close()
+    except Exception:
+        pass
 
 
 async def switch_role(app: Any, role: str, *, hub_url: str | None = None, subnet_id: str | None = None) -> NodeConfig:
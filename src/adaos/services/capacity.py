@@ -1,9 +1,19 @@
 from __future__ import annotations
 
+import copy
+import hashlib
+import json
+import threading
 from pathlib import Path
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Tuple
 import yaml
 
+# node.yaml -> ((mtime_ns, size), capacity, hash): heartbeat не перечитывает YAML без изменений
+_CAP_CACHE: Dict[Path, Tuple[Tuple[int, int], Dict[str, Any], str]] = {}
+_CAP_LOCK = threading.Lock()
+# node.yaml -> подписка file_watch; пока она активна, кэш не сверяет mtime
+_CAP_WATCH: Dict[Path, Any] = {}
+
 
 def load_capacity_from_node_yaml(base_dir: Path | None = None) -> Dict[str, Any]:
     """
@@ -87,8 +97,60 @@ def load_capacity_from_node_yaml(base_dir: Path | None = None) -> Dict[str, Any]
     return {"io": io_list, "skills": skills_list, "scenarios": scenarios_list}
 
 
+def capacity_hash(capacity: Dict[str, Any]) -> str:
+    """Стабильный хэш содержимого capacity (порядок ключей не важен)."""
+    raw = json.dumps(capacity or {}, ensure_ascii=False, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()[:32]
+
+
+def local_capacity_snapshot(base_dir: Path | None = None) -> Tuple[Dict[str, Any], str]:
+    """Capacity из node.yaml и её хэш; YAML перечитывается только при изменении файла.
+
+    Если запущен общий file_watch, об изменениях сообщает он, иначе сверяются mtime/size.
+    """
+    path = Path(_resolve_base_dir(base_dir)) / "node.yaml"
+    with _CAP_LOCK:
+        cached = _CAP_CACHE.get(path)
+        handle = _CAP_WATCH.get(path)
+    if cached is not None and handle is not None and handle.active:
+        return copy.deepcopy(cached[1]), cached[2]
+    _watch_node_yaml(path)
+    try:
+        st = path.stat()
+        stamp = (st.st_mtime_ns, st.st_size)
+    except OSError:
+        stamp = (0, -1)
+    if cached is not None and cached[0] == stamp:
+        return copy.deepcopy(cached[1]), cached[2]
+    capacity = load_capacity_from_node_yaml(path.parent)
+    digest = capacity_hash(capacity)
+    with _CAP_LOCK:
+        _CAP_CACHE[path] = (stamp, capacity, digest)
+    return copy.deepcopy(capacity), digest
+
+
+def _watch_node_yaml(path: Path) -> None:
+    # подписываемся до чтения файла: правка между чтением и подпиской не потеряется
+    from adaos.services.file_watch import file_watch_active, get_file_watch
+
+    if not file_watch_active():
+        return
+    with _CAP_LOCK:
+        handle = _CAP_WATCH.get(path)
+        if handle is not None and handle.active:
+            return
+
+        def _changed(_: Path) -> None:
+            with _CAP_LOCK:
+                _CAP_CACHE.pop(path, None)
+
+        if handle is not None:
+            handle.cancel()
+        _CAP_WATCH[path] = get_file_watch().watch(path, _changed)
+
+
 def get_local_capacity() -> Dict[str, Any]:
-    return load_capacity_from_node_yaml()
+    return local_capacity_snapshot()[0]
 
 
 # ----- mutation helpers for node.yaml -----
@@ -120,6 +182,8 @@ def _save_node_yaml(data: Dict[str, Any], base_dir: Path | None = None) -> None:
     path = Path(base) / "node.yaml"
     path.parent.mkdir(parents=True, exist_ok=True)
     path.write_text(yaml.safe_dump(data, allow_unicode=True, sort_keys=False), encoding="utf-8")
+    with _CAP_LOCK:
+        _CAP_CACHE.pop(path, None)
 
 
 def install_skill_in_capacity(name: str, version: str, *, active: bool = True, dev: bool = False, base_dir: Path | None = None) -> None:
@@ -0,0 +1,599 @@
+# src/adaos/services/event_log.py
+"""Фоновая запись и индексированное чтение журнала событий (logs/events.log).
+
+Производители (обёртка над emit, /api/observe/ingest) только кладут готовые
+строки в очередь и никогда не ждут диска. Единственный поток-писатель держит
+файл открытым, пишет пачками и сбрасывает буфер по объёму или по таймеру.
+
+Журнал состоит из сегментов. Активный сегмент — ``events.log``; заполненный
+сегмент запечатывается в ``events.<seq>.log.gz`` рядом с индексом
+``events.<seq>.idx``. Сегмент режется на блоки (до ``BLOCK_EVENTS`` строк),
+для каждого блока индекс хранит диапазон ts, смещение и длину, а также
+постинги «корень топика → блоки» и «node_id → блоки». При запечатывании каждый
+блок сжимается отдельным gzip-member'ом, поэтому блок читается одним seek
+даже из сжатого сегмента (а файл остаётся обычным .gz для zcat).
+Индекс активного сегмента живёт в памяти писателя и восстанавливается
+сканированием файла при старте.
+"""
+from __future__ import annotations
+
+import gzip
+import json
+import os
+import queue
+import re
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+__all__ = ["EventLogWriter", "LogSegment", "tail_lines", "lines_since", "parse_cursor"]
+
+BLOCK_EVENTS = 256
+BLOCK_BYTES = 64 * 1024
+
+_STOP = object()
+_SEALED_RE = re.compile(r"\.(\d{8})\.idx$")
+
+# (строка JSON с \n, ts, корень топика, node_id)
+_Record = Tuple[str, float, str, str]
+
+
+class _FlushRequest:
+    __slots__ = ("done",)
+
+    def __init__(self) -> None:
+        self.done = threading.Event()
+
+
+def _topic_key(topic: str) -> str:
+    return topic.split(".", 1)[0]
+
+
+def _record(event: Dict[str, Any]) -> _Record:
+    try:
+        ts = float(event.get("ts") or 0.0)
+    except (TypeError, ValueError):
+        ts = 0.0
+    return (
+        json.dumps(event, ensure_ascii=False) + "\n",
+        ts,
+        _topic_key(str(event.get("topic") or "")),
+        str(event.get("node_id") or ""),
+    )
+
+
+@dataclass(slots=True)
+class LogSegment:
+    """Сегмент журнала и его индекс.
+
+    ``blocks`` — список ``[ts_min, ts_max, offset, length, count]``; смещения
+    указывают в файл ``path`` (для сжатого сегмента — в сжатые байты блока).
+    ``limit`` ограничивает чтение активного сегмента уже сброшенными байтами.
+    """
+
+    seq: int
+    path: Path
+    compressed: bool = False
+    blocks: List[List[Any]] = field(default_factory=list)
+    topics: Dict[str, List[int]] = field(default_factory=dict)
+    nodes: Dict[str, List[int]] = field(default_factory=dict)
+    limit: Optional[int] = None
+    ino: Optional[int] = None
+    alt: Optional[Path] = None
+
+    def add(self, offset: int, length: int, ts: float, topic: str, node: str) -> None:
+        block = self.blocks[-1] if self.blocks else None
+        if block is None or block[4] >= BLOCK_EVENTS or block[3] >= BLOCK_BYTES:
+            block = [ts, ts, offset, 0, 0]
+            self.blocks.append(block)
+        else:
+            block[0] = min(block[0], ts)
+            block[1] = max(block[1], ts)
+        block[3] += length
+        block[4] += 1
+        bi = len(self.blocks) - 1
+        for postings, key in ((self.topics, topic), (self.nodes, node)):
+            ids = postings.setdefault(key, [])
+            if not ids or ids[-1] != bi:
+                ids.append(bi)
+
+    def copy(self, limit: Optional[int] = None, ino: Optional[int] = None, alt: Optional[Path] = None) -> "LogSegment":
+        return LogSegment(
+            self.seq,
+            self.path,
+            self.compressed,
+            [list(b) for b in self.blocks],
+            {k: list(v) for k, v in self.topics.items()},
+            {k: list(v) for k, v in self.nodes.items()},
+            limit,
+            ino,
+            alt,
+        )
+
+    def candidates(self, topic_prefix: Optional[str], node_id: Optional[str]) -> Optional[set]:
+        """Номера блоков, которые могут содержать подходящие события (None — все)."""
+        found: Optional[set] = None
+        if topic_prefix:
+            if "." in topic_prefix:
+                keys = [_topic_key(topic_prefix)]
+            else:
+                keys = [k for k in self.topics if k.startswith(topic_prefix)]
+            found = {bi for k in keys for bi in self.topics.get(k, ())}
+        if node_id:
+            ids = set(self.nodes.get(node_id, ()))
+            found = ids if found is None else found & ids
+        return found
+
+    def read_block(self, bi: int) -> List[str]:
+        _, _, offset, length, _ = self.blocks[bi]
+        if self.limit is not None:
+            length = min(length, self.limit - offset)
+            if length <= 0:
+                return []
+        fh = self.path.open("rb")
+        if self.ino is not None and self.alt is not None and os.fstat(fh.fileno()).st_ino != self.ino:
+            # активный сегмент успели запечатать после снимка — читаем его под новым именем
+            fh.close()
+            fh = self.alt.open("rb")
+        with fh:
+            fh.seek(offset)
+            data = fh.read(length)
+        if self.compressed:
+            data = gzip.decompress(data)
+        lines = data.decode("utf-8", errors="ignore").split("\n")
+        # последний элемент — пустая строка после \n или недописанная строка
+        return lines[:-1]
+
+    def to_json(self) -> Dict[str, Any]:
+        return {"version": 1, "seq": self.seq, "file": self.path.name, "compressed": self.compressed, "blocks": self.blocks, "topics": self.topics, "nodes": self.nodes}
+
+    @classmethod
+    def from_json(cls, base: Path, data: Dict[str, Any]) -> "LogSegment":
+        return cls(int(data["seq"]), base / data["file"], bool(data.get("compressed")), data.get("blocks") or [], data.get("topics") or {}, data.get("nodes") or {})
+
+
+class EventLogWriter:
+    """Буферизованный писатель сегментированного JSONL-журнала.
+
+    ``write``/``write_many`` безопасны из любого потока и из event loop;
+    ``flush`` синхронно ждёт, пока всё поставленное в очередь окажется в файле;
+    ``segments`` отдаёт снимок индекса для чтения.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        *,
+        max_bytes: int = 5 * 1024 * 1024,
+        keep: int = 3,
+        flush_interval: float = 0.5,
+        flush_bytes: int = 256 * 1024,
+        max_queue: int = 100_000,
+    ) -> None:
+        self.path = Path(path)
+        self.max_bytes = int(max_bytes)
+        self.keep = max(0, int(keep))
+        self.flush_interval = float(flush_interval)
+        self.flush_bytes = int(flush_bytes)
+        self._queue: "queue.Queue[Any]" = queue.Queue(maxsize=max_queue)
+        self._lock = threading.Lock()
+        self._index_lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._closed = False
+        self._fh = None
+        self._size = 0
+        self._flushed = 0
+        self._pending = 0
+        self._last_flush = time.monotonic()
+        self._loaded = False
+        self._sealed: List[LogSegment] = []
+        self._active: Optional[LogSegment] = None
+        self._active_ino: Optional[int] = None
+        self._compressors: List[threading.Thread] = []
+        self._stats = {"written": 0, "dropped": 0, "flushes": 0, "rotations": 0, "errors": 0}
+
+    # ------------------------------------------------------------------ producers
+    def write(self, event: Dict[str, Any]) -> bool:
+        """Поставить событие в очередь. False — очередь переполнена или писатель закрыт."""
+        return self._put([_record(event)])
+
+    def write_many(self, events: Iterable[Dict[str, Any]]) -> int:
+        records = [_record(e) for e in events]
+        if not records:
+            return 0
+        return len(records) if self._put(records) else 0
+
+    def _put(self, records: List[_Record]) -> bool:
+        if self._closed:
+            return False
+        self._ensure_thread()
+        try:
+            self._queue.put_nowait(records)
+            return True
+        except queue.Full:
+            with self._lock:
+                self._stats["dropped"] += len(records)
+            return False
+
+    def flush(self, timeout: float = 5.0) -> bool:
+        """Синхронно дописать очередь и сбросить буфер на диск."""
+        thread = self._thread
+        if thread is None or not thread.is_alive():
+            self._drain_inline()
+            return True
+        req = _FlushRequest()
+        try:
+            self._queue.put(req, timeout=timeout)
+        except queue.Full:
+            return False
+        return req.done.wait(timeout)
+
+    def close(self, timeout: float = 5.0) -> None:
+        """Дописать всё, закрыть файл и дождаться фонового сжатия."""
+        if self._closed:
+            return
+        self._closed = True
+        thread = self._thread
+        if thread is not None and thread.is_alive():
+            try:
+                self._queue.put(_STOP, timeout=timeout)
+            except queue.Full:
+                pass
+            thread.join(timeout)
+        else:
+            self._drain_inline()
+            self._close_file()
+        for t in list(self._compressors):
+            t.join(timeout)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            out = dict(self._stats)
+        with self._index_lock:
+            out["segments"] = len(self._sealed) + (1 if self._active else 0)
+        out.update({"queued": self._queue.qsize(), "size": self._size, "path": str(self.path)})
+        return out
+
+    # ------------------------------------------------------------------ readers
+    def segments(self) -> List[LogSegment]:
+        """Снимок индекса: запечатанные сегменты по возрастанию seq, затем активный."""
+        self._load()
+        with self._index_lock:
+            out = [s.copy() for s in self._sealed]
+            if self._active is not None:
+                out.append(self._active.copy(self._flushed, self._active_ino, self._sealed_path(self._active.seq, ".log.pending")))
+        return out
+
+    # ------------------------------------------------------------------ writer thread
+    def _ensure_thread(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._thread = threading.Thread(target=self._run, name="adaos-event-log", daemon=True)
+            self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            timeout = max(0.0, self.flush_interval - (time.monotonic() - self._last_flush))
+            try:
+                item = self._queue.get(timeout=timeout if self._pending else None)
+            except queue.Empty:
+                self._flush_file()
+                continue
+            batch = [item]
+            # выгребаем всё, что успело накопиться, одной пачкой
+            while len(batch) < 4096:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            stop = False
+            for item in batch:
+                if item is _STOP:
+                    stop = True
+                elif isinstance(item, _FlushRequest):
+                    self._flush_file()
+                    item.done.set()
+                else:
+                    self._append(item)
+            if stop:
+                self._close_file()
+                return
+            if self._pending >= self.flush_bytes or time.monotonic() - self._last_flush >= self.flush_interval:
+                self._flush_file()
+
+    def _drain_inline(self) -> None:
+        with self._lock:
+            while True:
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if isinstance(item, _FlushRequest):
+                    item.done.set()
+                elif item is not _STOP:
+                    self._append(item)
+            self._flush_file()
+
+    def _append(self, records: List[_Record]) -> None:
+        try:
+            fh = self._open()
+            for line, ts, topic, node in records:
+                data = line.encode("utf-8")
+                fh.write(data)
+                with self._index_lock:
+                    self._active.add(self._size, len(data), ts, topic, node)
+                self._size += len(data)
+                self._pending += len(data)
+                self._stats["written"] += 1
+                if self._size >= self.max_bytes:
+                    self._rotate()
+                    fh = self._open()
+        except Exception:
+            self._stats["errors"] += 1
+
+    def _open(self):
+        if self._fh is None:
+            self._load()
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._fh = open(self.path, "ab", buffering=max(self.flush_bytes, 8192))
+            self._size = self._flushed = self._fh.tell()
+            self._active_ino = os.fstat(self._fh.fileno()).st_ino
+        return self._fh
+
+    def _flush_file(self) -> None:
+        self._last_flush = time.monotonic()
+        if self._fh is None or not self._pending:
+            return
+        try:
+            self._fh.flush()
+            self._stats["flushes"] += 1
+        except Exception:
+            self._stats["errors"] += 1
+        self._pending = 0
+        with self._index_lock:
+            self._flushed = self._size
+
+    def _close_file(self) -> None:
+        self._flush_file()
+        if self._fh is not None:
+            try:
+                self._fh.close()
+            except Exception:
+                pass
+            self._fh = None
+
+    # ------------------------------------------------------------------ segments
+    def _sealed_path(self, seq: int, suffix: str) -> Path:
+        stem = self.path.stem if self.path.suffix == ".log" else self.path.name
+        return self.path.with_name(f"{stem}.{seq:08d}{suffix}")
+
+    def _load(self) -> None:
+        """Однократно поднять индексы запечатанных сегментов и отсканировать активный."""
+        if self._loaded:
+            return
+        with self._index_lock:
+            if self._loaded:
+                return
+            sealed: List[LogSegment] = []
+            pending: List[Path] = []
+            if self.path.parent.exists():
+                for idx in sorted(self.path.parent.glob(self._sealed_path(0, ".idx").name.replace("00000000", "*"))):
+                    if not _SEALED_RE.search(idx.name):
+                        continue
+                    try:
+                        seg = LogSegment.from_json(self.path.parent, json.loads(idx.read_text(encoding="utf-8")))
+                    except Exception:
+                        continue
+                    if seg.path.exists():
+                        sealed.append(seg)
+                pending = sorted(self.path.parent.glob(self._sealed_path(0, ".log.pending").name.replace("00000000", "*")))
+            sealed.sort(key=lambda s: s.seq)
+            for p in pending:
+                # запечатывание прервалось: переиндексируем и дожмём
+                seq = int(p.name.split(".")[-3])
+                if any(s.seq == seq for s in sealed):
+                    p.unlink(missing_ok=True)
+                    continue
+                seg = _scan(LogSegment(seq, p))
+                sealed.append(seg)
+                self._spawn_compress(seg)
+            sealed.sort(key=lambda s: s.seq)
+            next_seq = (sealed[-1].seq + 1) if sealed else 1
+            active = LogSegment(next_seq, self.path)
+            if self.path.exists():
+                active = _scan(active)
+                st = self.path.stat()
+                self._flushed, self._active_ino = st.st_size, st.st_ino
+            self._sealed = sealed
+            self._active = active
+            self._loaded = True
+
+    def _rotate(self) -> None:
+        """Запечатать активный сегмент и начать следующий; старше keep — удалить."""
+        self._close_file()
+        self._stats["rotations"] += 1
+        with self._index_lock:
+            seg = self._active
+            pending = self._sealed_path(seg.seq, ".log.pending")
+            os.replace(self.path, pending)
+            seg.path = pending
+            self._sealed.append(seg)
+            self._active = LogSegment(seg.seq + 1, self.path)
+            self._size = self._flushed = 0
+            expired = self._sealed[: max(0, len(self._sealed) - self.keep)]
+            self._sealed = self._sealed[len(expired) :]
+        self._compressors = [t for t in self._compressors if t.is_alive()]
+        for old in expired:
+            if old is not seg:
+                self._drop(old)
+        if seg in expired:
+            self._drop(seg)
+        else:
+            self._spawn_compress(seg)
+
+    def _drop(self, seg: LogSegment) -> None:
+        for t in self._compressors:
+            if getattr(t, "_adaos_seq", None) == seg.seq:
+                t.join()
+        for p in (seg.path, self._sealed_path(seg.seq, ".log.gz"), self._sealed_path(seg.seq, ".idx"), self._sealed_path(seg.seq, ".log.pending")):
+            p.unlink(missing_ok=True)
+
+    def _spawn_compress(self, seg: LogSegment) -> None:
+        t = threading.Thread(target=self._compress, args=(seg,), name="adaos-event-log-gzip", daemon=True)
+        t._adaos_seq = seg.seq  # type: ignore[attr-defined]
+        self._compressors.append(t)
+        t.start()
+
+    def _compress(self, seg: LogSegment) -> None:
+        """Сжать сегмент поблочно (gzip-member на блок) и записать индекс."""
+        src = seg.path
+        dst = self._sealed_path(seg.seq, ".log.gz")
+        tmp = dst.with_name(dst.name + ".tmp")
+        try:
+            blocks: List[List[Any]] = []
+            offset = 0
+            with src.open("rb") as fin, tmp.open("wb") as fout:
+                for ts_min, ts_max, start, length, count in seg.blocks:
+                    fin.seek(start)
+                    packed = gzip.compress(fin.read(length), compresslevel=6)
+                    fout.write(packed)
+                    blocks.append([ts_min, ts_max, offset, len(packed), count])
+                    offset += len(packed)
+            sealed = LogSegment(seg.seq, dst, True, blocks, seg.topics, seg.nodes)
+            os.replace(tmp, dst)
+            idx = self._sealed_path(seg.seq, ".idx")
+            idx_tmp = idx.with_name(idx.name + ".tmp")
+            idx_tmp.write_text(json.dumps(sealed.to_json(), ensure_ascii=False), encoding="utf-8")
+            os.replace(idx_tmp, idx)
+            with self._index_lock:
+                for i, cur in enumerate(self._sealed):
+                    if cur is seg:
+                        self._sealed[i] = sealed
+                        break
+                else:
+                    # сегмент уже вытеснен ротацией, пока мы сжимали
+                    dst.unlink(missing_ok=True)
+                    idx.unlink(missing_ok=True)
+            src.unlink(missing_ok=True)
+        except Exception:
+            with self._lock:
+                self._stats["errors"] += 1
+            tmp.unlink(missing_ok=True)
+
+
+def _scan(seg: LogSegment) -> LogSegment:
+    """Построить индекс несжатого сегмента, прочитав его целиком (старт/восстановление)."""
+    offset = 0
+    with seg.path.open("rb") as fh:
+        for raw in fh:
+            if not raw.endswith(b"\n"):
+                break
+            try:
+                evt = json.loads(raw)
+                _, ts, topic, node = _record(evt)
+            except Exception:
+                ts, topic, node = 0.0, "", ""
+            seg.add(offset, len(raw), ts, topic, node)
+            offset += len(raw)
+    return seg
+
+
+def _matches(line: str, topic_prefix: Optional[str], node_id: Optional[str], since_ts: Optional[float]) -> bool:
+    if not (topic_prefix or node_id or since_ts):
+        return True
+    try:
+        evt = json.loads(line)
+    except Exception:
+        return False
+    if topic_prefix and not str(evt.get("topic", "")).startswith(topic_prefix):
+        return False
+    if node_id and str(evt.get("node_id")) != node_id:
+        return False
+    if since_ts:
+        try:
+            return float(evt.get("ts") or 0.0) >= float(since_ts)
+        except (TypeError, ValueError):
+            return False
+    return True
+
+
+def parse_cursor(cursor: str) -> Tuple[int, int, int]:
+    """Курсор ``<seq>.<block>.<line>`` указывает на первое событие, которое уже отдано."""
+    seq, block, line = (int(part) for part in cursor.split("."))
+    if min(seq, block, line) < 0:
+        raise ValueError(cursor)
+    return seq, block, line
+
+
+def tail_lines(
+    segments: List[LogSegment],
+    limit: int,
+    *,
+    topic_prefix: Optional[str] = None,
+    node_id: Optional[str] = None,
+    cursor: Optional[str] = None,
+) -> Tuple[List[str], Optional[str]]:
+    """Последние ``limit`` подходящих строк раньше ``cursor`` (в хронологическом порядке).
+
+    Возвращает строки и курсор для следующей (более старой) страницы или None,
+    если история исчерпана. Блоки, не попавшие в постинги фильтров, не читаются.
+    """
+    if limit <= 0:
+        return [], cursor
+    stop = parse_cursor(cursor) if cursor else None
+    out: List[str] = []
+    for seg in reversed(segments):
+        if stop and seg.seq > stop[0]:
+            continue
+        cand = seg.candidates(topic_prefix, node_id)
+        last_block = stop[1] if stop and seg.seq == stop[0] else len(seg.blocks) - 1
+        for bi in range(min(last_block, len(seg.blocks) - 1), -1, -1):
+            if cand is not None and bi not in cand:
+                continue
+            try:
+                lines = seg.read_block(bi)
+            except OSError:
+                break
+            upto = stop[2] if stop and seg.seq == stop[0] and bi == stop[1] else len(lines)
+            for li in range(min(upto, len(lines)) - 1, -1, -1):
+                if _matches(lines[li], topic_prefix, node_id, None):
+                    out.append(lines[li])
+                    if len(out) >= limit:
+                        out.reverse()
+                        return out, f"{seg.seq}.{bi}.{li}"
+    out.reverse()
+    return out, None
+
+
+def lines_since(
+    segments: List[LogSegment],
+    since_ts: float,
+    *,
+    topic_prefix: Optional[str] = None,
+    node_id: Optional[str] = None,
+    limit: Optional[int] = None,
+) -> Iterator[str]:
+    """Строки с ``ts >= since_ts`` в порядке записи; блоки с ts_max < since пропускаются."""
+    sent = 0
+    for seg in segments:
+        if not seg.blocks or max(b[1] for b in seg.blocks) < since_ts:
+            continue
+        cand = seg.candidates(topic_prefix, node_id)
+        for bi, block in enumerate(seg.blocks):
+            if block[1] < since_ts or (cand is not None and bi not in cand):
+                continue
+            try:
+                lines = seg.read_block(bi)
+            except OSError:
+                break
+            for line in lines:
+                if _matches(line, topic_prefix, node_id, since_ts):
+                    yield line
+                    sent += 1
+                    if limit is not None and sent >= limit:
+                        return
@@ -1,48 +1,462 @@
 from __future__ import annotations
 import asyncio
+import inspect
+import itertools
+import logging
+import threading
 import time
-from collections import defaultdict
+from collections import deque
+from dataclasses import dataclass
 from threading import RLock
-from typing import Callable, Awaitable, Any, DefaultDict, List
+from typing import Callable, Awaitable, Any, Deque, Dict, List, Optional, Tuple
 
 from adaos.domain import Event
 from adaos.ports import EventBus
 
 Handler = Callable[[Event], Any] | Callable[[Event], Awaitable[Any]]
 
+_RESOLVED_CACHE_MAX = 4096
+OVERFLOW_TOPIC = "sys.bus.overflow"
+_OVERFLOW_POLICIES = ("drop_oldest", "block", "dead_letter")
+_LOG = logging.getLogger("adaos.eventbus")
+
+
+@dataclass(frozen=True, slots=True)
+class DispatchConfig:
+    """Очередь для корутинных обработчиков (opt-in).
+
+    Каждый подписчик получает собственную очередь на ``maxsize`` событий и
+    ``workers`` задач-исполнителей. При переполнении действует ``overflow``:
+      * ``drop_oldest`` — вытеснить самое старое событие;
+      * ``block`` — издатель ждёт места (из чужого потока — до ``block_timeout``,
+        в ``apublish`` — асинхронно); sync ``publish`` из потока самого лупа ждать
+        не может и кладёт событие сверх лимита (счётчик ``overrun``);
+      * ``dead_letter`` — событие уходит в тему ``sys.bus.overflow``.
+    """
+
+    maxsize: int = 1000
+    workers: int = 1
+    overflow: str = "drop_oldest"
+    block_timeout: float = 5.0
+
+    def __post_init__(self) -> None:
+        if self.overflow not in _OVERFLOW_POLICIES:
+            raise ValueError(f"unknown overflow policy '{self.overflow}' (expected one of {', '.join(_OVERFLOW_POLICIES)})")
+        if self.maxsize < 1 or self.workers < 1:
+            raise ValueError("maxsize and workers must be positive")
+
+
+class _HandlerQueue:
+    """Ограниченная очередь и пул исполнителей одного корутинного подписчика."""
+
+    def __init__(self, bus: "LocalEventBus", prefix: str, handler: Handler, config: DispatchConfig) -> None:
+        self.bus = bus
+        self.prefix = prefix
+        self.handler = handler
+        self.config = config
+        self.name = f"{getattr(handler, '__module__', '?')}.{getattr(handler, '__qualname__', repr(handler))}"
+        self._items: Deque[Tuple[float, Event]] = deque()
+        self._cond = threading.Condition()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._ready: Optional[asyncio.Event] = None
+        self._not_full: Optional[asyncio.Event] = None
+        self._tasks: List[asyncio.Task] = []
+        self._in_flight = 0
+        self.stats: Dict[str, float] = {
+            "enqueued": 0,
+            "processed": 0,
+            "errors": 0,
+            "dropped": 0,
+            "dead_lettered": 0,
+            "overrun": 0,
+            "inline": 0,
+            "max_depth": 0,
+            "wait_ms_total": 0.0,
+            "wait_ms_max": 0.0,
+            "run_ms_total": 0.0,
+            "run_ms_max": 0.0,
+            "run_ms_last": 0.0,
+        }
+
+    # -- producer side -----------------------------------------------------
+    def _bind_loop(self) -> Optional[asyncio.AbstractEventLoop]:
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if self._loop is not None and not self._loop.is_closed():
+            return self._loop
+        if running is None:
+            return None
+        self._loop = running
+        self._ready = asyncio.Event()
+        self._not_full = asyncio.Event()
+        self._not_full.set()
+        self._tasks = [running.create_task(self._worker(), name=f"adaos-bus:{self.name}:{i}") for i in range(self.config.workers)]
+        return running
+
+    def _wake(self, loop: asyncio.AbstractEventLoop, on_loop: bool) -> None:
+        assert self._ready is not None
+        if on_loop:
+            self._ready.set()
+        else:
+            loop.call_soon_threadsafe(self._ready.set)
+
+    def submit(self, event: Event) -> None:
+        loop = self._bind_loop()
+        if loop is None:
+            # нет ни одного лупа — исполняем как раньше, синхронно
+            self.stats["inline"] += 1
+            res = self.handler(event)
+            if asyncio.iscoroutine(res):
+                asyncio.run(res)
+            return
+        on_loop = _running_loop() is loop
+        dead_letter = False
+        with self._cond:
+            if len(self._items) >= self.config.maxsize:
+                policy = self.config.overflow
+                if policy == "block" and not on_loop:
+                    if not self._cond.wait_for(lambda: len(self._items) < self.config.maxsize, timeout=self.config.block_timeout):
+                        dead_letter = True
+                elif policy == "block":
+                    self.stats["overrun"] += 1
+                elif policy == "dead_letter":
+                    dead_letter = True
+                else:
+                    self._items.popleft()
+                    self.stats["dropped"] += 1
+            if not dead_letter:
+                self._push(event)
+        if dead_letter:
+            self._dead_letter(event)
+            return
+        self._wake(loop, on_loop)
+
+    async def asubmit(self, event: Event) -> None:
+        loop = self._bind_loop()
+        if loop is None or _running_loop() is not loop or self.config.overflow != "block":
+            self.submit(event)
+            return
+        assert self._not_full is not None
+        while len(self._items) >= self.config.maxsize:
+            self._not_full.clear()
+            await self._not_full.wait()
+        with self._cond:
+            self._push(event)
+        self._wake(loop, True)
+
+    def _push(self, event: Event) -> None:
+        self._items.append((time.perf_counter(), event))
+        self.stats["enqueued"] += 1
+        depth = len(self._items)
+        if depth > self.stats["max_depth"]:
+            self.stats["max_depth"] = depth
+
+    def _dead_letter(self, event: Event) -> None:
+        if event.type == OVERFLOW_TOPIC:
+            self.stats["dropped"] += 1
+            return
+        self.stats["dead_lettered"] += 1
+        payload = {
+            "topic": event.type,
+            "handler": self.name,
+            "prefix": self.prefix,
+            "payload": event.payload,
+            "source": event.source,
+            "ts": event.ts,
+        }
+        self.bus.publish(Event(type=OVERFLOW_TOPIC, payload=payload, source="eventbus", ts=time.time()))
+
+    # -- consumer side -----------------------------------------------------
+    async def _worker(self) -> None:
+        assert self._ready is not None and self._not_full is not None
+        while True:
+            if not self._items:
+                self._ready.clear()
+                if not self._items:
+                    await self._ready.wait()
+                continue
+            with self._cond:
+                try:
+                    enqueued_at, event = self._items.popleft()
+                except IndexError:
+                    continue
+                self._cond.notify()
+            self._not_full.set()
+            self._in_flight += 1
+            started = time.perf_counter()
+            try:
+                res = self.handler(event)
+                if asyncio.iscoroutine(res):
+                    await res
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                self.stats["errors"] += 1
+                _LOG.warning("bus handler %s failed for topic=%s", self.name, event.type, exc_info=True)
+            finally:
+                self._in_flight -= 1
+            finished = time.perf_counter()
+            wait_ms = (started - enqueued_at) * 1000.0
+            run_ms = (finished - started) * 1000.0
+            st = self.stats
+            st["processed"] += 1
+            st["wait_ms_total"] += wait_ms
+            st["run_ms_total"] += run_ms
+            st["run_ms_last"] = run_ms
+            if wait_ms > st["wait_ms_max"]:
+                st["wait_ms_max"] = wait_ms
+            if run_ms > st["run_ms_max"]:
+                st["run_ms_max"] = run_ms
+
+    @property
+    def idle(self) -> bool:
+        return not self._items and self._in_flight == 0
+
+    def close(self) -> None:
+        tasks, self._tasks = self._tasks, []
+        loop = self._loop
+        if not tasks or loop is None or loop.is_closed():
+            return
+        for task in tasks:
+            if _running_loop() is loop:
+                task.cancel()
+            else:
+                loop.call_soon_threadsafe(task.cancel)
+
+    def snapshot(self) -> Dict[str, Any]:
+        st = dict(self.stats)
+        processed = st["processed"] or 1
+        return {
+            "handler": self.name,
+            "prefix": self.prefix,
+            "overflow": self.config.overflow,
+            "maxsize": self.config.maxsize,
+            "workers": self.config.workers,
+            "depth": len(self._items),
+            "in_flight": self._in_flight,
+            "enqueued": int(st["enqueued"]),
+            "processed": int(st["processed"]),
+            "errors": int(st["errors"]),
+            "dropped": int(st["dropped"]),
+            "dead_lettered": int(st["dead_lettered"]),
+            "overrun": int(st["overrun"]),
+            "inline": int(st["inline"]),
+            "max_depth": int(st["max_depth"]),
+            "wait_ms_avg": st["wait_ms_total"] / processed,
+            "wait_ms_max": st["wait_ms_max"],
+            "run_ms_avg": st["run_ms_total"] / processed,
+            "run_ms_max": st["run_ms_max"],
+            "run_ms_last": st["run_ms_last"],
+        }
+
+
+def _running_loop() -> Optional[asyncio.AbstractEventLoop]:
+    try:
+        return asyncio.get_running_loop()
+    except RuntimeError:
+        return None
+
+
+_Entry = Tuple[int, str, Handler, Optional[_HandlerQueue]]
+
+
+class _TopicNode:
+    """Узел префиксного дерева по сегментам темы (разделитель — точка).
+
+    ``tails`` хранит подписки, чей последний (возможно неполный) сегмент
+    начинается на этом уровне: ключ — этот сегмент, значение — список
+    ``(seq, prefix, handler, queue)``, где ``queue`` — очередь подписчика
+    в режиме :class:`DispatchConfig` (иначе ``None``). Неполный сегмент сохраняет прежнюю семантику
+    ``str.startswith``: подписка ``"ui.no"`` совпадает с ``"ui.notify"``.
+    """
+
+    __slots__ = ("children", "tails")
+
+    def __init__(self) -> None:
+        self.children: Dict[str, _TopicNode] = {}
+        self.tails: Dict[str, List[_Entry]] = {}
+
 
 class LocalEventBus(EventBus):
     """
     Простая синхронно-асинхронная шина по префиксам типов событий.
-    - subscribe(prefix, handler)
+    - subscribe(prefix, handler) / unsubscribe(prefix, handler)
     - publish(event)
     Особенности:
       * prefix = "" или "*" — подписка на всё.
+      * Подписки хранятся в дереве сегментов, поэтому стоимость publish
+        зависит от глубины темы, а не от числа подписчиков; разрешённые
+        списки обработчиков кэшируются по теме до следующего (un)subscribe.
       * Асинхендлеры исполняются через running loop (или блокирующе, если лупа нет).
+      * С ``dispatch=DispatchConfig(...)`` (для всей шины или отдельной подписки)
+        корутинные обработчики получают ограниченную очередь и пул исполнителей;
+        статистика доступна через ``dispatch_stats()``.
     """
 
-    def __init__(self) -> None:
-        self._subs: DefaultDict[str, List[Handler]] = defaultdict(list)
+    def __init__(self, dispatch: DispatchConfig | None = None) -> None:
+        self._root = _TopicNode()
+        self._seq = itertools.count()
+        self._resolved: Dict[str, Tuple[Tuple[Handler, Optional[_HandlerQueue]], ...]] = {}
+        self._queues: List[_HandlerQueue] = []
+        self._dispatch = dispatch
         self._lock = RLock()
 
-    def subscribe(self, type_prefix: str, handler: Handler) -> None:
+    @staticmethod
+    def _split(type_prefix: str) -> List[str]:
+        return ("" if type_prefix == "*" else type_prefix).split(".")
+
+    def subscribe(self, type_prefix: str, handler: Handler, dispatch: DispatchConfig | None = None) -> None:
+        segments = self._split(type_prefix)
+        config = dispatch or self._dispatch
+        queue = _HandlerQueue(self, type_prefix, handler, config) if config and inspect.iscoroutinefunction(handler) else None
+        with self._lock:
+            node = self._root
+            for seg in segments[:-1]:
+                node = node.children.setdefault(seg, _TopicNode())
+            node.tails.setdefault(segments[-1], []).append((next(self._seq), type_prefix, handler, queue))
+            if queue is not None:
+                self._queues.append(queue)
+            self._resolved.clear()
+
+    def unsubscribe(self, type_prefix: str, handler: Handler) -> bool:
+        """Снять подписку ``handler`` с ``type_prefix``. Возвращает ``True``, если она была."""
+        segments = self._split(type_prefix)
+        with self._lock:
+            path: List[Tuple[_TopicNode, str]] = []
+            node = self._root
+            for seg in segments[:-1]:
+                child = node.children.get(seg)
+                if child is None:
+                    return False
+                path.append((node, seg))
+                node = child
+            entries = node.tails.get(segments[-1])
+            if not entries:
+                return False
+            for idx, (_, prefix, h, queue) in enumerate(entries):
+                if prefix == type_prefix and h == handler:
+                    del entries[idx]
+                    if queue is not None:
+                        queue.close()
+                        self._queues.remove(queue)
+                    break
+            else:
+                return False
+            if not entries:
+                del node.tails[segments[-1]]
+            # подчистить опустевшие ветки
+            for parent, seg in reversed(path):
+                if node.tails or node.children:
+                    break
+                del parent.children[seg]
+                node = parent
+            self._resolved.clear()
+            return True
+
+    def _resolve(self, topic: str) -> Tuple[Tuple[Handler, Optional[_HandlerQueue]], ...]:
+        handlers = self._resolved.get(topic)
+        if handlers is not None:
+            return handlers
         with self._lock:
-            self._subs[type_prefix].append(handler)
+            matched: List[_Entry] = []
+            node: _TopicNode | None = self._root
+            for seg in topic.split("."):
+                if node is None:
+                    break
+                if node.tails:
+                    for tail, entries in node.tails.items():
+                        if seg.startswith(tail):
+                            matched.extend(entries)
+                node = node.children.get(seg)
+            matched.sort(key=lambda item: item[0])
+            handlers = tuple((h, q) for _, _, h, q in matched)
+            if len(self._resolved) >= _RESOLVED_CACHE_MAX:
+                self._resolved.clear()
+            self._resolved[topic] = handlers
+        return handlers
 
     def publish(self, event: Event) -> None:
+        for h, queue in self._resolve(event.type):
+            if queue is not None:
+                queue.submit(event)
+                continue
+            res = h(event)
+            if asyncio.iscoroutine(res):
+                try:
+                    loop = asyncio.get_running_loop()
+                except RuntimeError:
+                    asyncio.run(res)  # нет активного лупа — выполним синхронно
+                else:
+                    loop.create_task(res)
+
+
+    async def apublish(self, event: Event) -> None:
+        """Как :meth:`publish`, но политика ``block`` асинхронно ждёт места в очереди."""
+        for h, queue in self._resolve(event.type):
+            if queue is not None:
+                await queue.asubmit(event)
+                continue
+            res = h(event)
+            if asyncio.iscoroutine(res):
+                asyncio.get_running_loop().create_task(res)
+
+    def dispatch_stats(self) -> List[Dict[str, Any]]:
+        """Глубина очередей и задержки по каждому подписчику в режиме очередей."""
         with self._lock:
-            pairs = [(p, hs[:]) for p, hs in self._subs.items()]
-        for prefix, handlers in pairs:
-            if prefix == "*" or prefix == "" or event.type.startswith(prefix):
-                for h in handlers:
-                    res = h(event)
-                    if asyncio.iscoroutine(res):
-                        try:
-                            loop = asyncio.get_running_loop()
-                        except RuntimeError:
-                            asyncio.run(res)  # нет активного лупа — выполним синхронно
-                        else:
-                            loop.create_task(res)
+            queues = list(self._queues)
+        return [q.snapshot() for q in queues]
+
+    async def drain(self, timeout: float | None = None) -> bool:
+        """Дождаться опустошения всех очередей. ``False`` — если истёк ``timeout``."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            with self._lock:
+                queues = list(self._queues)
+            if all(q.idle for q in queues):
+                return True
+            if deadline is not None and time.monotonic() >= deadline:
+                return False
+            await asyncio.sleep(0.005)
+
+    def close(self) -> None:
+        """Остановить исполнителей очередей (события в очередях отбрасываются)."""
+        with self._lock:
+            queues = list(self._queues)
+        for q in queues:
+            q.close()
+
+
+class LoopBoundBus(EventBus):
+    """Шина для кода в чужом потоке (``asyncio.to_thread``, ожидание воркеров инструментов).
+
+    ``publish`` из другого потока передаётся в ``loop`` через ``call_soon_threadsafe``:
+    корутинные подписчики работают в цикле сервера, а не в ``asyncio.run`` на
+    одноразовом лупе. В потоке самого лупа (или если он уже закрыт) — напрямую.
+    """
+
+    def __init__(self, bus: EventBus, loop: asyncio.AbstractEventLoop) -> None:
+        self._bus = bus
+        self._loop = loop
+
+    def publish(self, event: Event) -> None:
+        if _running_loop() is not self._loop and not self._loop.is_closed():
+            try:
+                self._loop.call_soon_threadsafe(self._bus.publish, event)
+                return
+            except RuntimeError:  # луп закрылся между проверкой и вызовом
+                pass
+        self._bus.publish(event)
+
+    def subscribe(self, type_prefix: str, handler: Handler) -> None:
+        self._bus.subscribe(type_prefix, handler)
+
+    def unsubscribe(self, type_prefix: str, handler: Handler) -> bool:
+        return self._bus.unsubscribe(type_prefix, handler)
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._bus, name)
 
 
 def emit(bus: EventBus, type_: str, payload: dict, source: str) -> None:
@@ -0,0 +1,363 @@
+# src/adaos/services/file_watch.py
+"""Общий сервис слежения за файлами конфигурации.
+
+Раньше каждый потребитель следил за своим файлом сам: роутер держал отдельный
+поток, который раз в секунду делал ``stat`` ``route_rules.yaml``, capacity и
+индекс манифестов навыков сверяли mtime на каждом обращении. Здесь один сервис:
+
+* если установлен ``watchdog`` (зависимость пакета), изменения приходят от ОС
+  (inotify / FSEvents / ReadDirectoryChanges);
+* иначе — и для путей, чей каталог ещё не существует, — один поток опрашивает
+  все подписанные пути пачкой раз в :data:`POLL_INTERVAL` секунд.
+
+Колбэки вызываются с задержкой (debounce) после последнего события и только
+если содержимое действительно изменилось (sha1 файла или состава каталога).
+"""
+from __future__ import annotations
+
+import hashlib
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Dict, Optional
+
+__all__ = [
+    "FileWatchService",
+    "WatchHandle",
+    "get_file_watch",
+    "file_watch_active",
+    "stop_file_watch",
+    "POLL_INTERVAL",
+    "DEFAULT_DEBOUNCE",
+]
+
+_log = logging.getLogger("adaos.file_watch")
+
+POLL_INTERVAL = 1.0
+DEFAULT_DEBOUNCE = 0.3
+
+Callback = Callable[[Path], None]
+
+
+def _fingerprint(path: Path) -> Optional[str]:
+    """sha1 содержимого файла или отсортированного списка имён каталога; None — пути нет."""
+    try:
+        if path.is_dir():
+            names = sorted(os.listdir(path))
+            return "d:" + hashlib.sha1("\0".join(names).encode("utf-8", "surrogateescape")).hexdigest()
+        return "f:" + hashlib.sha1(path.read_bytes()).hexdigest()
+    except OSError:
+        return None
+
+
+def _stat_key(path: Path) -> Optional[tuple]:
+    try:
+        st = path.stat()
+    except OSError:
+        return None
+    return (st.st_mtime_ns, st.st_size, st.st_ino)
+
+
+class WatchHandle:
+    """Подписка; вызов (или ``cancel()``) отписывает.
+
+    ``active`` истинно, пока подписка жива и события приходят от ОС — только тогда
+    кэши могут не сверять mtime сами.
+    """
+
+    __slots__ = ("_svc", "path", "callback", "_epoch", "_cancelled")
+
+    def __init__(self, svc: "FileWatchService", path: Path, callback: Callback, epoch: int) -> None:
+        self._svc = svc
+        self.path = path
+        self.callback = callback
+        self._epoch = epoch
+        self._cancelled = False
+
+    @property
+    def active(self) -> bool:
+        svc = self._svc
+        return not self._cancelled and svc.running and svc.epoch == self._epoch and svc.is_native(self.path)
+
+    def cancel(self) -> None:
+        if not self._cancelled:
+            self._cancelled = True
+            self._svc._unsubscribe(self)
+
+    __call__ = cancel
+
+
+@dataclass
+class _Watched:
+    path: Path
+    debounce: float
+    content_hash: bool
+    digest: Optional[str]
+    stat: Optional[tuple]
+    native_dir: Optional[str] = None
+    handles: list[WatchHandle] = field(default_factory=list)
+
+
+class FileWatchService:
+    def __init__(self, *, poll_interval: float = POLL_INTERVAL, use_native: bool = True) -> None:
+        self.poll_interval = poll_interval
+        self.use_native = use_native
+        self.epoch = 0
+        self._cond = threading.Condition()
+        self._watched: Dict[Path, _Watched] = {}
+        self._due: Dict[Path, float] = {}
+        self._thread: Optional[threading.Thread] = None
+        self._running = False
+        self._observer = None
+        self._handler = None
+        # каталог -> (ObservedWatch, число подписанных путей в нём)
+        self._native_dirs: Dict[str, list] = {}
+        self._native_lock = threading.Lock()
+
+    # ------------------------------------------------------------------
+    # lifecycle
+    # ------------------------------------------------------------------
+    @property
+    def running(self) -> bool:
+        return self._running
+
+    @property
+    def native(self) -> bool:
+        return self._observer is not None
+
+    def is_native(self, path: Path) -> bool:
+        w = self._watched.get(path)
+        return w is not None and w.native_dir is not None
+
+    def start(self) -> None:
+        with self._cond:
+            if self._running:
+                return
+            self._running = True
+            self.epoch += 1
+            if self.use_native:
+                self._observer = self._start_observer()
+            self._thread = threading.Thread(target=self._run, name="adaos-file-watch", daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        with self._cond:
+            if not self._running:
+                return
+            self._running = False
+            self.epoch += 1
+            observer, self._observer = self._observer, None
+            thread, self._thread = self._thread, None
+            self._watched.clear()
+            self._due.clear()
+            self._cond.notify_all()
+        with self._native_lock:
+            self._native_dirs.clear()
+        if observer is not None:
+            try:
+                observer.stop()
+                observer.join(timeout=1.0)
+            except Exception:
+                pass
+        if thread is not None and thread is not threading.current_thread():
+            thread.join(timeout=1.0)
+
+    def _start_observer(self):
+        try:
+            from watchdog.events import FileSystemEventHandler
+            from watchdog.observers import Observer
+        except Exception:
+            return None
+
+        svc = self
+
+        class _Handler(FileSystemEventHandler):
+            def on_any_event(self, event) -> None:  # noqa: D401 - watchdog callback
+                for raw in (event.src_path, getattr(event, "dest_path", "")):
+                    if raw:
+                        p = Path(os.fsdecode(raw))
+                        svc.notify(p)
+                        svc.notify(p.parent)
+
+        try:
+            observer = Observer()
+            observer.daemon = True
+            observer.start()
+        except Exception:
+            _log.debug("file watch: native observer unavailable, polling", exc_info=True)
+            return None
+        self._handler = _Handler()
+        return observer
+
+    # ------------------------------------------------------------------
+    # subscriptions
+    # ------------------------------------------------------------------
+    def watch(self, path: Path | str, callback: Callback, *, debounce: float = DEFAULT_DEBOUNCE, content_hash: bool = True) -> WatchHandle:
+        """Подписаться на изменения файла или (нерекурсивно) каталога.
+
+        ``callback(path)`` вызывается из потока сервиса. Путь может ещё не
+        существовать — появление тоже считается изменением.
+        """
+        self.start()
+        key = Path(os.path.abspath(os.fspath(path)))
+        with self._cond:
+            w = self._watched.get(key)
+            if w is not None:
+                return self._add_handle(w, callback, debounce, content_hash)
+        # schedule() у watchdog берёт лок наблюдателя, под которым тот же
+        # наблюдатель вызывает наш обработчик (→ notify → _cond): не держим _cond
+        native_dir = self._attach_native(key)
+        fresh = _Watched(path=key, debounce=debounce, content_hash=content_hash, digest=_fingerprint(key) if content_hash else None, stat=_stat_key(key), native_dir=native_dir)
+        with self._cond:
+            w = self._watched.get(key)
+            if w is None:
+                w = self._watched[key] = fresh
+                native_dir = None
+            handle = self._add_handle(w, callback, debounce, content_hash)
+        if native_dir is not None:
+            # параллельная подписка успела раньше
+            self._release_native(native_dir)
+        return handle
+
+    def _add_handle(self, w: _Watched, callback: Callback, debounce: float, content_hash: bool) -> WatchHandle:
+        w.debounce = max(w.debounce, debounce)
+        w.content_hash = w.content_hash and content_hash
+        handle = WatchHandle(self, w.path, callback, self.epoch)
+        w.handles.append(handle)
+        return handle
+
+    def _attach_native(self, key: Path) -> Optional[str]:
+        observer = self._observer
+        if observer is None:
+            return None
+        target = key if key.is_dir() else key.parent
+        dir_key = str(target)
+        with self._native_lock:
+            slot = self._native_dirs.get(dir_key)
+            if slot is None:
+                if not target.is_dir():
+                    # каталога ещё нет — остаёмся на опросе
+                    return None
+                try:
+                    watch = observer.schedule(self._handler, dir_key, recursive=False)
+                except Exception:
+                    _log.debug("file watch: cannot watch %s natively", dir_key, exc_info=True)
+                    return None
+                slot = self._native_dirs[dir_key] = [watch, 0]
+            slot[1] += 1
+        return dir_key
+
+    def _release_native(self, dir_key: str) -> None:
+        with self._native_lock:
+            slot = self._native_dirs.get(dir_key)
+            if slot is None:
+                return
+            slot[1] -= 1
+            if slot[1] > 0:
+                return
+            del self._native_dirs[dir_key]
+            observer = self._observer
+            if observer is not None:
+                try:
+                    observer.unschedule(slot[0])
+                except Exception:
+                    pass
+
+    def _unsubscribe(self, handle: WatchHandle) -> None:
+        with self._cond:
+            w = self._watched.get(handle.path)
+            if w is None or handle not in w.handles:
+                return
+            w.handles.remove(handle)
+            if w.handles:
+                return
+            del self._watched[handle.path]
+            self._due.pop(handle.path, None)
+        if w.native_dir is not None:
+            self._release_native(w.native_dir)
+
+    def notify(self, path: Path | str) -> None:
+        """Сообщить, что путь мог измениться (события ОС, явная запись из процесса)."""
+        key = Path(path)
+        with self._cond:
+            w = self._watched.get(key)
+            if w is None:
+                return
+            self._due[key] = time.monotonic() + w.debounce
+            self._cond.notify()
+
+    # ------------------------------------------------------------------
+    # worker
+    # ------------------------------------------------------------------
+    def _run(self) -> None:
+        next_poll = time.monotonic() + self.poll_interval
+        while True:
+            with self._cond:
+                if not self._running:
+                    return
+                now = time.monotonic()
+                wake = min([next_poll, *self._due.values()])
+                if wake > now:
+                    self._cond.wait(wake - now)
+                    if not self._running:
+                        return
+                    now = time.monotonic()
+                ready = [p for p, t in self._due.items() if t <= now]
+                for p in ready:
+                    del self._due[p]
+                polled: list[_Watched] = []
+                if now >= next_poll:
+                    next_poll = now + self.poll_interval
+                    polled = [w for w in self._watched.values() if w.native_dir is None]
+            for w in polled:
+                stamp = _stat_key(w.path)
+                if stamp != w.stat:
+                    w.stat = stamp
+                    self.notify(w.path)
+            for p in ready:
+                self._check(p)
+
+    def _check(self, path: Path) -> None:
+        with self._cond:
+            w = self._watched.get(path)
+            if w is None:
+                return
+            if w.content_hash:
+                digest = _fingerprint(path)
+                if digest == w.digest:
+                    return
+                w.digest = digest
+            w.stat = _stat_key(path)
+            handles = list(w.handles)
+        for h in handles:
+            try:
+                h.callback(path)
+            except Exception:
+                _log.warning("file watch: callback failed for %s", path, exc_info=True)
+
+
+_SERVICE: FileWatchService | None = None
+_SERVICE_LOCK = threading.Lock()
+
+
+def get_file_watch() -> FileWatchService:
+    global _SERVICE
+    if _SERVICE is None:
+        with _SERVICE_LOCK:
+            if _SERVICE is None:
+                _SERVICE = FileWatchService()
+    return _SERVICE
+
+
+def file_watch_active() -> bool:
+    """Запущен ли сервис с событиями от ОС (тогда кэшам можно доверять подпискам)."""
+    svc = _SERVICE
+    return svc is not None and svc.running and svc.native
+
+
+def stop_file_watch() -> None:
+    if _SERVICE is not None:
+        _SERVICE.stop()
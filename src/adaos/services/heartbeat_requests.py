@@ -1,24 +1,27 @@
 from __future__ import annotations
-import asyncio, os
+import os
 import socket
 from typing import Sequence
-import requests
 
 from adaos.ports.heartbeat import HeartbeatPort
-from adaos.services.capacity import get_local_capacity
+from adaos.services.capacity import local_capacity_snapshot
+from adaos.services.hub_http import get_hub_http
 
 
-# Реализация через requests, но безопасно для event loop (to_thread)
+# Историческое имя: теперь ходит через общий keep-alive пул httpx (hub_http)
 class RequestsHeartbeat(HeartbeatPort):
     def __init__(self, timeout: float = 3.0) -> None:
         self.timeout = timeout
+        # хэш capacity, который hub уже принял; полная capacity уходит только при его смене
+        self._acked_hash: str | None = None
 
     async def register(self, hub_url: str, token: str, *, node_id: str, subnet_id: str, hostname: str, roles: Sequence[str]) -> bool:
         url = f"{hub_url.rstrip('/')}/api/subnet/register"
         headers = {"X-AdaOS-Token": token}
         base_url = os.environ.get("ADAOS_SELF_BASE_URL") or None
+        digest: str | None = None
         try:
-            capacity = get_local_capacity()
+            capacity, digest = local_capacity_snapshot()
         except Exception:
             capacity = {"io": [{"io_type": "stdout", "capabilities": ["text"], "priority": 50}]}
         payload = {
@@ -29,28 +32,45 @@ class RequestsHeartbeat(HeartbeatPort):
             "base_url": base_url,
             "capacity": capacity,
         }
-        r = await asyncio.to_thread(requests.post, url, json=payload, headers=headers, timeout=self.timeout)
+        r = await get_hub_http().apost_json(url, payload, headers=headers, timeout=self.timeout)
+        self._acked_hash = digest if r.status_code == 200 else None
         return r.status_code == 200
 
     async def heartbeat(self, hub_url: str, token: str, *, node_id: str) -> bool:
         url = f"{hub_url.rstrip('/')}/api/subnet/heartbeat"
         headers = {"X-AdaOS-Token": token}
         try:
-            capacity = get_local_capacity()
+            capacity, digest = local_capacity_snapshot()
         except Exception:
-            capacity = None
+            capacity, digest = None, None
         payload = {"node_id": node_id}
-        if capacity is not None:
+        if digest is not None:
+            payload["capacity_hash"] = digest
+        if capacity is not None and digest != self._acked_hash:
             payload["capacity"] = capacity
-        r = await asyncio.to_thread(requests.post, url, json=payload, headers=headers, timeout=self.timeout)
+        http = get_hub_http()
+        r = await http.apost_json(url, payload, headers=headers, timeout=self.timeout)
+        if r.status_code == 200 and "capacity" not in payload and capacity is not None and self._capacity_required(r):
+            # hub не знает наш хэш (например, перезапустился) — досылаем полную capacity
+            payload["capacity"] = capacity
+            r = await http.apost_json(url, payload, headers=headers, timeout=self.timeout)
+        if r.status_code == 200 and "capacity" in payload:
+            self._acked_hash = digest
         return r.status_code == 200
 
+    @staticmethod
+    def _capacity_required(r) -> bool:
+        try:
+            return bool((r.json() or {}).get("capacity_required"))
+        except Exception:
+            return False
+
     async def deregister(self, hub_url: str, token: str, *, node_id: str) -> None:
         url = f"{hub_url.rstrip('/')}/api/subnet/deregister"
         headers = {"X-AdaOS-Token": token}
         payload = {"node_id": node_id}
         try:
-            await asyncio.to_thread(requests.post, url, json=payload, headers=headers, timeout=self.timeout)
+            await get_hub_http().apost_json(url, payload, headers=headers, timeout=self.timeout)
         except Exception:
             # без фейла — если хаб недоступен, просто продолжаем
             pass
@@ -0,0 +1,130 @@
+# src/adaos/services/hub_http.py
+"""Общий keep-alive HTTP-клиент для трафика member → hub (и между нодами).
+
+Раньше каждый heartbeat, батч observe и запрос к хабу открывал новое TCP/TLS
+соединение через ``requests``. Здесь живут два пула httpx с одинаковыми
+настройками: асинхронный — для корутин (heartbeat, observe push), синхронный —
+для синхронных мест (SubnetKV, обработчики шины роутера). HTTP/2 включается,
+если установлен пакет ``h2``.
+"""
+from __future__ import annotations
+
+import asyncio
+import gzip
+import json
+import threading
+import weakref
+from typing import Any, Dict, Optional
+
+import httpx
+
+__all__ = ["HubHttp", "get_hub_http", "close_hub_http", "gzip_json"]
+
+GZIP_MIN_BYTES = 1024
+
+
+def _http2_available() -> bool:
+    try:
+        import h2  # noqa: F401
+    except Exception:
+        return False
+    return True
+
+
+def gzip_json(payload: Any, *, min_bytes: int = GZIP_MIN_BYTES) -> tuple[bytes, Dict[str, str]]:
+    """JSON-тело и заголовки; тела больше ``min_bytes`` сжимаются gzip."""
+    body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+    headers = {"Content-Type": "application/json"}
+    if len(body) >= min_bytes:
+        body = gzip.compress(body, compresslevel=5)
+        headers["Content-Encoding"] = "gzip"
+    return body, headers
+
+
+class HubHttp:
+    """Пулы соединений httpx: по одному AsyncClient на event loop и один Client."""
+
+    def __init__(self, *, timeout: float = 3.0, max_connections: int = 20, max_keepalive: int = 10, keepalive_expiry: float = 30.0) -> None:
+        self.timeout = timeout
+        self.http2 = _http2_available()
+        self._limits = httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_keepalive, keepalive_expiry=keepalive_expiry)
+        self._lock = threading.Lock()
+        # соединения AsyncClient привязаны к loop'у, в котором созданы: свой клиент на каждый loop
+        self._async: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient]" = weakref.WeakKeyDictionary()
+        self._sync: Optional[httpx.Client] = None
+
+    def aclient(self) -> httpx.AsyncClient:
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            client = self._async.get(loop)
+            if client is None or client.is_closed:
+                self._drop_dead_loops()
+                client = self._async[loop] = httpx.AsyncClient(timeout=self.timeout, limits=self._limits, http2=self.http2)
+            return client
+
+    def _drop_dead_loops(self) -> None:
+        """Клиенты закрытых loop'ов: закрыть их транспорт уже нельзя, отпускаем сокеты вместе с объектом."""
+        for loop in [lp for lp in self._async.keys() if lp.is_closed()]:
+            self._async.pop(loop, None)
+
+    def client(self) -> httpx.Client:
+        with self._lock:
+            if self._sync is None or self._sync.is_closed:
+                self._sync = httpx.Client(timeout=self.timeout, limits=self._limits, http2=self.http2)
+            return self._sync
+
+    async def apost_json(self, url: str, payload: Any, *, headers: Optional[Dict[str, str]] = None, compress: bool = False, timeout: Optional[float] = None) -> httpx.Response:
+        if compress:
+            body, extra = gzip_json(payload)
+        else:
+            body, extra = json.dumps(payload, ensure_ascii=False).encode("utf-8"), {"Content-Type": "application/json"}
+        return await self.aclient().post(url, content=body, headers={**(headers or {}), **extra}, timeout=timeout or self.timeout)
+
+    async def aget(self, url: str, *, headers: Optional[Dict[str, str]] = None, timeout: Optional[float] = None) -> httpx.Response:
+        return await self.aclient().get(url, headers=headers, timeout=timeout or self.timeout)
+
+    def post_json(self, url: str, payload: Any, *, headers: Optional[Dict[str, str]] = None, timeout: Optional[float] = None) -> httpx.Response:
+        return self.client().post(url, json=payload, headers=headers, timeout=timeout or self.timeout)
+
+    def put_json(self, url: str, payload: Any, *, headers: Optional[Dict[str, str]] = None, timeout: Optional[float] = None) -> httpx.Response:
+        return self.client().put(url, json=payload, headers=headers, timeout=timeout or self.timeout)
+
+    def get(self, url: str, *, headers: Optional[Dict[str, str]] = None, timeout: Optional[float] = None) -> httpx.Response:
+        return self.client().get(url, headers=headers, timeout=timeout or self.timeout)
+
+    async def aclose(self) -> None:
+        with self._lock:
+            clients = list(self._async.items())
+            self._async.clear()
+            sync, self._sync = self._sync, None
+        current = asyncio.get_running_loop()
+        for loop, aclient in clients:
+            try:
+                if loop is current:
+                    await aclient.aclose()
+                elif loop.is_running():
+                    # закрываем на «своём» loop'е
+                    asyncio.run_coroutine_threadsafe(aclient.aclose(), loop)
+            except Exception:
+                pass
+        if sync is not None:
+            sync.close()
+
+
+_HTTP: HubHttp | None = None
+_HTTP_LOCK = threading.Lock()
+
+
+def get_hub_http() -> HubHttp:
+    global _HTTP
+    if _HTTP is None:
+        with _HTTP_LOCK:
+            if _HTTP is None:
+                _HTTP = HubHttp()
+    return _HTTP
+
+
+async def close_hub_http() -> None:
+    """Закрыть пулы при остановке (клиенты пересоздадутся лениво при следующем запросе)."""
+    if _HTTP is not None:
+        await _HTTP.aclose()
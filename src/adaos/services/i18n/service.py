@@ -1,19 +1,95 @@
 from __future__ import annotations
 import os, json, inspect
-from dataclasses import dataclass, field
+import threading
+import time
+from dataclasses import dataclass
 from pathlib import Path
-from typing import Optional, Any, Dict
+from typing import Optional, Any, Callable, Dict, Iterable
 
 from adaos.services.agent_context import AgentContext
 
 DEFAULT_LANG = "en"
 
+# как часто (сек) сверять mtime файлов каталога; между проверками перевод — чистый lookup
+CATALOG_RECHECK_INTERVAL = 1.0
+
+# сообщение: исходный текст + bound str.format (None, если плейсхолдеров нет)
+_Entry = tuple[str, Optional[Callable[..., str]]]
+
+
+def _compile(data: Dict[str, Any]) -> Dict[str, _Entry]:
+    compiled: Dict[str, _Entry] = {}
+    for key, value in data.items():
+        text = value if isinstance(value, str) else str(value)
+        fmt = text.format if ("{" in text or "}" in text) else None
+        compiled[key] = (text, fmt)
+    return compiled
+
+
+def _mtime_ns(path: Path) -> Optional[int]:
+    try:
+        return path.stat().st_mtime_ns
+    except OSError:
+        return None
+
+
+@dataclass(slots=True)
+class _Catalog:
+    """Скомпилированный каталог: цепочка lang → DEFAULT_LANG уже слита."""
+
+    sources: tuple[Path, ...]
+    stamps: tuple[Optional[int], ...]
+    messages: Dict[str, _Entry]
+    checked_at: float
+
+    @classmethod
+    def load(cls, sources: Iterable[Path]) -> "_Catalog":
+        """``sources`` по убыванию приоритета; ранние перекрывают поздние."""
+        sources = tuple(sources)
+        stamps = tuple(_mtime_ns(p) for p in sources)
+        merged: Dict[str, Any] = {}
+        for path, stamp in zip(reversed(sources), reversed(stamps)):
+            if stamp is None:
+                continue
+            try:
+                data = json.loads(path.read_text(encoding="utf-8"))
+            except Exception:
+                continue
+            if isinstance(data, dict):
+                merged.update(data)
+        return cls(sources=sources, stamps=stamps, messages=_compile(merged), checked_at=time.monotonic())
+
+    def stale(self, now: float) -> bool:
+        if now - self.checked_at < CATALOG_RECHECK_INTERVAL:
+            return False
+        self.checked_at = now
+        return tuple(_mtime_ns(p) for p in self.sources) != self.stamps
+
+
+# процессный кэш: (scope, skill, lang) -> _Catalog; общий для всех I18nService
+_CATALOGS: Dict[tuple[str, str, str], _Catalog] = {}
+_CATALOGS_LOCK = threading.Lock()
+
+
+def _catalog(key: tuple[str, str, str], sources: Callable[[], list[Path]]) -> Dict[str, _Entry]:
+    cat = _CATALOGS.get(key)
+    if cat is not None and not cat.stale(time.monotonic()):
+        return cat.messages
+    fresh = _Catalog.load(sources())
+    with _CATALOGS_LOCK:
+        _CATALOGS[key] = fresh
+    return fresh.messages
+
+
+def clear_i18n_cache() -> None:
+    """Сбросить все скомпилированные каталоги (например, после установки навыка)."""
+    with _CATALOGS_LOCK:
+        _CATALOGS.clear()
+
 
 @dataclass(slots=True)
 class I18nService:
     ctx: AgentContext
-    _cache_global: Dict[str, Dict[str, str]] = field(default_factory=dict, init=False, repr=False)
-    _cache_skill: Dict[tuple[str, str], Dict[str, str]] = field(default_factory=dict, init=False, repr=False)
 
     # ---------- public ----------
     def translate(
@@ -28,70 +104,48 @@ class I18nService:
     ) -> str:
         """Единая точка перевода. Без SDK-зависимостей."""
         lang = lang or getattr(self.ctx.settings, "lang", None) or os.getenv("ADAOS_LANG") or DEFAULT_LANG
-        params = params or {}
 
         if scope == "global" or (scope is None and not key.startswith("prep.")):
             messages = self._load_global(lang)
         else:
             messages = self._load_skill(lang, skill_path=skill_path, skill_id=skill_id)
 
-        text = messages.get(key, key)
+        entry = messages.get(key)
+        if entry is None:
+            text, fmt = key, key.format
+        else:
+            text, fmt = entry
+            if fmt is None:
+                return text
         try:
-            return text.format(**params)
+            return fmt(**(params or {}))
         except Exception:
             # не валимся, если плейсхолдеры не сошлись
             return text
 
     # ---------- loaders ----------
-    def _load_global(self, lang: str) -> Dict[str, str]:
-        if lang in self._cache_global:
-            return self._cache_global[lang]
+    def _load_global(self, lang: str) -> Dict[str, _Entry]:
         base = self.ctx.paths.locales_dir()
-        dflt = base / f"{DEFAULT_LANG}.json"
-        candidates = [(base / f"{lang}.json"), dflt]
-        data: Dict[str, str] = {}
-        for p in candidates:
-            if p.exists():
-                data = json.loads(p.read_text(encoding="utf-8"))
-                break
-        self._cache_global[lang] = data
-        return data
-
-    def _load_skill(self, lang: str, *, skill_path: Optional[Path], skill_id: Optional[str]) -> Dict[str, str]:
-        # ключ кэша: (skill_id|path, lang)
-        key = ((skill_id or (skill_path.name if skill_path else "")), lang)
-        if key in self._cache_skill:
-            return self._cache_skill[key]
-
-        # приоритет путей:
+
+        def sources() -> list[Path]:
+            return [base / f"{lang}.json", base / f"{DEFAULT_LANG}.json"]
+
+        return _catalog(("global", str(base), lang), sources)
+
+    def _load_skill(self, lang: str, *, skill_path: Optional[Path], skill_id: Optional[str]) -> Dict[str, _Entry]:
+        sid = skill_id or (skill_path.name if skill_path else None)
+        base = self.ctx.paths.skills_locales_dir()
+
+        # приоритет путей (для lang, затем для DEFAULT_LANG):
         # 1) <skill_path>/i18n/<lang>.json
         # 2) <skills_locales_dir>/<skill_id or folder>/<lang>.json
-        data: Dict[str, str] = {}
-        if skill_path:
-            p1 = skill_path / "i18n" / f"{lang}.json"
-            if p1.exists():
-                data = json.loads(p1.read_text(encoding="utf-8"))
-        if not data:
-            base = self.ctx.paths.skills_locales_dir()
-            sid = skill_id or (skill_path.name if skill_path else None)
-            if sid:
-                p2 = base / sid / f"{lang}.json"
-                if p2.exists():
-                    data = json.loads(p2.read_text(encoding="utf-8"))
-
-        # fallback на DEFAULT_LANG в тех же местах
-        if not data:
-            if skill_path:
-                p1d = skill_path / "i18n" / f"{DEFAULT_LANG}.json"
-                if p1d.exists():
-                    data = json.loads(p1d.read_text(encoding="utf-8"))
-            if not data and (skill_id or skill_path):
-                base = self.ctx.paths.skills_locales_dir()
-                sid = skill_id or (skill_path.name if skill_path else None)
+        def sources() -> list[Path]:
+            found: list[Path] = []
+            for code in dict.fromkeys((lang, DEFAULT_LANG)):
+                if skill_path:
+                    found.append(Path(skill_path) / "i18n" / f"{code}.json")
                 if sid:
-                    p2d = base / sid / f"{DEFAULT_LANG}.json"
-                    if p2d.exists():
-                        data = json.loads(p2d.read_text(encoding="utf-8"))
+                    found.append(base / sid / f"{code}.json")
+            return found
 
-        self._cache_skill[key] = data
-        return data
+        return _catalog(("skill", f"{sid or ''}@{skill_path or base}", lang), sources)
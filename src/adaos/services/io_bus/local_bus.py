@@ -17,7 +17,7 @@ class LocalIoBus:
 
     async def publish_input(self, hub_id: str, envelope: dict) -> None:
         subject = f"tg.input.{hub_id}"
-        self._core.publish(Event(type=subject, payload=envelope, source="io.local", ts=0.0))
+        await self._core.apublish(Event(type=subject, payload=envelope, source="io.local", ts=0.0))
 
     async def subscribe_output(self, bot_id: str, handler: Callable[[str, bytes], Awaitable[None]]) -> Any:
         prefix = f"tg.output.{bot_id}."
@@ -1,10 +1,12 @@
 from __future__ import annotations
-from dataclasses import asdict, dataclass, field
+from dataclasses import asdict, dataclass, field, fields
 from datetime import datetime, timezone
 from pathlib import Path
 from typing import Any, TypedDict
+import copy
 import os
 import sys
+import threading
 import uuid
 import yaml
 from adaos.services.agent_context import get_ctx, AgentContext  # type: ignore
@@ -365,12 +367,41 @@ def _normalize_root_state(raw: Any) -> RootState | None:
     return state or None
 
 
-def load_node(ctx: AgentContext | None = None) -> NodeConfig:
-    path = _config_path()
-    if not path.exists():
-        conf = _default_conf()
-        save_node(conf, ctx=ctx)
-        return conf
+# Process-wide cache: node.yaml path -> (stat stamp, shared NodeConfig).
+# The cached instance is the one attached to AgentContext.config; reloads and
+# saves update it in place so holders of the reference always see fresh data.
+_CACHE: dict[Path, tuple[tuple[int, int] | None, NodeConfig]] = {}
+_CACHE_LOCK = threading.RLock()
+
+
+def _stat_stamp(path: Path) -> tuple[int, int] | None:
+    try:
+        st = path.stat()
+    except OSError:
+        return None
+    return (st.st_mtime_ns, st.st_size)
+
+
+def _assign(target: NodeConfig, source: NodeConfig) -> None:
+    if target is source:
+        return
+    for f in fields(NodeConfig):
+        setattr(target, f.name, copy.deepcopy(getattr(source, f.name)))
+
+
+def _remember(path: Path, conf: NodeConfig) -> NodeConfig:
+    """Store ``conf`` as the cached config for ``path`` (in place if one exists)."""
+    with _CACHE_LOCK:
+        cached = _CACHE.get(path)
+        shared = conf
+        if cached is not None:
+            shared = cached[1]
+            _assign(shared, conf)
+        _CACHE[path] = (_stat_stamp(path), shared)
+        return shared
+
+
+def _read_node(path: Path) -> tuple[NodeConfig, bool]:
     data = yaml.safe_load(path.read_text(encoding="utf-8")) or {}
 
     raw_root_settings = data.get("root")
@@ -407,18 +438,71 @@ def load_node(ctx: AgentContext | None = None) -> NodeConfig:
     )
     changed = conf.ensure_defaults()
     conf.sync_sections()
-    if changed:
-        save_node(conf, ctx=ctx)
-    return conf
+    return conf, changed
+
+
+def _shared_node(ctx: AgentContext | None = None, *, refresh: bool = False) -> NodeConfig:
+    """The process-wide NodeConfig instance, re-read only when ``node.yaml`` changed."""
+    path = _config_path()
+    stamp = _stat_stamp(path)
+    with _CACHE_LOCK:
+        cached = _CACHE.get(path)
+        if cached is not None and not refresh and stamp is not None and cached[0] == stamp:
+            return cached[1]
+        if stamp is None:
+            conf = _default_conf()
+            save_node(conf, ctx=ctx)
+            return _CACHE[path][1]
+        conf, changed = _read_node(path)
+        if changed:
+            save_node(conf, ctx=ctx)
+            return _CACHE[path][1]
+        return _remember(path, conf)
+
+
+def load_node(ctx: AgentContext | None = None, *, refresh: bool = False) -> NodeConfig:
+    """Return a private copy of the NodeConfig for the active base dir.
+
+    ``node.yaml`` is parsed only when its mtime/size differ from the cached
+    stamp (or ``refresh=True``). The copy may be mutated freely: nothing is
+    shared until it is persisted with :func:`save_node`, which updates the
+    cached instance in place. Use :func:`current_config` for read-only hot paths.
+    """
+    shared = _shared_node(ctx, refresh=refresh)
+    with _CACHE_LOCK:
+        return copy.deepcopy(shared)
 
 
 def save_node(conf: NodeConfig, *, ctx: AgentContext | None = None) -> None:
     conf.sync_sections()
     data = conf.to_dict()
-    _config_path(ctx).write_text(
-        yaml.safe_dump(data, allow_unicode=True, sort_keys=False),
-        encoding="utf-8",
-    )
+    path = _config_path(ctx)
+    with _CACHE_LOCK:
+        path.write_text(
+            yaml.safe_dump(data, allow_unicode=True, sort_keys=False),
+            encoding="utf-8",
+        )
+        _remember(path, conf)
+
+
+def current_config(ctx: AgentContext | None = None) -> NodeConfig:
+    """NodeConfig for hot paths: ``ctx.config`` if attached, else load and attach it once.
+
+    This is the shared instance: read it, but change settings through a
+    :func:`load_config` copy and :func:`save_config`.
+    """
+    try:
+        agent_ctx = ctx or get_ctx()
+    except Exception:
+        return _shared_node()
+    conf = getattr(agent_ctx, "config", None)
+    if conf is None:
+        conf = _shared_node(agent_ctx)
+        try:
+            object.__setattr__(agent_ctx, "config", conf)
+        except Exception:
+            pass
+    return conf
 
 
 def ensure_hub(conf: NodeConfig) -> None:
@@ -443,8 +527,8 @@ def set_role(role: str, *, hub_url: str | None = None, subnet_id: str | None = N
     return conf
 
 
-def load_config(ctx: AgentContext | None = None) -> NodeConfig:
-    return load_node(ctx=ctx)
+def load_config(ctx: AgentContext | None = None, *, refresh: bool = False) -> NodeConfig:
+    return load_node(ctx=ctx, refresh=refresh)
 
 
 def save_config(conf: NodeConfig, *, ctx: AgentContext | None = None) -> None:
@@ -1,13 +1,14 @@
 # src/adaos/services/observe.py
 from __future__ import annotations
-import asyncio, json, time, uuid, gzip, os
+import asyncio, atexit, threading, time, uuid
 from pathlib import Path
 from typing import Any, Dict, List, Optional
 
-import requests
 
 from adaos.services.agent_context import get_ctx
-from adaos.services.node_config import load_config
+from adaos.services.hub_http import get_hub_http
+from adaos.services.event_log import EventLogWriter, lines_since, tail_lines
+from adaos.services.node_config import current_config
 from adaos.services.settings import Settings
 from adaos.sdk.data import bus as bus_module  # будем мягко оборачивать emit
 
@@ -35,7 +36,8 @@ _KEEP = 3
 _LOG_TASK: Optional[asyncio.Task] = None
 _QUEUE: "asyncio.Queue[Dict[str, Any]]" | None = None
 _ORIG_EMIT = None
-_LOG_FILE: Path | None = None
+_WRITER: EventLogWriter | None = None
+_WRITER_LOCK = threading.Lock()
 
 
 class EventBroadcaster:
@@ -81,16 +83,7 @@ def _ensure_trace(kwargs: Dict[str, Any]) -> str:
 
 
 def _serialize_event(topic: str, payload: Dict[str, Any], kwargs: Dict[str, Any]) -> Dict[str, Any]:
-    try:
-        ctx = get_ctx()
-        conf = getattr(ctx, "config", None) or load_config()
-        try:
-            if getattr(ctx, "config", None) is None:
-                object.__setattr__(ctx, "config", conf)
-        except Exception:
-            pass
-    except Exception:
-        conf = load_config()
+    conf = current_config()
     return {
         "ts": _now_ts(),
         "topic": topic,
@@ -103,51 +96,70 @@ def _serialize_event(topic: str, payload: Dict[str, Any], kwargs: Dict[str, Any]
     }
 
 
-def _rotate_if_needed(path: Path):
-    try:
-        if path.exists() and path.stat().st_size >= _MAX_BYTES:
-            for i in range(_KEEP, 0, -1):
-                src = path.with_suffix(path.suffix + ("" if i == 1 else f".{i-1}.gz"))
-                dst = path.with_suffix(path.suffix + f".{i}.gz")
-                if i == 1:
-                    if path.exists():
-                        data = path.read_bytes()
-                        with gzip.open(path.with_suffix(path.suffix + ".1.gz"), "wb") as gz:
-                            gz.write(data)
-                        path.unlink(missing_ok=True)
-                else:
-                    if src.exists():
-                        src.rename(dst)
-    except Exception:
-        pass
+def _log_writer() -> EventLogWriter:
+    """Общий фоновый писатель events.log (создаётся при первом событии)."""
+    global _WRITER
+    if _WRITER is None:
+        with _WRITER_LOCK:
+            if _WRITER is None:
+                _WRITER = EventLogWriter(_log_path(), max_bytes=_MAX_BYTES, keep=_KEEP)
+                atexit.register(_WRITER.close)
+    return _WRITER
 
 
 def _write_local(e: Dict[str, Any]) -> None:
-    global _LOG_FILE
-    if _LOG_FILE is None:
-        _LOG_FILE = _log_path()
-    with _LOG_FILE.open("a", encoding="utf-8") as f:
-        f.write(json.dumps(e, ensure_ascii=False) + "\n")
+    _log_writer().write(e)
+
+
+def write_events(events: List[Dict[str, Any]]) -> int:
+    """Пакетная запись в локальный журнал (используется /api/observe/ingest)."""
+    return _log_writer().write_many(events)
+
+
+def flush_events(timeout: float = 5.0) -> bool:
+    """Синхронно сбросить очередь журнала на диск (shutdown, тесты, CLI)."""
+    if _WRITER is None:
+        return True
+    return _WRITER.flush(timeout)
+
+
+def tail_events(
+    lines: int,
+    *,
+    topic_prefix: str | None = None,
+    node_id: str | None = None,
+    cursor: str | None = None,
+) -> tuple[List[str], str | None]:
+    """Страница истории по индексу сегментов: строки и курсор на более старую страницу."""
+    writer = _log_writer()
+    writer.flush(1.0)
+    return tail_lines(writer.segments(), lines, topic_prefix=topic_prefix, node_id=node_id, cursor=cursor)
+
+
+def replay_since(
+    since_ts: float,
+    *,
+    topic_prefix: str | None = None,
+    node_id: str | None = None,
+    limit: int | None = None,
+) -> List[str]:
+    """События с ts >= since_ts (для SSE-реплея), блоки раньше since не читаются."""
+    writer = _log_writer()
+    writer.flush(1.0)
+    return list(lines_since(writer.segments(), since_ts, topic_prefix=topic_prefix, node_id=node_id, limit=limit))
 
 
 async def _push_loop():
     """Фоновая отправка батчей логов на hub (для member)."""
     assert _QUEUE is not None
-    try:
-        ctx = get_ctx()
-        conf = getattr(ctx, "config", None) or load_config()
-        try:
-            if getattr(ctx, "config", None) is None:
-                object.__setattr__(ctx, "config", conf)
-        except Exception:
-            pass
-    except Exception:
-        conf = load_config()
+    conf = current_config()
     url = f"{conf.hub_url.rstrip('/')}/api/observe/ingest"
-    headers = {"X-AdaOS-Token": conf.token, "Content-Type": "application/json"}
+    headers = {"X-AdaOS-Token": conf.token}
+    http = get_hub_http()
 
     batch: List[Dict[str, Any]] = []
     backoff = 1
+    compress = True
     while True:
         try:
             try:
@@ -162,7 +174,11 @@ async def _push_loop():
                 continue
 
             payload = {"node_id": conf.node_id, "events": batch}
-            r = requests.post(url, json=payload, headers=headers, timeout=3)
+            r = await http.apost_json(url, payload, headers=headers, compress=compress)
+            if compress and r.status_code in (400, 415, 422):
+                # старый hub не понимает Content-Encoding: gzip — шлём как раньше
+                compress = False
+                r = await http.apost_json(url, payload, headers=headers)
             if r.status_code == 200:
                 batch.clear()
                 backoff = 1
@@ -182,16 +198,7 @@ async def _emit_wrapper(topic: str, payload: Dict[str, Any], **kwargs):
     trace = _ensure_trace(kwargs)
     res = await _ORIG_EMIT(topic, payload, **kwargs)
     event = _serialize_event(topic, payload, kwargs)
-    try:
-        ctx = get_ctx()
-        conf = getattr(ctx, "config", None) or load_config()
-        try:
-            if getattr(ctx, "config", None) is None:
-                object.__setattr__(ctx, "config", conf)
-        except Exception:
-            pass
-    except Exception:
-        conf = load_config()
+    conf = current_config()
     _write_local(event)
     await BROADCAST.publish(event)
     if conf.role == "member" and _QUEUE:
@@ -224,16 +231,7 @@ async def start_observer():
     _ORIG_EMIT = bus_module.emit
     bus_module.emit = _emit_wrapper  # type: ignore
 
-    try:
-        ctx = get_ctx()
-        conf = getattr(ctx, "config", None) or load_config()
-        try:
-            if getattr(ctx, "config", None) is None:
-                object.__setattr__(ctx, "config", conf)
-        except Exception:
-            pass
-    except Exception:
-        conf = load_config()
+    conf = current_config()
     if conf.role == "member":
         _QUEUE = _QUEUE or asyncio.Queue(maxsize=5000)
         if not _LOG_TASK:
@@ -254,6 +252,8 @@ async def stop_observer():
     if _ORIG_EMIT is not None:
         bus_module.emit = _ORIG_EMIT  # type: ignore
         _ORIG_EMIT = None
+    if _WRITER is not None:
+        await asyncio.to_thread(_WRITER.flush)
 
 
 def pass_filters(evt: Dict[str, Any], topic_prefix: str | None, node_id: str | None, since_ts: float | None) -> bool:
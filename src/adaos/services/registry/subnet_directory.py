@@ -4,12 +4,17 @@ import time
 from typing import Any, Dict, List, Optional, TypedDict
 
 from adaos.services.agent_context import get_ctx
+from adaos.services.capacity import capacity_hash as _capacity_hash
 from .subnet_repo import SubnetRepo
 
+# last_seen пишется в SQLite не чаще раза в этот интервал (живость — в памяти)
+LAST_SEEN_PERSIST_INTERVAL = 300.0
+
 
 class LiveState(TypedDict, total=False):
     online: bool
     last_seen: float
+    persisted_at: float
 
 
 class SubnetDirectory:
@@ -17,9 +22,13 @@ class SubnetDirectory:
         ctx = get_ctx()
         self.repo = SubnetRepo(ctx.sql)
         self.live: Dict[str, LiveState] = {}
+        # node_id -> хэш capacity, уже записанной в SQLite
+        self.capacity_hashes: Dict[str, str] = {}
+        self.stats: Dict[str, int] = {"heartbeats": 0, "capacity_writes": 0, "capacity_skipped": 0, "capacity_requested": 0}
         # preload persisted nodes as offline until first heartbeat
         for n in self.repo.list_nodes():
-            self.live[n["node_id"]] = {"online": False, "last_seen": float(n.get("last_seen") or 0.0)}
+            last_seen = float(n.get("last_seen") or 0.0)
+            self.live[n["node_id"]] = {"online": False, "last_seen": last_seen, "persisted_at": last_seen}
 
     # ------ lifecycle events ------
     def on_register(self, node_info: Dict[str, Any]) -> None:
@@ -36,16 +45,53 @@ class SubnetDirectory:
         self.repo.replace_io_capacity(node["node_id"], capacity.get("io") or [])
         self.repo.replace_skill_capacity(node["node_id"], capacity.get("skills") or [])
         self.repo.replace_scenario_capacity(node["node_id"], capacity.get("scenarios") or [])
-        self.live[node["node_id"]] = {"online": True, "last_seen": node["last_seen"]}
+        self.capacity_hashes[node["node_id"]] = _capacity_hash(capacity)
+        self.live[node["node_id"]] = {"online": True, "last_seen": node["last_seen"], "persisted_at": node["last_seen"]}
+
+    def is_known(self, node_id: str) -> bool:
+        """Нода зарегистрирована (persisted или через register) — без запроса в SQLite."""
+        return node_id in self.live
+
+    def on_heartbeat(self, node_id: str, capacity: Optional[Dict[str, Any]], *, capacity_hash: Optional[str] = None) -> bool:
+        """Отметить живость ноды; capacity переписывается в SQLite только при смене хэша.
 
-    def on_heartbeat(self, node_id: str, capacity: Optional[Dict[str, Any]]) -> None:
+        Возвращает True, если нода прислала незнакомый хэш без capacity и должна
+        дослать полную capacity.
+        """
         ts = time.time()
-        self.repo.touch_heartbeat(node_id, ts, capacity)
+        self.stats["heartbeats"] += 1
         st = self.live.get(node_id) or {}
         st["online"] = True
         st["last_seen"] = ts
         self.live[node_id] = st
 
+        known = self.capacity_hashes.get(node_id)
+        required = False
+        if capacity:
+            digest = capacity_hash or _capacity_hash(capacity)
+            if digest != known:
+                self._write_capacity(node_id, capacity)
+                self.capacity_hashes[node_id] = digest
+                self.stats["capacity_writes"] += 1
+            else:
+                self.stats["capacity_skipped"] += 1
+        elif capacity_hash and capacity_hash != known:
+            required = True
+            self.stats["capacity_requested"] += 1
+        else:
+            self.stats["capacity_skipped"] += 1
+
+        if ts - float(st.get("persisted_at") or 0.0) >= LAST_SEEN_PERSIST_INTERVAL:
+            self.repo.touch_heartbeat(node_id, ts)
+            st["persisted_at"] = ts
+        return required
+
+    def _write_capacity(self, node_id: str, capacity: Dict[str, Any]) -> None:
+        self.repo.replace_io_capacity(node_id, capacity.get("io") or [])
+        self.repo.replace_skill_capacity(node_id, capacity.get("skills") or [])
+        if "scenarios" in capacity:
+            self.repo.replace_scenario_capacity(node_id, capacity.get("scenarios") or [])
+
     # ------ queries ------
     def mark_stale_if_expired(self, ttl: float = 45.0) -> None:
         now = time.time()
@@ -123,7 +123,7 @@ class SubnetRepo:
             self.replace_skill_capacity(node_id, capacity.get("skills") or [])
 
     def list_nodes(self) -> List[Dict[str, Any]]:
-        with self.sql.connect() as con:
+        with self.sql.read() as con:
             cur = con.execute(
                 "SELECT node_id, subnet_id, roles_json, hostname, base_url, last_seen, created_at, updated_at FROM subnet_nodes"
             )
@@ -144,7 +144,7 @@ class SubnetRepo:
             return rows
 
     def get_node(self, node_id: str) -> Optional[Dict[str, Any]]:
-        with self.sql.connect() as con:
+        with self.sql.read() as con:
             cur = con.execute(
                 "SELECT node_id, subnet_id, roles_json, hostname, base_url, last_seen, created_at, updated_at FROM subnet_nodes WHERE node_id=?",
                 (node_id,),
@@ -226,7 +226,7 @@ class SubnetRepo:
             return out
 
     def io_for_node(self, node_id: str) -> List[Dict[str, Any]]:
-        with self.sql.connect() as con:
+        with self.sql.read() as con:
             cur = con.execute(
                 "SELECT io_type, capabilities_json, priority, id_hint, updated_at FROM subnet_capacity_io WHERE node_id=?",
                 (node_id,),
@@ -245,7 +245,7 @@ class SubnetRepo:
             return out
 
     def skills_for_node(self, node_id: str) -> List[Dict[str, Any]]:
-        with self.sql.connect() as con:
+        with self.sql.read() as con:
             cur = con.execute(
                 "SELECT name, version, active, updated_at, dev FROM subnet_capacity_skills WHERE node_id=?",
                 (node_id,),
@@ -284,7 +284,7 @@ class SubnetRepo:
             con.commit()
 
     def scenarios_for_node(self, node_id: str) -> List[Dict[str, Any]]:
-        with self.sql.connect() as con:
+        with self.sql.read() as con:
             cur = con.execute(
                 "SELECT name, version, active, updated_at, dev FROM subnet_capacity_scenarios WHERE node_id=?",
                 (node_id,),
@@ -0,0 +1,236 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from adaos.services.hub_http import get_hub_http
+
+_log = logging.getLogger("adaos.router.delivery")
+
+Send = Callable[[], Awaitable[bool]]
+Fallback = Callable[[], Any]
+
+
+@dataclass
+class _Job:
+    send: Send
+    fallback: Optional[Fallback] = None
+    label: str = ""
+    attempts: int = 0
+    retries: Optional[int] = None
+
+
+@dataclass
+class DeliveryStats:
+    submitted: int = 0
+    delivered: int = 0
+    retried: int = 0
+    failed: int = 0
+    dropped: int = 0
+
+
+class DeliveryPool:
+    """
+    Async delivery workers for router traffic.
+
+    ``submit`` is non-blocking and safe to call from the synchronous bus
+    callback (or from another thread): the job is put on the queue of its
+    target, and one worker per target sends jobs in order through the shared
+    keep-alive client. Failed sends are retried with exponential backoff; after
+    the last attempt the optional ``fallback`` runs (e.g. print locally).
+    Non-idempotent sends pass ``retries=0``: a timeout or 5xx may still mean the
+    request was applied, and a retry would duplicate it.
+    A global semaphore bounds the number of requests in flight.
+    """
+
+    def __init__(
+        self,
+        *,
+        retries: int = 2,
+        backoff: float = 0.2,
+        queue_size: int = 256,
+        max_inflight: int = 8,
+        idle_timeout: float = 60.0,
+    ) -> None:
+        self.retries = retries
+        self.backoff = backoff
+        self.queue_size = queue_size
+        self.idle_timeout = idle_timeout
+        self.stats = DeliveryStats()
+        self._max_inflight = max_inflight
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._sem: Optional[asyncio.Semaphore] = None
+        self._queues: Dict[str, asyncio.Queue[_Job]] = {}
+        self._workers: Dict[str, asyncio.Task] = {}
+
+    def bind(self, loop: asyncio.AbstractEventLoop) -> None:
+        self._loop = loop
+        self._sem = asyncio.Semaphore(self._max_inflight)
+
+    def submit(self, target: str, send: Send, *, fallback: Optional[Fallback] = None, label: str = "", retries: Optional[int] = None) -> bool:
+        loop = self._loop
+        if loop is None or loop.is_closed():
+            return False
+        job = _Job(send=send, fallback=fallback, label=label, retries=retries)
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is loop:
+            self._enqueue(target, job)
+        else:
+            loop.call_soon_threadsafe(self._enqueue, target, job)
+        return True
+
+    def _enqueue(self, target: str, job: _Job) -> None:
+        self.stats.submitted += 1
+        queue = self._queues.get(target)
+        if queue is None:
+            queue = self._queues[target] = asyncio.Queue(self.queue_size)
+        worker = self._workers.get(target)
+        if worker is None or worker.done():
+            self._workers[target] = asyncio.get_running_loop().create_task(self._worker(target, queue), name=f"adaos-router-{target}")
+        try:
+            queue.put_nowait(job)
+        except asyncio.QueueFull:
+            self.stats.dropped += 1
+            _log.warning("router: delivery queue full, dropping target=%s %s", target, job.label)
+            self._run_fallback(job)
+
+    async def _worker(self, target: str, queue: asyncio.Queue[_Job]) -> None:
+        try:
+            while True:
+                try:
+                    job = await asyncio.wait_for(queue.get(), self.idle_timeout)
+                except asyncio.TimeoutError:
+                    if queue.empty():
+                        return
+                    continue
+                try:
+                    await self._deliver(target, job)
+                finally:
+                    queue.task_done()
+        finally:
+            if self._workers.get(target) is asyncio.current_task():
+                self._workers.pop(target, None)
+                if queue.empty():
+                    self._queues.pop(target, None)
+
+    async def _deliver(self, target: str, job: _Job) -> None:
+        assert self._sem is not None
+        while True:
+            job.attempts += 1
+            ok = False
+            try:
+                async with self._sem:
+                    ok = await job.send()
+            except Exception as exc:
+                _log.debug("router: send failed target=%s %s: %s", target, job.label, exc)
+            if ok:
+                self.stats.delivered += 1
+                return
+            if job.attempts > (self.retries if job.retries is None else job.retries):
+                self.stats.failed += 1
+                _log.warning("router: delivery failed target=%s %s attempts=%d", target, job.label, job.attempts)
+                self._run_fallback(job)
+                return
+            self.stats.retried += 1
+            await asyncio.sleep(self.backoff * (2 ** (job.attempts - 1)))
+
+    def _run_fallback(self, job: _Job) -> None:
+        if job.fallback is None:
+            return
+        try:
+            res = job.fallback()
+            if asyncio.iscoroutine(res):
+                asyncio.get_running_loop().create_task(res)
+        except Exception:
+            _log.warning("router: fallback failed %s", job.label, exc_info=True)
+
+    async def drain(self, timeout: float = 5.0) -> bool:
+        """Wait until every queued job has been delivered or given up on."""
+        queues = list(self._queues.values())
+        if not queues:
+            return True
+        try:
+            await asyncio.wait_for(asyncio.gather(*(q.join() for q in queues)), timeout)
+        except asyncio.TimeoutError:
+            return False
+        return True
+
+    async def close(self) -> None:
+        workers = list(self._workers.values())
+        self._workers.clear()
+        self._queues.clear()
+        for w in workers:
+            w.cancel()
+        if workers:
+            await asyncio.gather(*workers, return_exceptions=True)
+
+
+@dataclass
+class NodeUrlCache:
+    """
+    node_id -> base_url with TTL; unresolved lookups are cached for a shorter time
+    so an unknown node does not cost a directory/hub round-trip per event.
+    On the hub the online flag is still checked on every call (it is an in-memory
+    overlay in SubnetDirectory), only the base_url lookup is cached.
+    """
+
+    ttl: float = 30.0
+    negative_ttl: float = 5.0
+    _items: Dict[str, tuple[Optional[str], float]] = field(default_factory=dict)
+
+    def get(self, node_id: str) -> tuple[bool, Optional[str]]:
+        hit = self._items.get(node_id)
+        if hit is None or hit[1] < time.monotonic():
+            return False, None
+        return True, hit[0]
+
+    def put(self, node_id: str, url: Optional[str]) -> None:
+        self._items[node_id] = (url, time.monotonic() + (self.ttl if url else self.negative_ttl))
+
+    def clear(self) -> None:
+        self._items.clear()
+
+    async def resolve(self, node_id: str, role: str, hub_url: str | None, token: str | None) -> Optional[str]:
+        if role == "hub":
+            from adaos.services.registry.subnet_directory import get_directory
+
+            try:
+                if not get_directory().is_online(node_id):
+                    return None
+            except Exception:
+                return None
+        found, url = self.get(node_id)
+        if found:
+            return url
+        url = await _lookup_base_url(node_id, role, hub_url, token)
+        self.put(node_id, url)
+        return url
+
+
+async def _lookup_base_url(node_id: str, role: str, hub_url: str | None, token: str | None) -> Optional[str]:
+    try:
+        if role == "hub":
+            from adaos.services.registry.subnet_directory import get_directory
+
+            return get_directory().get_node_base_url(node_id)
+        # member: ask hub
+        if not hub_url:
+            return None
+        url = f"{hub_url.rstrip('/')}/api/subnet/nodes/{node_id}"
+        r = await get_hub_http().aget(url, headers={"X-AdaOS-Token": token or "dev-local-token"}, timeout=2.5)
+        if r.status_code != 200:
+            return None
+        data = r.json() or {}
+        node = data.get("node") or {}
+        return node.get("base_url")
+    except Exception:
+        return None
+
+
+__all__ = ["DeliveryPool", "DeliveryStats", "NodeUrlCache"]
@@ -2,10 +2,10 @@ from __future__ import annotations
 
 from pathlib import Path
 from typing import Any, Callable
-import threading
-import time
 import yaml
 
+from adaos.services.file_watch import get_file_watch
+
 
 def load_rules(base_dir: Path, this_node_id: str) -> list[dict[str, Any]]:
     path = Path(base_dir) / "route_rules.yaml"
@@ -52,43 +52,34 @@ def load_rules(base_dir: Path, this_node_id: str) -> list[dict[str, Any]]:
     return items
 
 
-def watch_rules(base_dir: Path, this_node_id: str, on_reload: Callable[[list[dict]], None]) -> Callable[[], None]:
-    """Polls route_rules.yaml for changes with a small debounce and invokes on_reload.
-    Returns a callable which stops the watcher.
-    """
-    path = Path(base_dir) / "route_rules.yaml"
-    stop = threading.Event()
-    lock = threading.Lock()
-    last_mtime: float = 0.0
+def compile_rules(rules: list[dict[str, Any]]) -> dict[str, str | None]:
+    """Index rules by io_type (lower-case) -> target node_id, None meaning "this".
 
-    def _worker():
-        nonlocal last_mtime
-        # Initial preload
+    ``rules`` are expected sorted by priority desc (as returned by load_rules):
+    the first rule for an io_type wins. A target without io_type routes stdout.
+    """
+    table: dict[str, str | None] = {}
+    for r in rules:
         try:
-            rules = load_rules(base_dir, this_node_id)
-            on_reload(rules)
+            target = r.get("target") or {}
+            io_type = str(target.get("io_type") or "stdout").lower()
+            if io_type in table:
+                continue
+            nid = target.get("node_id")
+            table[io_type] = None if (not nid or nid == "this") else str(nid)
         except Exception:
-            pass
-        while not stop.is_set():
-            try:
-                if path.exists():
-                    mtime = path.stat().st_mtime
-                    if mtime > last_mtime:
-                        last_mtime = mtime
-                        # Debounce ~400ms
-                        time.sleep(0.4)
-                        rules = load_rules(base_dir, this_node_id)
-                        on_reload(rules)
-            except Exception:
-                # swallow and continue
-                pass
-            stop.wait(1.0)
+            continue
+    return table
 
-    t = threading.Thread(target=_worker, name="route-rules-watcher", daemon=True)
-    t.start()
 
-    def _stop():
-        stop.set()
-        t.join(timeout=1.0)
+def watch_rules(base_dir: Path, this_node_id: str, on_reload: Callable[[list[dict]], None]) -> Callable[[], None]:
+    """Subscribes to route_rules.yaml via the shared file watch service and invokes
+    on_reload with freshly loaded rules after each (debounced, content-changing) edit.
+    The caller is expected to preload rules itself. Returns a callable which stops watching.
+    """
+    path = Path(base_dir) / "route_rules.yaml"
+
+    def _changed(_: Path) -> None:
+        on_reload(load_rules(base_dir, this_node_id))
 
-    return _stop
+    return get_file_watch().watch(path, _changed, debounce=0.4)
@@ -3,21 +3,29 @@ from __future__ import annotations
 from typing import Any, Callable
 from pathlib import Path
 import asyncio
-import json
-import requests
 import os
 
 from adaos.services.eventbus import LocalEventBus
 import logging
 from adaos.domain import Event
 from adaos.services.agent_context import get_ctx
-from .rules_loader import load_rules, watch_rules
+from adaos.services.hub_http import get_hub_http
+from adaos.services.node_config import current_config
+from .delivery import DeliveryPool, NodeUrlCache
+from .rules_loader import compile_rules, load_rules, watch_rules
 from adaos.services.registry.subnet_directory import get_directory
 from adaos.services.io_console import print_text
 from adaos.sdk.data.env import get_tts_backend
 from adaos.adapters.audio.tts.native_tts import NativeTTS
 from adaos.integrations.rhasspy.tts import RhasspyTTSAdapter
 
+_log = logging.getLogger("adaos.router")
+
+
+def _ok(status_code: int) -> bool:
+    # 4xx are not retried: the request itself is wrong
+    return status_code < 500
+
 
 class RouterService:
     def __init__(self, eventbus: LocalEventBus, base_dir: Path) -> None:
@@ -26,229 +34,206 @@ class RouterService:
         self._started = False
         self._stop_watch: Callable[[], None] | None = None
         self._rules: list[dict[str, Any]] = []
+        # io_type -> node_id (None == this node); rebuilt on every (re)load of the rules
+        self._routes: dict[str, str | None] = {}
         self._subscribed = False
+        self._pool = DeliveryPool()
+        self._urls = NodeUrlCache()
+
+    # ------------------------------------------------------------------
+    # rules
+    # ------------------------------------------------------------------
+    def _set_rules(self, rules: list[dict[str, Any]]) -> None:
+        rules = rules or []
+        # одна ссылка на новый словарь: читатели в колбэке шины не видят промежуточного состояния
+        self._routes = compile_rules(rules)
+        self._rules = rules
 
     def _pick_target_node(self, desired_io: str, this_node: str) -> str:
-        node = this_node
-        for r in self._rules:
-            try:
-                target = r.get("target") or {}
-                if str(target.get("io_type") or "stdout").lower() == desired_io.lower():
-                    nid = target.get("node_id")
-                    if nid == "this" or not nid:
-                        node = this_node
-                    else:
-                        node = str(nid)
-                    break
-            except Exception:
-                continue
-        return node
+        return self._routes.get(desired_io.lower()) or this_node
 
     def _has_rule_for(self, desired_io: str) -> bool:
-        for r in self._rules:
-            try:
-                target = r.get("target") or {}
-                if str(target.get("io_type") or "").lower() == desired_io.lower():
-                    return True
-            except Exception:
-                continue
-        return False
+        return desired_io.lower() in self._routes
 
+    # ------------------------------------------------------------------
+    # ui.notify
+    # ------------------------------------------------------------------
     def _on_event(self, ev: Event) -> None:
         payload = ev.payload or {}
-        text = (payload or {}).get("text")
+        text = payload.get("text")
         if not isinstance(text, str) or not text:
             return
 
-        conf = get_ctx().config
+        conf = current_config()
         this_node = conf.node_id
-        # Multi-target routing: attempt telegram and stdout independently if rules exist
-        did_any = False
-
-        # Telegram route (if configured in rules)
-        if self._has_rule_for("telegram"):
-            target_node_tg = self._pick_target_node("telegram", this_node)
-            try:
-                # Resolve hub_id for target node
-                if target_node_tg == this_node:
-                    hub_id = conf.subnet_id
-                else:
-                    directory = get_directory()
-                    node = directory.get_node(target_node_tg)
-                    hub_id = (node or {}).get("subnet_id")
-                if not hub_id:
-                    raise RuntimeError("hub_id unresolved for telegram routing")
-                # Root API base
-                from adaos.services.agent_context import get_ctx as _get_ctx
+        routes = self._routes
+        source = ev.source
+
+        def _print_local() -> None:
+            print_text(text, node_id=this_node, origin={"source": source})
+
+        if "stdout" in routes:
+            target = routes["stdout"] or this_node
+            if target == this_node:
+                _print_local()
+            elif not self._pool.submit(f"node:{target}", lambda: self._send_stdout(target, text, source), fallback=_print_local, label="stdout"):
+                _print_local()
+
+        if "telegram" in routes:
+            target = routes["telegram"] or this_node
+            # без stdout-маршрута провал telegram печатаем локально, как раньше
+            fallback = None if "stdout" in routes else _print_local
+            # POST /io/tg/send не идемпотентен — повтор после таймаута/5xx дублирует сообщение
+            if not self._pool.submit("telegram", lambda: self._send_telegram(target, text), fallback=fallback, label="telegram", retries=0):
+                if fallback:
+                    fallback()
+
+        if "stdout" not in routes and "telegram" not in routes:
+            _print_local()
+
+    async def _send_telegram(self, target_node: str, text: str) -> bool:
+        conf = current_config()
+        # Resolve hub_id for target node
+        if target_node == conf.node_id:
+            hub_id = conf.subnet_id
+        else:
+            node = get_directory().get_node(target_node)
+            hub_id = (node or {}).get("subnet_id")
+        if not hub_id:
+            _log.warning("router: hub_id unresolved for telegram routing")
+            return False
+        api_base = getattr(get_ctx().settings, "api_base", "https://api.inimatic.com")
+        url = f"{api_base.rstrip('/')}/io/tg/send"
+        # Prefix message with subnet alias (or id) for clarity
+        try:
+            from adaos.services.capacity import _load_node_yaml as _load_node
 
-                api_base = getattr(_get_ctx().settings, "api_base", "https://api.inimatic.com")
-                url = f"{api_base.rstrip('/')}/io/tg/send"
-                # Prefix message with subnet alias (or id) for clarity
-                try:
-                    from adaos.services.capacity import _load_node_yaml as _load_node
+            node_yaml = _load_node()
+        except Exception:
+            node_yaml = {}
+        try:
+            alias = ((node_yaml.get("nats") or {}).get("alias")) or os.getenv("DEFAULT_HUB") or conf.subnet_id
+        except Exception:
+            alias = conf.subnet_id
+        prefixed_text = f"[{alias}]: {text}" if alias else text
+        r = await get_hub_http().apost_json(url, {"hub_id": hub_id, "text": prefixed_text}, timeout=3.0)
+        _log.info("router: telegram sent", extra={"hub_id": hub_id, "status": r.status_code})
+        return _ok(r.status_code)
+
+    async def _send_stdout(self, target_node: str, text: str, source: str) -> bool:
+        conf = current_config()
+        base_url = await self._urls.resolve(target_node, conf.role, conf.hub_url, conf.token)
+        if not base_url and conf.role == "hub":
+            base_url = await self._stdout_candidate(conf)
+        if not base_url:
+            _log.warning(f"router: stdout target {target_node} offline/unresolved; fallback to local print")
+            print_text(text, node_id=conf.node_id, origin={"source": source})
+            return True
+        r = await get_hub_http().apost_json(
+            f"{base_url.rstrip('/')}/api/io/console/print",
+            {"text": text, "origin": {"source": source, "from": conf.node_id}},
+            headers={"X-AdaOS-Token": conf.token or "dev-local-token"},
+            timeout=2.5,
+        )
+        if not _ok(r.status_code):
+            # адрес мог устареть — при повторе спросим заново
+            self._urls.clear()
+        return _ok(r.status_code)
+
+    async def _stdout_candidate(self, conf) -> str | None:
+        try:
+            directory = get_directory()
+            candidates = []
+            for n in directory.list_known_nodes():
+                if not n.get("online"):
+                    continue
+                for io in (n.get("capacity") or {}).get("io", []):
+                    if io.get("io_type") == "stdout":
+                        candidates.append((int(io.get("priority") or 50), n))
+                        break
+            candidates.sort(key=lambda x: x[0], reverse=True)
+            for _, cand in candidates:
+                nid = cand.get("node_id")
+                if not nid:
+                    continue
+                base_url = await self._urls.resolve(str(nid), conf.role, conf.hub_url, conf.token)
+                if base_url:
+                    return base_url
+        except Exception:
+            return None
+        return None
 
-                    node_yaml = _load_node()
-                except Exception:
-                    node_yaml = {}
-                try:
-                    alias = ((node_yaml.get("nats") or {}).get("alias")) or os.getenv("DEFAULT_HUB") or conf.subnet_id
-                except Exception:
-                    alias = conf.subnet_id
-                prefixed_text = f"[{alias}]: {text}" if alias else text
-                body = {"hub_id": hub_id, "text": prefixed_text}
-                try:
-                    r = requests.post(url, json=body, headers={"Content-Type": "application/json"}, timeout=3.0)
-                    logging.getLogger("adaos.router").info("router: telegram sent", extra={"hub_id": hub_id, "status": r.status_code})
-                except Exception as pe:
-                    logging.getLogger("adaos.router").warning("router: telegram request failed", extra={"hub_id": hub_id, "error": str(pe)})
-                    raise
-                did_any = True
-            except Exception:
-                # swallow to allow stdout route below
+    # ------------------------------------------------------------------
+    # ui.say
+    # ------------------------------------------------------------------
+    def _on_say(self, ev: Event) -> None:
+        payload = ev.payload or {}
+        text = payload.get("text")
+        if not isinstance(text, str) or not text:
+            return
+        voice = payload.get("voice")
+        this_node = current_config().node_id
+        target_node = self._pick_target_node("say", this_node)
+        source = ev.source
+        if not self._pool.submit(f"say:{target_node}", lambda: self._send_say(target_node, text, voice, source), label="say"):
+            self._say_local(text, this_node, source)
+
+    async def _send_say(self, target_node: str, text: str, voice: Any, source: str) -> bool:
+        conf = current_config()
+        token = conf.token or "dev-local-token"
+        http = get_hub_http()
+        if target_node != conf.node_id:
+            base_url = await self._urls.resolve(target_node, conf.role, conf.hub_url, conf.token)
+            if base_url:
                 try:
-                    logging.getLogger("adaos.router").warning("router: telegram route failed; will continue with other routes")
+                    r = await http.apost_json(f"{base_url.rstrip('/')}/api/say", {"text": text, "voice": voice}, headers={"X-AdaOS-Token": token}, timeout=3.0)
+                    if _ok(r.status_code):
+                        return True
                 except Exception:
                     pass
+        # local fallback via API if self base_url known, else direct adapter
+        self_url = os.environ.get("ADAOS_SELF_BASE_URL")
+        if self_url:
+            try:
+                r = await http.apost_json(f"{self_url.rstrip('/')}/api/say", {"text": text, "voice": voice}, headers={"X-AdaOS-Token": token}, timeout=3.0)
+                if _ok(r.status_code):
+                    return True
+            except Exception:
+                pass
+        await asyncio.to_thread(self._say_local, text, conf.node_id, source)
+        return True
 
-        # Stdout route (if configured in rules)
-        if self._has_rule_for("stdout"):
-            target_node_out = self._pick_target_node("stdout", this_node)
-            if target_node_out == this_node:
-                print_text(text, node_id=this_node, origin={"source": ev.source})
-                did_any = True
-            else:
-                # Cross-node delivery: resolve base_url and POST
-                base_url = self._resolve_node_base_url(target_node_out, conf.role, conf.hub_url)
-                if not base_url and conf.role == "hub":
-                    try:
-                        directory = get_directory()
-                        candidates = []
-                        for n in directory.list_known_nodes():
-                            if not n.get("online"):
-                                continue
-                            for io in (n.get("capacity") or {}).get("io", []):
-                                if io.get("io_type") == "stdout":
-                                    candidates.append((int(io.get("priority") or 50), n))
-                                    break
-                        candidates.sort(key=lambda x: x[0], reverse=True)
-                        for _, cand in candidates:
-                            nid = cand.get("node_id")
-                            if not nid:
-                                continue
-                            base_url = self._resolve_node_base_url(str(nid), conf.role, conf.hub_url)
-                            if base_url:
-                                break
-                    except Exception:
-                        base_url = None
-
-                if base_url:
-                    url = f"{base_url.rstrip('/')}/api/io/console/print"
-                    headers = {"X-AdaOS-Token": conf.token or "dev-local-token", "Content-Type": "application/json"}
-                    body = {"text": text, "origin": {"source": ev.source, "from": this_node}}
-                    try:
-                        requests.post(url, json=body, headers=headers, timeout=2.5)
-                        did_any = True
-                    except Exception:
-                        pass
-                else:
-                    try:
-                        logging.getLogger("adaos.router").warning(f"router: stdout target {target_node_out} offline/unresolved; fallback to local print")
-                    except Exception:
-                        pass
-                    print_text(text, node_id=this_node, origin={"source": ev.source})
-                    did_any = True
-
-        # If no route matched or everything failed, fallback to local stdout
-        if not did_any:
-            print_text(text, node_id=this_node, origin={"source": ev.source})
-
-    def _resolve_node_base_url(self, node_id: str, role: str, hub_url: str | None) -> str | None:
+    @staticmethod
+    def _say_local(text: str, this_node: str, source: str) -> None:
         try:
-            if role == "hub":
-                directory = get_directory()
-                if not directory.is_online(node_id):
-                    return None
-                return directory.get_node_base_url(node_id)
-            # member: ask hub
-            if not hub_url:
-                return None
-            url = f"{hub_url.rstrip('/')}/api/subnet/nodes/{node_id}"
-            token = load_config().token or "dev-local-token"
-            r = requests.get(url, headers={"X-AdaOS-Token": token}, timeout=2.5)
-            if r.status_code != 200:
-                return None
-            data = r.json() or {}
-            node = data.get("node") or {}
-            return node.get("base_url")
+            mode = get_tts_backend()
+            adapter = NativeTTS() if mode == "native" else RhasspyTTSAdapter()
+            adapter.say(text)
         except Exception:
-            return None
+            print_text(text, node_id=this_node, origin={"source": source})
 
+    # ------------------------------------------------------------------
+    # lifecycle
+    # ------------------------------------------------------------------
     async def start(self) -> None:
         if self._started:
             return
         self._started = True
-        # Subscribe to ui.notify on local event bus
+        self._pool.bind(asyncio.get_running_loop())
+        # Subscribe to ui.notify / ui.say on local event bus
         if not self._subscribed:
             self.bus.subscribe("ui.notify", self._on_event)
-
-            # ui.say routing (TTS)
-            def _on_say(ev: Event) -> None:
-                payload = ev.payload or {}
-                text = (payload or {}).get("text")
-                if not isinstance(text, str) or not text:
-                    return
-                voice = (payload or {}).get("voice")
-                conf = load_config()
-                this_node = conf.node_id
-                target_node = self._pick_target_node("say", this_node)
-                base_url = self._resolve_node_base_url(target_node, conf.role, conf.hub_url)
-                token = conf.token or "dev-local-token"
-                if base_url and target_node != this_node:
-                    try:
-                        requests.post(
-                            f"{base_url.rstrip('/')}/api/say",
-                            json={"text": text, "voice": voice},
-                            headers={"X-AdaOS-Token": token, "Content-Type": "application/json"},
-                            timeout=3.0,
-                        )
-                        return
-                    except Exception:
-                        pass
-                # local fallback via API if self base_url known, else direct adapter
-                self_url = os.environ.get("ADAOS_SELF_BASE_URL")
-                if self_url:
-                    try:
-                        requests.post(
-                            f"{self_url.rstrip('/')}/api/say",
-                            json={"text": text, "voice": voice},
-                            headers={"X-AdaOS-Token": token, "Content-Type": "application/json"},
-                            timeout=3.0,
-                        )
-                        return
-                    except Exception:
-                        pass
-                try:
-                    mode = get_tts_backend()
-                    adapter = NativeTTS() if mode == "native" else RhasspyTTSAdapter()
-                    adapter.say(text)
-                except Exception:
-                    print_text(text, node_id=this_node, origin={"source": ev.source})
-
-            self.bus.subscribe("ui.say", _on_say)
+            self.bus.subscribe("ui.say", self._on_say)
             self._subscribed = True
 
-        # Watch rules file
-        def _reload(rules: list[dict]):
-            self._rules = rules or []
-
         # Preload rules and start watcher
         try:
             node_id = get_ctx().config.node_id
         except Exception:
             # fallback: do not crash router if config is not ready yet
             node_id = ""
-        self._rules = load_rules(self.base_dir, node_id)
-        self._stop_watch = watch_rules(self.base_dir, node_id, _reload)
+        self._set_rules(load_rules(self.base_dir, node_id))
+        self._stop_watch = watch_rules(self.base_dir, node_id, self._set_rules)
 
     async def stop(self) -> None:
         if self._stop_watch:
@@ -257,4 +242,7 @@ class RouterService:
             except Exception:
                 pass
             self._stop_watch = None
+        await self._pool.drain(timeout=2.0)
+        await self._pool.close()
+        self._urls.clear()
         self._started = False
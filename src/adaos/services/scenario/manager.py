@@ -228,25 +228,10 @@ class ScenarioManager:
             bus=self.bus,
             caps=self.ctx.caps,
         )
-        for dep in depends:
-            if not isinstance(dep, str) or not dep:
-                continue
-            try:
-                # Ensure installed in monorepo and then activate runtime.
-                skill_mgr.install(dep)
-                version = None
-                slot = None
-                try:
-                    runtime = skill_mgr.prepare_runtime(dep, run_tests=False)
-                except Exception:
-                    runtime = None
-                if runtime:
-                    version = getattr(runtime, "version", None)
-                    slot = getattr(runtime, "slot", None)
-                skill_mgr.activate_for_space(dep, version=version, slot=slot, space="default", webspace_id=target_webspace)
-            except Exception:
-                # Do not break scenario install on individual dependency issues.
-                continue
+        names = [dep for dep in depends if isinstance(dep, str) and dep]
+        # One fetch for all skills, parallel prepare; per-skill failures are
+        # reported in the result and on the bus, not raised.
+        skill_mgr.install_batch(names, space="default", webspace_id=target_webspace)
 
     def remove(self, name: str) -> None:
         self.caps.require("core", "scenarios.manage", "net.git")
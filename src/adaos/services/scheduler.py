@@ -1,108 +1,454 @@
 from __future__ import annotations
 
 import asyncio
+import heapq
+import itertools
+import json
 import logging
+import random
 import time
 from dataclasses import dataclass, field
-from typing import Any, Dict
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Dict, List, Optional
 
 from adaos.sdk.data.bus import emit as bus_emit
 
 _log = logging.getLogger("adaos.scheduler")
 
+MISFIRE_POLICIES = ("skip", "once")
+
+
+class CronSchedule:
+    """
+    Classic 5-field cron expression (minute hour day-of-month month day-of-week)
+    in local time. Supports ``*``, ``a-b``, ``*/n``, ``a-b/n``, lists and the
+    ``@hourly``/``@daily``/``@weekly``/``@monthly``/``@yearly`` aliases.
+    Day-of-week is 0-6 with 0 (or 7) meaning Sunday; when both day fields are
+    restricted a day matches if either of them does, as in cron.
+    """
+
+    _ALIASES = {
+        "@hourly": "0 * * * *",
+        "@daily": "0 0 * * *",
+        "@midnight": "0 0 * * *",
+        "@weekly": "0 0 * * 0",
+        "@monthly": "0 0 1 * *",
+        "@yearly": "0 0 1 1 *",
+        "@annually": "0 0 1 1 *",
+    }
+    _BOUNDS = ((0, 59), (0, 23), (1, 31), (1, 12), (0, 7))
+
+    def __init__(self, expr: str) -> None:
+        self.expr = expr.strip()
+        fields = self._ALIASES.get(self.expr, self.expr).split()
+        if len(fields) != 5:
+            raise ValueError(f"cron expression must have 5 fields: {expr!r}")
+        parsed = [self._parse(f, lo, hi) for f, (lo, hi) in zip(fields, self._BOUNDS)]
+        self.minutes, self.hours, self.days, self.months, dows = parsed
+        self.dows = {d % 7 for d in dows}
+        self._any_day = fields[2] == "*"
+        self._any_dow = fields[4] == "*"
+
+    @staticmethod
+    def _parse(spec: str, lo: int, hi: int) -> frozenset[int]:
+        values: set[int] = set()
+        for part in spec.split(","):
+            rng, _, step_s = part.partition("/")
+            step = int(step_s) if step_s else 1
+            if rng == "*":
+                start, end = lo, hi
+            elif "-" in rng:
+                a, b = rng.split("-", 1)
+                start, end = int(a), int(b)
+            else:
+                start = int(rng)
+                end = hi if step_s else start
+            if step < 1 or start < lo or end > hi or start > end:
+                raise ValueError(f"invalid cron field {spec!r}")
+            values.update(range(start, end + 1, step))
+        return frozenset(values)
+
+    def _day_matches(self, dt: datetime) -> bool:
+        dom = dt.day in self.days
+        dow = (dt.weekday() + 1) % 7 in self.dows
+        if self._any_day:
+            return dow
+        if self._any_dow:
+            return dom
+        return dom or dow
+
+    def next_after(self, ts: float) -> float:
+        dt = datetime.fromtimestamp(ts).replace(second=0, microsecond=0) + timedelta(minutes=1)
+        limit = dt + timedelta(days=366 * 5)
+        while dt < limit:
+            if dt.month not in self.months:
+                dt = (dt.replace(day=1, hour=0, minute=0) + timedelta(days=32)).replace(day=1)
+                continue
+            if not self._day_matches(dt):
+                dt = dt.replace(hour=0, minute=0) + timedelta(days=1)
+                continue
+            if dt.hour not in self.hours:
+                dt = dt.replace(minute=0) + timedelta(hours=1)
+                continue
+            if dt.minute not in self.minutes:
+                dt += timedelta(minutes=1)
+                continue
+            return dt.timestamp()
+        raise ValueError(f"cron expression never fires: {self.expr!r}")
+
 
 @dataclass
 class Job:
     name: str
     topic: str
-    interval: float
+    interval: float | None = None
     payload: dict = field(default_factory=dict)
     enabled: bool = True
     next_run: float = field(default_factory=lambda: time.time())
+    cron: str | None = None
+    jitter: float = 0.0
+    max_concurrency: int = 1
+    misfire: str | None = None
+    last_run: float | None = None
+    # runtime-only state
+    handler: Callable[[dict], Awaitable[Any]] | None = field(default=None, repr=False, compare=False)
+    running: int = field(default=0, repr=False, compare=False)
+    skipped: int = field(default=0, repr=False, compare=False)
+    _gen: int = field(default=0, repr=False, compare=False)
+    _cron: CronSchedule | None = field(default=None, repr=False, compare=False)
+
+    def schedule_after(self, ts: float) -> float:
+        if self.cron:
+            if self._cron is None or self._cron.expr != self.cron:
+                self._cron = CronSchedule(self.cron)
+            base = self._cron.next_after(ts)
+        else:
+            base = ts + float(self.interval or 0.0)
+        if self.jitter > 0:
+            base += random.uniform(0.0, self.jitter)
+        return base
+
+
+class SqliteJobStore:
+    """Persists job definitions and their next/last run times in ``scheduler_jobs``."""
+
+    def __init__(self, sql: Any) -> None:
+        self.sql = sql
+        with sql.connect() as con:
+            con.execute(
+                """
+                CREATE TABLE IF NOT EXISTS scheduler_jobs(
+                    name TEXT PRIMARY KEY,
+                    topic TEXT NOT NULL,
+                    interval REAL,
+                    cron TEXT,
+                    payload TEXT NOT NULL DEFAULT '{}',
+                    enabled INTEGER NOT NULL DEFAULT 1,
+                    jitter REAL NOT NULL DEFAULT 0,
+                    max_concurrency INTEGER NOT NULL DEFAULT 1,
+                    misfire TEXT,
+                    next_run REAL NOT NULL,
+                    last_run REAL
+                )
+                """
+            )
+
+    def load(self) -> List[Job]:
+        with self.sql.read() as con:
+            rows = con.execute(
+                "SELECT name, topic, interval, cron, payload, enabled, jitter, max_concurrency, misfire, next_run, last_run FROM scheduler_jobs"
+            ).fetchall()
+        jobs: List[Job] = []
+        for row in rows:
+            try:
+                payload = json.loads(row[4] or "{}")
+            except ValueError:
+                payload = {}
+            jobs.append(
+                Job(
+                    name=row[0],
+                    topic=row[1],
+                    interval=row[2],
+                    cron=row[3],
+                    payload=payload if isinstance(payload, dict) else {},
+                    enabled=bool(row[5]),
+                    jitter=float(row[6] or 0.0),
+                    max_concurrency=int(row[7] or 1),
+                    misfire=row[8],
+                    next_run=float(row[9]),
+                    last_run=row[10],
+                )
+            )
+        return jobs
+
+    def save(self, job: Job) -> None:
+        with self.sql.connect() as con:
+            con.execute(
+                """
+                INSERT INTO scheduler_jobs(name, topic, interval, cron, payload, enabled, jitter, max_concurrency, misfire, next_run, last_run)
+                VALUES(?,?,?,?,?,?,?,?,?,?,?)
+                ON CONFLICT(name) DO UPDATE SET
+                    topic=excluded.topic, interval=excluded.interval, cron=excluded.cron,
+                    payload=excluded.payload, enabled=excluded.enabled, jitter=excluded.jitter,
+                    max_concurrency=excluded.max_concurrency, misfire=excluded.misfire,
+                    next_run=excluded.next_run, last_run=excluded.last_run
+                """,
+                (
+                    job.name,
+                    job.topic,
+                    job.interval,
+                    job.cron,
+                    json.dumps(job.payload, ensure_ascii=False),
+                    int(job.enabled),
+                    job.jitter,
+                    job.max_concurrency,
+                    job.misfire,
+                    job.next_run,
+                    job.last_run,
+                ),
+            )
+
+    def mark_run(self, job: Job) -> None:
+        with self.sql.connect() as con:
+            con.execute(
+                "UPDATE scheduler_jobs SET next_run=?, last_run=? WHERE name=?",
+                (job.next_run, job.last_run, job.name),
+            )
+
+    def delete(self, name: str) -> None:
+        with self.sql.connect() as con:
+            con.execute("DELETE FROM scheduler_jobs WHERE name=?", (name,))
 
 
 class Scheduler:
     """
-    Minimal in-process scheduler:
-      * jobs are kept in-memory only (MVP);
-      * on each tick, emits an event to the core bus instead of calling code.
+    In-process scheduler that emits events to the core bus instead of calling code.
 
     This keeps the execution model uniform with skills: everything reacts to
     events such as `sys.ystore.backup` rather than being invoked directly.
+
+    Jobs sit in a min-heap keyed by ``next_run``; the loop sleeps until the
+    earliest one or until an ``asyncio.Event`` signals that jobs changed.
+    A job runs every ``interval`` seconds or on a ``cron`` expression, with an
+    optional random ``jitter`` added to each run, and at most
+    ``max_concurrency`` runs in flight (a topic-only run ends once the event is
+    published; jobs with an in-process ``handler`` are awaited). With a job
+    store, definitions survive restarts; runs missed while the node was down
+    are either dropped (``skip``) or collapsed into one immediate run (``once``).
     """
 
-    def __init__(self) -> None:
+    def __init__(self, *, store: SqliteJobStore | None = None, misfire: str = "skip") -> None:
+        if misfire not in MISFIRE_POLICIES:
+            raise ValueError(f"unknown misfire policy {misfire!r}")
         self._jobs: Dict[str, Job] = {}
-        self._lock = asyncio.Lock()
+        self._heap: List[tuple[float, int, str, int]] = []
+        self._seq = itertools.count()
+        self._store = store
+        self._loaded = False
+        self.misfire = misfire
+        self._wake = asyncio.Event()
         self._task: asyncio.Task | None = None
+        self._inflight: set[asyncio.Task] = set()
         self._stopped = asyncio.Event()
         self._stopped.set()
 
+    # ------------------------------------------------------------------ lifecycle
     async def start(self) -> None:
         if self._task and not self._task.done():
             return
+        self.load()
         self._stopped.clear()
         self._task = asyncio.create_task(self._run(), name="adaos-scheduler")
-        _log.info("scheduler started")
+        _log.info("scheduler started jobs=%d", len(self._jobs))
 
     async def stop(self) -> None:
         self._stopped.set()
+        self._wake.set()
         if self._task and not self._task.done():
             self._task.cancel()
 
-    async def ensure_every(self, name: str, interval: float, topic: str, payload: dict | None = None) -> Job:
+    def attach_store(self, store: SqliteJobStore | None, *, misfire: str | None = None) -> None:
+        if misfire is not None:
+            if misfire not in MISFIRE_POLICIES:
+                raise ValueError(f"unknown misfire policy {misfire!r}")
+            self.misfire = misfire
+        self._store = store
+        self._loaded = False
+
+    def load(self) -> None:
+        """Pull persisted jobs from the store, applying the misfire policy."""
+        if self._loaded or self._store is None:
+            return
+        self._loaded = True
+        try:
+            persisted = self._store.load()
+        except Exception:
+            _log.warning("failed to load scheduler jobs", exc_info=True)
+            return
+        now = time.time()
+        known = {job.name for job in persisted}
+        for job in list(self._jobs.values()):
+            if job.name not in known:
+                # задания, заведённые до подключения хранилища
+                self._save(job)
+        for job in persisted:
+            current = self._jobs.get(job.name)
+            if current is not None:
+                # задание заведено до подключения хранилища: сохранённые времена запусков не теряем
+                current.last_run = job.last_run
+                if current.misfire is None:
+                    current.misfire = job.misfire
+                if (current.interval, current.cron) == (job.interval, job.cron):
+                    current.next_run = job.next_run
+                    self._apply_misfire(current, now)
+                self._save(current)
+                self._push(current)
+                continue
+            self._apply_misfire(job, now)
+            self._jobs[job.name] = job
+            self._push(job)
+
+    def _apply_misfire(self, job: Job, now: float) -> None:
+        if job.next_run >= now:
+            return
+        policy = job.misfire or self.misfire
+        job.next_run = now if policy == "once" else job.schedule_after(now)
+        _log.info("scheduler job missed name=%s policy=%s", job.name, policy)
+
+    # ------------------------------------------------------------------ jobs
+    async def ensure_every(
+        self,
+        name: str,
+        interval: float,
+        topic: str,
+        payload: dict | None = None,
+        *,
+        jitter: float = 0.0,
+        max_concurrency: int = 1,
+        misfire: str | None = None,
+        handler: Callable[[dict], Awaitable[Any]] | None = None,
+    ) -> Job:
         """
         Create or update a simple \"every N seconds\" job.
         """
-        interval = float(interval)
+        return self._ensure(
+            name,
+            topic,
+            payload,
+            interval=float(interval),
+            cron=None,
+            jitter=jitter,
+            max_concurrency=max_concurrency,
+            misfire=misfire,
+            handler=handler,
+        )
+
+    async def ensure_cron(
+        self,
+        name: str,
+        cron: str,
+        topic: str,
+        payload: dict | None = None,
+        *,
+        jitter: float = 0.0,
+        max_concurrency: int = 1,
+        misfire: str | None = None,
+        handler: Callable[[dict], Awaitable[Any]] | None = None,
+    ) -> Job:
+        """
+        Create or update a job driven by a cron expression (see :class:`CronSchedule`).
+        """
+        CronSchedule(cron)  # validate early
+        return self._ensure(
+            name,
+            topic,
+            payload,
+            interval=None,
+            cron=cron,
+            jitter=jitter,
+            max_concurrency=max_concurrency,
+            misfire=misfire,
+            handler=handler,
+        )
+
+    def _ensure(self, name: str, topic: str, payload: dict | None, **spec: Any) -> Job:
+        if spec["misfire"] is not None and spec["misfire"] not in MISFIRE_POLICIES:
+            raise ValueError(f"unknown misfire policy {spec['misfire']!r}")
+        self.load()
         now = time.time()
-        async with self._lock:
-            job = self._jobs.get(name)
-            if job is None:
-                job = Job(
-                    name=name,
-                    topic=topic,
-                    interval=interval,
-                    payload=dict(payload or {}),
-                    next_run=now + interval,
-                )
-                self._jobs[name] = job
-                _log.info("scheduler job created name=%s topic=%s interval=%ss", name, topic, interval)
-            else:
-                job.topic = topic
-                job.interval = interval
-                job.payload = dict(payload or {})
-                if job.next_run < now:
-                    job.next_run = now + interval
-                _log.info("scheduler job updated name=%s topic=%s interval=%ss", name, topic, interval)
-            return job
+        job = self._jobs.get(name)
+        if job is None:
+            job = Job(name=name, topic=topic, payload=dict(payload or {}), **spec)
+            job.max_concurrency = max(1, int(job.max_concurrency))
+            job.next_run = job.schedule_after(now)
+            self._jobs[name] = job
+            _log.info("scheduler job created name=%s topic=%s interval=%s cron=%s", name, topic, job.interval, job.cron)
+        else:
+            # просроченный next_run не повод переносить: это может быть ожидающий догоняющий запуск (misfire=once)
+            reschedule = (job.interval, job.cron, job.jitter) != (spec["interval"], spec["cron"], spec["jitter"]) or not job.enabled
+            job.topic = topic
+            job.payload = dict(payload or {})
+            for key, value in spec.items():
+                setattr(job, key, value)
+            job.max_concurrency = max(1, int(job.max_concurrency))
+            job.enabled = True
+            if reschedule:
+                job.next_run = job.schedule_after(now)
+            _log.debug("scheduler job updated name=%s topic=%s interval=%s cron=%s", name, topic, job.interval, job.cron)
+        self._save(job)
+        self._push(job)
+        return job
 
     async def delete(self, name: str) -> None:
-        async with self._lock:
-            if self._jobs.pop(name, None) is not None:
-                _log.info("scheduler job deleted name=%s", name)
+        if self._jobs.pop(name, None) is not None:
+            _log.info("scheduler job deleted name=%s", name)
+        if self._store is not None:
+            try:
+                self._store.delete(name)
+            except Exception:
+                _log.warning("failed to delete persisted job name=%s", name, exc_info=True)
+        self._wake.set()
+
+    def get(self, name: str) -> Optional[Job]:
+        return self._jobs.get(name)
+
+    def jobs(self) -> List[Job]:
+        return sorted(self._jobs.values(), key=lambda j: j.next_run)
+
+    # ------------------------------------------------------------------ loop
+    def _push(self, job: Job) -> None:
+        # старые записи кучи с прежним поколением просто отбрасываются при извлечении
+        job._gen += 1
+        heapq.heappush(self._heap, (job.next_run, next(self._seq), job.name, job._gen))
+        self._wake.set()
+
+    def _save(self, job: Job, *, run_only: bool = False) -> None:
+        if self._store is None:
+            return
+        try:
+            if run_only:
+                self._store.mark_run(job)
+            else:
+                self._store.save(job)
+        except Exception:
+            _log.warning("failed to persist scheduler job name=%s", job.name, exc_info=True)
 
     async def _run(self) -> None:
         try:
             while not self._stopped.is_set():
-                async with self._lock:
-                    jobs = [j for j in self._jobs.values() if j.enabled]
-
-                if not jobs:
-                    await asyncio.sleep(0.5)
-                    continue
-
+                self._wake.clear()
                 now = time.time()
-                due = [j for j in jobs if j.next_run <= now]
-                if not due:
-                    sleep_for = max(0.1, min(j.next_run for j in jobs) - now)
-                    await asyncio.sleep(sleep_for)
-                    continue
-
-                for job in due:
-                    job.next_run = now + job.interval
-                    asyncio.create_task(self._fire(job), name=f"adaos-scheduler-job-{job.name}")
-                await asyncio.sleep(0)  # yield control
+                while self._heap and self._heap[0][0] <= now:
+                    _, _, name, gen = heapq.heappop(self._heap)
+                    job = self._jobs.get(name)
+                    if job is None or job._gen != gen or not job.enabled:
+                        continue
+                    self._dispatch(job, now)
+                timeout = self._heap[0][0] - now if self._heap else None
+                try:
+                    await asyncio.wait_for(self._wake.wait(), timeout)
+                except asyncio.TimeoutError:
+                    pass
         except asyncio.CancelledError:  # pragma: no cover - controlled shutdown
             pass
         except Exception:  # pragma: no cover - defensive logging
@@ -110,11 +456,30 @@ class Scheduler:
         finally:
             _log.info("scheduler stopped")
 
+    def _dispatch(self, job: Job, now: float) -> None:
+        job.next_run = job.schedule_after(now)
+        if job.running >= job.max_concurrency:
+            job.skipped += 1
+            _log.debug("scheduler job still running, tick skipped name=%s running=%d", job.name, job.running)
+        else:
+            job.running += 1
+            job.last_run = now
+            task = asyncio.create_task(self._fire(job), name=f"adaos-scheduler-job-{job.name}")
+            self._inflight.add(task)
+            task.add_done_callback(self._inflight.discard)
+        self._save(job, run_only=True)
+        self._push(job)
+
     async def _fire(self, job: Job) -> None:
         try:
-            await bus_emit(job.topic, job.payload, source="scheduler", job_name=job.name)
+            if job.handler is not None:
+                await job.handler(dict(job.payload))
+            else:
+                await bus_emit(job.topic, job.payload, source="scheduler", job_name=job.name)
         except Exception:  # pragma: no cover - defensive logging
             _log.warning("scheduler job failed name=%s topic=%s", job.name, job.topic, exc_info=True)
+        finally:
+            job.running -= 1
 
 
 _SCHEDULER: Scheduler | None = None
@@ -130,6 +495,16 @@ def get_scheduler() -> Scheduler:
 async def start_scheduler() -> None:
     """
     Public entrypoint used from bootstrap to start the background loop.
+
+    Jobs are persisted in the node SQLite database when the agent context is
+    available; the restart policy comes from ``Settings.scheduler_misfire``.
     """
-    await get_scheduler().start()
+    sched = get_scheduler()
+    try:
+        from adaos.services.agent_context import get_ctx
 
+        ctx = get_ctx()
+        sched.attach_store(SqliteJobStore(ctx.sql), misfire=getattr(ctx.settings, "scheduler_misfire", None) or "skip")
+    except Exception:
+        _log.warning("scheduler persistence unavailable, jobs stay in memory", exc_info=True)
+    await sched.start()
@@ -61,6 +61,18 @@ class Settings:
     route_rules_path: Optional[str] = None
     default_hub: Optional[str] = None
 
+    # LocalEventBus: очередь для корутинных подписчиков (None — прежний режим)
+    bus_overflow: Optional[str] = None
+    bus_queue_size: int = 1000
+    bus_workers: int = 1
+
+    # SQLiteKV: размер LRU-кэша чтений и интервал write-behind в секундах (None — запись сразу)
+    kv_cache_size: int = 1024
+    kv_write_behind: Optional[float] = None
+
+    # Scheduler: что делать с пропущенными за время простоя запусками ("skip" | "once")
+    scheduler_misfire: str = "skip"
+
     @staticmethod
     def from_sources(env_file: Optional[str] = ".env") -> "Settings":
         # Optional runtime guard: disallow ad-hoc calls outside composition roots when ADAOS_STRICT_CTX=1
@@ -183,6 +195,12 @@ class Settings:
             files_tmp_dir=pick_env("FILES_TMP_DIR", str(base / "tmp")),
             route_rules_path=pick_env("ROUTE_RULES_PATH", None) or None,
             default_hub=pick_env("DEFAULT_HUB", None) or None,
+            bus_overflow=pick_env("ADAOS_BUS_OVERFLOW", None) or None,
+            bus_queue_size=int(pick_env("ADAOS_BUS_QUEUE_SIZE", "1000") or 1000),
+            bus_workers=int(pick_env("ADAOS_BUS_WORKERS", "1") or 1),
+            kv_cache_size=int(pick_env("ADAOS_KV_CACHE_SIZE", "1024") or 0),
+            kv_write_behind=float(pick_env("ADAOS_KV_WRITE_BEHIND", "0") or 0) or None,
+            scheduler_misfire=(pick_env("ADAOS_SCHEDULER_MISFIRE", "skip") or "skip").strip().lower(),
         )
 
     def with_overrides(self, **kw) -> "Settings":
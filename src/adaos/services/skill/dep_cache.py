@@ -0,0 +1,314 @@
+"""Shared, hash-addressed Python dependency environments for skill slots.
+
+A skill's dependency set (``requirements.in`` + manifest dependencies +
+constraints + interpreter tag) is reduced to a lock hash. Each hash maps to
+one vendor directory under ``skills/.runtime/.deps/<hash>`` that every slot
+with the same inputs reuses: the slot only gets a ``.pth`` pointer and the
+directory on its ``python_paths``, so redeploying a skill with unchanged
+dependencies does not invoke pip at all.
+
+Wheels are collected in a local wheelhouse (``.runtime/.deps/wheelhouse`` or
+``ADAOS_WHEELHOUSE``). Installs are attempted offline from the wheelhouse
+first and only then fall back to the index, so a pre-seeded wheelhouse is
+enough for air-gapped reinstalls.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import shutil
+import subprocess
+import sys
+import sysconfig
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Optional, Sequence
+
+__all__ = [
+    "DependencyCache",
+    "DependencyInstallError",
+    "dependency_cache_for",
+    "is_dependency_env",
+    "vendor_paths",
+    "DEPS_POINTER_NAME",
+]
+
+_LOG = logging.getLogger("adaos.skill.deps")
+
+DEPS_POINTER_NAME = "adaos-deps.pth"
+_MARKER_NAME = ".adaos-env.json"
+_PRUNE_GRACE_SEC = 3600.0
+
+Runner = Callable[[Sequence[str]], "tuple[bool, str]"]
+
+
+class DependencyInstallError(RuntimeError):
+    """Raised when no installer strategy could build a dependency environment."""
+
+
+def _run(cmd: Sequence[str]) -> tuple[bool, str]:
+    try:
+        proc = subprocess.run(list(cmd), capture_output=True, text=True)
+    except FileNotFoundError as exc:
+        return False, str(exc)
+    out = (proc.stdout or "") + ("\n" + proc.stderr if proc.stderr else "")
+    return proc.returncode == 0, out
+
+
+def _no_pip(output: str) -> bool:
+    return "No module named pip" in output.replace("\r", "\n")
+
+
+class DependencyCache:
+    """Builds and reuses one vendor directory per dependency lock hash."""
+
+    def __init__(self, root: Path, *, wheelhouse: Optional[Path] = None, runner: Optional[Runner] = None) -> None:
+        self.root = Path(root)
+        env_wheelhouse = os.getenv("ADAOS_WHEELHOUSE")
+        self.wheelhouse = Path(wheelhouse or env_wheelhouse or self.root / "wheelhouse")
+        self._run = runner or _run
+        self._locks: Dict[str, threading.Lock] = {}
+        self._locks_guard = threading.Lock()
+        # pip wheel writes into the shared wheelhouse: one writer at a time
+        self._wheelhouse_lock = threading.Lock()
+
+    # ------------------------------------------------------------------
+    # Hashing
+    # ------------------------------------------------------------------
+    @staticmethod
+    def lock_hash(
+        requirements: Iterable[str],
+        *,
+        requirement_files: Iterable[Path] = (),
+        constraints: Optional[Path] = None,
+    ) -> str:
+        h = hashlib.sha256()
+        h.update(f"{sys.implementation.cache_tag}|{sysconfig.get_platform()}\n".encode("utf-8"))
+        for spec in sorted({str(item).strip() for item in requirements if str(item).strip()}):
+            h.update(b"req\0" + spec.encode("utf-8") + b"\n")
+        for path in requirement_files:
+            h.update(b"file\0" + _normalized_lines(path) + b"\n")
+        if constraints is not None:
+            h.update(b"constraints\0" + _normalized_lines(constraints) + b"\n")
+        return h.hexdigest()[:32]
+
+    def env_path(self, key: str) -> Path:
+        return self.root / key
+
+    def is_ready(self, key: str) -> bool:
+        return (self.env_path(key) / _MARKER_NAME).exists()
+
+    # ------------------------------------------------------------------
+    # Build / reuse
+    # ------------------------------------------------------------------
+    def ensure(
+        self,
+        requirements: Sequence[str],
+        *,
+        requirement_files: Sequence[Path] = (),
+        constraints: Optional[Path] = None,
+        label: str = "",
+    ) -> Path:
+        """Return the vendor directory for this dependency set, building it once."""
+        key = self.lock_hash(requirements, requirement_files=requirement_files, constraints=constraints)
+        target = self.env_path(key)
+        marker = target / _MARKER_NAME
+        if marker.exists():
+            _touch(marker)
+            return target
+        with self._lock_for(key):
+            if marker.exists():
+                _touch(marker)
+                return target
+            args: list[str] = []
+            for path in requirement_files:
+                args.extend(["-r", str(path)])
+            args.extend(requirements)
+            self.root.mkdir(parents=True, exist_ok=True)
+            self.wheelhouse.mkdir(parents=True, exist_ok=True)
+            staging = self.root / f".{key}.{os.getpid()}.{threading.get_ident()}.tmp"
+            shutil.rmtree(staging, ignore_errors=True)
+            try:
+                self._build(staging, args, constraints=constraints, label=label)
+                (staging / _MARKER_NAME).write_text(
+                    json.dumps({"key": key, "requirements": args, "skill": label, "created_at": time.time()}, ensure_ascii=False),
+                    encoding="utf-8",
+                )
+                if target.exists() and not marker.exists():
+                    shutil.rmtree(target, ignore_errors=True)  # leftover of an interrupted build
+                try:
+                    os.replace(staging, target)
+                except OSError:
+                    # another process published the same hash first
+                    if not marker.exists():
+                        raise
+            finally:
+                shutil.rmtree(staging, ignore_errors=True)
+            _LOG.info("dependency env %s ready for %s", key, label or "?")
+            return target
+
+    def _build(self, staging: Path, args: Sequence[str], *, constraints: Optional[Path], label: str) -> None:
+        wh = str(self.wheelhouse)
+        cons = ["-c", str(constraints)] if constraints else []
+        pip = [str(sys.executable), "-m", "pip"]
+        quiet = ["--disable-pip-version-check", "--no-warn-script-location"]
+        offline = [*pip, "install", *quiet, "--no-index", "--find-links", wh, "--target", str(staging), *cons, *args]
+
+        # 1) everything already in the wheelhouse — no network at all
+        ok, out_offline = self._run(offline)
+        if not ok and _no_pip(out_offline):
+            self._run([str(sys.executable), "-m", "ensurepip", "--upgrade"])  # best-effort
+            ok, out_offline = self._run(offline)
+        if ok:
+            return
+        shutil.rmtree(staging, ignore_errors=True)
+
+        # 2) fill the wheelhouse from the index, then install from it
+        with self._wheelhouse_lock:
+            ok, out_wheel = self._run([*pip, "wheel", "--disable-pip-version-check", "--wheel-dir", wh, "--find-links", wh, *cons, *args])
+        if ok:
+            ok, out_offline = self._run(offline)
+            if ok:
+                return
+            shutil.rmtree(staging, ignore_errors=True)
+
+        # 3) uv, if present
+        ok, out_uv = self._run(["uv", "pip", "install", "--find-links", wh, "--target", str(staging), *cons, *args])
+        if ok:
+            return
+        shutil.rmtree(staging, ignore_errors=True)
+        raise DependencyInstallError(
+            f"failed to install dependencies for skill '{label}':\n"
+            f"pip(wheelhouse) -> {out_offline}\n"
+            f"pip(wheel) -> {out_wheel}\n"
+            f"uv(target) -> {out_uv}"
+        )
+
+    def _lock_for(self, key: str) -> threading.Lock:
+        with self._locks_guard:
+            lock = self._locks.get(key)
+            if lock is None:
+                lock = self._locks[key] = threading.Lock()
+            return lock
+
+    # ------------------------------------------------------------------
+    # Slots / GC
+    # ------------------------------------------------------------------
+    @staticmethod
+    def link_slot(vendor_dir: Path, env_dir: Optional[Path]) -> None:
+        """Point a slot's vendor dir at the shared env (or clear it)."""
+        if vendor_dir.exists():
+            for child in vendor_dir.iterdir():
+                if child.is_dir() and not child.is_symlink():
+                    shutil.rmtree(child, ignore_errors=True)
+                else:
+                    try:
+                        child.unlink()
+                    except FileNotFoundError:
+                        pass
+        if env_dir is None:
+            return
+        vendor_dir.mkdir(parents=True, exist_ok=True)
+        (vendor_dir / DEPS_POINTER_NAME).write_text(str(env_dir) + "\n", encoding="utf-8")
+
+    @staticmethod
+    def referenced(runtime_root: Path) -> list[Path]:
+        """Envs pointed to by any slot under ``.runtime/<skill>/<version>/slots/*``."""
+        found: list[Path] = []
+        for pointer in Path(runtime_root).glob(f"*/*/slots/*/vendor/{DEPS_POINTER_NAME}"):
+            try:
+                value = pointer.read_text(encoding="utf-8").strip()
+            except OSError:
+                continue
+            if value:
+                found.append(Path(value))
+        return found
+
+    def prune(self, in_use: Iterable[Path], *, grace: float = _PRUNE_GRACE_SEC) -> list[str]:
+        """Remove envs no slot refers to and that were not used for ``grace`` seconds."""
+        if not self.root.exists():
+            return []
+        keep = {os.path.normcase(os.path.abspath(p)) for p in in_use}
+        now = time.time()
+        removed: list[str] = []
+        for child in self.root.iterdir():
+            marker = child / _MARKER_NAME
+            if not child.is_dir() or not marker.exists():
+                continue
+            if os.path.normcase(os.path.abspath(child)) in keep:
+                continue
+            try:
+                if now - marker.stat().st_mtime < grace:
+                    continue
+            except FileNotFoundError:
+                continue
+            shutil.rmtree(child, ignore_errors=True)
+            removed.append(child.name)
+        return removed
+
+
+def vendor_paths(vendor_dir: Path) -> list[Path]:
+    """Import roots of a slot: its ``vendor`` dir plus the shared env it points to.
+
+    ``sys.path``/``PYTHONPATH`` entries do not process ``.pth`` files, so every
+    place that puts ``vendor`` on the path must add the pointed env as well.
+    """
+    vendor_dir = Path(vendor_dir)
+    if not vendor_dir.is_dir():
+        return []
+    paths = [vendor_dir]
+    try:
+        target = (vendor_dir / DEPS_POINTER_NAME).read_text(encoding="utf-8").strip()
+    except OSError:
+        return paths
+    if target and Path(target).is_dir():
+        paths.append(Path(target))
+    return paths
+
+
+def is_dependency_env(path: Path) -> bool:
+    """True for a shared env built by :class:`DependencyCache` (not a slot's own dir).
+
+    Such envs carry a full transitive tree, so they go *after* site-packages on
+    ``sys.path``: the host's own copies of shared packages must keep winning.
+    """
+    return (Path(path) / _MARKER_NAME).is_file()
+
+
+def _normalized_lines(path: Path) -> bytes:
+    try:
+        text = Path(path).read_text(encoding="utf-8")
+    except OSError:
+        return b""
+    lines = []
+    for line in text.splitlines():
+        line = line.split("#", 1)[0].strip()
+        if line:
+            lines.append(line)
+    return "\n".join(lines).encode("utf-8")
+
+
+def _touch(path: Path) -> None:
+    try:
+        os.utime(path, None)
+    except OSError:
+        pass
+
+
+_CACHES: Dict[str, DependencyCache] = {}
+_CACHES_LOCK = threading.Lock()
+
+
+def dependency_cache_for(skills_root: Path) -> DependencyCache:
+    """Process-wide cache for ``skills_root/.runtime/.deps``."""
+    root = Path(skills_root) / ".runtime" / ".deps"
+    key = os.path.abspath(root)
+    with _CACHES_LOCK:
+        cache = _CACHES.get(key)
+        if cache is None:
+            cache = _CACHES[key] = DependencyCache(root)
+        return cache
@@ -1,13 +1,16 @@
 # src\adaos\services\skill\manager.py
 from __future__ import annotations
 
+import hashlib
 import importlib
 import json
 import os
 import re
 import shutil
-import subprocess
 import sys
+import threading
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from contextvars import copy_context
 from dataclasses import dataclass, replace
 from datetime import datetime, timezone
 from pathlib import Path
@@ -25,8 +28,13 @@ from adaos.services.git.safe_commit import sanitize_message, check_no_denied
 from adaos.services.git.workspace_guard import ensure_clean
 from adaos.services.settings import Settings
 from adaos.services.agent_context import AgentContext, get_ctx, use_ctx
+from adaos.services.skill.runtime import _apply_skill_sys_paths, invalidate_handler_cache
+from adaos.services.skill.dep_cache import DependencyCache, DependencyInstallError, dependency_cache_for
+from adaos.services.skill.memory_store import flush_skill_memory, use_skill_env_path
+from adaos.services.skill.object_store import object_store_for, slots_identical
 from adaos.services.skill.runtime_env import SkillRuntimeEnvironment, SkillSlotPaths
-from adaos.services.skill.tests_runner import TestResult, run_tests
+from adaos.services.skill.tests_runner import TestResult, prune_test_cache, run_tests
+from adaos.services.skill.tool_workers import WorkerSpec, get_tool_workers
 from adaos.skills.runtime_runner import execute_tool
 from adaos.services.skill.validation import SkillValidationService, ValidationReport
 from adaos.services.crypto.secrets_service import SecretsService
@@ -47,6 +55,16 @@ class RuntimeInstallResult:
     tests: Dict[str, TestResult]
 
 
+@dataclass(slots=True)
+class BatchInstallResult:
+    name: str
+    status: str = "pending"  # activated | failed | skipped
+    version: str | None = None
+    slot: str | None = None
+    error: str | None = None
+    report: ValidationReport | None = None
+
+
 @dataclass(slots=True, frozen=True)
 class PolicyDefaults:
     timeout_seconds: float
@@ -56,6 +74,114 @@ class PolicyDefaults:
     sandbox_cpu_seconds: float | None = None
 
 
+@dataclass(slots=True, frozen=True)
+class _ToolRuntime:
+    """Launch data of a prepared slot, resolved once and reused by ``run_tool``."""
+
+    name: str
+    version: str
+    slot: SkillSlotPaths
+    manifest: Mapping[str, Any]
+    skill_dir: Path
+    extra_paths: tuple[Path, ...]
+    skill_env_path: Path
+    secrets_path: Path
+    stamp: tuple = ()
+
+    def tool(self, tool: str | None) -> tuple[str, Mapping[str, Any]]:
+        tools = self.manifest.get("tools") or {}
+        target_tool = tool or self.manifest.get("default_tool")
+        if not target_tool:
+            raise KeyError("tool name not provided and no default tool defined")
+        tool_spec = tools.get(target_tool)
+        if not tool_spec:
+            available = ", ".join(sorted(tools)) or "<none>"
+            raise KeyError(f"tool '{target_tool}' not found (available: {available})")
+        return target_tool, tool_spec
+
+    @property
+    def runtime_info(self) -> Mapping[str, Any]:
+        return self.manifest.get("runtime") or {}
+
+    def worker_spec(self) -> WorkerSpec:
+        modules = {spec.get("module") or "handlers.main" for spec in (self.manifest.get("tools") or {}).values()}
+        return WorkerSpec(
+            skill=self.name,
+            version=self.version,
+            slot=self.slot.slot,
+            skill_dir=self.skill_dir,
+            extra_paths=self.extra_paths,
+            skill_env_path=self.skill_env_path,
+            secrets_path=self.secrets_path,
+            preload=tuple(sorted(modules)),
+            stamp=self.stamp,
+        )
+
+
+def _stat_stamp(path: Path) -> tuple[int, int, int] | None:
+    try:
+        st = path.stat()
+    except OSError:
+        return None
+    return (st.st_mtime_ns, st.st_size, st.st_ino)
+
+
+def _runtime_stamp(env: SkillRuntimeEnvironment, version: str, manifest_path: Path) -> tuple:
+    return (
+        _stat_stamp(env.active_version_marker()),
+        _stat_stamp(env.active_marker(version)),
+        _stat_stamp(manifest_path),
+    )
+
+
+class _ToolRuntimeCache:
+    """Active-slot :class:`_ToolRuntime` per skill, validated by marker/manifest stats.
+
+    A hit costs three ``stat`` calls instead of ``runtime_status`` (directory
+    setup, marker and metadata reads, manifest parse) on every tool call.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._entries: Dict[tuple[str, str], _ToolRuntime] = {}
+
+    def get(self, env: SkillRuntimeEnvironment, name: str) -> Optional[_ToolRuntime]:
+        key = (str(env.runtime_root), name)
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if _runtime_stamp(env, entry.version, entry.slot.resolved_manifest) != entry.stamp:
+            with self._lock:
+                if self._entries.get(key) is entry:
+                    del self._entries[key]
+            return None
+        return entry
+
+    def put(self, env: SkillRuntimeEnvironment, entry: _ToolRuntime) -> None:
+        with self._lock:
+            self._entries[(str(env.runtime_root), entry.name)] = entry
+
+    def invalidate(self, name: Optional[str] = None) -> None:
+        with self._lock:
+            if name is None:
+                self._entries.clear()
+                return
+            for key in [key for key in self._entries if key[1] == name]:
+                del self._entries[key]
+
+
+_TOOL_RUNTIMES = _ToolRuntimeCache()
+
+
+def _invalidate_tool_runtime(name: str) -> None:
+    """Forget the resolved slot of ``name`` and retire its warm workers."""
+    _TOOL_RUNTIMES.invalidate(name)
+    pools = get_tool_workers()
+    if pools is not None:
+        pools.retire(name)
+
+
 class SkillManager:
     def __init__(
         self,
@@ -457,6 +583,7 @@ class SkillManager:
                 skill_name=name,
                 skill_version=version,
                 slot_current_dir=slot.root,
+                cache_dir=env.runtime_root.parent / ".tests",
             )
             if any(result.status != "passed" for result in tests.values()):
                 env.cleanup_slot(version, slot_name)
@@ -478,6 +605,7 @@ class SkillManager:
         history["last_install_at"] = datetime.now(timezone.utc).isoformat()
         history["last_default_tool"] = resolved.get("default_tool")
         env.write_version_metadata(version, metadata)
+        object_store_for(skills_root).prune()
 
         return RuntimeInstallResult(
             name=name,
@@ -500,6 +628,11 @@ class SkillManager:
         manifest_path = Path(slot_meta.get("resolved_manifest") or slot_paths.resolved_manifest)
         if not manifest_path.exists():
             raise RuntimeError(f"slot {target_slot} of version {target_version} is not prepared; run 'adaos skill install {name} --slot={target_slot}' first")
+        if slot is None and env.resolve_active_version() == target_version:
+            active_slot = env.read_active_slot(target_version)
+            if active_slot != target_slot and slots_identical(env.slot_root(target_version, active_slot), slot_paths.root):
+                # redeploy of byte-identical sources: the running slot already serves them
+                return active_slot
         env.set_active_slot(target_version, target_slot)
         env.active_version_marker().write_text(target_version, encoding="utf-8")
         history = metadata.setdefault("history", {})
@@ -507,6 +640,8 @@ class SkillManager:
         history["last_active_at"] = datetime.now(timezone.utc).isoformat()
         env.write_version_metadata(target_version, metadata)
         self._smoke_import(env=env, name=name, version=target_version)
+        invalidate_handler_cache(name)
+        _invalidate_tool_runtime(name)
         try:
             install_skill_in_capacity(name, target_version, active=True)
             try:
@@ -529,7 +664,10 @@ class SkillManager:
         if not version:
             raise RuntimeError("no active version")
         env.prepare_version(version)
-        return env.rollback_slot(version)
+        previous = env.rollback_slot(version)
+        invalidate_handler_cache(name)
+        _invalidate_tool_runtime(name)
+        return previous
 
     def dev_rollback_runtime(self, name: str) -> str:
         env = self._runtime_env_dev(name)
@@ -537,7 +675,9 @@ class SkillManager:
         if not version:
             raise RuntimeError("no active version")
         env.prepare_version(version)
-        return env.rollback_slot(version)
+        previous = env.rollback_slot(version)
+        invalidate_handler_cache(name)
+        return previous
 
     def activate_for_space(
         self,
@@ -577,6 +717,173 @@ class SkillManager:
             emit(self.bus, "skills.rolledback", payload, "skill.mgr")
         return target
 
+    def install_batch(
+        self,
+        names: Iterable[str],
+        *,
+        space: str = "default",
+        webspace_id: str | None = None,
+        max_workers: int | None = None,
+        run_tests: bool = False,
+        validate: bool = True,
+        strict: bool = True,
+    ) -> Dict[str, BatchInstallResult]:
+        """Install, prepare and activate several skills at once.
+
+        Sources for all skills are fetched with one sparse-checkout update and
+        a single pull. Skills are then ordered by the ``depends`` lists of
+        their manifests; staging and dependency installs of independent skills
+        run in a bounded worker pool, while activation (smoke import mutates
+        ``sys.path``) and bus events stay on the calling thread. A failed skill
+        marks the skills depending on it as skipped. As in :meth:`install`,
+        fetched skills are validated; the report is kept in the result and does
+        not block activation. Progress is published as ``skills.batch.progress``
+        events, the summary as ``skills.batch.completed``.
+        """
+        self.caps.require("core", "skills.manage")
+        order: list[str] = []
+        for raw in names:
+            name = str(raw or "").strip()
+            if not name or name in order:
+                continue
+            if not _name_re.match(name):
+                raise ValueError(f"invalid skill name: {raw!r}")
+            order.append(name)
+        results = {name: BatchInstallResult(name=name) for name in order}
+        if not order:
+            return results
+        total = len(order)
+
+        def progress(name: str, stage: str, **extra: Any) -> None:
+            if self.bus:
+                payload: Dict[str, Any] = {"skill_name": name, "stage": stage, "total": total, **extra}
+                emit(self.bus, "skills.batch.progress", payload, "skill.mgr")
+
+        def fail(name: str, status: str, error: str) -> None:
+            results[name].status = status
+            results[name].error = error
+            progress(name, status, error=error)
+
+        # 1) fetch: one sparse_set + pull for the whole batch
+        for name in order:
+            self.reg.register(name)
+        fetched_ok: set[str] = set()
+        if os.getenv("ADAOS_TESTING") != "1":
+            repo = self.ctx.skills_repo
+            install_many = getattr(repo, "install_many", None)
+            if callable(install_many):
+                try:
+                    fetched = install_many(order)
+                except Exception as exc:
+                    # сбой сети/pull не должен ронять установку сценария целиком
+                    fetched = {name: exc for name in order}
+            else:
+                fetched = {}
+                for name in order:
+                    try:
+                        fetched[name] = repo.install(name, branch=None)
+                    except Exception as exc:
+                        fetched[name] = exc
+            for name in order:
+                outcome = fetched.get(name)
+                if isinstance(outcome, Exception):
+                    fail(name, "failed", f"fetch: {outcome}")
+                else:
+                    fetched_ok.add(name)
+                    progress(name, "fetched")
+
+        # 2) dependency graph restricted to the batch
+        skills_root = self.ctx.paths.skills_dir()
+        pending: Dict[str, set[str]] = {}
+        for name in order:
+            if results[name].status != "pending":
+                continue
+            try:
+                manifest = self._load_manifest(skills_root / name)
+            except Exception:
+                manifest = {}
+            depends = manifest.get("depends") or []
+            if not isinstance(depends, (list, tuple)):
+                depends = []
+            pending[name] = {str(dep) for dep in depends if str(dep) in results and str(dep) != name}
+
+        def prepare(name: str) -> RuntimeInstallResult:
+            with use_ctx(self.ctx):
+                if validate and name in fetched_ok:
+                    # тот же проход валидации, что и в install(); путь явный — skill_ctx не трогаем
+                    report = SkillValidationService(self.ctx).validate_path(skills_root / name, name=name, strict=strict)
+                    results[name].report = report
+                return self.prepare_runtime(name, run_tests=run_tests)
+
+        def activate(name: str, runtime: RuntimeInstallResult | None, prepare_error: Exception | None) -> None:
+            result = results[name]
+            try:
+                result.slot = self.activate_for_space(
+                    name,
+                    version=runtime.version if runtime else None,
+                    slot=runtime.slot if runtime else None,
+                    space=space,
+                    webspace_id=webspace_id,
+                )
+            except Exception as exc:
+                reason = f"prepare: {prepare_error}; activate: {exc}" if prepare_error else f"activate: {exc}"
+                fail(name, "failed", reason)
+                return
+            result.status = "activated"
+            result.version = runtime.version if runtime else None
+            # как и раньше: при ошибке подготовки остаётся ранее подготовленный слот
+            result.error = f"prepare: {prepare_error}" if prepare_error else None
+            progress(name, "activated", version=result.version, slot=result.slot)
+
+        def skip_dependents(name: str) -> None:
+            for dependent in [n for n, deps in pending.items() if name in deps]:
+                if dependent in pending:
+                    del pending[dependent]
+                    fail(dependent, "skipped", f"dependency '{name}' failed")
+                    skip_dependents(dependent)
+
+        for name in order:
+            if results[name].status != "pending":
+                skip_dependents(name)
+
+        workers = max(1, min(max_workers or min(4, os.cpu_count() or 1), len(pending) or 1))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="skill-batch") as pool:
+            running: Dict[Future, str] = {}
+            while pending or running:
+                for name in [n for n, deps in pending.items() if not deps]:
+                    del pending[name]
+                    progress(name, "preparing")
+                    running[pool.submit(prepare, name)] = name
+                if not running:
+                    # only cyclic dependencies are left
+                    cycle = sorted(pending)
+                    pending.clear()
+                    for name in cycle:
+                        fail(name, "failed", "dependency cycle: " + ", ".join(cycle))
+                    break
+                done, _ = wait(list(running), return_when=FIRST_COMPLETED)
+                for future in done:
+                    name = running.pop(future)
+                    report = results[name].report
+                    if report is not None:
+                        progress(name, "validated", ok=report.ok, issues=len(report.issues))
+                    try:
+                        runtime, error = future.result(), None
+                        progress(name, "prepared", version=runtime.version, slot=runtime.slot)
+                    except Exception as exc:
+                        runtime, error = None, exc
+                    activate(name, runtime, error)
+                    if results[name].status == "activated":
+                        for deps in pending.values():
+                            deps.discard(name)
+                    else:
+                        skip_dependents(name)
+
+        if self.bus:
+            summary = {status: sorted(n for n, r in results.items() if r.status == status) for status in ("activated", "failed", "skipped")}
+            emit(self.bus, "skills.batch.completed", {"total": total, **summary}, "skill.mgr")
+        return results
+
     def runtime_status(self, name: str) -> Dict[str, Any]:
         env = self._runtime_env(name)
         version = env.resolve_active_version()
@@ -646,6 +953,8 @@ class SkillManager:
         return state
 
     def cleanup_runtime(self, name: str, *, purge_data: bool = False) -> None:
+        invalidate_handler_cache(name)
+        _invalidate_tool_runtime(name)
         env = self._runtime_env(name)
         for version in env.list_versions():
             for slot in ("A", "B"):
@@ -669,7 +978,7 @@ class SkillManager:
 
     def gc_runtime(self, name: str | None = None) -> Dict[str, Iterable[str]]:
         skills_root = self.ctx.paths.skills_dir()
-        targets = [name] if name else [p.name for p in (skills_root / ".runtime").glob("*") if p.is_dir()]
+        targets = [name] if name else [p.name for p in (skills_root / ".runtime").glob("*") if p.is_dir() and not p.name.startswith(".")]
         cleaned: Dict[str, Iterable[str]] = {}
         for skill in targets:
             env = SkillRuntimeEnvironment(skills_root=skills_root, skill_name=skill)
@@ -683,6 +992,10 @@ class SkillManager:
                 self._remove_tree(env.version_root(version))
                 removed.append(version)
             cleaned[skill] = removed
+        object_store_for(skills_root).prune()
+        deps = dependency_cache_for(skills_root)
+        deps.prune(deps.referenced(skills_root / ".runtime"))
+        prune_test_cache(skills_root / ".runtime" / ".tests")
         return cleaned
 
     def doctor_runtime(self, name: str) -> Dict[str, Any]:
@@ -754,111 +1067,38 @@ class SkillManager:
         allow_inactive: bool = False,
         slot: str | None = None,
     ) -> Any:
-        status = self.runtime_status(name)
         env = self._runtime_env(name)
-        version = status.get("version")
-        active_slot = status.get("active_slot")
-        manifest_path = Path(status["resolved_manifest"])
-        slot_name = active_slot
-
-        if not status.get("ready", True):
-            target_slot = slot or status.get("pending_slot")
-            target_version = status.get("pending_version") or version
-            if not allow_inactive or not target_slot or not target_version:
-                raise RuntimeError(
-                    f"skill '{name}' version {status.get('pending_version') or status.get('version')} is not activated. "
-                    f"Activate slot {target_slot or status.get('active_slot')} and retry."
-                )
-            env.prepare_version(target_version)
-            metadata = env.read_version_metadata(target_version)
-            slot_paths = env.build_slot_paths(target_version, target_slot)
-            slot_meta = metadata.get("slots", {}).get(target_slot, {})
-            manifest_path = Path(slot_meta.get("resolved_manifest") or slot_paths.resolved_manifest)
-            if not manifest_path.exists():
-                raise RuntimeError(f"slot {target_slot} for version {target_version} is not prepared")
-            version = target_version
-            slot_name = target_slot
-        elif slot and slot != active_slot:
-            env.prepare_version(version)
-            metadata = env.read_version_metadata(version)
-            slot_paths = env.build_slot_paths(version, slot)
-            slot_meta = metadata.get("slots", {}).get(slot, {})
-            candidate = Path(slot_meta.get("resolved_manifest") or slot_paths.resolved_manifest)
-            if not candidate.exists():
-                raise RuntimeError(f"slot {slot} for version {version} is not prepared")
-            manifest_path = candidate
-            slot_name = slot
-
-        data = json.loads(manifest_path.read_text(encoding="utf-8"))
-        tools = data.get("tools") or {}
-        if tool:
-            target_tool = tool
-        else:
-            target_tool = data.get("default_tool")
-        if not target_tool:
-            raise KeyError("tool name not provided and no default tool defined")
-        tool_spec = tools.get(target_tool)
-        if not tool_spec:
-            available = ", ".join(sorted(tools)) or "<none>"
-            raise KeyError(f"tool '{target_tool}' not found (available: {available})")
-
+        runtime = _TOOL_RUNTIMES.get(env, name)
+        if runtime is None or (slot and slot != runtime.slot.slot):
+            runtime = self._resolve_tool_runtime(
+                name,
+                env,
+                self.runtime_status(name),
+                allow_inactive=allow_inactive,
+                slot=slot,
+                default_source=self.ctx.paths.skills_dir() / name,
+            )
+        target_tool, tool_spec = runtime.tool(tool)
         module = tool_spec.get("module")
         attr = tool_spec.get("callable") or target_tool
-        skill_dir = Path(data.get("source") or (self.ctx.paths.skills_dir() / name))
-        slot_name = data.get("slot") or slot_name
-        slot = env.build_slot_paths(version or data.get("version"), slot_name)
-        runtime_info = data.get("runtime", {})
-        extra_paths = [Path(p) for p in runtime_info.get("python_paths", []) if p]
-        skill_env_path = Path(runtime_info.get("skill_env") or slot.skill_env_path)
-
-        ctx = self.ctx
-        previous = ctx.skill_ctx.get()
-        prev_env = os.environ.get("ADAOS_SKILL_ENV_PATH")
-        prev_secrets = ctx.secrets
-        ctx.secrets = SecretsService(SkillSecretsBackend(env.data_root() / "files" / "secrets.json"), ctx.caps)
         execution_timeout = timeout or tool_spec.get("timeout_seconds")
 
-        def _call_tool() -> Any:
-            with use_ctx(ctx):
-                return execute_tool(
-                    skill_dir,
-                    module=module,
-                    attr=attr,
-                    payload=payload,
-                    extra_paths=extra_paths,
-                )
-
-        try:
-            if not ctx.skill_ctx.set(name, skill_dir):
-                raise RuntimeError(f"failed to establish context for skill '{name}'")
-            os.environ["ADAOS_SKILL_ENV_PATH"] = str(skill_env_path)
-
-            if execution_timeout:
-                from concurrent.futures import ThreadPoolExecutor, TimeoutError as FuturesTimeoutError
-                from contextvars import copy_context
-
-                with ThreadPoolExecutor(max_workers=1) as pool:
-                    ctxvars = copy_context()
-                    future = pool.submit(lambda: ctxvars.run(_call_tool))
-                    try:
-                        result = future.result(timeout=execution_timeout)
-                    except FuturesTimeoutError as exc:
-                        future.cancel()
-                        raise TimeoutError(f"tool '{target_tool}' timed out after {execution_timeout} seconds") from exc
-            else:
-                result = _call_tool()
-        finally:
-            ctx.secrets = prev_secrets
-            if previous is None:
-                ctx.skill_ctx.clear()
-            else:
-                ctx.skill_ctx.set(previous.name, Path(previous.path))
-            if prev_env is None:
-                os.environ.pop("ADAOS_SKILL_ENV_PATH", None)
-            else:
-                os.environ["ADAOS_SKILL_ENV_PATH"] = prev_env
+        pools = get_tool_workers()
+        if pools is not None and runtime.runtime_info.get("isolation") != "inproc":
+            result = pools.call(
+                runtime.worker_spec(),
+                module,
+                attr,
+                payload,
+                timeout=execution_timeout,
+                bus=self.ctx.bus,
+                label=target_tool,
+                size=runtime.runtime_info.get("workers"),
+            )
+        else:
+            result = self._run_tool_inproc(runtime, module=module, attr=attr, payload=payload, timeout=execution_timeout, label=target_tool)
 
-        self._persist_skill_env(env, slot)
+        self._persist_skill_env(env, runtime.slot)
         return result
 
     def run_dev_tool(
@@ -871,8 +1111,40 @@ class SkillManager:
         allow_inactive: bool = False,
         slot: str | None = None,
     ) -> Any:
-        status = self.dev_runtime_status(name)
         env = self._runtime_env_dev(name)
+        # DEV sources change under the running node: no resolution cache, no warm workers
+        runtime = self._resolve_tool_runtime(
+            name,
+            env,
+            self.dev_runtime_status(name),
+            allow_inactive=allow_inactive,
+            slot=slot,
+            default_source=self.ctx.paths.dev_skills_dir() / name,
+            cache=False,
+        )
+        target_tool, tool_spec = runtime.tool(tool)
+        result = self._run_tool_inproc(
+            runtime,
+            module=tool_spec.get("module"),
+            attr=tool_spec.get("callable") or target_tool,
+            payload=payload,
+            timeout=timeout or tool_spec.get("timeout_seconds"),
+            label=target_tool,
+        )
+        self._persist_skill_env(env, runtime.slot)
+        return result
+
+    def _resolve_tool_runtime(
+        self,
+        name: str,
+        env: SkillRuntimeEnvironment,
+        status: Mapping[str, Any],
+        *,
+        allow_inactive: bool,
+        slot: str | None,
+        default_source: Path,
+        cache: bool = True,
+    ) -> _ToolRuntime:
         version = status.get("version")
         active_slot = status.get("active_slot")
         manifest_path = Path(status["resolved_manifest"])
@@ -906,65 +1178,86 @@ class SkillManager:
             manifest_path = candidate
             slot_name = slot
 
+        stamp = _runtime_stamp(env, version, manifest_path) if version else ()
         data = json.loads(manifest_path.read_text(encoding="utf-8"))
-        tools = data.get("tools") or {}
-        if tool:
-            target_tool = tool
-        else:
-            target_tool = data.get("default_tool")
-        if not target_tool:
-            raise KeyError("tool name not provided and no default tool defined")
-        tool_spec = tools.get(target_tool)
-        if not tool_spec:
-            available = ", ".join(sorted(tools)) or "<none>"
-            raise KeyError(f"tool '{target_tool}' not found (available: {available})")
-
-        module = tool_spec.get("module")
-        attr = tool_spec.get("callable") or target_tool
-        skill_dir = Path(data.get("source") or (self.ctx.paths.dev_skills_dir() / name))
-        slot_name = data.get("slot") or slot_name
-        slot = env.build_slot_paths(version or data.get("version"), slot_name)
+        version = version or data.get("version")
+        slot_paths = env.build_slot_paths(version, data.get("slot") or slot_name)
         runtime_info = data.get("runtime", {})
-        extra_paths = [Path(p) for p in runtime_info.get("python_paths", []) if p]
-        skill_env_path = Path(runtime_info.get("skill_env") or slot.skill_env_path)
+        runtime = _ToolRuntime(
+            name=name,
+            version=version,
+            slot=slot_paths,
+            manifest=data,
+            skill_dir=Path(data.get("source") or default_source),
+            extra_paths=tuple(Path(p) for p in runtime_info.get("python_paths", []) if p),
+            skill_env_path=Path(runtime_info.get("skill_env") or slot_paths.skill_env_path),
+            secrets_path=env.data_root() / "files" / "secrets.json",
+            stamp=stamp,
+        )
+        cacheable = (
+            cache
+            and status.get("ready", True)
+            and slot_paths.slot == active_slot
+            and slot_paths.resolved_manifest == manifest_path
+            and stamp
+            and all(item is not None for item in stamp)
+        )
+        if cacheable:
+            _TOOL_RUNTIMES.put(env, runtime)
+        return runtime
+
+    def _run_tool_inproc(
+        self,
+        runtime: _ToolRuntime,
+        *,
+        module: str | None,
+        attr: str,
+        payload: Mapping[str, Any],
+        timeout: float | None,
+        label: str,
+    ) -> Any:
+        """Run a tool in this process with per-call context (no shared state is mutated).
+
+        On timeout the caller gets ``TimeoutError`` but the tool thread keeps
+        running: threads cannot be cancelled, use the worker pools for that.
+        """
 
         ctx = self.ctx
-        previous = ctx.skill_ctx.get()
-        prev_env = os.environ.get("ADAOS_SKILL_ENV_PATH")
-        prev_secrets = ctx.secrets
-        ctx.secrets = SecretsService(SkillSecretsBackend(env.data_root() / "files" / "secrets.json"), ctx.caps)
-        execution_timeout = timeout or tool_spec.get("timeout_seconds")
+        scoped = ctx.with_overrides(secrets=SecretsService(SkillSecretsBackend(runtime.secrets_path), ctx.caps))
 
         def _call_tool() -> Any:
-            with use_ctx(ctx):
+            with use_ctx(scoped), use_skill_env_path(runtime.skill_env_path):
+                if not scoped.skill_ctx.set(runtime.name, runtime.skill_dir):
+                    raise RuntimeError(f"failed to establish context for skill '{runtime.name}'")
                 return execute_tool(
-                    skill_dir,
+                    runtime.skill_dir,
                     module=module,
                     attr=attr,
                     payload=payload,
-                    extra_paths=extra_paths,
+                    extra_paths=runtime.extra_paths,
                 )
 
-        try:
-            if not ctx.skill_ctx.set(name, skill_dir):
-                raise RuntimeError(f"failed to establish context for skill '{name}'")
-        except Exception:
-            pass
-        try:
-            os.environ["ADAOS_SKILL_ENV_PATH"] = str(skill_env_path)
-            result = _call_tool()
-        finally:
-            if previous is None:
-                ctx.skill_ctx.clear()
-            else:
-                ctx.skill_ctx.set(previous.name, Path(previous.path))
-            if prev_env is None:
-                os.environ.pop("ADAOS_SKILL_ENV_PATH", None)
-            else:
-                os.environ["ADAOS_SKILL_ENV_PATH"] = prev_env
+        call_ctx = copy_context()
+        if not timeout:
+            return call_ctx.run(_call_tool)
 
-        self._persist_skill_env(env, slot)
-        return result
+        outcome: Dict[str, Any] = {}
+        done = threading.Event()
+
+        def _runner() -> None:
+            try:
+                outcome["result"] = call_ctx.run(_call_tool)
+            except BaseException as exc:
+                outcome["error"] = exc
+            finally:
+                done.set()
+
+        threading.Thread(target=_runner, name=f"adaos-tool-{runtime.name}", daemon=True).start()
+        if not done.wait(timeout):
+            raise TimeoutError(f"tool '{label}' timed out after {timeout} seconds")
+        if "error" in outcome:
+            raise outcome["error"]
+        return outcome["result"]
 
     # ------------------------------------------------------------------
     # Internal helpers
@@ -1019,11 +1312,13 @@ class SkillManager:
         if destination_root.exists():
             self._remove_tree(destination_root)
         namespace_root.mkdir(parents=True, exist_ok=True)
-        ignore = shutil.ignore_patterns(".git", "__pycache__", "*.pyc", "*.pyo", ".runtime")
-        shutil.copytree(source, target, ignore=ignore)
+        # files are hardlinked from the shared object store: unchanged sources cost no copy
+        store = object_store_for(self._skills_root_of(slot))
+        sources = store.stage_tree(source, target)
         package_init = target / "__init__.py"
         if not package_init.exists():
             package_init.write_text("", encoding="utf-8")
+            store.add_file(sources, target, package_init)
         handlers_dir = target / "handlers"
         handler_main = handlers_dir / "main.py"
         if not handler_main.exists():
@@ -1031,8 +1326,27 @@ class SkillManager:
         handlers_init = handlers_dir / "__init__.py"
         if not handlers_init.exists():
             handlers_init.write_text("from .main import handle  # noqa: F401\n", encoding="utf-8")
+            store.add_file(sources, target, handlers_init)
+        sources.meta.update(self._slot_inputs())
+        sources.write(slot.sources_manifest)
         return target
 
+    @staticmethod
+    def _skills_root_of(slot: SkillSlotPaths) -> Path:
+        # <skills_root>/.runtime/<name>/<version>/slots/<slot>
+        return slot.root.parents[4]
+
+    def _slot_inputs(self) -> Dict[str, str]:
+        """Inputs besides the sources that make two prepared slots equivalent."""
+        inputs = {"interpreter": str(sys.executable)}
+        constraints = self._constraints_file()
+        if constraints:
+            try:
+                inputs["constraints"] = hashlib.sha256(constraints.read_bytes()).hexdigest()
+            except OSError:
+                pass
+        return inputs
+
     def _smoke_import(self, *, env: SkillRuntimeEnvironment, name: str, version: str) -> None:
         module_name = f"skills.{name}.handlers.main"
         try:
@@ -1044,26 +1358,10 @@ class SkillManager:
         if not src_path.exists():
             raise RuntimeError(f"active slot for {name} lacks src directory: {src_path}")
 
-        vendor_path = current_link / "vendor"
-
         original_sys_path = list(sys.path)
         try:
-            suffixes = (
-                f"/{name}/slots/current/src",
-                f"/{name}/slots/A/src",
-                f"/{name}/slots/B/src",
-                f"/{name}/slots/current/vendor",
-                f"/{name}/slots/A/vendor",
-                f"/{name}/slots/B/vendor",
-            )
-            sys.path[:] = [entry for entry in sys.path if not any(entry.replace("\\", "/").endswith(suffix) for suffix in suffixes)]
-            paths_to_add = []
-            if vendor_path.is_dir():
-                paths_to_add.append(str(vendor_path))
-            paths_to_add.append(str(src_path))
-            for candidate in reversed(paths_to_add):
-                if candidate not in sys.path:
-                    sys.path.insert(0, candidate)
+            # sys.path восстанавливается ниже, поэтому учёт окружений навыков не трогаем
+            _apply_skill_sys_paths(name, current_link, record=False)
             for mod in list(sys.modules.keys()):
                 if mod == module_name or mod.startswith(f"skills.{name}."):
                     sys.modules.pop(mod, None)
@@ -1104,105 +1402,24 @@ class SkillManager:
     ) -> list[str]:
         requirements_file = skill_dir / "requirements.in"
         dependencies = self._collect_dependencies(manifest)
-        python_args: list[str] = []
-        if requirements_file.exists():
-            python_args.extend(["-r", str(requirements_file)])
-        if dependencies:
-            python_args.extend(dependencies)
-
-        if not python_args:
+        requirement_files = [requirements_file] if requirements_file.exists() else []
+        if not requirement_files and not dependencies:
+            DependencyCache.link_slot(slot.vendor_dir, None)
             return []
 
-        constraints = self._constraints_file()
-        base_cmd = [
-            str(sys.executable),
-            "-m",
-            "pip",
-            "install",
-            "--upgrade",
-            "--disable-pip-version-check",
-        ]
-        if constraints:
-            base_cmd.extend(["-c", str(constraints)])
-
-        shared_cmd = [*base_cmd, *python_args]
-        vendor_dir = slot.vendor_dir
-        
-        def _run(cmd: list[str]) -> tuple[bool, str]:
-            try:
-                p = subprocess.run(cmd, capture_output=True, text=True)
-            except FileNotFoundError as e:
-                return False, str(e)
-            ok = (p.returncode == 0)
-            out = (p.stdout or "") + ("\n" + p.stderr if p.stderr else "")
-            return ok, out
-
-        # 1) Try pip in current interpreter; bootstrap pip if missing
-        ok, out = _run(shared_cmd)
-        if not ok and ("No module named pip" in out or "No module named pip" in out.replace("\r", "\n")):
-            _run([str(sys.executable), "-m", "ensurepip", "--upgrade"])  # best-effort
-            ok, out = _run(shared_cmd)
-        if ok:
-            # clean vendor if present
-            if vendor_dir.exists():
-                for child in vendor_dir.iterdir():
-                    if child.is_dir():
-                        shutil.rmtree(child, ignore_errors=True)
-                    else:
-                        try:
-                            child.unlink()
-                        except FileNotFoundError:
-                            pass
-            return []
-
-        # 2) Fallback: pip --target vendor (after ensurepip)
-        vendor_dir.mkdir(parents=True, exist_ok=True)
-        vendor_cmd = [
-            *base_cmd,
-            "--target",
-            str(vendor_dir),
-            "--no-warn-script-location",
-            *python_args,
-        ]
-        ok2, out2 = _run(vendor_cmd)
-        if not ok2 and ("No module named pip" in out2 or "No module named pip" in out2.replace("\r", "\n")):
-            _run([str(sys.executable), "-m", "ensurepip", "--upgrade"])  # best-effort
-            ok2, out2 = _run(vendor_cmd)
-        if ok2:
-            return [str(vendor_dir)]
-
-        # 3) Last resort: try `uv pip install` (if available)
-        uv_base = ["uv", "pip", "install", "--upgrade"]
-        if constraints:
-            uv_base.extend(["-c", str(constraints)])
-        ok3, out3 = _run([*uv_base, *python_args])
-        if ok3:
-            # uv installs into environment; keep vendor clean
-            if vendor_dir.exists():
-                for child in vendor_dir.iterdir():
-                    if child.is_dir():
-                        shutil.rmtree(child, ignore_errors=True)
-                    else:
-                        try:
-                            child.unlink()
-                        except FileNotFoundError:
-                            pass
-            return []
-
-        # Try uv with --target vendor
-        uv_vendor = [*uv_base, "--target", str(vendor_dir), "--no-warn-script-location", *python_args]
-        ok4, out4 = _run(uv_vendor)
-        if ok4:
-            return [str(vendor_dir)]
-
-        # Failed all strategies
-        raise RuntimeError(
-            f"failed to install dependencies for skill '{slot.skill_name}':\n"
-            f"pip(shared) -> {out}\n"
-            f"pip(target) -> {out2}\n"
-            f"uv(shared) -> {out3}\n"
-            f"uv(target) -> {out4}"
-        )
+        # one shared vendor dir per lock hash: unchanged dependencies skip pip entirely
+        cache = dependency_cache_for(self._skills_root_of(slot))
+        try:
+            env_dir = cache.ensure(
+                dependencies,
+                requirement_files=requirement_files,
+                constraints=self._constraints_file(),
+                label=slot.skill_name,
+            )
+        except DependencyInstallError as exc:
+            raise RuntimeError(str(exc)) from exc
+        DependencyCache.link_slot(slot.vendor_dir, env_dir)
+        return [str(env_dir)]
 
     def _constraints_file(self) -> Path | None:
         candidates: list[Path] = []
@@ -1240,6 +1457,8 @@ class SkillManager:
         store_path = env.data_root() / "files" / ".skill_env.json"
         candidates = [store_path, skill_dir / ".skill_env.json"]
         target = slot.skill_env_path
+        # pending in-memory writes must not resurface on top of the synced copy
+        flush_skill_memory(target)
         for candidate in candidates:
             if candidate.exists():
                 target.parent.mkdir(parents=True, exist_ok=True)
@@ -1251,6 +1470,7 @@ class SkillManager:
 
     def _persist_skill_env(self, env: SkillRuntimeEnvironment, slot: SkillSlotPaths) -> None:
         source = slot.skill_env_path
+        flush_skill_memory(source)
         if not source.exists():
             return
         store = env.data_root() / "files"
@@ -1353,6 +1573,8 @@ class SkillManager:
             "source": str(skill_dir.resolve()),
             "runtime": {
                 "type": (manifest.get("runtime") or {}).get("type", "python"),
+                "isolation": (manifest.get("runtime") or {}).get("isolation", "process"),
+                "workers": (manifest.get("runtime") or {}).get("workers"),
                 "interpreter": str(interpreter),
                 "src": str(slot.src_dir),
                 "vendor": str(slot.vendor_dir),
@@ -1501,6 +1723,7 @@ class SkillManager:
                 skill_name=name,
                 skill_version=version,
                 slot_current_dir=slot.root,
+                cache_dir=env.runtime_root.parent / ".tests",
             )
             if any(result.status != "passed" for result in tests.values()):
                 env.cleanup_slot(version, slot_name)
@@ -1522,6 +1745,7 @@ class SkillManager:
         history["last_install_at"] = datetime.now(timezone.utc).isoformat()
         history["last_default_tool"] = resolved.get("default_tool")
         env.write_version_metadata(version, metadata)
+        object_store_for(dev_root).prune()
 
         return RuntimeInstallResult(
             name=name,
@@ -1574,6 +1798,7 @@ class SkillManager:
         history["last_active_at"] = datetime.now(timezone.utc).isoformat()
         env.write_version_metadata(target_version, metadata)
         self._smoke_import(env=env, name=name, version=target_version)
+        invalidate_handler_cache(name)
         return target_slot
 
     def run_dev_skill_tests(self, name: str) -> Dict[str, TestResult]:
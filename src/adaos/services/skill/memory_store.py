@@ -0,0 +1,321 @@
+"""In-memory view over a skill's ``.skill_env.json`` with deferred atomic writes.
+
+``adaos.sdk.data.skill_memory`` used to re-read the JSON file on every ``get``
+and rewrite it on every ``set``.  :class:`SkillMemoryStore` keeps the decoded
+mapping in memory, tracks whether it is dirty and writes it back at most once
+per :data:`FLUSH_DELAY` seconds via a temp file + ``os.replace``.
+
+In journal mode every ``set`` appends one JSON line to
+``.skill_env.json.journal`` instead, so high-frequency updates cost O(1) on
+disk; the journal is folded into the snapshot once it grows past
+:data:`JOURNAL_COMPACT_ENTRIES` lines and on every explicit :func:`flush_skill_memory`.
+
+Stores are process-wide, one per resolved file path.  Changes made by other
+processes are picked up on the next access as long as the local view is clean.
+Writes hold an inter-process lock on ``.skill_env.json.lock`` and merge only the
+keys this process changed into a fresh read of the file, so a tool worker and
+the hub flushing the same file do not overwrite each other's keys.
+
+The file a tool call writes to is selected with :func:`use_skill_env_path`,
+which is scoped to the current context instead of the process environment.
+"""
+
+from __future__ import annotations
+
+import atexit
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows
+    fcntl = None  # type: ignore[assignment]
+    try:
+        import msvcrt
+    except ImportError:
+        msvcrt = None  # type: ignore[assignment]
+
+__all__ = [
+    "SkillMemoryStore",
+    "get_skill_memory",
+    "flush_skill_memory",
+    "use_skill_env_path",
+    "current_skill_env_path",
+    "FLUSH_DELAY",
+    "JOURNAL_COMPACT_ENTRIES",
+]
+
+_LOG = logging.getLogger("adaos.skill.memory")
+
+FLUSH_DELAY = 0.5
+JOURNAL_COMPACT_ENTRIES = 1000
+_JOURNAL_SUFFIX = ".journal"
+_LOCK_SUFFIX = ".lock"
+_MISSING = object()
+
+_SKILL_ENV_PATH: ContextVar[Optional[Path]] = ContextVar("adaos_skill_env_path", default=None)
+
+
+@contextmanager
+def use_skill_env_path(path: Path | str) -> Iterator[None]:
+    """Route ``skill_memory`` of the current context to ``path``."""
+    token = _SKILL_ENV_PATH.set(Path(path))
+    try:
+        yield
+    finally:
+        _SKILL_ENV_PATH.reset(token)
+
+
+def current_skill_env_path() -> Optional[Path]:
+    return _SKILL_ENV_PATH.get()
+
+
+def _journal_enabled() -> bool:
+    return os.getenv("ADAOS_SKILL_MEMORY_JOURNAL", "").strip().lower() in {"1", "true", "yes", "on"}
+
+
+@contextmanager
+def _file_lock(path: Path) -> Iterator[None]:
+    """Exclusive lock shared by all processes touching one memory file."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with path.open("a+b") as fh:
+        if fcntl is not None:
+            fcntl.flock(fh.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(fh.fileno(), fcntl.LOCK_UN)
+        elif msvcrt is not None:  # pragma: no cover - Windows
+            fh.seek(0)
+            while True:
+                try:
+                    msvcrt.locking(fh.fileno(), msvcrt.LK_NBLCK, 1)
+                    break
+                except OSError:
+                    time.sleep(0.01)
+            try:
+                yield
+            finally:
+                fh.seek(0)
+                msvcrt.locking(fh.fileno(), msvcrt.LK_UNLCK, 1)
+        else:  # pragma: no cover
+            yield
+
+
+def _stat_key(path: Path) -> Optional[tuple[int, int, int]]:
+    try:
+        st = path.stat()
+    except OSError:
+        return None
+    return (st.st_mtime_ns, st.st_size, st.st_ino)
+
+
+class SkillMemoryStore:
+    """Cached key/value mapping persisted to a single JSON file."""
+
+    def __init__(self, path: Path, *, journal: bool = False, flush_delay: float = FLUSH_DELAY) -> None:
+        self.path = Path(path)
+        self.journal_path = self.path.with_name(self.path.name + _JOURNAL_SUFFIX)
+        self.lock_path = self.path.with_name(self.path.name + _LOCK_SUFFIX)
+        self.journal = journal
+        self.flush_delay = flush_delay
+        self._lock = threading.RLock()
+        self._data: Optional[Dict[str, Any]] = None
+        self._signature: Optional[tuple] = None
+        self._dirty = False
+        # keys set here since the last write: only these are merged into the file
+        self._pending: Dict[str, Any] = {}
+        self._journal_entries = 0
+        self._timer: Optional[threading.Timer] = None
+
+    # ------------------------------------------------------------------
+    # Loading
+    # ------------------------------------------------------------------
+    def _disk_signature(self) -> tuple:
+        return (_stat_key(self.path), _stat_key(self.journal_path))
+
+    def _load(self) -> None:
+        data: Dict[str, Any] = {}
+        signature = self._disk_signature()
+        if signature[0] is not None:
+            try:
+                loaded = json.loads(self.path.read_text(encoding="utf-8"))
+            except Exception:
+                loaded = {}
+            if isinstance(loaded, dict):
+                data = loaded
+        entries = 0
+        if signature[1] is not None:
+            try:
+                with self.journal_path.open("r", encoding="utf-8") as fh:
+                    for line in fh:
+                        try:
+                            record = json.loads(line)
+                        except ValueError:
+                            # torn trailing line after a crash
+                            continue
+                        if isinstance(record, dict) and "k" in record:
+                            data[record["k"]] = record.get("v")
+                            entries += 1
+            except OSError:
+                pass
+        self._data = data
+        self._signature = signature
+        self._journal_entries = entries
+
+    def _view(self) -> Dict[str, Any]:
+        if self._data is None:
+            self._load()
+        elif not self._dirty and self._disk_signature() != self._signature:
+            # changed outside this process (another process, slot sync)
+            self._load()
+        return self._data  # type: ignore[return-value]
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+    def get(self, key: str, default: Any = None) -> Any:
+        with self._lock:
+            value = self._view().get(key, _MISSING)
+        if value is _MISSING:
+            return default
+        if isinstance(value, (dict, list)):
+            # callers must not mutate the cached view
+            return json.loads(json.dumps(value))
+        return value
+
+    def set(self, key: str, value: Any) -> None:
+        encoded = json.dumps(value, ensure_ascii=False)
+        with self._lock:
+            data = self._view()
+            data[key] = json.loads(encoded)
+            if self.journal:
+                self._append_journal(key, encoded)
+                if self._journal_entries >= JOURNAL_COMPACT_ENTRIES:
+                    self._write_snapshot()
+            else:
+                self._pending[key] = data[key]
+                self._dirty = True
+                self._schedule()
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return json.loads(json.dumps(self._view()))
+
+    def flush(self) -> None:
+        """Write pending changes (and compact the journal) synchronously."""
+        with self._lock:
+            self._cancel_timer()
+            journal_exists = _stat_key(self.journal_path) is not None
+            if self._data is None and not journal_exists:
+                return
+            # a journal left by another process (e.g. a tool subprocess) is folded in as well
+            self._view()
+            if self._dirty or journal_exists:
+                self._write_snapshot()
+
+    # ------------------------------------------------------------------
+    # Persistence
+    # ------------------------------------------------------------------
+    def _append_journal(self, key: str, encoded: str) -> None:
+        line = '{"k": ' + json.dumps(key, ensure_ascii=False) + ', "v": ' + encoded + "}\n"
+        # the lock keeps the append out of another process's fold-and-unlink
+        with _file_lock(self.lock_path):
+            with self.journal_path.open("a", encoding="utf-8") as fh:
+                fh.write(line)
+        self._journal_entries += 1
+        self._signature = self._disk_signature()
+
+    def _write_snapshot(self) -> None:
+        with _file_lock(self.lock_path):
+            # other processes may have written since our read: start from the file,
+            # then apply our own changes (journal-mode sets are already in the journal)
+            self._load()
+            assert self._data is not None
+            self._data.update(self._pending)
+            tmp = self.path.with_name(f"{self.path.name}.{os.getpid()}.tmp")
+            try:
+                tmp.write_text(json.dumps(self._data, indent=2, ensure_ascii=False), encoding="utf-8")
+                os.replace(tmp, self.path)
+            finally:
+                try:
+                    tmp.unlink()
+                except FileNotFoundError:
+                    pass
+            try:
+                self.journal_path.unlink()
+            except FileNotFoundError:
+                pass
+            self._signature = self._disk_signature()
+        self._pending.clear()
+        self._dirty = False
+        self._journal_entries = 0
+
+    def _schedule(self) -> None:
+        if self._timer is not None:
+            return
+        timer = threading.Timer(self.flush_delay, self._flush_from_timer)
+        timer.daemon = True
+        self._timer = timer
+        timer.start()
+
+    def _flush_from_timer(self) -> None:
+        with self._lock:
+            self._timer = None
+            if not self._dirty:
+                return
+            try:
+                self._write_snapshot()
+            except Exception:
+                _LOG.warning("failed to flush skill memory %s", self.path, exc_info=True)
+
+    def _cancel_timer(self) -> None:
+        timer, self._timer = self._timer, None
+        if timer is not None:
+            timer.cancel()
+
+
+_STORES: Dict[str, SkillMemoryStore] = {}
+_STORES_LOCK = threading.Lock()
+
+
+def _key(path: Path | str) -> str:
+    return os.path.abspath(os.fspath(path))
+
+
+def get_skill_memory(path: Path | str) -> SkillMemoryStore:
+    key = _key(path)
+    store = _STORES.get(key)
+    if store is None:
+        with _STORES_LOCK:
+            store = _STORES.get(key)
+            if store is None:
+                store = SkillMemoryStore(Path(key), journal=_journal_enabled())
+                _STORES[key] = store
+    return store
+
+
+def flush_skill_memory(path: Path | str | None = None) -> None:
+    """Flush one store (by file path) or all of them."""
+    if path is not None:
+        store = _STORES.get(_key(path))
+        if store is not None:
+            store.flush()
+        return
+    with _STORES_LOCK:
+        stores = list(_STORES.values())
+    for store in stores:
+        try:
+            store.flush()
+        except Exception:
+            _LOG.warning("failed to flush skill memory %s", store.path, exc_info=True)
+
+
+atexit.register(flush_skill_memory)
@@ -0,0 +1,307 @@
+"""Content-addressed file store used to stage skill sources into runtime slots.
+
+Every staged file is stored once under ``skills/.runtime/.objects/<aa>/<sha256>``
+and hardlinked (or reflinked, or as a last resort copied) into the slot, so
+redeploying an unchanged skill only creates directory entries instead of
+rewriting the same bytes. Objects are read-only; objects no longer linked from
+any slot (link count 1) are removed by :meth:`ObjectStore.prune`.
+
+A per-slot :class:`SlotManifest` records the hash of every staged file and a
+digest of the whole tree, which lets activation detect byte-identical slots.
+"""
+
+from __future__ import annotations
+
+import errno
+import fnmatch
+import hashlib
+import json
+import logging
+import os
+import shutil
+import stat
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Iterable, Optional
+
+__all__ = [
+    "ObjectStore",
+    "SlotManifest",
+    "STAGE_IGNORE",
+    "SLOT_MANIFEST_NAME",
+    "object_store_for",
+    "slots_identical",
+]
+
+_LOG = logging.getLogger("adaos.skill.objects")
+
+STAGE_IGNORE: tuple[str, ...] = (".git", "__pycache__", "*.pyc", "*.pyo", ".runtime")
+SLOT_MANIFEST_NAME = "sources.manifest.json"
+_INDEX_NAME = ".index.json"
+_CHUNK = 1024 * 1024
+# objects younger than this are never pruned: a concurrent stage may not have linked them yet
+_PRUNE_GRACE_SEC = 300.0
+_FICLONE = 0x40049409
+
+
+def _hash_file(path: Path) -> str:
+    digest = hashlib.sha256()
+    with path.open("rb") as fh:
+        while True:
+            chunk = fh.read(_CHUNK)
+            if not chunk:
+                break
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _reflink(src: Path, dst: Path) -> bool:
+    """Copy-on-write clone (btrfs/xfs); False when unsupported."""
+    try:
+        import fcntl
+    except ImportError:  # pragma: no cover - Windows
+        return False
+    try:
+        with src.open("rb") as fin, dst.open("wb") as fout:
+            fcntl.ioctl(fout.fileno(), _FICLONE, fin.fileno())
+        return True
+    except OSError:
+        try:
+            dst.unlink()
+        except FileNotFoundError:
+            pass
+        return False
+
+
+@dataclass(slots=True)
+class SlotManifest:
+    """Hashes of the files staged into a slot (relative posix path -> object key).
+
+    ``meta`` carries other inputs that make two slots equivalent (e.g. the
+    runtime/dependency section of the manifest) and is part of the digest.
+    """
+
+    files: Dict[str, str] = field(default_factory=dict)
+    meta: Dict[str, str] = field(default_factory=dict)
+
+    @property
+    def digest(self) -> str:
+        h = hashlib.sha256()
+        for section in (self.files, self.meta):
+            for key in sorted(section):
+                h.update(key.encode("utf-8"))
+                h.update(b"\0")
+                h.update(section[key].encode("utf-8"))
+                h.update(b"\n")
+            h.update(b"\x1e")
+        return h.hexdigest()
+
+    def write(self, path: Path) -> None:
+        payload = {"digest": self.digest, "meta": dict(sorted(self.meta.items())), "files": dict(sorted(self.files.items()))}
+        tmp = path.with_suffix(".tmp")
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp.write_text(json.dumps(payload, ensure_ascii=False, indent=2), encoding="utf-8")
+        os.replace(tmp, path)
+
+    @classmethod
+    def read(cls, path: Path) -> Optional["SlotManifest"]:
+        try:
+            payload = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+        files = payload.get("files") if isinstance(payload, dict) else None
+        if not isinstance(files, dict):
+            return None
+        meta = payload.get("meta") if isinstance(payload.get("meta"), dict) else {}
+        return cls(files={str(k): str(v) for k, v in files.items()}, meta={str(k): str(v) for k, v in meta.items()})
+
+
+class ObjectStore:
+    """Hash-keyed immutable file objects shared by all skill slots."""
+
+    def __init__(self, root: Path) -> None:
+        self.root = Path(root)
+        self._lock = threading.Lock()
+        self._index: Optional[Dict[str, list]] = None
+        self._index_dirty = False
+        # hardlinks fail across devices / on some filesystems — remember per process
+        self._links_supported = True
+
+    # ------------------------------------------------------------------
+    # Hash cache: source path -> (size, mtime_ns, ino, sha)
+    # ------------------------------------------------------------------
+    def _load_index(self) -> Dict[str, list]:
+        if self._index is None:
+            try:
+                data = json.loads((self.root / _INDEX_NAME).read_text(encoding="utf-8"))
+            except (OSError, ValueError):
+                data = {}
+            self._index = data if isinstance(data, dict) else {}
+        return self._index
+
+    def _save_index(self) -> None:
+        if not self._index_dirty or self._index is None:
+            return
+        self.root.mkdir(parents=True, exist_ok=True)
+        path = self.root / _INDEX_NAME
+        tmp = path.with_name(f"{_INDEX_NAME}.{os.getpid()}.tmp")
+        tmp.write_text(json.dumps(self._index, separators=(",", ":")), encoding="utf-8")
+        os.replace(tmp, path)
+        self._index_dirty = False
+
+    def file_key(self, path: Path) -> str:
+        """Object key of a source file: sha256 plus ``.x`` for executables."""
+        st = path.stat()
+        src = str(path.resolve())
+        sig = [st.st_size, st.st_mtime_ns, st.st_ino]
+        with self._lock:
+            cached = self._load_index().get(src)
+        if cached and cached[:3] == sig:
+            sha = cached[3]
+        else:
+            sha = _hash_file(path)
+            with self._lock:
+                self._load_index()[src] = sig + [sha]
+                self._index_dirty = True
+        return sha + (".x" if st.st_mode & stat.S_IXUSR else "")
+
+    # ------------------------------------------------------------------
+    # Objects
+    # ------------------------------------------------------------------
+    def object_path(self, key: str) -> Path:
+        return self.root / key[:2] / key
+
+    def _ensure_object(self, key: str, source: Path) -> Path:
+        obj = self.object_path(key)
+        if obj.exists():
+            return obj
+        obj.parent.mkdir(parents=True, exist_ok=True)
+        tmp = obj.with_name(f"{key}.{os.getpid()}.{threading.get_ident()}.tmp")
+        shutil.copyfile(source, tmp)
+        if os.name != "nt":
+            # read-only: a slot must not be able to modify a shared object in place
+            os.chmod(tmp, 0o555 if key.endswith(".x") else 0o444)
+        os.replace(tmp, obj)
+        return obj
+
+    def _place(self, key: str, source: Path, dest: Path) -> None:
+        if self._links_supported:
+            for _ in range(2):
+                obj = self._ensure_object(key, source)
+                try:
+                    os.link(obj, dest)
+                    return
+                except FileNotFoundError:
+                    # pruned concurrently — recreate once
+                    continue
+                except OSError as exc:
+                    if exc.errno not in (errno.EXDEV, errno.EPERM, errno.EMLINK, errno.ENOTSUP, errno.EOPNOTSUPP):
+                        raise
+                    _LOG.info("hardlinks unavailable for %s (%s); falling back to copies", self.root, exc)
+                    self._links_supported = False
+                    break
+        if not _reflink(source, dest):
+            shutil.copyfile(source, dest)
+        shutil.copymode(source, dest)
+
+    # ------------------------------------------------------------------
+    # Staging
+    # ------------------------------------------------------------------
+    def stage_tree(self, source: Path, target: Path, *, ignore: Iterable[str] = STAGE_IGNORE) -> SlotManifest:
+        """Materialise ``source`` at ``target`` (which must not exist) from objects."""
+        patterns = tuple(ignore)
+        manifest = SlotManifest()
+        # slots of different skills are staged concurrently (install_batch): only the
+        # hash index is shared state; objects are published atomically via os.replace
+        try:
+            for dirpath, dirnames, filenames in os.walk(source):
+                dirnames[:] = sorted(d for d in dirnames if not _ignored(d, patterns))
+                rel_dir = Path(dirpath).relative_to(source)
+                out_dir = target / rel_dir
+                out_dir.mkdir(parents=True, exist_ok=True)
+                for fname in sorted(filenames):
+                    if _ignored(fname, patterns):
+                        continue
+                    src = Path(dirpath) / fname
+                    if src.is_symlink() and not src.exists():
+                        continue
+                    key = self.file_key(src)
+                    self._place(key, src, out_dir / fname)
+                    manifest.files[(rel_dir / fname).as_posix()] = key
+        finally:
+            with self._lock:
+                self._save_index()
+        return manifest
+
+    def add_file(self, manifest: SlotManifest, root: Path, path: Path) -> None:
+        """Record a file generated directly inside a staged tree."""
+        key = _hash_file(path) + (".x" if path.stat().st_mode & stat.S_IXUSR else "")
+        manifest.files[path.relative_to(root).as_posix()] = key
+
+    def prune(self, *, grace: float = _PRUNE_GRACE_SEC) -> int:
+        """Delete objects that no slot links to any more; returns the number removed."""
+        if not self.root.exists():
+            return 0
+        removed = 0
+        now = time.time()
+        with self._lock:
+            for bucket in self.root.iterdir():
+                if not bucket.is_dir():
+                    continue
+                for obj in bucket.iterdir():
+                    try:
+                        st = obj.stat()
+                    except FileNotFoundError:
+                        continue
+                    if st.st_nlink > 1 or now - st.st_mtime < grace:
+                        continue
+                    try:
+                        obj.unlink()
+                        removed += 1
+                    except OSError:
+                        pass
+                try:
+                    bucket.rmdir()
+                except OSError:
+                    pass
+            index = self._load_index()
+            stale = [src for src in index if not os.path.exists(src)]
+            for src in stale:
+                del index[src]
+            if stale:
+                self._index_dirty = True
+                self._save_index()
+        return removed
+
+
+def _ignored(name: str, patterns: tuple[str, ...]) -> bool:
+    return any(fnmatch.fnmatch(name, pattern) for pattern in patterns)
+
+
+_STORES: Dict[str, ObjectStore] = {}
+_STORES_LOCK = threading.Lock()
+
+
+def object_store_for(skills_root: Path) -> ObjectStore:
+    """Process-wide store for ``skills_root/.runtime/.objects``."""
+    root = Path(skills_root) / ".runtime" / ".objects"
+    key = os.path.abspath(root)
+    with _STORES_LOCK:
+        store = _STORES.get(key)
+        if store is None:
+            store = _STORES[key] = ObjectStore(root)
+        return store
+
+
+def slots_identical(first: Path, second: Path) -> bool:
+    """True when both slot roots carry manifests with the same tree digest."""
+    a = SlotManifest.read(Path(first) / SLOT_MANIFEST_NAME)
+    b = SlotManifest.read(Path(second) / SLOT_MANIFEST_NAME)
+    return a is not None and b is not None and a.digest == b.digest
+
+
+def manifest_digest(slot_root: Path) -> Optional[str]:
+    manifest = SlotManifest.read(Path(slot_root) / SLOT_MANIFEST_NAME)
+    return manifest.digest if manifest is not None else None
@@ -13,18 +13,31 @@ import asyncio
 import importlib
 import importlib.util
 import sys
-from inspect import isawaitable
+import threading
+from dataclasses import dataclass
+from inspect import isawaitable, iscoroutinefunction
 from pathlib import Path
-from typing import Any, Mapping, Optional
+from typing import Any, Callable, Mapping, Optional
 
 from adaos.services.agent_context import AgentContext, get_ctx
+from adaos.services.skill.dep_cache import is_dependency_env, vendor_paths
 from adaos.services.skill.runtime_env import SkillRuntimeEnvironment
 
 _SLOT_NAMES = ("A", "B")
 
 
-def _ensure_sys_paths(skill_name: str, slot_root: Path) -> None:
-    """Ensure the active slot paths are positioned at the front of ``sys.path``."""
+# shared dependency env (``.runtime/.deps/<hash>``) each skill currently has on ``sys.path``
+_SKILL_DEP_ENVS: dict[str, str] = {}
+_SKILL_DEP_ENVS_LOCK = threading.Lock()
+
+
+def _apply_skill_sys_paths(skill_name: str, slot_root: Path, *, record: bool = True) -> None:
+    """Put a slot on ``sys.path``: ``vendor``/``src`` in front, the shared env at the end.
+
+    Envs are shared between skills by lock hash, so the env this skill added
+    before is dropped only when no other skill still uses it. ``record=False``
+    leaves the bookkeeping untouched for callers that restore ``sys.path``.
+    """
 
     src_path = slot_root / "src"
     vendor_path = slot_root / "vendor"
@@ -41,17 +54,33 @@ def _ensure_sys_paths(skill_name: str, slot_root: Path) -> None:
         normalized = entry.replace("\\", "/")
         return any(normalized.endswith(suffix) for suffix in suffixes)
 
-    sys.path[:] = [p for p in sys.path if not _is_outdated(p)]
-
-    paths_to_add = []
-    if vendor_path.is_dir():
-        paths_to_add.append(str(vendor_path))
+    front: list[str] = []
+    envs: list[str] = []
+    for path in vendor_paths(vendor_path):
+        (envs if is_dependency_env(path) else front).append(str(path))
     if src_path.is_dir():
-        paths_to_add.append(str(src_path))
+        front.append(str(src_path))
+
+    with _SKILL_DEP_ENVS_LOCK:
+        previous = _SKILL_DEP_ENVS.get(skill_name)
+        others = {env for name, env in _SKILL_DEP_ENVS.items() if name != skill_name}
+        stale = {previous} - others - set(envs) if previous else set()
+        sys.path[:] = [p for p in sys.path if not _is_outdated(p) and p not in stale and p not in envs]
+        for candidate in reversed(front):
+            if candidate not in sys.path:
+                sys.path.insert(0, candidate)
+        sys.path.extend(envs)
+        if record:
+            if envs:
+                _SKILL_DEP_ENVS[skill_name] = envs[0]
+            else:
+                _SKILL_DEP_ENVS.pop(skill_name, None)
+
 
-    for candidate in reversed(paths_to_add):
-        if candidate not in sys.path:
-            sys.path.insert(0, candidate)
+def _ensure_sys_paths(skill_name: str, slot_root: Path) -> None:
+    """Ensure the active slot paths are positioned on ``sys.path``."""
+
+    _apply_skill_sys_paths(skill_name, slot_root)
 
 
 def _clear_skill_modules(skill_name: str) -> None:
@@ -105,6 +134,81 @@ class SkillPrepMissingFunctionError(SkillPrepError):
     """Raised when ``run_prep`` is not defined in ``prepare.py``."""
 
 
+@dataclass(frozen=True, slots=True)
+class _CachedHandler:
+    key: tuple[str, str, str]
+    runtime_root: Path
+    slot_path: Path
+    skill_dir: Path
+    handle: Callable[..., Any]
+
+
+class _HandlerCache:
+    """Resident cache of imported skill handlers.
+
+    Entries are keyed by ``(skill, version, slot)``.  Only one entry per skill
+    is kept because all slots share the ``skills.<name>`` module namespace; a
+    key change (slot switch, new version) evicts the previous entry and forces
+    a fresh import.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._entries: dict[str, _CachedHandler] = {}
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def get(self, key: tuple[str, str, str], runtime_root: Path) -> Optional[_CachedHandler]:
+        with self._lock:
+            entry = self._entries.get(key[0])
+            if entry is not None and entry.key == key and entry.runtime_root == runtime_root:
+                self.hits += 1
+                return entry
+            self.misses += 1
+            return None
+
+    def put(self, entry: _CachedHandler) -> None:
+        with self._lock:
+            self._entries[entry.key[0]] = entry
+
+    def invalidate(self, skill_name: Optional[str] = None) -> None:
+        with self._lock:
+            if skill_name is None:
+                self.invalidations += len(self._entries)
+                self._entries.clear()
+            elif self._entries.pop(skill_name, None) is not None:
+                self.invalidations += 1
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "invalidations": self.invalidations,
+                "entries": {name: list(entry.key[1:]) for name, entry in self._entries.items()},
+            }
+
+
+_HANDLER_CACHE = _HandlerCache()
+
+
+def invalidate_handler_cache(skill_name: Optional[str] = None) -> None:
+    """Drop cached handlers for ``skill_name`` (or for all skills).
+
+    Called by :class:`SkillManager` whenever the ``current_version``/``active``
+    markers of a skill change so the next invocation re-imports the handler.
+    """
+
+    _HANDLER_CACHE.invalidate(skill_name)
+
+
+def handler_cache_stats() -> dict[str, Any]:
+    """Return hit/miss counters and the currently cached ``(version, slot)`` per skill."""
+
+    return _HANDLER_CACHE.stats()
+
+
 def _runtime_env(skill_name: str, agent_ctx: AgentContext) -> SkillRuntimeEnvironment:
     skills_root = Path(agent_ctx.paths.skills_dir())
     return SkillRuntimeEnvironment(skills_root=skills_root, skill_name=skill_name)
@@ -187,32 +291,13 @@ def find_skill_dir(skill_name: str, *, ctx: Optional[AgentContext] = None) -> Pa
     return skill_dir
 
 
-async def run_skill_handler(
+def _load_handler(
     skill_name: str,
-    topic: str,
-    payload: Mapping[str, Any],
-    *,
-    ctx: Optional[AgentContext] = None,
-) -> Any:
-    """Execute the ``handle`` function of a skill handler.
-
-    Args:
-        skill_name: Name of the skill to execute.
-        topic: Event topic/intention passed to the handler.
-        payload: JSON-like mapping that represents the payload.
-        ctx: Optional context override.
-
-    Returns:
-        Whatever value the handler returns.
-
-    Raises:
-        SkillDirectoryNotFoundError: If the skill cannot be located.
-        SkillDirectoryAmbiguousError: If multiple directories match the skill.
-        SkillHandlerImportError: If the handler file is missing or invalid.
-    """
-
-    agent_ctx = ctx or get_ctx()
-    version = resolve_active_version(skill_name, ctx=agent_ctx)
+    agent_ctx: AgentContext,
+    env: SkillRuntimeEnvironment,
+    version: str,
+    slot: str,
+) -> _CachedHandler:
     slot_path = find_skill_slot(skill_name, ctx=agent_ctx, version=version)
     src_path = slot_path / "src"
     if not src_path.is_dir():
@@ -240,13 +325,68 @@ async def run_skill_handler(
         raise SkillHandlerMissingFunctionError(
             f"'handle' not found in {module_name}"
         )
+    return _CachedHandler(
+        key=(skill_name, version, slot),
+        runtime_root=env.runtime_root,
+        slot_path=slot_path,
+        skill_dir=skill_dir,
+        handle=handle_fn,
+    )
+
+
+async def run_skill_handler(
+    skill_name: str,
+    topic: str,
+    payload: Mapping[str, Any],
+    *,
+    ctx: Optional[AgentContext] = None,
+    reload: bool = False,
+) -> Any:
+    """Execute the ``handle`` function of a skill handler.
+
+    The handler module is imported once per ``(skill, version, slot)`` and kept
+    resident, so module-level state survives between calls.  Activation or
+    rollback through :class:`SkillManager` invalidates the cached entry.
 
+    Args:
+        skill_name: Name of the skill to execute.
+        topic: Event topic/intention passed to the handler.
+        payload: JSON-like mapping that represents the payload.
+        ctx: Optional context override.
+        reload: Force a fresh import of the handler module.
+
+    Returns:
+        Whatever value the handler returns.
+
+    Raises:
+        SkillDirectoryNotFoundError: If the skill cannot be located.
+        SkillDirectoryAmbiguousError: If multiple directories match the skill.
+        SkillHandlerImportError: If the handler file is missing or invalid.
+    """
+
+    agent_ctx = ctx or get_ctx()
+    env = _runtime_env(skill_name, agent_ctx)
+    version = resolve_active_version(skill_name, ctx=agent_ctx)
+    key = (skill_name, version, env.read_active_slot(version))
+    if reload:
+        _HANDLER_CACHE.invalidate(skill_name)
+    entry = _HANDLER_CACHE.get(key, env.runtime_root)
+    if entry is None:
+        entry = _load_handler(skill_name, agent_ctx, env, version, key[2])
+        _HANDLER_CACHE.put(entry)
+
+    skill_dir = entry.skill_dir
     skill_ctx_port = agent_ctx.skill_ctx
     previous = skill_ctx_port.get()
     if not skill_ctx_port.set(skill_name, skill_dir):
         raise SkillRuntimeError(f"failed to establish context for skill '{skill_name}'")
     try:
-        result = handle_fn(topic, payload)
+        if iscoroutinefunction(entry.handle):
+            result = entry.handle(topic, payload)
+        else:
+            # a synchronous handler (blocking HTTP, sleeps) must not stall the loop:
+            # parallel scenario steps would serialize and their timeouts could not fire
+            result = await asyncio.to_thread(entry.handle, topic, payload)
         if isawaitable(result):
             result = await result
         return result
@@ -263,6 +403,7 @@ def run_skill_handler_sync(
     payload: Mapping[str, Any],
     *,
     ctx: Optional[AgentContext] = None,
+    reload: bool = False,
 ) -> Any:
     """Synchronously execute :func:`run_skill_handler`.
 
@@ -276,7 +417,7 @@ def run_skill_handler_sync(
     try:
         asyncio.get_running_loop()
     except RuntimeError:
-        return asyncio.run(run_skill_handler(skill_name, topic, payload, ctx=ctx))
+        return asyncio.run(run_skill_handler(skill_name, topic, payload, ctx=ctx, reload=reload))
     raise RuntimeError("run_skill_handler_sync() cannot be used inside an active event loop")
 
 
@@ -388,6 +529,8 @@ __all__ = [
     "find_skill_dir",
     "run_skill_handler",
     "run_skill_handler_sync",
+    "invalidate_handler_cache",
+    "handler_cache_stats",
     "run_skill_prep",
     "run_dev_skill_prep",
 ]
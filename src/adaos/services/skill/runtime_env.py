@@ -3,7 +3,10 @@
 This module encapsulates the on-disk layout used by the new skill lifecycle
 in AdaOS.  The layout is intentionally simple and filesystem friendly so that
 it works on both Linux and Windows without relying on advanced features such
-as hardlinks or POSIX specific flags.  The public API is intentionally small
+as POSIX specific flags.  Staged sources are hardlinked from a shared
+content-addressed store (``.runtime/.objects``, see
+:mod:`adaos.services.skill.object_store`) and silently fall back to copies
+where links are unavailable.  The public API is intentionally small
 so that higher level services (CLI/API) can orchestrate installations,
 activations and rollbacks without duplicating path arithmetic.
 
@@ -23,10 +26,12 @@ skills/.runtime/<name>/<version>/
                 logs/
                 tmp/
             resolved.manifest.json
+            sources.manifest.json # hashes of the staged files
         B/ ...
     active                        # text file with current slot name
     previous                      # optional previous healthy slot
     meta.json                     # version metadata (tests etc.)
+skills/.runtime/.objects/<aa>/<sha256>   # shared read-only file objects
 data/
     db/
     files/
@@ -45,6 +50,8 @@ import subprocess
 from pathlib import Path
 from typing import Iterable, Optional
 
+from adaos.services.skill.object_store import SLOT_MANIFEST_NAME
+
 
 _SLOT_NAMES: tuple[str, ...] = ("A", "B")
 
@@ -69,6 +76,10 @@ class SkillSlotPaths:
     def skill_env_path(self) -> Path:
         return self.runtime_dir / ".skill_env.json"
 
+    @property
+    def sources_manifest(self) -> Path:
+        return self.root / SLOT_MANIFEST_NAME
+
 
 class SkillRuntimeEnvironment:
     """Encapsulates filesystem layout for skill runtime deployments."""
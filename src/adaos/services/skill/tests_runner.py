@@ -1,14 +1,28 @@
-"""Self-test runner for skills runtime pipeline."""
+"""Self-test runner for skills runtime pipeline.
+
+Suites run concurrently (each one is an independent subprocess with its own
+timeout from ``_TEST_TIMEOUTS``); their output is buffered and written to the
+log in suite order. Passing results of a prepared slot can be cached by the
+slot's content digest (see :mod:`adaos.services.skill.object_store`), so
+re-preparing an unchanged skill does not run the suites again.
+"""
 
 from __future__ import annotations
 
+import hashlib
+import io
+import json
 import os
 import subprocess
 import sys
-from dataclasses import dataclass
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass
 from pathlib import Path
-from typing import Dict, Iterable, Mapping, Sequence
+from typing import Callable, Dict, Iterable, Mapping, Optional, Sequence
 
+from adaos.services.skill.dep_cache import vendor_paths
+from adaos.services.skill.object_store import manifest_digest
 from adaos.services.testing.bootstrap import skill_tests_root
 
 
@@ -24,6 +38,8 @@ _TEST_TIMEOUTS = {
     "contract": 30,
     "e2e-dryrun": 60,
 }
+_MAX_PARALLEL_SUITES = 3
+_CACHE_MAX_AGE_SEC = 14 * 24 * 3600
 
 
 def run_tests(
@@ -38,6 +54,8 @@ def run_tests(
     skill_version: str | None = None,
     slot_current_dir: Path | None = None,
     dev_mode: bool = False,
+    cache_dir: Path | None = None,
+    max_workers: int | None = None,
 ) -> Dict[str, TestResult]:
     results: Dict[str, TestResult] = {}
     log_path.parent.mkdir(parents=True, exist_ok=True)
@@ -73,8 +91,7 @@ def run_tests(
         # runtime: src + vendor
         src_root = root  # root у нас = src/skills/<name>, см. существующую логику вызова
         vendor_root = src_root.parent / "vendor"
-        if vendor_root.exists():
-            python_entries.append(str(vendor_root))
+        python_entries.extend(str(path) for path in vendor_paths(vendor_root))
         python_entries.append(str(src_root))
 
     for p in python_paths or []:
@@ -93,26 +110,48 @@ def run_tests(
     else:
         runtime_tests_root = dev_tests_root
 
+    cache_key = None
+    if cache_dir is not None and not dev_mode and slot_current_dir is not None:
+        cache_key = _cache_key(
+            slot_current_dir,
+            interpreter=interpreter,
+            python_paths=python_paths,
+            skill_env_path=skill_env_path,
+            extra_env=extra_env,
+        )
+    if cache_key is not None:
+        cached = _load_cached(cache_dir, cache_key)
+        if cached is not None:
+            with log_path.open("w", encoding="utf-8") as log:
+                log.write(f"# cached pass for content {cache_key} — suites not re-run\n")
+            return cached
+
+    workers = max(1, max_workers or _MAX_PARALLEL_SUITES)
     with log_path.open("w", encoding="utf-8") as log:
         if not dev_mode:
             # старые suite-скрипты
-            suite_results: Dict[str, TestResult] = {}
+            jobs: list[tuple[str, Callable[[io.StringIO], Optional[TestResult]]]] = []
             for suite in ("smoke", "contract", "e2e-dryrun"):
                 suite_dir = runtime_tests_root / suite
                 if not suite_dir.exists():
                     continue
-                suite_results[suite] = _run_suite(
-                    suite,
-                    suite_dir,
-                    timeout=_TEST_TIMEOUTS.get(suite, 30),
-                    log=log,
-                    interpreter=interpreter,
-                    env=env_template,
-                    skill_name=skill_name,
-                    skill_version=skill_version,
-                    slot_dir=slot_current_dir,
+                jobs.append(
+                    (
+                        suite,
+                        lambda buf, suite=suite, suite_dir=suite_dir: _run_suite(
+                            suite,
+                            suite_dir,
+                            timeout=_TEST_TIMEOUTS.get(suite, 30),
+                            log=buf,
+                            interpreter=interpreter,
+                            env=env_template,
+                            skill_name=skill_name,
+                            skill_version=skill_version,
+                            slot_dir=slot_current_dir,
+                        ),
+                    )
                 )
-            results.update(suite_results)
+            results.update(_run_parallel(jobs, log=log, workers=workers))
 
             need_fallback = (
                 not results or all(res.status == "skipped" for res in results.values())
@@ -143,22 +182,117 @@ def run_tests(
             if not any((dev_tests_root / n).exists() for n in ("smoke", "contract", "e2e-dryrun", "e2e")):
                 dev_groups = [("pytest", dev_tests_root, None)]
 
-            for suite_name, suite_dir, marker in dev_groups:
-                outcome = _run_pytest_suite(
-                    suite_name=suite_name,
-                    tests_dir=suite_dir or dev_tests_root,
-                    marker=marker,
-                    timeout=_TEST_TIMEOUTS.get(suite_name, 60),
-                    log=log,
-                    interpreter=interpreter,
-                    env=env_template,
+            jobs = [
+                (
+                    suite_name,
+                    lambda buf, suite_name=suite_name, suite_dir=suite_dir, marker=marker: _run_pytest_suite(
+                        suite_name=suite_name,
+                        tests_dir=suite_dir or dev_tests_root,
+                        marker=marker,
+                        timeout=_TEST_TIMEOUTS.get(suite_name, 60),
+                        log=buf,
+                        interpreter=interpreter,
+                        env=env_template,
+                    ),
                 )
-                if outcome is not None:
-                    results[suite_name] = outcome
+                for suite_name, suite_dir, marker in dev_groups
+            ]
+            results.update(_run_parallel(jobs, log=log, workers=workers))
 
+    if cache_key is not None and results and all(res.status == "passed" for res in results.values()):
+        _store_cached(cache_dir, cache_key, results)
     return results
 
 
+def _run_parallel(
+    jobs: Sequence[tuple[str, Callable[[io.StringIO], Optional[TestResult]]]],
+    *,
+    log,
+    workers: int,
+) -> Dict[str, TestResult]:
+    """Run suite jobs concurrently; logs are appended in job order once all finish."""
+    if not jobs:
+        return {}
+    buffers = [io.StringIO() for _ in jobs]
+    with ThreadPoolExecutor(max_workers=min(workers, len(jobs)), thread_name_prefix="skill-tests") as pool:
+        futures = [pool.submit(job, buf) for (_, job), buf in zip(jobs, buffers)]
+    results: Dict[str, TestResult] = {}
+    for (name, _), buf, future in zip(jobs, buffers, futures):
+        log.write(buf.getvalue())
+        try:
+            outcome = future.result()
+        except Exception as exc:
+            outcome = TestResult(name=name, status="error", detail=str(exc))
+        if outcome is not None:
+            results[name] = outcome
+    return results
+
+
+def _cache_key(
+    slot_dir: Path,
+    *,
+    interpreter: Path | None,
+    python_paths: Sequence[str] | None,
+    skill_env_path: Path | None,
+    extra_env: Mapping[str, str] | None,
+) -> str | None:
+    digest = manifest_digest(slot_dir)
+    if digest is None:
+        return None
+    h = hashlib.sha256()
+    h.update(digest.encode("ascii"))
+    h.update(str(interpreter or sys.executable).encode("utf-8"))
+    for entry in python_paths or ():
+        h.update(b"\0" + str(entry).encode("utf-8"))
+    if skill_env_path is not None:
+        try:
+            h.update(b"\0env\0" + Path(skill_env_path).read_bytes())
+        except OSError:
+            pass
+    for key, value in sorted((extra_env or {}).items()):
+        h.update(f"\0{key}={value}".encode("utf-8"))
+    return h.hexdigest()[:32]
+
+
+def _load_cached(cache_dir: Path, key: str) -> Dict[str, TestResult] | None:
+    try:
+        path = cache_dir / f"{key}.json"
+        payload = json.loads(path.read_text(encoding="utf-8"))
+        results = {name: TestResult(**item) for name, item in payload["results"].items()}
+        os.utime(path, None)  # keep entries that are still being hit
+        return results
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+
+
+def _store_cached(cache_dir: Path, key: str, results: Mapping[str, TestResult]) -> None:
+    try:
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        path = cache_dir / f"{key}.json"
+        tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        payload = {"created_at": time.time(), "results": {name: asdict(res) for name, res in results.items()}}
+        tmp.write_text(json.dumps(payload, ensure_ascii=False), encoding="utf-8")
+        os.replace(tmp, path)
+    except OSError:
+        pass
+
+
+def prune_test_cache(cache_dir: Path, *, max_age: float = _CACHE_MAX_AGE_SEC) -> int:
+    """Drop cached passes older than ``max_age`` seconds."""
+    if not cache_dir.exists():
+        return 0
+    removed = 0
+    now = time.time()
+    for entry in cache_dir.glob("*.json"):
+        try:
+            if now - entry.stat().st_mtime > max_age:
+                entry.unlink()
+                removed += 1
+        except OSError:
+            continue
+    return removed
+
+
 def _run_pytest_suite(
     suite_name: str,
     tests_dir: Path,
@@ -171,11 +305,11 @@ def _run_pytest_suite(
 ) -> TestResult | None:
     # Запуск из каталога тестов, цель "."; расширяем правило поиска файлов
     local_cfg = tests_dir / "pytest.dev.ini"
+    cfg_text = "[pytest]\n" "testpaths = .\n" "python_files = test_*.py *_test.py *.spec.py\n" "addopts = -q -vv -s --maxfail=1\n" "log_cli = false\n"
     try:
-        local_cfg.write_text(
-            "[pytest]\n" "testpaths = .\n" "python_files = test_*.py *_test.py *.spec.py\n" "addopts = -q -vv -s --maxfail=1\n" "log_cli = false\n",
-            encoding="utf-8",
-        )
+        # группы идут параллельно в одном каталоге — не переписываем готовый конфиг
+        if not local_cfg.exists() or local_cfg.read_text(encoding="utf-8") != cfg_text:
+            local_cfg.write_text(cfg_text, encoding="utf-8")
     except Exception:
         pass
 
@@ -192,16 +326,20 @@ def _run_pytest_suite(
         f"ENV.ADAOS_DEV_SKILL_DIR={env.get('ADAOS_DEV_SKILL_DIR')}\n"
         f"ENV.PYTHONPATH={env.get('PYTHONPATH','')}\n\n"
     )
-    proc = subprocess.run(
-        cmd,
-        cwd=str(tests_dir),
-        stdout=log,
-        stderr=log,
-        env=dict(env),
-        timeout=timeout,
-        check=False,
-        text=False,
-    )
+    try:
+        proc = subprocess.run(
+            cmd,
+            cwd=str(tests_dir),
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            env=dict(env),
+            timeout=timeout,
+            check=False,
+        )
+    except subprocess.TimeoutExpired as exc:
+        log.write(_decode(exc.output))
+        return TestResult(name=suite_name, status="error", detail=f"timed out after {timeout}s")
+    log.write(_decode(proc.stdout))
     if proc.returncode == 0:
         return TestResult(name=suite_name, status="passed", detail=None)
     if proc.returncode == 5:
@@ -236,25 +374,37 @@ def _run_suite(
     if not commands:
         return TestResult(name=name, status="skipped", detail="no tests found")
 
+    # timeout applies to the whole suite, not to each command
+    deadline = time.monotonic() + timeout
     for command in commands:
-        proc = subprocess.run(
-            command,
-            cwd=suite_dir,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.STDOUT,
-            text=True,
-            timeout=timeout,
-            env=env,
-        )
-        print(proc)
         log.write(f"$ {' '.join(command)}\n")
-        log.write(proc.stdout or "")
+        try:
+            proc = subprocess.run(
+                command,
+                cwd=suite_dir,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.STDOUT,
+                timeout=max(0.1, deadline - time.monotonic()),
+                env=env,
+            )
+        except subprocess.TimeoutExpired as exc:
+            log.write(_decode(exc.output) + "\n")
+            return TestResult(name=name, status="error", detail=f"timed out after {timeout}s")
+        log.write(_decode(proc.stdout))
         log.write("\n")
         if proc.returncode != 0:
             return TestResult(name=name, status="failed", detail=f"command {' '.join(command)} exited {proc.returncode}")
     return TestResult(name=name, status="passed")
 
 
+def _decode(data: bytes | str | None) -> str:
+    if not data:
+        return ""
+    if isinstance(data, str):
+        return data
+    return data.decode("utf-8", errors="replace")
+
+
 def _discover_commands(
     suite_dir: Path,
     *,
@@ -0,0 +1,500 @@
+"""Warm worker processes for :meth:`SkillManager.run_tool`.
+
+Each prepared slot of a skill gets a small pool of long-lived worker
+processes. Workers are forked from a forkserver template that has already
+imported the AdaOS runtime. On start a worker builds its own agent context,
+pre-imports the slot's tool modules and then serves calls received over a
+pipe, so a call costs one round trip instead of a context setup and import.
+
+A call that exceeds its timeout kills the worker (a thread cannot be
+cancelled, a process can) and a fresh one is started in its place. Events a
+tool publishes inside a worker are sent over the same pipe and re-published
+on the caller's bus.
+
+Pools are off until :func:`start_tool_workers` is called (the API server does
+so on startup); without them ``run_tool`` executes in-process. A skill can
+opt out with ``runtime.isolation: inproc`` in its manifest.
+"""
+
+from __future__ import annotations
+
+import importlib
+import logging
+import multiprocessing
+import os
+import signal
+import sys
+import threading
+import time
+import traceback
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, Mapping, Optional, Tuple
+
+__all__ = [
+    "WorkerSpec",
+    "ToolWorkerPool",
+    "ToolWorkerPools",
+    "start_tool_workers",
+    "stop_tool_workers",
+    "get_tool_workers",
+    "DEFAULT_POOL_SIZE",
+    "IDLE_TTL",
+]
+
+_LOG = logging.getLogger("adaos.skill.workers")
+
+DEFAULT_POOL_SIZE = 2
+IDLE_TTL = 600.0
+_READY_TIMEOUT = 60.0
+_STOP_GRACE = 1.0
+# imported once by the forkserver template, inherited by every worker
+_PRELOAD = ["adaos.apps.bootstrap", "adaos.skills.runtime_runner", "adaos.services.skill.tool_workers"]
+
+
+@dataclass(frozen=True, slots=True)
+class WorkerSpec:
+    """Everything a worker needs to serve one prepared slot of a skill."""
+
+    skill: str
+    version: str
+    slot: str
+    skill_dir: Path
+    extra_paths: Tuple[Path, ...]
+    skill_env_path: Path
+    secrets_path: Path
+    preload: Tuple[str, ...] = ()
+    # changes whenever the slot is re-prepared or re-activated
+    stamp: Tuple[Any, ...] = ()
+
+    @property
+    def key(self) -> Tuple[Any, ...]:
+        return (self.skill, self.version, self.slot, self.stamp)
+
+
+# ----------------------------------------------------------------------
+# Worker process
+# ----------------------------------------------------------------------
+class _ForwardingBus:
+    """Worker-side bus: local subscribers as usual, every event is also sent to the parent."""
+
+    def __init__(self, local: Any, send: Callable[[Any], None]) -> None:
+        self._local = local
+        self._send = send
+
+    def publish(self, event: Any) -> None:
+        self._local.publish(event)
+        try:
+            self._send(("event", event))
+        except Exception:
+            _LOG.debug("event %s was not forwarded to the parent", getattr(event, "type", "?"), exc_info=True)
+
+    def subscribe(self, type_prefix: str, handler: Callable[[Any], None]) -> None:
+        self._local.subscribe(type_prefix, handler)
+
+    def unsubscribe(self, type_prefix: str, handler: Callable[[Any], None]) -> bool:
+        return self._local.unsubscribe(type_prefix, handler)
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._local, name)
+
+
+def _portable_error(exc: BaseException) -> BaseException:
+    """Exceptions of skill-defined classes cannot be unpickled by the parent."""
+    module = type(exc).__module__ or ""
+    if module == "builtins" or module.startswith("adaos."):
+        return exc
+    return RuntimeError(f"{type(exc).__name__}: {exc}")
+
+
+def _init_worker(spec: WorkerSpec, settings: Any, send: Callable[[Any], None]) -> None:
+    from adaos.apps.bootstrap import init_ctx
+    from adaos.services.agent_context import set_ctx
+    from adaos.services.crypto.secrets_service import SecretsService
+    from adaos.services.skill.dep_cache import is_dependency_env
+    from adaos.services.skill.secrets_backend import SkillSecretsBackend
+
+    ctx = init_ctx(settings)
+    ctx = ctx.with_overrides(
+        bus=_ForwardingBus(ctx.bus, send),
+        secrets=SecretsService(SkillSecretsBackend(spec.secrets_path), ctx.caps),
+    )
+    set_ctx(ctx)
+    if not ctx.skill_ctx.set(spec.skill, spec.skill_dir):
+        raise RuntimeError(f"failed to establish context for skill '{spec.skill}'")
+    # the process serves a single slot, so the process environment is ours
+    os.environ["ADAOS_SKILL_ENV_PATH"] = str(spec.skill_env_path)
+
+    for path in (spec.skill_dir, *spec.extra_paths):
+        resolved = str(Path(path).resolve())
+        if resolved in sys.path:
+            continue
+        if is_dependency_env(Path(resolved)):
+            sys.path.append(resolved)  # the shared env goes after the host site-packages
+        else:
+            sys.path.insert(0, resolved)
+    for module in spec.preload:
+        try:
+            importlib.import_module(module)
+        except Exception:
+            _LOG.warning("preload of %s for skill %s failed", module, spec.skill, exc_info=True)
+
+
+def _worker_main(conn: Any, spec: WorkerSpec, settings: Any) -> None:
+    # the parent owns the lifetime of the worker; Ctrl+C in a terminal must not kill it mid-call
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    send_lock = threading.Lock()
+
+    def send(message: Any) -> None:
+        with send_lock:
+            conn.send(message)
+
+    try:
+        _init_worker(spec, settings, send)
+    except BaseException as exc:
+        send(("init_error", _portable_error(exc), traceback.format_exc()))
+        return
+    send(("ready", os.getpid()))
+
+    from adaos.services.skill.memory_store import flush_skill_memory
+    from adaos.skills.runtime_runner import execute_tool
+
+    while True:
+        try:
+            request = conn.recv()
+        except (EOFError, OSError):
+            break
+        if request is None:
+            break
+        module, attr, payload = request
+        try:
+            reply: Tuple[Any, ...] = (
+                "ok",
+                execute_tool(spec.skill_dir, module=module, attr=attr, payload=payload, extra_paths=spec.extra_paths),
+            )
+        except BaseException as exc:
+            reply = ("error", _portable_error(exc), traceback.format_exc())
+        try:
+            flush_skill_memory(spec.skill_env_path)
+        except Exception:
+            _LOG.warning("flushing skill memory of %s failed", spec.skill, exc_info=True)
+        try:
+            send(reply)
+        except Exception as exc:
+            send(("error", TypeError(f"tool result cannot be sent back: {exc}"), ""))
+
+
+# ----------------------------------------------------------------------
+# Parent side
+# ----------------------------------------------------------------------
+class _Worker:
+    __slots__ = ("proc", "conn", "ready", "last_used")
+
+    def __init__(self, mp_context: Any, spec: WorkerSpec, settings: Any) -> None:
+        parent_conn, child_conn = mp_context.Pipe()
+        self.proc = mp_context.Process(
+            target=_worker_main,
+            args=(child_conn, spec, settings),
+            name=f"adaos-tool-{spec.skill}",
+            daemon=True,
+        )
+        self.proc.start()
+        child_conn.close()
+        self.conn = parent_conn
+        self.ready = False
+        self.last_used = time.monotonic()
+
+    def kill(self) -> None:
+        try:
+            self.proc.kill()
+        except Exception:
+            pass
+        self.proc.join(timeout=5)
+        self.conn.close()
+
+    def stop(self) -> None:
+        try:
+            self.conn.send(None)
+        except Exception:
+            pass
+        self.proc.join(timeout=_STOP_GRACE)
+        if self.proc.is_alive():
+            self.kill()
+        else:
+            self.conn.close()
+
+
+class _Timeout(Exception):
+    pass
+
+
+class ToolWorkerPool:
+    """Up to ``size`` warm workers serving one :class:`WorkerSpec`."""
+
+    def __init__(self, spec: WorkerSpec, *, settings: Any, mp_context: Any, size: int = DEFAULT_POOL_SIZE) -> None:
+        self.spec = spec
+        self.size = max(1, int(size))
+        self._settings = settings
+        self._mp = mp_context
+        self._cond = threading.Condition()
+        self._idle: list[_Worker] = []
+        self._count = 0
+        self._closed = False
+
+    # ------------------------------------------------------------------
+    # Workers
+    # ------------------------------------------------------------------
+    def warm(self) -> None:
+        """Start one worker ahead of the first call if none exists yet."""
+        with self._cond:
+            if self._closed or self._count:
+                return
+            self._count += 1
+        try:
+            worker = _Worker(self._mp, self.spec, self._settings)
+        except Exception:
+            with self._cond:
+                self._count -= 1
+                self._cond.notify()
+            _LOG.warning("starting tool worker for %s failed", self.spec.skill, exc_info=True)
+            return
+        self._release(worker)
+
+    def _acquire(self) -> _Worker:
+        with self._cond:
+            while True:
+                if self._closed:
+                    raise RuntimeError(f"tool workers of skill '{self.spec.skill}' are shut down")
+                self._reap_idle()
+                while self._idle:
+                    worker = self._idle.pop()
+                    if worker.proc.is_alive():
+                        return worker
+                    self._count -= 1
+                    worker.conn.close()
+                if self._count < self.size:
+                    self._count += 1
+                    break
+                self._cond.wait()
+        try:
+            return _Worker(self._mp, self.spec, self._settings)
+        except BaseException:
+            with self._cond:
+                self._count -= 1
+                self._cond.notify()
+            raise
+
+    def _reap_idle(self) -> None:
+        # oldest first; one warm worker always stays
+        now = time.monotonic()
+        while len(self._idle) > 1 and now - self._idle[0].last_used > IDLE_TTL:
+            self._count -= 1
+            self._idle.pop(0).stop()
+
+    def _release(self, worker: _Worker) -> None:
+        worker.last_used = time.monotonic()
+        with self._cond:
+            if not self._closed:
+                self._idle.append(worker)
+                self._cond.notify()
+                return
+            self._count -= 1
+        worker.stop()
+
+    def _discard(self, worker: _Worker) -> None:
+        worker.kill()
+        with self._cond:
+            self._count -= 1
+            self._cond.notify()
+        # keep the pool warm after a killed or crashed worker
+        self.warm()
+
+    # ------------------------------------------------------------------
+    # Calls
+    # ------------------------------------------------------------------
+    def call(
+        self,
+        module: Optional[str],
+        attr: str,
+        payload: Mapping[str, Any],
+        *,
+        timeout: Optional[float] = None,
+        bus: Any = None,
+        label: str = "",
+    ) -> Any:
+        worker = self._acquire()
+        try:
+            if not worker.ready:
+                self._await_ready(worker, bus)
+            deadline = None if not timeout else time.monotonic() + float(timeout)
+            worker.conn.send((module, attr, dict(payload)))
+            reply = self._await_reply(worker, deadline, bus)
+        except _Timeout:
+            self._discard(worker)
+            raise TimeoutError(f"tool '{label or attr}' timed out after {timeout} seconds") from None
+        except BaseException:
+            self._discard(worker)
+            raise
+        self._release(worker)
+        if reply[0] == "ok":
+            return reply[1]
+        if reply[2]:
+            _LOG.debug("tool %s:%s failed in worker:\n%s", self.spec.skill, label or attr, reply[2])
+        raise reply[1]
+
+    def _await_ready(self, worker: _Worker, bus: Any) -> None:
+        reply = self._await_reply(worker, time.monotonic() + _READY_TIMEOUT, bus, starting=True)
+        if reply[0] == "init_error":
+            _LOG.warning("tool worker for %s failed to start:\n%s", self.spec.skill, reply[2])
+            raise RuntimeError(f"tool worker for skill '{self.spec.skill}' failed to start: {reply[1]}")
+        worker.ready = True
+
+    def _await_reply(self, worker: _Worker, deadline: Optional[float], bus: Any, *, starting: bool = False) -> Tuple[Any, ...]:
+        while True:
+            remaining = None if deadline is None else deadline - time.monotonic()
+            if remaining is not None and (remaining <= 0 or not worker.conn.poll(remaining)):
+                if starting:
+                    raise RuntimeError(f"tool worker for skill '{self.spec.skill}' did not start in {_READY_TIMEOUT:.0f}s")
+                raise _Timeout()
+            try:
+                message = worker.conn.recv()
+            except (EOFError, OSError) as exc:
+                worker.proc.join(timeout=1)
+                raise RuntimeError(f"tool worker for skill '{self.spec.skill}' exited (code {worker.proc.exitcode})") from exc
+            except Exception as exc:
+                # the message was consumed; the worker itself is fine
+                return ("error", RuntimeError(f"tool reply could not be decoded: {exc}"), "")
+            if message[0] == "event":
+                if bus is not None:
+                    try:
+                        bus.publish(message[1])
+                    except Exception:
+                        _LOG.warning("re-publishing worker event failed", exc_info=True)
+                continue
+            return message
+
+    # ------------------------------------------------------------------
+    # Lifecycle
+    # ------------------------------------------------------------------
+    def close(self) -> None:
+        with self._cond:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            self._count -= len(idle)
+            self._cond.notify_all()
+        for worker in idle:
+            worker.stop()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._cond:
+            return {
+                "version": self.spec.version,
+                "slot": self.spec.slot,
+                "workers": self._count,
+                "idle": len(self._idle),
+            }
+
+
+def _mp_context(method: Optional[str] = None) -> Any:
+    # plain fork of a threaded server (event loop, sqlite, watchers) is unsafe;
+    # the forkserver template is single-threaded and already has the runtime imported
+    methods = multiprocessing.get_all_start_methods()
+    method = method or ("forkserver" if "forkserver" in methods else "spawn")
+    mp_context = multiprocessing.get_context(method)
+    if method == "forkserver":
+        mp_context.set_forkserver_preload(_PRELOAD)
+    return mp_context
+
+
+class ToolWorkerPools:
+    """Registry of worker pools, one per ``(skill, version, slot)``."""
+
+    def __init__(self, settings: Any, *, size: int = DEFAULT_POOL_SIZE, start_method: Optional[str] = None) -> None:
+        self.settings = settings
+        self.size = size
+        self._mp = _mp_context(start_method)
+        self._lock = threading.Lock()
+        self._pools: Dict[Tuple[str, str, str], ToolWorkerPool] = {}
+        self._closed = False
+
+    def pool_for(self, spec: WorkerSpec, *, size: Optional[int] = None) -> ToolWorkerPool:
+        slot_key = (spec.skill, spec.version, spec.slot)
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("tool workers are stopped")
+            pool = self._pools.get(slot_key)
+            if pool is not None and pool.spec.key == spec.key:
+                return pool
+            stale = pool
+            pool = self._pools[slot_key] = ToolWorkerPool(spec, settings=self.settings, mp_context=self._mp, size=size or self.size)
+        if stale is not None:
+            stale.close()
+        return pool
+
+    def call(
+        self,
+        spec: WorkerSpec,
+        module: Optional[str],
+        attr: str,
+        payload: Mapping[str, Any],
+        *,
+        timeout: Optional[float] = None,
+        bus: Any = None,
+        label: str = "",
+        size: Optional[int] = None,
+    ) -> Any:
+        return self.pool_for(spec, size=size).call(module, attr, payload, timeout=timeout, bus=bus, label=label)
+
+    def retire(self, skill: str) -> None:
+        """Shut down every pool of ``skill`` (after activation, rollback or uninstall)."""
+        with self._lock:
+            retired = [key for key in self._pools if key[0] == skill]
+            pools = [self._pools.pop(key) for key in retired]
+        for pool in pools:
+            pool.close()
+
+    def close(self) -> None:
+        with self._lock:
+            self._closed = True
+            pools, self._pools = list(self._pools.values()), {}
+        for pool in pools:
+            pool.close()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            pools = dict(self._pools)
+        return {f"{skill}@{version}/{slot}": pool.stats() for (skill, version, slot), pool in pools.items()}
+
+
+_POOLS: ToolWorkerPools | None = None
+_POOLS_LOCK = threading.Lock()
+
+
+def start_tool_workers(settings: Any, *, size: Optional[int] = None) -> Optional[ToolWorkerPools]:
+    """Enable worker pools for ``run_tool`` in this process.
+
+    ``ADAOS_TOOL_WORKERS=0`` keeps tools in-process; a positive number sets
+    the pool size per slot.
+    """
+    global _POOLS
+    raw = os.getenv("ADAOS_TOOL_WORKERS", "").strip().lower()
+    if raw in {"0", "off", "false", "no"}:
+        return None
+    if size is None:
+        size = int(raw) if raw.isdigit() else DEFAULT_POOL_SIZE
+    with _POOLS_LOCK:
+        if _POOLS is None:
+            _POOLS = ToolWorkerPools(settings, size=size)
+        return _POOLS
+
+
+def stop_tool_workers() -> None:
+    global _POOLS
+    with _POOLS_LOCK:
+        pools, _POOLS = _POOLS, None
+    if pools is not None:
+        pools.close()
+
+
+def get_tool_workers() -> Optional[ToolWorkerPools]:
+    return _POOLS
@@ -52,5 +52,6 @@ class SkillUpdateService:
         else:
             git.pull(str(skill_path))
 
+        repo.invalidate(skill_id)
         refreshed = repo.get(skill_id) or meta
         return SkillUpdateResult(updated=True, version=getattr(refreshed, "version", version))
@@ -1,10 +1,11 @@
 from __future__ import annotations
 from pathlib import Path
 from typing import Any, Dict, Optional
-import json, os, requests
+import json, os
 from adaos.ports.subnet_kv import SubnetKVPort
 from adaos.services.node_config import load_config
 from adaos.services.agent_context import get_ctx
+from adaos.services.hub_http import get_hub_http
 from adaos.services.settings import Settings
 
 
@@ -58,7 +59,7 @@ class MemberSubnetKV(SubnetKVPort):
 
     def get(self, key: str, default: Any = None) -> Any:
         url = f"{self._conf.hub_url.rstrip('/')}/api/subnet/context/{key}"
-        r = requests.get(url, headers={"X-AdaOS-Token": self._conf.token}, timeout=3)
+        r = get_hub_http().get(url, headers={"X-AdaOS-Token": self._conf.token}, timeout=3)
         if r.status_code == 200:
             try:
                 return r.json().get("value", default)
@@ -68,7 +69,7 @@ class MemberSubnetKV(SubnetKVPort):
 
     def set(self, key: str, value: Any) -> bool:
         url = f"{self._conf.hub_url.rstrip('/')}/api/subnet/context/{key}"
-        r = requests.put(url, json={"value": value}, headers={"X-AdaOS-Token": self._conf.token}, timeout=3)
+        r = get_hub_http().put_json(url, {"value": value}, headers={"X-AdaOS-Token": self._conf.token}, timeout=3)
         return r.status_code == 200
 
 
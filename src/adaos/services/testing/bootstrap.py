@@ -223,8 +223,10 @@ def mount_skill_paths_for_testing(
 
     sys.path[:] = [entry for entry in sys.path if not _is_outdated(entry)]
 
+    from adaos.services.skill.dep_cache import vendor_paths
+
     candidates: list[str] = []
-    for candidate in (vendor, src):
+    for candidate in (*vendor_paths(vendor), src):
         if candidate.is_dir():
             candidate_str = str(candidate)
             if candidate_str not in sys.path:
@@ -23,9 +23,15 @@ def execute_tool(
     if str(skill_path) not in sys.path:
         sys.path.insert(0, str(skill_path))
 
+    from adaos.services.skill.dep_cache import is_dependency_env
+
     for extra in extra_paths or ():
         extra_path = Path(extra).resolve()
-        if str(extra_path) not in sys.path:
+        if str(extra_path) in sys.path:
+            continue
+        if is_dependency_env(extra_path):
+            sys.path.append(str(extra_path))  # shared env must not shadow host site-packages
+        else:
             sys.path.insert(0, str(extra_path))
 
     module_name = module or "handlers.main"
@@ -273,6 +273,7 @@ def _autocontext(tmp_path, monkeypatch):
         yield ctx
     finally:
         clear_ctx()
+        sql.close()
 
 
 def pytest_sessionstart(session):
@@ -0,0 +1,90 @@
+# tests/test_event_log.py
+import gzip
+import json
+
+import pytest
+
+from adaos.services.event_log import EventLogWriter, lines_since, parse_cursor, tail_lines
+
+
+def test_writer_batches_and_flushes(tmp_path):
+    path = tmp_path / "events.log"
+    writer = EventLogWriter(path, flush_interval=60.0)
+    for i in range(100):
+        assert writer.write({"topic": "t", "i": i})
+    assert writer.write_many([{"topic": "b", "i": i} for i in range(10)]) == 10
+    assert writer.flush()
+    lines = [json.loads(ln) for ln in path.read_text(encoding="utf-8").splitlines()]
+    assert len(lines) == 110
+    assert lines[0]["i"] == 0 and lines[-1]["topic"] == "b"
+    writer.close()
+    assert not writer.write({"topic": "late"})
+
+
+def test_writer_rotates_and_compresses(tmp_path):
+    path = tmp_path / "events.log"
+    writer = EventLogWriter(path, max_bytes=4096, keep=2, flush_interval=60.0)
+    for i in range(300):
+        writer.write({"ts": float(i), "topic": "rot", "i": i, "pad": "x" * 40})
+    writer.close()
+
+    assert writer.stats()["rotations"] >= 3
+    sealed = sorted(tmp_path.glob("events.*.log.gz"))
+    assert len(sealed) == 2 and len(list(tmp_path.glob("events.*.idx"))) == 2
+    assert not list(tmp_path.glob("*.pending"))
+    # поблочные gzip-member'ы читаются как обычный .gz
+    with gzip.open(sealed[-1], "rt", encoding="utf-8") as fh:
+        last_sealed = [json.loads(ln) for ln in fh]
+    current = [json.loads(ln) for ln in path.read_text(encoding="utf-8").splitlines()]
+    assert current[-1]["i"] == 299
+    assert last_sealed[-1]["i"] + 1 == current[0]["i"]
+
+
+def _fill(path, count=1000, **kw):
+    writer = EventLogWriter(path, flush_interval=60.0, **kw)
+    for i in range(count):
+        topic = "net.subnet.hb" if i % 10 == 0 else "ui.notify"
+        writer.write({"ts": 1000.0 + i, "topic": topic, "node_id": f"n{i % 2}", "i": i})
+    writer.flush()
+    return writer
+
+
+def test_tail_pages_with_cursor_across_segments(tmp_path):
+    writer = _fill(tmp_path / "events.log", max_bytes=16 * 1024, keep=10)
+    seen = []
+    cursor = None
+    while True:
+        lines, cursor = tail_lines(writer.segments(), 150, cursor=cursor)
+        seen = [json.loads(ln)["i"] for ln in lines] + seen
+        if cursor is None:
+            break
+    assert seen == list(range(1000))
+    writer.close()
+
+
+def test_tail_filters_use_postings(tmp_path):
+    writer = _fill(tmp_path / "events.log")
+    lines, cursor = tail_lines(writer.segments(), 5, topic_prefix="net.", node_id="n0")
+    assert [json.loads(ln)["i"] for ln in lines] == [950, 960, 970, 980, 990]
+    more, _ = tail_lines(writer.segments(), 5, topic_prefix="net.", node_id="n0", cursor=cursor)
+    assert [json.loads(ln)["i"] for ln in more] == [900, 910, 920, 930, 940]
+    assert tail_lines(writer.segments(), 5, node_id="missing") == ([], None)
+    with pytest.raises(ValueError):
+        parse_cursor("x.y")
+    writer.close()
+
+
+def test_since_replay_and_index_reload(tmp_path):
+    path = tmp_path / "events.log"
+    _fill(path, max_bytes=16 * 1024, keep=10).close()
+
+    reopened = EventLogWriter(path)
+    since = [json.loads(ln)["i"] for ln in lines_since(reopened.segments(), 1990.0)]
+    assert since == list(range(990, 1000))
+    limited = list(lines_since(reopened.segments(), 1000.0, topic_prefix="net.", limit=3))
+    assert [json.loads(ln)["i"] for ln in limited] == [0, 10, 20]
+    reopened.write({"ts": 5000.0, "topic": "ui.new", "i": 1000})
+    reopened.flush()
+    lines, _ = tail_lines(reopened.segments(), 2)
+    assert [json.loads(ln)["i"] for ln in lines] == [999, 1000]
+    reopened.close()
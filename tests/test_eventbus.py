@@ -0,0 +1,159 @@
+# tests/test_eventbus.py
+from __future__ import annotations
+
+import asyncio
+import threading
+
+from adaos.domain import Event
+from adaos.services.eventbus import OVERFLOW_TOPIC, DispatchConfig, LocalEventBus, LoopBoundBus
+
+
+def _publish(bus: LocalEventBus, topic: str) -> None:
+    bus.publish(Event(type=topic, payload={}, source="test", ts=0.0))
+
+
+def test_prefix_matching_keeps_startswith_semantics():
+    bus = LocalEventBus()
+    seen: list[tuple[str, str]] = []
+
+    for prefix in ("", "*", "ui", "ui.", "ui.notify", "ui.no", "tg.output.bot1.", "other"):
+        bus.subscribe(prefix, lambda ev, p=prefix: seen.append((p, ev.type)))
+
+    _publish(bus, "ui.notify")
+    assert [p for p, _ in seen] == ["", "*", "ui", "ui.", "ui.notify", "ui.no"]
+
+    seen.clear()
+    _publish(bus, "uix")
+    assert [p for p, _ in seen] == ["", "*", "ui"]
+
+    seen.clear()
+    _publish(bus, "tg.output.bot1")
+    assert [p for p, _ in seen] == ["", "*"]
+
+    seen.clear()
+    _publish(bus, "tg.output.bot1.msg")
+    assert [p for p, _ in seen] == ["", "*", "tg.output.bot1."]
+
+
+def test_handlers_run_in_subscription_order():
+    bus = LocalEventBus()
+    order: list[str] = []
+    bus.subscribe("a.b.c", lambda ev: order.append("exact"))
+    bus.subscribe("a", lambda ev: order.append("root"))
+    bus.subscribe("a.b", lambda ev: order.append("mid"))
+
+    _publish(bus, "a.b.c")
+    assert order == ["exact", "root", "mid"]
+
+
+def test_unsubscribe_invalidates_resolved_handlers():
+    bus = LocalEventBus()
+    calls: list[str] = []
+
+    def handler(ev):
+        calls.append(ev.type)
+
+    bus.subscribe("skill.demo.", handler)
+    _publish(bus, "skill.demo.ping")
+    assert bus.unsubscribe("skill.demo.", handler) is True
+    _publish(bus, "skill.demo.ping")
+    assert calls == ["skill.demo.ping"]
+
+    assert bus.unsubscribe("skill.demo.", handler) is False
+    assert bus.unsubscribe("missing.topic", handler) is False
+
+
+def test_subscribe_after_publish_is_visible():
+    bus = LocalEventBus()
+    calls: list[str] = []
+    _publish(bus, "late.topic")
+    bus.subscribe("late", lambda ev: calls.append(ev.type))
+    _publish(bus, "late.topic")
+    assert calls == ["late.topic"]
+
+
+def test_queued_dispatch_drop_oldest_keeps_latest_events():
+    bus = LocalEventBus(dispatch=DispatchConfig(maxsize=2, overflow="drop_oldest"))
+    seen: list[str] = []
+
+    async def handler(ev):
+        seen.append(ev.type)
+
+    async def scenario():
+        bus.subscribe("tick", handler)
+        for i in range(5):
+            _publish(bus, f"tick.{i}")
+        assert await bus.drain(timeout=1.0)
+        bus.close()
+
+    asyncio.run(scenario())
+    assert seen == ["tick.3", "tick.4"]
+    (stats,) = bus.dispatch_stats()
+    assert stats["dropped"] == 3
+    assert stats["processed"] == 2
+    assert stats["max_depth"] == 2
+
+
+def test_queued_dispatch_dead_letters_overflow():
+    bus = LocalEventBus()
+    overflow: list[dict] = []
+    bus.subscribe(OVERFLOW_TOPIC, lambda ev: overflow.append(ev.payload))
+
+    async def handler(ev):
+        await asyncio.sleep(0)
+
+    async def scenario():
+        bus.subscribe("tg.input.", handler, dispatch=DispatchConfig(maxsize=1, overflow="dead_letter"))
+        for i in range(3):
+            _publish(bus, f"tg.input.hub{i}")
+        assert await bus.drain(timeout=1.0)
+        bus.close()
+
+    asyncio.run(scenario())
+    assert [p["topic"] for p in overflow] == ["tg.input.hub1", "tg.input.hub2"]
+    assert bus.dispatch_stats()[0]["dead_lettered"] == 2
+
+
+def test_queued_dispatch_apublish_blocks_until_space():
+    bus = LocalEventBus(dispatch=DispatchConfig(maxsize=1, workers=2, overflow="block"))
+    seen: list[str] = []
+
+    async def handler(ev):
+        await asyncio.sleep(0.001)
+        seen.append(ev.type)
+
+    async def scenario():
+        bus.subscribe("job", handler)
+        for i in range(4):
+            await bus.apublish(Event(type=f"job.{i}", payload={}, source="test", ts=0.0))
+        assert await bus.drain(timeout=1.0)
+        bus.close()
+
+    asyncio.run(scenario())
+    assert sorted(seen) == ["job.0", "job.1", "job.2", "job.3"]
+    stats = bus.dispatch_stats()[0]
+    assert stats["dropped"] == 0 and stats["overrun"] == 0
+    assert stats["max_depth"] == 1
+
+
+def test_loop_bound_bus_runs_async_handlers_on_the_owner_loop():
+    bus = LocalEventBus()
+    seen: list[tuple[str, object, int]] = []
+
+    async def handler(ev):
+        seen.append((ev.type, asyncio.get_running_loop(), threading.get_ident()))
+
+    bus.subscribe("demo.", handler)
+
+    async def main():
+        loop = asyncio.get_running_loop()
+        wrapped = LoopBoundBus(bus, loop)
+        await asyncio.to_thread(_publish, wrapped, "demo.thread")
+        _publish(wrapped, "demo.loop")
+        for _ in range(10):
+            await asyncio.sleep(0)
+        return loop
+
+    loop = asyncio.run(main())
+    assert [t for t, _, _ in seen] == ["demo.thread", "demo.loop"]
+    assert all(l is loop and tid == threading.get_ident() for _, l, tid in seen)
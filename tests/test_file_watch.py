@@ -0,0 +1,109 @@
+# tests/test_file_watch.py
+from __future__ import annotations
+
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+import adaos.adapters.skills.git_repo as git_repo
+import adaos.services.file_watch as file_watch
+from adaos.adapters.skills.git_repo import GitSkillRepository
+from adaos.services.file_watch import FileWatchService
+
+
+def _wait(pred, timeout: float = 3.0) -> bool:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if pred():
+            return True
+        time.sleep(0.01)
+    return pred()
+
+
+@pytest.mark.parametrize("native", [True, False])
+def test_debounced_and_hash_filtered(tmp_path, native):
+    svc = FileWatchService(poll_interval=0.05, use_native=native)
+    target = tmp_path / "route_rules.yaml"
+    target.write_text("a: 1\n", encoding="utf-8")
+    calls: list[Path] = []
+    fired = threading.Event()
+
+    def cb(p: Path) -> None:
+        calls.append(p)
+        fired.set()
+
+    handle = svc.watch(target, cb, debounce=0.1)
+    try:
+        assert svc.native is native
+        # серия правок схлопывается в один вызов
+        for i in range(5):
+            target.write_text(f"a: {i + 2}\n", encoding="utf-8")
+            time.sleep(0.01)
+        assert fired.wait(3.0)
+        time.sleep(0.3)
+        assert len(calls) == 1
+
+        # перезапись тем же содержимым — не изменение
+        target.write_text("a: 6\n", encoding="utf-8")
+        time.sleep(0.4)
+        assert len(calls) == 1
+
+        handle()
+        target.write_text("a: 7\n", encoding="utf-8")
+        time.sleep(0.3)
+        assert len(calls) == 1
+    finally:
+        svc.stop()
+
+
+def test_missing_file_and_directory_listing(tmp_path):
+    svc = FileWatchService(poll_interval=0.05)
+    seen: list[str] = []
+    try:
+        svc.watch(tmp_path / "later" / "node.yaml", lambda p: seen.append("file"), debounce=0.05)
+        svc.watch(tmp_path, lambda p: seen.append("dir"), debounce=0.05)
+        (tmp_path / "later").mkdir()
+        assert _wait(lambda: "dir" in seen)
+        (tmp_path / "later" / "node.yaml").write_text("x", encoding="utf-8")
+        assert _wait(lambda: "file" in seen)
+    finally:
+        svc.stop()
+
+
+def test_manifest_index_trusts_native_watch(tmp_path, monkeypatch):
+    svc = FileWatchService(poll_interval=0.05)
+    monkeypatch.setattr(file_watch, "_SERVICE", svc)
+    svc.start()
+    if not svc.native:
+        pytest.skip("native file events unavailable")
+
+    class _Paths:
+        def skills_dir(self) -> Path:
+            return tmp_path / "skills"
+
+        def workspace_dir(self) -> Path:
+            return tmp_path / "workspace"
+
+    sd = tmp_path / "skills" / "alpha"
+    sd.mkdir(parents=True)
+    (sd / "skill.yaml").write_text("id: alpha\nversion: '1.0.0'\n", encoding="utf-8")
+    try:
+        repo = GitSkillRepository(paths=_Paths(), git=None)
+        assert repo.get("alpha").version == "1.0.0"
+
+        stats = []
+        real = git_repo._manifest_stamp
+        monkeypatch.setattr(git_repo, "_manifest_stamp", lambda d: stats.append(d) or real(d))
+        for _ in range(50):
+            assert repo.get("alpha") is not None
+        assert stats == []
+
+        (sd / "skill.yaml").write_text("id: alpha\nversion: '2.0.0'\n", encoding="utf-8")
+        assert _wait(lambda: repo.get("alpha").version == "2.0.0")
+        (tmp_path / "skills" / "beta").mkdir()
+        (tmp_path / "skills" / "beta" / "skill.yaml").write_text("id: beta\n", encoding="utf-8")
+        assert _wait(lambda: repo.get("beta") is not None)
+    finally:
+        svc.stop()
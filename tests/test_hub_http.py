@@ -0,0 +1,73 @@
+# tests/test_hub_http.py
+import asyncio
+import gzip
+import json
+import threading
+from types import SimpleNamespace
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from adaos.apps.api import observe_api
+from adaos.apps.api.auth import require_token
+from adaos.services.agent_context import get_ctx
+from adaos.services.hub_http import HubHttp, gzip_json
+
+
+def test_gzip_json_compresses_only_large_bodies():
+    body, headers = gzip_json({"a": 1})
+    assert "Content-Encoding" not in headers and json.loads(body) == {"a": 1}
+    events = [{"topic": "ui.notify", "payload": {"text": "x" * 50}} for _ in range(50)]
+    body, headers = gzip_json({"events": events})
+    assert headers["Content-Encoding"] == "gzip"
+    assert json.loads(gzip.decompress(body))["events"] == events
+
+
+def test_sync_client_is_shared():
+    http = HubHttp()
+    assert http.client() is http.client()
+    http.client().close()
+    assert not http.client().is_closed
+
+
+def test_async_client_per_loop_is_kept_and_closed():
+    http = HubHttp()
+    server_loop = asyncio.new_event_loop()
+    thread = threading.Thread(target=server_loop.run_forever, daemon=True)
+    thread.start()
+
+    async def grab():
+        return http.aclient()
+
+    try:
+        server_client = asyncio.run_coroutine_threadsafe(grab(), server_loop).result(5)
+        other = asyncio.run(grab())  # другой loop — свой клиент, серверный не вытесняется
+        assert other is not server_client
+        assert asyncio.run_coroutine_threadsafe(grab(), server_loop).result(5) is server_client
+
+        asyncio.run_coroutine_threadsafe(http.aclose(), server_loop).result(5)
+        assert server_client.is_closed
+    finally:
+        server_loop.call_soon_threadsafe(server_loop.stop)
+        thread.join(5)
+        server_loop.close()
+
+
+def test_ingest_accepts_gzip_batches(monkeypatch):
+    written = []
+    monkeypatch.setattr(observe_api, "write_events", lambda events: written.extend(events) or len(events))
+    object.__setattr__(get_ctx(), "config", SimpleNamespace(role="hub"))
+    app = FastAPI()
+    app.include_router(observe_api.router, prefix="/api/observe")
+    app.dependency_overrides[require_token] = lambda: None
+    client = TestClient(app)
+
+    batch = {"node_id": "m1", "events": [{"topic": "t", "i": i, "pad": "y" * 40} for i in range(40)]}
+    body, headers = gzip_json(batch)
+    assert headers.get("Content-Encoding") == "gzip"
+    r = client.post("/api/observe/ingest", content=body, headers=headers)
+    assert r.status_code == 200 and r.json()["ingested"] == 40
+    r = client.post("/api/observe/ingest", json={"node_id": "m2", "events": [{"topic": "t"}]})
+    assert r.status_code == 200
+    assert written[-1]["node_id"] == "m2" and written[0]["node_id"] == "m1"
+    assert client.post("/api/observe/ingest", content=b"garbage", headers={"Content-Encoding": "gzip"}).status_code == 400
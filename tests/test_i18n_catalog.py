@@ -0,0 +1,55 @@
+# tests/test_i18n_catalog.py
+from __future__ import annotations
+
+import json
+import os
+from pathlib import Path
+
+import adaos.services.i18n.service as i18n_service
+from adaos.services.agent_context import get_ctx
+from adaos.services.i18n.service import I18nService, clear_i18n_cache
+
+
+def _write(path: Path, data: dict) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(data), encoding="utf-8")
+
+
+def _skill(tmp_path: Path) -> Path:
+    skill = tmp_path / "skills" / "demo"
+    _write(skill / "i18n" / "en.json", {"prep.hello": "Hello, {name}", "prep.only_en": "english"})
+    _write(skill / "i18n" / "ru.json", {"prep.hello": "Привет, {name}"})
+    return skill
+
+
+def test_fallback_chain_is_merged(tmp_path):
+    clear_i18n_cache()
+    skill = _skill(tmp_path)
+    svc = I18nService(get_ctx())
+    kw = dict(skill_path=skill, skill_id="demo", scope="skill")
+    assert svc.translate("prep.hello", lang="ru", params={"name": "Ада"}, **kw) == "Привет, Ада"
+    assert svc.translate("prep.only_en", lang="ru", **kw) == "english"
+    assert svc.translate("prep.missing", lang="ru", **kw) == "prep.missing"
+    # плейсхолдеры не сошлись — возвращаем исходный текст
+    assert svc.translate("prep.hello", lang="ru", **kw) == "Привет, {name}"
+
+
+def test_catalog_is_shared_and_follows_mtime(tmp_path, monkeypatch):
+    clear_i18n_cache()
+    skill = _skill(tmp_path)
+    loads = []
+    real = i18n_service._Catalog.load.__func__
+    monkeypatch.setattr(i18n_service._Catalog, "load", classmethod(lambda cls, src: loads.append(1) or real(cls, src)))
+    kw = dict(lang="en", skill_path=skill, skill_id="demo", scope="skill")
+
+    for _ in range(10):
+        assert I18nService(get_ctx()).translate("prep.only_en", **kw) == "english"
+    assert len(loads) == 1
+
+    target = skill / "i18n" / "en.json"
+    _write(target, {"prep.only_en": "changed"})
+    st = target.stat()
+    os.utime(target, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+    monkeypatch.setattr(i18n_service, "CATALOG_RECHECK_INTERVAL", 0.0)
+    assert I18nService(get_ctx()).translate("prep.only_en", **kw) == "changed"
+    assert len(loads) == 2
@@ -0,0 +1,80 @@
+# tests/test_node_config_cache.py
+from __future__ import annotations
+
+import os
+
+import pytest
+
+from adaos.services.agent_context import get_ctx
+from adaos.services import node_config
+from adaos.services.node_config import current_config, load_config, save_config, set_role
+
+
+def test_load_config_reuses_cache_until_file_changes(monkeypatch):
+    first = current_config()
+    path = get_ctx().paths.base_dir() / "node.yaml"
+    assert path.exists()
+
+    calls = []
+    original = node_config._read_node
+    monkeypatch.setattr(node_config, "_read_node", lambda p: calls.append(p) or original(p))
+
+    copy = load_config()
+    assert copy is not first and copy.node_id == first.node_id
+    assert calls == []
+
+    text = path.read_text(encoding="utf-8").replace(f"node_id: {first.node_id}", "node_id: edited-node")
+    path.write_text(text, encoding="utf-8")
+    st = path.stat()
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+
+    second = load_config()
+    assert len(calls) == 1
+    assert second.node_id == "edited-node"
+    assert first.node_id == "edited-node"  # общий экземпляр обновлён на месте
+
+
+def test_save_and_set_role_update_attached_config():
+    ctx = get_ctx()
+    conf = current_config()
+    assert ctx.config is conf
+
+    set_role("member", hub_url="http://hub.local:8777")
+    assert ctx.config.role == "member"
+    assert ctx.config.hub_url == "http://hub.local:8777"
+
+    detached = node_config._read_node(ctx.paths.base_dir() / "node.yaml")[0]
+    detached.token = "rotated"
+    save_config(detached)
+    assert ctx.config is conf
+    assert conf.token == "rotated"
+    assert load_config() is not conf
+
+
+def test_unsaved_changes_to_loaded_config_do_not_leak(monkeypatch):
+    ctx = get_ctx()
+    shared = current_config()
+    path = ctx.paths.base_dir() / "node.yaml"
+    on_disk = node_config._read_node(path)[0]
+
+    # как RootService.init/login: правим конфиг, затем шаг до сохранения падает
+    conf = load_config()
+    conf.subnet_id = "unsaved-subnet"
+    conf.subnet_settings.id = "unsaved-subnet"
+    conf.role = "member"
+
+    def failing_dump(*args, **kwargs):
+        raise OSError("disk full")
+
+    with monkeypatch.context() as m:
+        m.setattr(node_config.yaml, "safe_dump", failing_dump)
+        with pytest.raises(OSError):
+            save_config(conf)
+
+    reloaded = load_config()
+    assert (reloaded.subnet_id, reloaded.subnet_settings.id, reloaded.role) == (
+        on_disk.subnet_id,
+        on_disk.subnet_settings.id,
+        on_disk.role,
+    )
+    assert ctx.config is shared and shared.subnet_id == on_disk.subnet_id
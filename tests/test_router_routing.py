@@ -0,0 +1,100 @@
+# tests/test_router_routing.py
+from __future__ import annotations
+
+import asyncio
+import time
+
+from adaos.services.router.delivery import DeliveryPool, NodeUrlCache
+from adaos.services.router.rules_loader import compile_rules
+
+
+def test_compile_rules_first_priority_wins():
+    rules = [
+        {"target": {"node_id": "n2", "io_type": "STDOUT"}, "priority": 90},
+        {"target": {"node_id": "this", "io_type": "stdout"}, "priority": 50},
+        {"target": {"node_id": "this", "io_type": "telegram"}, "priority": 10},
+        {"target": {"node_id": "n3"}, "priority": 5},
+    ]
+    assert compile_rules(rules) == {"stdout": "n2", "telegram": None}
+
+
+def test_pool_retries_then_falls_back_and_keeps_order():
+    async def scenario():
+        pool = DeliveryPool(retries=2, backoff=0.001)
+        pool.bind(asyncio.get_running_loop())
+        seen: list[str] = []
+        attempts = {"n": 0}
+        fallbacks: list[str] = []
+
+        def ok(tag: str):
+            async def send() -> bool:
+                await asyncio.sleep(0.01)
+                seen.append(tag)
+                return True
+
+            return send
+
+        async def broken() -> bool:
+            attempts["n"] += 1
+            raise ConnectionError("down")
+
+        t0 = time.perf_counter()
+        for i in range(5):
+            assert pool.submit("node:a", ok(f"a{i}"))
+        pool.submit("node:b", broken, fallback=lambda: fallbacks.append("b"))
+        # submit не ждёт доставки
+        assert time.perf_counter() - t0 < 0.01
+        assert await pool.drain(timeout=2.0)
+        await pool.close()
+        return seen, attempts["n"], fallbacks, pool.stats
+
+    seen, attempts, fallbacks, stats = asyncio.run(scenario())
+    assert seen == [f"a{i}" for i in range(5)]
+    assert attempts == 3
+    assert fallbacks == ["b"]
+    assert stats.delivered == 5 and stats.failed == 1
+
+
+def test_pool_submit_from_thread():
+    async def scenario():
+        pool = DeliveryPool()
+        pool.bind(asyncio.get_running_loop())
+        done = asyncio.Event()
+
+        async def send() -> bool:
+            done.set()
+            return True
+
+        await asyncio.to_thread(pool.submit, "t", send)
+        await asyncio.wait_for(done.wait(), 1.0)
+        await pool.close()
+
+    asyncio.run(scenario())
+
+
+def test_pool_without_retries_sends_once():
+    async def scenario():
+        pool = DeliveryPool(retries=2, backoff=0.001)
+        pool.bind(asyncio.get_running_loop())
+        attempts = {"n": 0}
+        fallbacks: list[str] = []
+
+        async def timed_out() -> bool:
+            attempts["n"] += 1
+            raise TimeoutError("no answer")
+
+        pool.submit("telegram", timed_out, fallback=lambda: fallbacks.append("tg"), retries=0)
+        assert await pool.drain(timeout=2.0)
+        await pool.close()
+        return attempts["n"], fallbacks
+
+    assert asyncio.run(scenario()) == (1, ["tg"])
+
+
+def test_node_url_cache_ttl():
+    cache = NodeUrlCache(ttl=60.0, negative_ttl=0.0)
+    cache.put("n1", "http://n1")
+    cache.put("n2", None)
+    assert cache.get("n1") == (True, "http://n1")
+    time.sleep(0.001)
+    assert cache.get("n2") == (False, None)
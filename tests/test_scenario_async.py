@@ -0,0 +1,164 @@
+# tests/test_scenario_async.py
+from __future__ import annotations
+
+import asyncio
+import time
+
+import pytest
+
+from adaos.sdk.scenarios.runtime import ActionRegistry, ScenarioModel, ScenarioRuntime, default_registry
+from adaos.services.agent_context import get_ctx
+from adaos.services.skill.manager import SkillManager
+
+
+def _registry(log: list[str]) -> ActionRegistry:
+    registry = ActionRegistry()
+    active = {"now": 0, "peak": 0}
+
+    async def slow(args):
+        active["now"] += 1
+        active["peak"] = max(active["peak"], active["now"])
+        try:
+            await asyncio.sleep(float(args.get("delay", 0.1)))
+        finally:
+            active["now"] -= 1
+        log.append(str(args.get("tag")))
+        return {"tag": args.get("tag")}
+
+    def blocking(args):
+        time.sleep(float(args.get("delay", 0.1)))
+        log.append(str(args.get("tag")))
+        return args.get("tag")
+
+    async def boom(args):
+        raise ValueError("boom")
+
+    registry.register("demo.slow", slow)
+    registry.register("demo.block", blocking)
+    registry.register("demo.boom", boom)
+    registry.active = active  # type: ignore[attr-defined]
+    return registry
+
+
+def _model(steps, **extra) -> ScenarioModel:
+    return ScenarioModel.from_payload({"id": "async_demo", "steps": steps, **extra}, fallback_id="async_demo")
+
+
+def test_parallel_block_takes_max_not_sum():
+    log: list[str] = []
+    model = _model(
+        [
+            {
+                "name": "fetch",
+                "parallel": [
+                    {"name": "a", "call": "demo.slow", "args": {"tag": "a", "delay": 0.2}, "save_as": "a"},
+                    {"name": "b", "call": "demo.block", "args": {"tag": "b", "delay": 0.2}, "save_as": "b"},
+                    {"name": "c", "call": "demo.slow", "args": {"tag": "c", "delay": 0.2}, "save_as": "c"},
+                ],
+            },
+            {"name": "join", "set": {"msg": "got ${a.tag}${b}${c.tag}"}},
+        ]
+    )
+    started = time.perf_counter()
+    state = asyncio.run(ScenarioRuntime(_registry(log)).arun(model))
+    assert time.perf_counter() - started < 0.5
+    assert state["msg"] == "got abc"
+    assert sorted(log) == ["a", "b", "c"]
+    assert set(state["steps"]) == {"a", "b", "c"}
+
+
+def test_block_concurrency_limit_and_sync_run():
+    log: list[str] = []
+    registry = _registry(log)
+    model = _model(
+        [
+            {
+                "name": "fetch",
+                "max_concurrency": 2,
+                "parallel": [{"name": f"s{i}", "call": "demo.slow", "args": {"tag": i, "delay": 0.05}} for i in range(6)],
+            }
+        ]
+    )
+    # синхронный run вне цикла идёт через arun
+    ScenarioRuntime(registry).run(model)
+    assert registry.active["peak"] == 2  # type: ignore[attr-defined]
+    assert len(log) == 6
+
+
+def test_step_timeout_is_recorded_and_raised():
+    model = _model([{"name": "slow", "call": "demo.slow", "timeout": "50ms", "args": {"tag": "x", "delay": 1}}])
+    state: dict = {}
+    with pytest.raises(TimeoutError):
+        asyncio.run(ScenarioRuntime(_registry([])).arun(model, bag=state))
+    assert "timed out" in state["steps"]["slow"]["error"]
+    assert state["steps"]["slow"]["args"]["tag"] == "x"
+
+
+def test_sync_skill_handlers_run_off_the_loop():
+    ctx = get_ctx()
+    name = "scenario_blocking"
+    sd = ctx.paths.skills_dir() / name
+    (sd / "handlers").mkdir(parents=True, exist_ok=True)
+    (sd / "skill.yaml").write_text(f"name: {name}\nversion: 1.0.0\n", encoding="utf-8")
+    (sd / "handlers" / "main.py").write_text(
+        "import time\n\n\ndef handle(topic, payload):\n    time.sleep(payload['delay'])\n    print(topic)\n    return topic\n",
+        encoding="utf-8",
+    )
+    mgr = SkillManager(git=ctx.git, paths=ctx.paths, caps=ctx.caps)
+    try:
+        mgr.prepare_runtime(name, run_tests=False)
+        mgr.activate_runtime(name)
+        step = lambda tag, delay: {"name": tag, "call": "skills.run", "args": {"skill": name, "topic": tag, "payload": {"delay": delay}}, "save_as": tag}
+        model = _model([{"name": "fetch", "parallel": [step("a", 0.3), step("b", 0.3), step("c", 0.3)]}])
+        started = time.perf_counter()
+        state = asyncio.run(ScenarioRuntime(default_registry()).arun(model))
+        assert time.perf_counter() - started < 0.8  # блокирующие handle() не сериализуются
+        assert [state[tag]["result"] for tag in "abc"] == ["a", "b", "c"]
+        assert [state[tag]["stdout"] for tag in "abc"] == ["a", "b", "c"]
+
+        slow = {**step("slow", 1.0), "timeout": "100ms"}
+        state = {}
+
+        async def timed() -> float:
+            started = time.perf_counter()
+            with pytest.raises(TimeoutError):
+                await ScenarioRuntime(default_registry()).arun(_model([slow]), bag=state)
+            return time.perf_counter() - started
+
+        # asyncio.run дожидается потока-исполнителя, поэтому время меряем внутри цикла
+        assert asyncio.run(timed()) < 0.8
+        assert "timed out" in state["steps"]["slow"]["error"]
+    finally:
+        mgr.cleanup_runtime(name, purge_data=True)
+
+
+def test_failed_branch_cancels_siblings():
+    log: list[str] = []
+    model = _model(
+        [
+            {
+                "name": "fetch",
+                "parallel": [
+                    {"name": "ok", "call": "demo.slow", "args": {"tag": "late", "delay": 0.5}},
+                    {"name": "bad", "call": "demo.boom"},
+                ],
+            }
+        ]
+    )
+    state: dict = {}
+    with pytest.raises(ValueError):
+        asyncio.run(ScenarioRuntime(_registry(log)).arun(model, bag=state))
+    assert log == []
+    assert state["steps"]["bad"]["error"] == "boom"
+
+
+def test_coroutine_action_inside_running_loop_needs_arun():
+    model = _model([{"name": "a", "call": "demo.slow", "args": {"tag": "a", "delay": 0}}])
+
+    async def scenario():
+        runtime = ScenarioRuntime(_registry([]))
+        with pytest.raises(RuntimeError):
+            runtime.run(model)
+        return await runtime.arun(model)
+
+    assert asyncio.run(scenario())["steps"]["a"]["result"] == {"tag": "a"}
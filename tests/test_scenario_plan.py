@@ -0,0 +1,84 @@
+# tests/test_scenario_plan.py
+from __future__ import annotations
+
+import os
+
+import adaos.sdk.scenarios.runtime as runtime_mod
+from adaos.sdk.scenarios.runtime import ActionRegistry, ScenarioRuntime, load_scenario
+
+_YAML = """
+id: plan_demo
+vars:
+  greet: "hi"
+steps:
+  - name: get
+    call: demo.get
+    save_as: user
+  - name: named
+    when: ${user.name}
+    set:
+      line: "${vars.greet}, ${user.name}!"
+  - name: anonymous
+    when: ${not user.name}
+    set:
+      line: ${vars.greet}
+  - name: out
+    call: demo.echo
+    args:
+      text: ${line}
+      opts: {level: 1, tags: [a, b]}
+"""
+
+
+def _registry(user):
+    calls = []
+    registry = ActionRegistry()
+    registry.register("demo.get", lambda args: user)
+    registry.register("demo.echo", lambda args: calls.append(args) or "ok")
+    return registry, calls
+
+
+def test_plan_resolves_templates_and_conditions(tmp_path):
+    (tmp_path / "scenario.yaml").write_text(_YAML, encoding="utf-8")
+    model = load_scenario(tmp_path)
+
+    registry, calls = _registry({"name": "Ada"})
+    state = ScenarioRuntime(registry).run(model)
+    assert state["line"] == "hi, Ada!"
+
+    registry2, calls2 = _registry({})
+    state2 = ScenarioRuntime(registry2).run(model)
+    assert state2["line"] == "hi"
+
+    # константное поддерево аргументов не пересобирается между запусками
+    assert calls[0]["opts"] is calls2[0]["opts"]
+    assert calls[0]["text"] == "hi, Ada!" and calls2[0]["text"] == "hi"
+
+
+def test_resolve_helpers_keep_semantics():
+    bag = {"a": {"b": 0, "c": "x"}, "n": None}
+    assert runtime_mod._resolve_value("${a.c}", bag) == "x"
+    assert runtime_mod._resolve_value("${not a.b}", bag) is True
+    assert runtime_mod._resolve_value("v=${a.c}/${n}/${a..c}", bag) == "v=x//"
+    assert runtime_mod._resolve_value({"k": ["${a.c}", 1]}, bag) == {"k": ["x", 1]}
+    assert runtime_mod._evaluate_condition(None, bag) is True
+    assert runtime_mod._evaluate_condition("${a.c}", bag) is True
+    assert runtime_mod._evaluate_condition("", bag) is False
+
+
+def test_load_scenario_cached_by_mtime(tmp_path, monkeypatch):
+    path = tmp_path / "scenario.yaml"
+    path.write_text(_YAML, encoding="utf-8")
+    parsed = []
+    real = runtime_mod.yaml.safe_load
+    monkeypatch.setattr(runtime_mod.yaml, "safe_load", lambda text: parsed.append(1) or real(text))
+
+    first = load_scenario(tmp_path)
+    assert load_scenario(path) is first
+    assert len(parsed) == 1
+
+    path.write_text(_YAML.replace("plan_demo", "plan_demo2"), encoding="utf-8")
+    st = path.stat()
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+    assert load_scenario(tmp_path).id == "plan_demo2"
+    assert len(parsed) == 2
@@ -0,0 +1,103 @@
+# tests/test_scheduler.py
+from __future__ import annotations
+
+import asyncio
+import time
+from datetime import datetime
+
+import pytest
+
+from adaos.services.agent_context import get_ctx
+from adaos.services.scheduler import CronSchedule, Scheduler, SqliteJobStore
+
+
+def test_cron_next_after():
+    base = datetime(2026, 3, 2, 10, 7, 30).timestamp()  # понедельник
+    assert datetime.fromtimestamp(CronSchedule("*/15 * * * *").next_after(base)) == datetime(2026, 3, 2, 10, 15)
+    assert datetime.fromtimestamp(CronSchedule("0 9 * * 1-5").next_after(base)) == datetime(2026, 3, 3, 9, 0)
+    assert datetime.fromtimestamp(CronSchedule("30 4 1 * *").next_after(base)) == datetime(2026, 4, 1, 4, 30)
+    assert datetime.fromtimestamp(CronSchedule("@weekly").next_after(base)) == datetime(2026, 3, 8, 0, 0)
+    with pytest.raises(ValueError):
+        CronSchedule("61 * * * *")
+    with pytest.raises(ValueError):
+        CronSchedule("* * *")
+
+
+def test_jobs_fire_in_order_and_respect_concurrency():
+    async def scenario():
+        sched = Scheduler()
+        fired: list[str] = []
+        gate = asyncio.Event()
+
+        async def slow(payload):
+            fired.append("slow")
+            await gate.wait()
+
+        async def fast(payload):
+            fired.append(payload["name"])
+
+        await sched.start()
+        await sched.ensure_every("fast", 0.02, "test.fast", {"name": "fast"}, handler=fast)
+        slow_job = await sched.ensure_every("slow", 0.01, "test.slow", handler=slow)
+        await asyncio.sleep(0.2)
+        assert fired.count("slow") == 1
+        assert slow_job.skipped > 0
+        assert fired.count("fast") >= 3
+        gate.set()
+        await sched.delete("fast")
+        count = fired.count("fast")
+        await asyncio.sleep(0.1)
+        assert fired.count("fast") == count
+        await sched.stop()
+
+    asyncio.run(scenario())
+
+
+def test_persisted_jobs_follow_misfire_policy():
+    store = SqliteJobStore(get_ctx().sql)
+
+    async def scenario():
+        first = Scheduler(store=store)
+        await first.ensure_every("backup.a", 60.0, "sys.ystore.backup", {"webspace_id": "a"})
+        await first.ensure_every("backup.b", 60.0, "sys.ystore.backup", {"webspace_id": "b"}, misfire="once")
+        # имитируем простой: оба запуска уже в прошлом
+        for job in first.jobs():
+            job.next_run = time.time() - 600
+            store.save(job)
+
+        second = Scheduler(store=store, misfire="skip")
+        second.load()
+        now = time.time()
+        a, b = second.get("backup.a"), second.get("backup.b")
+        assert a.payload == {"webspace_id": "a"}
+        assert a.next_run > now + 50
+        assert b.next_run <= now
+
+    asyncio.run(scenario())
+
+
+def test_jobs_ensured_before_store_keep_persisted_runs():
+    store = SqliteJobStore(get_ctx().sql)
+
+    async def scenario():
+        first = Scheduler(store=store)
+        job = await first.ensure_every("early.a", 60.0, "sys.ystore.backup", misfire="once")
+        job.last_run = time.time() - 700
+        job.next_run = time.time() - 600
+        store.save(job)
+
+        second = Scheduler()
+        await second.ensure_every("early.a", 60.0, "sys.ystore.backup")
+        second.attach_store(store)
+        second.load()
+        now = time.time()
+        restored = second.get("early.a")
+        assert restored.misfire == "once"
+        assert abs(restored.last_run - (now - 700)) < 5
+        assert restored.next_run <= now  # догоняющий запуск
+
+        # повторный ensure до тика цикла не отменяет догоняющий запуск
+        await second.ensure_every("early.a", 60.0, "sys.ystore.backup")
+        assert second.get("early.a").next_run <= time.time()
+
+    asyncio.run(scenario())
@@ -0,0 +1,163 @@
+# tests/test_skill_batch_install.py
+from __future__ import annotations
+
+import threading
+import time
+from pathlib import Path
+
+from adaos.adapters.db import SqliteSkillRegistry
+from adaos.adapters.skills.git_repo import GitSkillRepository
+from adaos.services.agent_context import get_ctx
+from adaos.services.eventbus import LocalEventBus
+from adaos.services.policy.capabilities import InMemoryCapabilities
+from adaos.services.skill.manager import SkillManager
+
+
+def _skill(root: Path, name: str, *, depends: list[str] | None = None, handler: bool = True) -> None:
+    sd = root / name
+    (sd / "handlers").mkdir(parents=True, exist_ok=True)
+    text = f"name: {name}\nversion: 1.0.0\n"
+    if depends:
+        text += "depends: [" + ", ".join(depends) + "]\n"
+    (sd / "skill.yaml").write_text(text, encoding="utf-8")
+    if handler:
+        (sd / "handlers" / "main.py").write_text("def handle(topic, payload):\n    return payload\n", encoding="utf-8")
+
+
+def _manager(**kwargs) -> SkillManager:
+    ctx = get_ctx()
+    caps = InMemoryCapabilities()
+    caps.grant("core", "skills.manage")
+    return SkillManager(git=ctx.git, paths=ctx.paths, caps=caps, registry=SqliteSkillRegistry(ctx.sql), **kwargs)
+
+
+def test_batch_respects_dependencies_and_reports_progress(monkeypatch):
+    ctx = get_ctx()
+    root = Path(ctx.paths.skills_dir())
+    _skill(root, "batch_a")
+    _skill(root, "batch_b", depends=["batch_a"])
+    _skill(root, "batch_c", depends=["not_in_batch"])
+    _skill(root, "batch_d", handler=False)
+    _skill(root, "batch_e", depends=["batch_d"])
+    _skill(root, "batch_f", depends=["batch_e"])
+
+    bus = LocalEventBus()
+    events: list[tuple[str, str]] = []
+    bus.subscribe("skills.batch.progress", lambda ev: events.append((ev.payload["skill_name"], ev.payload["stage"])))
+    completed: list[dict] = []
+    bus.subscribe("skills.batch.completed", lambda ev: completed.append(ev.payload))
+
+    mgr = _manager(bus=bus)
+    active = {"now": 0, "peak": 0}
+    lock = threading.Lock()
+    real_prepare = mgr.prepare_runtime
+
+    def slow_prepare(name, **kwargs):
+        with lock:
+            active["now"] += 1
+            active["peak"] = max(active["peak"], active["now"])
+        try:
+            time.sleep(0.1)
+            return real_prepare(name, **kwargs)
+        finally:
+            with lock:
+                active["now"] -= 1
+
+    monkeypatch.setattr(mgr, "prepare_runtime", slow_prepare)
+    names = ["batch_f", "batch_e", "batch_d", "batch_c", "batch_b", "batch_a"]
+    try:
+        results = mgr.install_batch(names, max_workers=4)
+    finally:
+        for name in names:
+            mgr.cleanup_runtime(name)
+
+    assert {n: r.status for n, r in results.items()} == {
+        "batch_a": "activated",
+        "batch_b": "activated",
+        "batch_c": "activated",
+        "batch_d": "failed",
+        "batch_e": "skipped",
+        "batch_f": "skipped",
+    }
+    assert results["batch_a"].slot in {"A", "B"} and results["batch_a"].version == "1.0.0"
+    # независимые навыки готовятся параллельно, зависимый — после активации предка
+    assert active["peak"] >= 2
+    assert events.index(("batch_a", "activated")) < events.index(("batch_b", "preparing"))
+    assert ("batch_e", "preparing") not in events
+    assert completed == [
+        {"total": 6, "activated": ["batch_a", "batch_b", "batch_c"], "failed": ["batch_d"], "skipped": ["batch_e", "batch_f"]}
+    ]
+
+
+def test_batch_dependency_cycle_fails_without_preparing():
+    ctx = get_ctx()
+    root = Path(ctx.paths.skills_dir())
+    _skill(root, "cyc_a", depends=["cyc_b"])
+    _skill(root, "cyc_b", depends=["cyc_a"])
+    mgr = _manager()
+    results = mgr.install_batch(["cyc_a", "cyc_b"])
+    assert {r.status for r in results.values()} == {"failed"}
+    assert "cycle" in (results["cyc_a"].error or "")
+
+
+class _FakeRepo:
+    def __init__(self, error: Exception | None = None) -> None:
+        self.error = error
+
+    def install_many(self, names):
+        if self.error is not None:
+            raise self.error
+        return {name: object() for name in names}
+
+
+def _with_repo(monkeypatch, repo):
+    # без ADAOS_TESTING install_batch идёт в репозиторий; подменяем его кэш в контексте
+    ctx = get_ctx()
+    monkeypatch.setenv("ADAOS_TESTING", "0")
+    previous = ctx._skills_repo
+    object.__setattr__(ctx, "_skills_repo", repo)
+    return previous
+
+
+def test_batch_fetch_failure_marks_every_skill_failed(monkeypatch):
+    ctx = get_ctx()
+    previous = _with_repo(monkeypatch, _FakeRepo(OSError("network down")))
+    try:
+        results = _manager().install_batch(["fetch_a", "fetch_b"])
+    finally:
+        object.__setattr__(ctx, "_skills_repo", previous)
+    assert {n: (r.status, r.error) for n, r in results.items()} == {
+        "fetch_a": ("failed", "fetch: network down"),
+        "fetch_b": ("failed", "fetch: network down"),
+    }
+
+
+def test_install_many_reports_sync_errors_per_skill(monkeypatch):
+    ctx = get_ctx()
+    repo = GitSkillRepository(paths=ctx.paths, git=ctx.git)
+
+    def broken_ensure():
+        raise RuntimeError("pull failed")
+
+    monkeypatch.setattr(repo, "ensure", broken_ensure)
+    results = repo.install_many(["one", "two"])
+    assert set(results) == {"one", "two"}
+    assert all(isinstance(err, RuntimeError) and "pull failed" in str(err) for err in results.values())
+
+
+def test_batch_validates_fetched_skills(monkeypatch):
+    ctx = get_ctx()
+    _skill(Path(ctx.paths.skills_dir()), "valid_a")
+    bus = LocalEventBus()
+    stages: list[str] = []
+    bus.subscribe("skills.batch.progress", lambda ev: stages.append(ev.payload["stage"]))
+    previous = _with_repo(monkeypatch, _FakeRepo())
+    mgr = _manager(bus=bus)
+    try:
+        results = mgr.install_batch(["valid_a"])
+    finally:
+        object.__setattr__(ctx, "_skills_repo", previous)
+        mgr.cleanup_runtime("valid_a")
+    assert results["valid_a"].status == "activated"
+    assert results["valid_a"].report is not None
+    assert stages[:3] == ["fetched", "preparing", "validated"]
@@ -0,0 +1,109 @@
+# tests/test_skill_dep_cache.py
+from __future__ import annotations
+
+import base64
+import hashlib
+import subprocess
+import sys
+import zipfile
+from pathlib import Path
+
+import pytest
+
+import adaos.services.skill.dep_cache as dep_cache
+from adaos.services.skill.dep_cache import DEPS_POINTER_NAME, DependencyCache
+
+pytestmark = pytest.mark.skipif(
+    subprocess.run([sys.executable, "-m", "pip", "--version"], capture_output=True).returncode != 0,
+    reason="pip unavailable",
+)
+
+
+def _wheel(wheelhouse: Path, version: str = "1.0") -> None:
+    """Минимальный чистый wheel без сети и сборки."""
+    files = {
+        "adaos_demo_dep/__init__.py": f"VERSION = {version!r}\n",
+        f"adaos_demo_dep-{version}.dist-info/METADATA": f"Metadata-Version: 2.1\nName: adaos-demo-dep\nVersion: {version}\n",
+        f"adaos_demo_dep-{version}.dist-info/WHEEL": "Wheel-Version: 1.0\nGenerator: tests\nRoot-Is-Purelib: true\nTag: py3-none-any\n",
+    }
+    record = []
+    for name, text in files.items():
+        digest = base64.urlsafe_b64encode(hashlib.sha256(text.encode()).digest()).rstrip(b"=").decode()
+        record.append(f"{name},sha256={digest},{len(text.encode())}")
+    record.append(f"adaos_demo_dep-{version}.dist-info/RECORD,,")
+    files[f"adaos_demo_dep-{version}.dist-info/RECORD"] = "\n".join(record) + "\n"
+    wheelhouse.mkdir(parents=True, exist_ok=True)
+    with zipfile.ZipFile(wheelhouse / f"adaos_demo_dep-{version}-py3-none-any.whl", "w") as zf:
+        for name, text in files.items():
+            zf.writestr(name, text)
+
+
+def _counting_runner(calls: list[list[str]]):
+    def run(cmd):
+        calls.append(list(cmd))
+        return dep_cache._run(cmd)
+
+    return run
+
+
+def test_offline_install_from_wheelhouse_and_reuse(tmp_path):
+    wheelhouse = tmp_path / "wh"
+    _wheel(wheelhouse)
+    calls: list[list[str]] = []
+    cache = DependencyCache(tmp_path / "deps", wheelhouse=wheelhouse, runner=_counting_runner(calls))
+
+    env = cache.ensure(["adaos-demo-dep==1.0"], label="demo")
+    assert (env / "adaos_demo_dep" / "__init__.py").exists()
+    assert len(calls) == 1 and "--no-index" in calls[0]
+
+    # тот же набор зависимостей — без pip
+    assert cache.ensure(["adaos-demo-dep==1.0"], label="other") == env
+    assert len(calls) == 1
+
+    # другой набор — другой хеш
+    _wheel(wheelhouse, "2.0")
+    env2 = cache.ensure(["adaos-demo-dep==2.0"], label="demo")
+    assert env2 != env
+    assert "2.0" in (env2 / "adaos_demo_dep" / "__init__.py").read_text(encoding="utf-8")
+
+
+def test_lock_hash_inputs(tmp_path):
+    req = tmp_path / "requirements.in"
+    req.write_text("# comment\nfoo==1\n\n", encoding="utf-8")
+    base = DependencyCache.lock_hash(["b", "a"], requirement_files=[req])
+    assert base == DependencyCache.lock_hash(["a", "b", "a"], requirement_files=[req])
+    req.write_text("foo==1  # same\n", encoding="utf-8")
+    assert base == DependencyCache.lock_hash(["a", "b"], requirement_files=[req])
+    cons = tmp_path / "constraints.txt"
+    cons.write_text("foo<2\n", encoding="utf-8")
+    assert base != DependencyCache.lock_hash(["a", "b"], requirement_files=[req], constraints=cons)
+
+
+def test_failure_is_reported_and_prune(tmp_path):
+    runner_calls: list[list[str]] = []
+    cache = DependencyCache(tmp_path / "deps", wheelhouse=tmp_path / "wh", runner=lambda cmd: runner_calls.append(cmd) or (False, "nope"))
+    with pytest.raises(dep_cache.DependencyInstallError):
+        cache.ensure(["missing-thing"], label="demo")
+    assert not any(p.name.endswith(".tmp") for p in (tmp_path / "deps").iterdir())
+
+    _wheel(tmp_path / "wh")
+    cache = DependencyCache(tmp_path / "deps", wheelhouse=tmp_path / "wh")
+    env = cache.ensure(["adaos-demo-dep==1.0"])
+    slot_vendor = tmp_path / "runtime" / "demo" / "1.0" / "slots" / "A" / "vendor"
+    DependencyCache.link_slot(slot_vendor, env)
+    assert (slot_vendor / DEPS_POINTER_NAME).read_text(encoding="utf-8").strip() == str(env)
+
+    in_use = DependencyCache.referenced(tmp_path / "runtime")
+    assert cache.prune(in_use, grace=0) == []
+    DependencyCache.link_slot(slot_vendor, None)
+    assert cache.prune(DependencyCache.referenced(tmp_path / "runtime"), grace=0) == [env.name]
+    assert not env.exists()
+
+
+def test_vendor_paths_follow_pointer(tmp_path):
+    env = tmp_path / "deps" / "abc"
+    env.mkdir(parents=True)
+    vendor = tmp_path / "slot" / "vendor"
+    assert dep_cache.vendor_paths(vendor) == []
+    DependencyCache.link_slot(vendor, env)
+    assert dep_cache.vendor_paths(vendor) == [vendor, env]
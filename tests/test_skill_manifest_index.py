@@ -0,0 +1,82 @@
+# tests/test_skill_manifest_index.py
+from __future__ import annotations
+
+import os
+from pathlib import Path
+
+import adaos.adapters.skills.git_repo as git_repo
+from adaos.adapters.skills.git_repo import GitSkillRepository
+
+
+class _Paths:
+    def __init__(self, base: Path) -> None:
+        self.base = base
+
+    def skills_dir(self) -> Path:
+        return self.base / "skills"
+
+    def workspace_dir(self) -> Path:
+        return self.base / "workspace"
+
+
+def _write_skill(root: Path, name: str, *, sid: str | None = None, version: str = "1.0.0") -> Path:
+    sd = root / name
+    sd.mkdir(parents=True, exist_ok=True)
+    (sd / "skill.yaml").write_text(f"id: {sid or name}\nversion: '{version}'\n", encoding="utf-8")
+    return sd
+
+
+def _bump_mtime(path: Path) -> None:
+    st = path.stat()
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+
+
+def test_get_uses_index_without_reparsing(tmp_path, monkeypatch):
+    paths = _Paths(tmp_path)
+    _write_skill(paths.skills_dir(), "alpha")
+    _write_skill(paths.skills_dir(), "beta")
+    repo = GitSkillRepository(paths=paths, git=None)
+
+    calls = []
+    real = git_repo._read_manifest
+    monkeypatch.setattr(git_repo, "_read_manifest", lambda d: calls.append(d) or real(d))
+
+    assert repo.get("alpha").version == "1.0.0"
+    parsed = len(calls)
+    for _ in range(100):
+        assert repo.get("alpha") is not None
+        assert repo.get("beta") is not None
+    assert repo.get("missing") is None
+    assert len(calls) == parsed
+    assert [m.id.value for m in repo.list()] == ["alpha", "beta"]
+    assert len(calls) == parsed
+
+
+def test_index_follows_manifest_and_directory_changes(tmp_path):
+    paths = _Paths(tmp_path)
+    root = paths.skills_dir()
+    sd = _write_skill(root, "alpha")
+    repo = GitSkillRepository(paths=paths, git=None)
+    assert repo.get("alpha").version == "1.0.0"
+
+    (sd / "skill.yaml").write_text("id: alpha\nversion: '2.0.0'\n", encoding="utf-8")
+    _bump_mtime(sd / "skill.yaml")
+    assert repo.get("alpha").version == "2.0.0"
+
+    _write_skill(root, "gamma")
+    _bump_mtime(root)
+    assert repo.get("gamma") is not None
+
+    # каталог с другим именем, но id в манифесте
+    _write_skill(root, "renamed", sid="delta")
+    repo.invalidate("delta")
+    assert Path(repo.get("delta").path).name == "renamed"
+
+
+def test_directory_named_like_skill_wins(tmp_path):
+    paths = _Paths(tmp_path)
+    root = paths.skills_dir()
+    _write_skill(root, "aaa", sid="dup", version="0.1.0")
+    _write_skill(root, "dup", version="0.2.0")
+    repo = GitSkillRepository(paths=paths, git=None)
+    assert repo.get("dup").version == "0.2.0"
@@ -0,0 +1,90 @@
+# tests/test_skill_memory.py
+from __future__ import annotations
+
+import json
+import os
+import time
+
+import adaos.services.skill.memory_store as memory_store
+from adaos.sdk.data import skill_memory
+from adaos.services.skill.memory_store import SkillMemoryStore, flush_skill_memory
+
+
+def test_sdk_get_set_is_cached_and_flushed(tmp_path, monkeypatch):
+    path = tmp_path / "slot" / ".skill_env.json"
+    monkeypatch.setenv("ADAOS_SKILL_ENV_PATH", str(path))
+
+    skill_memory.set("counter", 1)
+    skill_memory.set("items", [1, 2])
+    assert skill_memory.get("counter") == 1
+    skill_memory.get("items").append(3)
+    assert skill_memory.get("items") == [1, 2]
+    assert skill_memory.get("missing", "x") == "x"
+
+    skill_memory.flush()
+    assert json.loads(path.read_text(encoding="utf-8")) == {"counter": 1, "items": [1, 2]}
+    assert not list(path.parent.glob("*.tmp"))
+
+
+def test_debounced_flush_and_external_reload(tmp_path):
+    path = tmp_path / ".skill_env.json"
+    store = SkillMemoryStore(path, flush_delay=0.05)
+    store.set("a", 1)
+    assert not path.exists()
+    deadline = time.time() + 2
+    while not path.exists() and time.time() < deadline:
+        time.sleep(0.01)
+    assert json.loads(path.read_text(encoding="utf-8")) == {"a": 1}
+
+    path.write_text(json.dumps({"a": 2}), encoding="utf-8")
+    st = path.stat()
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+    assert store.get("a") == 2
+
+
+def test_journal_mode_appends_and_compacts(tmp_path, monkeypatch):
+    monkeypatch.setattr(memory_store, "JOURNAL_COMPACT_ENTRIES", 5)
+    path = tmp_path / ".skill_env.json"
+    store = SkillMemoryStore(path, journal=True)
+    for i in range(3):
+        store.set("n", i)
+    journal = path.with_name(".skill_env.json.journal")
+    assert len(journal.read_text(encoding="utf-8").splitlines()) == 3
+
+    # новый процесс видит снапшот + журнал, оборванная строка игнорируется
+    with journal.open("a", encoding="utf-8") as fh:
+        fh.write('{"k": "n", "v"')
+    assert SkillMemoryStore(path, journal=True).get("n") == 2
+
+    store.set("n", 3)
+    store.set("n", 4)
+    assert not journal.exists()
+    assert json.loads(path.read_text(encoding="utf-8")) == {"n": 4}
+
+
+def test_flush_folds_foreign_journal(tmp_path):
+    path = tmp_path / ".skill_env.json"
+    SkillMemoryStore(path, journal=True).set("k", "v")
+    flush_skill_memory(path)  # нет открытого store — ничего не делаем
+    store = memory_store.get_skill_memory(path)
+    store.flush()
+    assert json.loads(path.read_text(encoding="utf-8")) == {"k": "v"}
+    assert not path.with_name(".skill_env.json.journal").exists()
+
+
+def test_flush_merges_only_own_keys(tmp_path):
+    path = tmp_path / ".skill_env.json"
+    path.write_text(json.dumps({"shared": 0}), encoding="utf-8")
+    hub = SkillMemoryStore(path, flush_delay=60)
+    worker = SkillMemoryStore(path, flush_delay=60)  # как кэш в процессе-воркере
+    assert hub.get("shared") == worker.get("shared") == 0
+
+    hub.set("hub", 1)
+    worker.set("worker", 2)
+    worker.set("shared", 3)
+    worker.flush()
+    hub.flush()  # устаревший вид хаба не затирает ключи воркера
+
+    assert json.loads(path.read_text(encoding="utf-8")) == {"shared": 3, "hub": 1, "worker": 2}
+    assert hub.get("worker") == 2
+    assert path.with_name(".skill_env.json.lock").exists()
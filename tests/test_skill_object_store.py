@@ -0,0 +1,91 @@
+# tests/test_skill_object_store.py
+from __future__ import annotations
+
+import os
+import time
+from pathlib import Path
+
+from adaos.services.agent_context import get_ctx
+from adaos.services.skill.manager import SkillManager
+from adaos.services.skill.object_store import SLOT_MANIFEST_NAME, ObjectStore, SlotManifest, slots_identical
+
+
+def _tree(root: Path, files: dict[str, str]) -> Path:
+    for rel, text in files.items():
+        path = root / rel
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(text, encoding="utf-8")
+    return root
+
+
+def test_stage_links_identical_files_once(tmp_path):
+    source = _tree(tmp_path / "src", {"a.py": "A = 1\n", "pkg/b.py": "B = 2\n", "__pycache__/x.pyc": "junk"})
+    store = ObjectStore(tmp_path / "objects")
+
+    first = store.stage_tree(source, tmp_path / "slotA")
+    second = store.stage_tree(source, tmp_path / "slotB")
+
+    assert set(first.files) == {"a.py", "pkg/b.py"}
+    assert first.digest == second.digest
+    assert not (tmp_path / "slotA" / "__pycache__").exists()
+    a1, a2 = tmp_path / "slotA" / "a.py", tmp_path / "slotB" / "a.py"
+    assert a1.read_text(encoding="utf-8") == "A = 1\n"
+    if os.name != "nt":
+        assert a1.stat().st_ino == a2.stat().st_ino
+        assert a1.stat().st_nlink == 3  # объект + два слота
+
+    # изменённый файл получает новый объект, остальные остаются общими
+    (source / "a.py").write_text("A = 3\n", encoding="utf-8")
+    third = store.stage_tree(source, tmp_path / "slotC")
+    assert third.files["a.py"] != first.files["a.py"]
+    assert third.files["pkg/b.py"] == first.files["pkg/b.py"]
+    assert third.digest != first.digest
+
+
+def test_manifest_roundtrip_and_prune(tmp_path):
+    source = _tree(tmp_path / "src", {"a.py": "x\n"})
+    store = ObjectStore(tmp_path / "objects")
+    manifest = store.stage_tree(source, tmp_path / "slot")
+    manifest.meta["interpreter"] = "py"
+    manifest.write(tmp_path / "slot" / SLOT_MANIFEST_NAME)
+    loaded = SlotManifest.read(tmp_path / "slot" / SLOT_MANIFEST_NAME)
+    assert loaded is not None and loaded.digest == manifest.digest
+
+    obj = store.object_path(manifest.files["a.py"])
+    assert store.prune(grace=0) == 0  # ещё связан со слотом
+    (tmp_path / "slot" / "a.py").unlink()
+    past = time.time() - 3600
+    os.utime(obj, (past, past))
+    assert store.prune(grace=0) == 1
+    assert not obj.exists()
+
+
+def test_redeploy_of_identical_sources_keeps_active_slot(tmp_path):
+    ctx = get_ctx()
+    skills_root = Path(ctx.paths.skills_dir())
+    name = "objstore_demo"
+    _tree(
+        skills_root / name,
+        {
+            "skill.yaml": f"name: {name}\nversion: 1.0.0\n",
+            "handlers/main.py": "def handle(topic, payload):\n    return payload\n",
+        },
+    )
+    mgr = SkillManager(git=ctx.git, paths=ctx.paths, caps=ctx.caps)
+    try:
+        first = mgr.prepare_runtime(name)
+        active = mgr.activate_runtime(name)
+        assert active == first.slot
+
+        second = mgr.prepare_runtime(name)
+        assert second.slot != first.slot
+        env = mgr._runtime_env(name)
+        assert slots_identical(env.slot_root("1.0.0", first.slot), env.slot_root("1.0.0", second.slot))
+        assert mgr.activate_runtime(name) == first.slot
+        assert env.read_active_slot("1.0.0") == first.slot
+
+        (skills_root / name / "handlers" / "main.py").write_text("def handle(topic, payload):\n    return 1\n", encoding="utf-8")
+        third = mgr.prepare_runtime(name)
+        assert mgr.activate_runtime(name) == third.slot
+    finally:
+        mgr.cleanup_runtime(name, purge_data=True)
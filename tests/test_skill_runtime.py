@@ -15,6 +15,8 @@ from adaos.services.skill.runtime import (
     SkillPrepScriptNotFoundError,
     find_skill_dir,
     find_skill_slot,
+    handler_cache_stats,
+    invalidate_handler_cache,
     resolve_active_version,
     run_skill_handler_sync,
     run_skill_prep,
@@ -186,3 +188,68 @@ def test_run_skill_prep_missing_script_raises(skill_factory):
 
     with pytest.raises(SkillPrepScriptNotFoundError):
         run_skill_prep("no_prep")
+
+
+def test_run_skill_handler_keeps_module_state_between_calls(skill_factory):
+    handler_source = textwrap.dedent(
+        """
+        CALLS = []
+
+        def handle(topic, payload):
+            CALLS.append(topic)
+            return len(CALLS)
+        """
+    )
+    skill_factory("cached_skill", handler_source=handler_source, prep_source=None)
+    invalidate_handler_cache("cached_skill")
+    before = handler_cache_stats()
+
+    assert run_skill_handler_sync("cached_skill", "a", {}) == 1
+    assert run_skill_handler_sync("cached_skill", "b", {}) == 2
+
+    stats = handler_cache_stats()
+    assert stats["misses"] - before["misses"] == 1
+    assert stats["hits"] - before["hits"] == 1
+    assert stats["entries"]["cached_skill"] == ["1.0.0", "A"]
+
+    assert run_skill_handler_sync("cached_skill", "c", {}, reload=True) == 1
+    invalidate_handler_cache("cached_skill")
+    assert run_skill_handler_sync("cached_skill", "d", {}) == 1
+
+
+def test_shared_dep_envs_go_last_and_stale_ones_are_dropped(tmp_path, monkeypatch):
+    import sys
+
+    from adaos.services.skill import runtime as skill_runtime
+    from adaos.services.skill.dep_cache import DependencyCache
+
+    monkeypatch.setattr(sys, "path", list(sys.path))
+    monkeypatch.setattr(skill_runtime, "_SKILL_DEP_ENVS", {})
+    site = sys.path[-1]
+
+    def _env(key: str) -> Path:
+        env = tmp_path / ".deps" / key
+        env.mkdir(parents=True)
+        (env / ".adaos-env.json").write_text("{}", encoding="utf-8")
+        return env
+
+    def _slot(skill: str, env: Path) -> Path:
+        slot = tmp_path / skill / "slots" / "A"
+        (slot / "src").mkdir(parents=True, exist_ok=True)
+        DependencyCache.link_slot(slot / "vendor", env)
+        return slot
+
+    old, new = _env("old"), _env("new")
+    slot_a = _slot("alpha", old)
+    skill_runtime._ensure_sys_paths("alpha", slot_a)
+    assert sys.path[:2] == [str(slot_a / "vendor"), str(slot_a / "src")]
+    assert sys.path.index(str(old)) > sys.path.index(site)  # skill copies of libraries do not shadow the host
+
+    skill_runtime._ensure_sys_paths("beta", _slot("beta", old))
+    skill_runtime._ensure_sys_paths("alpha", _slot("alpha", new))
+    assert str(old) in sys.path  # still used by beta
+    assert sys.path[-1] == str(new)
+
+    skill_runtime._ensure_sys_paths("beta", _slot("beta", new))
+    assert str(old) not in sys.path
+    assert sys.path.count(str(new)) == 1
@@ -0,0 +1,75 @@
+# tests/test_skill_tests_runner.py
+from __future__ import annotations
+
+import os
+import time
+from pathlib import Path
+
+import pytest
+
+import adaos.services.skill.tests_runner as tests_runner
+from adaos.services.skill.object_store import SLOT_MANIFEST_NAME, SlotManifest
+from adaos.services.skill.tests_runner import run_tests
+
+pytestmark = pytest.mark.skipif(os.name == "nt", reason="suites are shell scripts")
+
+
+def _slot(tmp_path: Path, suites: dict[str, str]) -> tuple[Path, Path]:
+    slot = tmp_path / "slot"
+    root = slot / "src" / "skills" / "demo"
+    for suite, body in suites.items():
+        script = root / "tests" / suite / "run.sh"
+        script.parent.mkdir(parents=True, exist_ok=True)
+        script.write_text("#!/bin/sh\n" + body + "\n", encoding="utf-8")
+        script.chmod(0o755)
+    SlotManifest(files={"handlers/main.py": "abc"}).write(slot / SLOT_MANIFEST_NAME)
+    return slot, root
+
+
+def _run(slot: Path, root: Path, **kwargs):
+    return run_tests(root, log_path=slot / "runtime" / "logs" / "tests.log", skill_name="demo", slot_current_dir=slot, **kwargs)
+
+
+def test_suites_run_concurrently_with_ordered_log(tmp_path):
+    body = "sleep 0.4; echo {name}"
+    slot, root = _slot(tmp_path, {name: body.format(name=name) for name in ("smoke", "contract", "e2e-dryrun")})
+    started = time.perf_counter()
+    results = _run(slot, root)
+    assert time.perf_counter() - started < 1.0
+    assert {name: res.status for name, res in results.items()} == {"smoke": "passed", "contract": "passed", "e2e-dryrun": "passed"}
+    log = (slot / "runtime" / "logs" / "tests.log").read_text(encoding="utf-8")
+    assert log.index("smoke\n") < log.index("contract\n") < log.index("e2e-dryrun\n")
+
+
+def test_suite_timeout_is_reported(tmp_path, monkeypatch):
+    monkeypatch.setitem(tests_runner._TEST_TIMEOUTS, "smoke", 0.3)
+    slot, root = _slot(tmp_path, {"smoke": "sleep 5", "contract": "exit 0"})
+    started = time.perf_counter()
+    results = _run(slot, root)
+    assert time.perf_counter() - started < 3
+    assert results["smoke"].status == "error" and "timed out" in (results["smoke"].detail or "")
+    assert results["contract"].status == "passed"
+
+
+def test_passing_results_cached_by_slot_content(tmp_path):
+    counter = tmp_path / "runs.txt"
+    slot, root = _slot(tmp_path, {"smoke": f"echo x >> {counter}"})
+    cache = tmp_path / "cache"
+
+    first = _run(slot, root, cache_dir=cache)
+    second = _run(slot, root, cache_dir=cache)
+    assert first == second and first["smoke"].status == "passed"
+    assert counter.read_text(encoding="utf-8").count("x") == 1
+    assert "cached pass" in (slot / "runtime" / "logs" / "tests.log").read_text(encoding="utf-8")
+
+    # другое содержимое слота — тесты снова запускаются
+    SlotManifest(files={"handlers/main.py": "def"}).write(slot / SLOT_MANIFEST_NAME)
+    _run(slot, root, cache_dir=cache)
+    assert counter.read_text(encoding="utf-8").count("x") == 2
+
+    # проваленный прогон не кэшируется
+    (root / "tests" / "smoke" / "run.sh").write_text(f"#!/bin/sh\necho x >> {counter}\nexit 1\n", encoding="utf-8")
+    SlotManifest(files={"handlers/main.py": "ghi"}).write(slot / SLOT_MANIFEST_NAME)
+    assert _run(slot, root, cache_dir=cache)["smoke"].status == "failed"
+    assert _run(slot, root, cache_dir=cache)["smoke"].status == "failed"
+    assert counter.read_text(encoding="utf-8").count("x") == 4
@@ -0,0 +1,203 @@
+# tests/test_skill_tool_workers.py
+from __future__ import annotations
+
+import json
+import os
+import time
+from pathlib import Path
+
+import pytest
+
+from adaos.services.agent_context import get_ctx
+from adaos.services.eventbus import LocalEventBus
+from adaos.services.skill.manager import SkillManager
+from adaos.services.skill.tool_workers import ToolWorkerPools, WorkerSpec
+
+_HANDLER = """\
+import os
+import time
+
+from adaos.sdk.data import skill_memory
+from adaos.services.agent_context import get_ctx
+from adaos.services.eventbus import emit
+
+
+class SkillError(Exception):
+    pass
+
+
+def handle(topic, payload):
+    return payload
+
+
+def pid(payload):
+    return os.getpid()
+
+
+def slow(payload):
+    time.sleep(payload.get("sleep", 5))
+    return "late"
+
+
+def boom(payload):
+    raise ValueError("bad input")
+
+
+def custom(payload):
+    raise SkillError("skill specific")
+
+
+def remember(payload):
+    skill_memory.set("last", payload["value"])
+    emit(get_ctx().bus, "demo.remembered", {"value": payload["value"]}, "demo")
+    return os.environ.get("ADAOS_SKILL_ENV_PATH")
+"""
+
+
+def _spec(tmp_path: Path) -> WorkerSpec:
+    skill_dir = tmp_path / "workers_demo"
+    (skill_dir / "handlers").mkdir(parents=True)
+    (skill_dir / "handlers" / "__init__.py").write_text("", encoding="utf-8")
+    (skill_dir / "handlers" / "main.py").write_text(_HANDLER, encoding="utf-8")
+    return WorkerSpec(
+        skill="workers_demo",
+        version="1.0.0",
+        slot="A",
+        skill_dir=skill_dir,
+        extra_paths=(),
+        skill_env_path=tmp_path / "env" / ".skill_env.json",
+        secrets_path=tmp_path / "secrets.json",
+        preload=("handlers.main",),
+    )
+
+
+@pytest.fixture
+def pools():
+    settings = get_ctx().settings
+    pools = ToolWorkerPools(settings.with_overrides(base_dir=Path(settings.base_dir)), size=1)
+    try:
+        yield pools
+    finally:
+        pools.close()
+
+
+def test_worker_is_reused_and_killed_on_timeout(tmp_path, pools):
+    spec = _spec(tmp_path)
+    first = pools.call(spec, None, "pid", {})
+    assert first != os.getpid()
+    assert pools.call(spec, None, "pid", {}) == first
+
+    started = time.perf_counter()
+    with pytest.raises(TimeoutError, match="timed out"):
+        pools.call(spec, None, "slow", {"sleep": 30}, timeout=0.5, label="slow")
+    assert time.perf_counter() - started < 5
+
+    replacement = pools.call(spec, None, "pid", {})
+    assert replacement != first
+    with pytest.raises(OSError):
+        os.kill(first, 0)  # старый воркер действительно убит
+
+
+def test_errors_events_and_memory_cross_the_pipe(tmp_path, pools):
+    spec = _spec(tmp_path)
+    bus = LocalEventBus()
+    seen: list[dict] = []
+    bus.subscribe("demo.", lambda ev: seen.append(dict(ev.payload)))
+
+    worker = pools.call(spec, None, "pid", {})
+    with pytest.raises(ValueError, match="bad input"):
+        pools.call(spec, None, "boom", {})
+    with pytest.raises(RuntimeError, match="SkillError: skill specific"):
+        pools.call(spec, None, "custom", {})
+    assert pools.call(spec, None, "pid", {}) == worker  # ошибка инструмента не убивает воркер
+
+    env_path = pools.call(spec, None, "remember", {"value": 42}, bus=bus)
+    assert env_path == str(spec.skill_env_path)
+    assert seen == [{"value": 42}]
+    assert json.loads(spec.skill_env_path.read_text(encoding="utf-8"))["last"] == 42
+
+    # новый stamp слота — новый пул и новый процесс
+    restamped = WorkerSpec(**{**{f: getattr(spec, f) for f in WorkerSpec.__slots__}, "stamp": ("v2",)})
+    assert pools.call(restamped, None, "pid", {}) != worker
+
+
+def test_run_tool_reuses_resolution_and_keeps_process_state(monkeypatch):
+    ctx = get_ctx()
+    root = Path(ctx.paths.skills_dir())
+    name = "workers_inproc"
+    sd = root / name
+    (sd / "handlers").mkdir(parents=True, exist_ok=True)
+    (sd / "skill.yaml").write_text(f"name: {name}\nversion: 1.0.0\ntools:\n  - name: remember\n  - name: slow\n", encoding="utf-8")
+    (sd / "handlers" / "main.py").write_text(_HANDLER, encoding="utf-8")
+    mgr = SkillManager(git=ctx.git, paths=ctx.paths, caps=ctx.caps)
+    try:
+        mgr.prepare_runtime(name, run_tests=False)
+        mgr.activate_runtime(name)
+        calls = {"status": 0}
+        real_status = mgr.runtime_status
+
+        def counting_status(skill):
+            calls["status"] += 1
+            return real_status(skill)
+
+        monkeypatch.setattr(mgr, "runtime_status", counting_status)
+        secrets = ctx.secrets
+        monkeypatch.delenv("ADAOS_SKILL_ENV_PATH", raising=False)
+
+        first = mgr.run_tool(name, "remember", {"value": 1})
+        second = mgr.run_tool(name, "remember", {"value": 2}, timeout=5)
+        assert first == second is None  # путь памяти не идёт через os.environ
+        assert "ADAOS_SKILL_ENV_PATH" not in os.environ
+        assert ctx.secrets is secrets
+        assert calls["status"] <= 1
+
+        env = mgr._runtime_env(name)
+        slot = env.build_slot_paths("1.0.0", env.read_active_slot("1.0.0"))
+        assert json.loads(slot.skill_env_path.read_text(encoding="utf-8"))["last"] == 2
+
+        with pytest.raises(TimeoutError):
+            mgr.run_tool(name, "slow", {"sleep": 1}, timeout=0.1)
+    finally:
+        mgr.cleanup_runtime(name, purge_data=True)
+
+
+def test_tool_bridge_delivers_tool_events_on_the_server_loop():
+    import asyncio
+    import threading
+
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+
+    from adaos.apps.api import tool_bridge
+    from adaos.apps.api.auth import require_token
+
+    ctx = get_ctx()
+    name = "workers_bridge"
+    sd = Path(ctx.paths.skills_dir()) / name
+    (sd / "handlers").mkdir(parents=True, exist_ok=True)
+    (sd / "skill.yaml").write_text(f"name: {name}\nversion: 1.0.0\ntools:\n  - name: remember\n", encoding="utf-8")
+    (sd / "handlers" / "main.py").write_text(_HANDLER, encoding="utf-8")
+    mgr = SkillManager(git=ctx.git, paths=ctx.paths, caps=ctx.caps)
+    bus = LocalEventBus()
+    seen: list[int] = []
+
+    async def on_event(ev):
+        seen.append(threading.get_ident())
+
+    bus.subscribe("demo.remembered", on_event)
+    app = FastAPI()
+    app.include_router(tool_bridge.router, prefix="/api")
+    app.dependency_overrides[require_token] = lambda: None
+    app.dependency_overrides[get_ctx] = lambda: ctx.with_overrides(bus=bus)
+    try:
+        mgr.prepare_runtime(name, run_tests=False)
+        mgr.activate_runtime(name)
+        with TestClient(app) as client:
+            loop_thread = client.portal.call(lambda: threading.get_ident())
+            response = client.post("/api/tools/call", json={"tool": f"{name}:remember", "arguments": {"value": 7}})
+            assert response.status_code == 200, response.text
+            client.portal.call(asyncio.sleep, 0.05)
+        # событие из потока инструмента обработано в цикле сервера, а не в asyncio.run
+        assert seen == [loop_thread]
+    finally:
+        mgr.cleanup_runtime(name, purge_data=True)
@@ -0,0 +1,63 @@
+# tests/test_sqlite_kv.py
+from adaos.adapters.db.sqlite_store import SQLite, SQLiteKV
+from adaos.services.agent_context import get_ctx
+
+
+def test_read_cache_hits_and_returns_fresh_containers():
+    kv = SQLiteKV(get_ctx().sql, namespace="cache")
+    kv.set("a", {"items": [1]})
+    first = kv.get("a")
+    first["items"].append(2)
+    assert kv.get("a") == {"items": [1]}
+    assert kv.get("missing", "dflt") == "dflt" and kv.get("missing") is None
+    stats = kv.cache_stats()
+    assert stats["hits"] >= 2
+
+    # другой экземпляр того же namespace видит тот же кэш, другой namespace — нет
+    twin, other = SQLiteKV(get_ctx().sql, namespace="cache"), SQLiteKV(get_ctx().sql, namespace="other")
+    twin.set("a", 5)
+    assert kv.get("a") == 5 and other.get("a") is None
+
+
+def test_external_commit_invalidates_cache(tmp_path):
+    paths = type("P", (), {"state_dir": lambda self: tmp_path})()
+    mine, theirs = SQLite(paths), SQLite(paths)
+    kv, ext = SQLiteKV(mine), SQLiteKV(theirs)
+    kv.set("k", 1)
+    assert kv.get("k") == 1 and kv.get("absent") is None
+    ext.set("k", 2)
+    ext.set("absent", "now")
+    assert kv.get("k") == 2 and kv.get("absent") == "now"
+    mine.close()
+    theirs.close()
+
+
+def test_batch_operations_and_range_list():
+    kv = SQLiteKV(get_ctx().sql, namespace="batch")
+    kv.set_many({"user/1": {"n": 1}, "user/2": {"n": 2}, "user_x": 3, "users": 4, "zzz": 5})
+    assert kv.get_many(["user/1", "user/2", "nope", "user/1"]) == {"user/1": {"n": 1}, "user/2": {"n": 2}}
+    # '_' больше не работает как wildcard LIKE
+    assert kv.list("user_") == ["user_x"]
+    assert kv.list("user/") == ["user/1", "user/2"]
+    assert kv.list() == ["user/1", "user/2", "user_x", "users", "zzz"]
+    assert kv.delete_prefix("user/") == 2
+    assert kv.get("user/1") is None and kv.list("user") == ["user_x", "users"]
+
+
+def test_write_behind_coalesces_and_flushes():
+    sql = get_ctx().sql
+    kv = SQLiteKV(sql, namespace="wb", write_behind=60.0)
+    for i in range(100):
+        kv.set("counter", i)
+    kv.set("gone", 1)
+    kv.delete("gone")
+    assert kv.get("counter") == 99 and kv.get("gone") is None
+    with sql.read() as con:
+        assert con.execute("SELECT COUNT(*) FROM kv WHERE ns='wb'").fetchone()[0] == 0
+    assert kv.cache_stats()["coalesced"] >= 99
+
+    kv.flush()
+    with sql.read() as con:
+        rows = con.execute("SELECT k, v FROM kv WHERE ns='wb'").fetchall()
+    assert rows == [("counter", "99")]
+    assert kv.cache_stats()["pending"] == 0
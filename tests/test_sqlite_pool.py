@@ -0,0 +1,80 @@
+# tests/test_sqlite_pool.py
+import gc
+import sqlite3
+import threading
+
+import pytest
+
+from adaos.adapters.db.sqlite_store import SQLite, SQLiteKV
+from adaos.services.agent_context import get_ctx
+
+
+def test_connections_are_pooled_and_configured():
+    sql = get_ctx().sql
+    with sql.connect() as w1:
+        pass
+    with sql.connect() as w2:
+        assert w2 is w1
+        assert w2.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+        assert w2.execute("PRAGMA synchronous").fetchone()[0] == 1  # NORMAL
+        assert w2.execute("PRAGMA foreign_keys").fetchone()[0] == 1
+    with sql.read() as r1, sql.read() as r2:
+        assert r1 is r2 and r1 is not w1
+
+    other = []
+    t = threading.Thread(target=lambda: other.append(sql.read().__enter__()))
+    t.start()
+    t.join()
+    assert other[0] is not r1
+
+
+def test_writer_commits_on_exit_and_rolls_back_on_error():
+    sql = get_ctx().sql
+    kv = SQLiteKV(sql, namespace="pool")
+    with pytest.raises(RuntimeError):
+        with sql.connect() as con:
+            con.execute("INSERT INTO kv(ns,k,v) VALUES('pool','lost','1')")
+            raise RuntimeError("boom")
+    assert kv.get("lost") is None
+
+    with sql.connect() as con:
+        with sql.connect() as inner:
+            inner.execute("INSERT INTO kv(ns,k,v) VALUES('pool','nested','1')")
+        assert con.in_transaction  # внутренний with не коммитит раньше внешнего
+    seen = []
+    t = threading.Thread(target=lambda: seen.append(kv.get("nested")))
+    t.start()
+    t.join()
+    assert seen == [1]
+
+
+def test_close_and_reopen(tmp_path):
+    paths = type("P", (), {"state_dir": lambda self: tmp_path})()
+    sql = SQLite(paths)
+    kv = SQLiteKV(sql)
+    kv.set("a", {"x": 1})
+    sql.close()
+    assert kv.get("a") == {"x": 1}
+    sql.close()
+
+
+def test_reader_of_finished_thread_is_closed(tmp_path):
+    paths = type("P", (), {"state_dir": lambda self: tmp_path})()
+    sql = SQLite(paths)
+    opened = []
+
+    def worker():
+        with sql.read() as con:
+            con.execute("SELECT 1").fetchone()
+            opened.append(con)
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    gc.collect()
+    assert sql._readers == {}
+    with pytest.raises(sqlite3.ProgrammingError):
+        opened[0].execute("SELECT 1")
+    sql.close()
@@ -0,0 +1,107 @@
+# tests/test_subnet_heartbeat.py
+import yaml
+
+from adaos.services import capacity as capacity_mod
+from adaos.services.capacity import capacity_hash, local_capacity_snapshot
+from adaos.services.registry.subnet_directory import SubnetDirectory
+
+
+def _register(directory, node_id="m1", capacity=None):
+    capacity = capacity or {"io": [{"io_type": "stdout", "capabilities": ["text"], "priority": 50}], "skills": [], "scenarios": []}
+    directory.on_register({"node_id": node_id, "subnet_id": "s", "roles": ["member"], "capacity": capacity})
+    return capacity
+
+
+def test_heartbeat_skips_capacity_rewrite_when_hash_matches(monkeypatch):
+    directory = SubnetDirectory()
+    capacity = _register(directory)
+    writes = []
+    monkeypatch.setattr(directory.repo, "replace_io_capacity", lambda *a: writes.append(a))
+    monkeypatch.setattr(directory.repo, "touch_heartbeat", lambda *a: writes.append(a))
+
+    digest = capacity_hash(capacity)
+    for _ in range(100):
+        assert directory.on_heartbeat("m1", None, capacity_hash=digest) is False
+    # legacy member: full capacity every time, unchanged content
+    assert directory.on_heartbeat("m1", capacity) is False
+    assert writes == []
+    assert directory.is_online("m1") and directory.stats["capacity_skipped"] == 101
+
+    changed = {**capacity, "skills": [{"name": "weather", "version": "1.0"}]}
+    directory.on_heartbeat("m1", changed, capacity_hash=capacity_hash(changed))
+    assert len(writes) == 1 and directory.capacity_hashes["m1"] == capacity_hash(changed)
+
+
+def test_unknown_hash_requests_full_capacity():
+    directory = SubnetDirectory()
+    _register(directory)
+    assert directory.on_heartbeat("m1", None, capacity_hash="deadbeef") is True
+    assert directory.stats["capacity_requested"] == 1
+    # the hub restarted: persisted nodes are known but hashes are not
+    restarted = SubnetDirectory()
+    assert restarted.is_known("m1")
+    assert restarted.on_heartbeat("m1", None, capacity_hash="anything") is True
+
+
+def test_local_capacity_snapshot_reparses_only_on_change(tmp_path, monkeypatch):
+    node_yaml = tmp_path / "node.yaml"
+    node_yaml.write_text(yaml.safe_dump({"capacity": {"skills": [{"name": "a", "version": "1"}]}}), encoding="utf-8")
+    calls = []
+    real = capacity_mod.load_capacity_from_node_yaml
+    monkeypatch.setattr(capacity_mod, "load_capacity_from_node_yaml", lambda base=None: calls.append(base) or real(base))
+
+    cap1, h1 = local_capacity_snapshot(tmp_path)
+    cap2, h2 = local_capacity_snapshot(tmp_path)
+    assert len(calls) == 1 and h1 == h2 and cap1 == cap2
+    cap2["skills"].clear()
+    assert local_capacity_snapshot(tmp_path)[0]["skills"], "snapshot must not leak the cached dict"
+
+    capacity_mod._save_node_yaml({"capacity": {"skills": [{"name": "b", "version": "2"}]}}, tmp_path)
+    cap3, h3 = local_capacity_snapshot(tmp_path)
+    assert len(calls) == 2 and h3 != h1 and cap3["skills"][0]["name"] == "b"
+
+
+class _Resp:
+    def __init__(self, body):
+        self.status_code = 200
+        self._body = body
+
+    def json(self):
+        return self._body
+
+
+def test_member_sends_capacity_only_on_change(monkeypatch):
+    import asyncio
+
+    from adaos.services import heartbeat_requests
+
+    directory = SubnetDirectory()
+    snapshot = {"cap": {"io": [], "skills": [], "scenarios": []}}
+    sent = []
+
+    class _Http:
+        async def apost_json(self, url, payload, **kw):
+            sent.append(dict(payload))
+            if url.endswith("/register"):
+                directory.on_register(payload)
+                return _Resp({"ok": True})
+            return _Resp({"ok": True, "capacity_required": directory.on_heartbeat(payload["node_id"], payload.get("capacity"), capacity_hash=payload.get("capacity_hash"))})
+
+    monkeypatch.setattr(heartbeat_requests, "get_hub_http", lambda: _Http())
+    monkeypatch.setattr(heartbeat_requests, "local_capacity_snapshot", lambda: (snapshot["cap"], capacity_hash(snapshot["cap"])))
+    hb = heartbeat_requests.RequestsHeartbeat()
+
+    async def scenario():
+        assert await hb.register("http://hub", "t", node_id="m1", subnet_id="s", hostname="h", roles=["member"])
+        for _ in range(3):
+            assert await hb.heartbeat("http://hub", "t", node_id="m1")
+        snapshot["cap"] = {"io": [], "skills": [{"name": "x", "version": "1"}], "scenarios": []}
+        assert await hb.heartbeat("http://hub", "t", node_id="m1")
+        assert await hb.heartbeat("http://hub", "t", node_id="m1")
+        directory.capacity_hashes.clear()  # hub restart
+        assert await hb.heartbeat("http://hub", "t", node_id="m1")
+
+    asyncio.run(scenario())
+    with_capacity = ["capacity" in p for p in sent[1:]]
+    assert with_capacity == [False, False, False, True, False, False, True]
+    assert directory.capacity_hashes["m1"] == capacity_hash(snapshot["cap"])
@@ -0,0 +1,75 @@
+# tests/test_yjs_seeding.py
+from __future__ import annotations
+
+import asyncio
+from types import SimpleNamespace
+
+import y_py as Y
+
+import adaos.sdk  # noqa: F401  # y_store и sdk импортируют друг друга — sdk первым
+from adaos.apps.yjs import y_gateway
+from adaos.apps.yjs.y_bootstrap import ensure_webspace_seeded_from_scenario
+from adaos.apps.yjs.y_store import AdaosMemoryYStore
+
+
+def _seeded_update() -> bytes:
+    doc = Y.YDoc()
+    with doc.begin_transaction() as txn:
+        doc.get_map("ui").set(txn, "application", {"id": "desktop"})
+    return Y.encode_state_as_update(doc)
+
+
+def test_seed_check_runs_once_per_store():
+    async def scenario():
+        store = AdaosMemoryYStore("ws-seed")
+        await store.write(_seeded_update())
+        replays = []
+        original = store.apply_updates
+
+        async def counting(ydoc):
+            replays.append(1)
+            await original(ydoc)
+
+        store.apply_updates = counting  # type: ignore[method-assign]
+        await asyncio.gather(*(ensure_webspace_seeded_from_scenario(store, "ws-seed") for _ in range(10)))
+        assert store.seeded
+        assert len(replays) == 1
+
+    asyncio.run(scenario())
+
+
+def test_seed_check_uses_live_document():
+    async def scenario():
+        store = AdaosMemoryYStore("ws-live")
+        live = Y.YDoc()
+        Y.apply_update(live, _seeded_update())
+
+        async def fail(ydoc):
+            raise AssertionError("store history must not be replayed")
+
+        store.apply_updates = fail  # type: ignore[method-assign]
+        await ensure_webspace_seeded_from_scenario(store, "ws-live", ydoc=live)
+        assert store.seeded
+
+    asyncio.run(scenario())
+
+
+def test_device_presence_is_coalesced(monkeypatch):
+    monkeypatch.setattr(y_gateway, "PRESENCE_COALESCE_SEC", 0.01)
+    doc = Y.YDoc()
+    transactions = []
+    # учитываем только транзакции с изменениями (пустой update — b"\x00\x00")
+    doc.observe_after_transaction(lambda ev: len(ev.get_update()) > 2 and transactions.append(ev))
+    monkeypatch.setattr(y_gateway.y_server, "rooms", {"ws-presence": SimpleNamespace(ydoc=doc)})
+
+    async def scenario():
+        for i in range(50):
+            await y_gateway._update_device_presence("ws-presence", f"dev-{i % 5}")
+        await asyncio.sleep(0.05)
+
+    asyncio.run(scenario())
+    writes = len(transactions)
+    devices = doc.get_map("devices")
+    assert sorted(devices.keys()) == [f"dev-{i}" for i in range(5)]
+    assert devices["dev-3"]["presence"]["online"] is True
+    assert writes == 1
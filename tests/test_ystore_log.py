@@ -0,0 +1,105 @@
+# tests/test_ystore_log.py
+from __future__ import annotations
+
+import asyncio
+
+import y_py as Y
+
+import adaos.sdk  # noqa: F401  # y_store и sdk импортируют друг друга — sdk первым
+import adaos.apps.yjs.y_store as y_store
+from adaos.apps.yjs.y_store import AdaosMemoryYStore, read_update_log, ystore_log_path_for_webspace
+
+
+def _edits(count: int) -> list[bytes]:
+    doc = Y.YDoc()
+    updates: list[bytes] = []
+    doc.observe_after_transaction(lambda ev: updates.append(ev.get_update()))
+    data = doc.get_map("data")
+    for i in range(count):
+        with doc.begin_transaction() as txn:
+            data.set(txn, f"k{i % 7}", i)
+    return updates
+
+
+async def _state(store: AdaosMemoryYStore) -> dict:
+    doc = Y.YDoc()
+    await store.apply_updates(doc)
+    return dict(doc.get_map("data").items())
+
+
+def test_restart_recovers_snapshot_plus_log_tail():
+    async def scenario():
+        first = AdaosMemoryYStore("ws-log")
+        for update in _edits(20):
+            await first.write(update)
+        expected = await _state(first)
+        first.update_log.close()
+
+        second = AdaosMemoryYStore("ws-log")
+        assert expected["k6"] == 13
+        assert await _state(second) == expected
+
+    asyncio.run(scenario())
+
+
+def test_compaction_bounds_memory_and_trims_log(monkeypatch):
+    monkeypatch.setattr(y_store, "COMPACT_UPDATES", 10)
+
+    async def scenario():
+        store = AdaosMemoryYStore("ws-compact")
+        updates = _edits(45)
+        for update in updates:
+            await store.write(update)
+            if store._compact_task is not None:
+                await store._compact_task
+        assert len(store._updates) <= 11
+        store.update_log.flush()
+        log_path = ystore_log_path_for_webspace("ws-compact")
+        assert len(read_update_log(log_path)) < len(updates)
+        assert not store.update_log.rotated.exists()
+        expected = await _state(store)
+
+        # оборванная запись в конце журнала отбрасывается
+        with open(log_path, "ab") as fh:
+            fh.write(b"\x00\x00\x01\x00partial")
+        restored = AdaosMemoryYStore("ws-compact")
+        assert await _state(restored) == expected
+
+    asyncio.run(scenario())
+
+
+def test_concurrent_backups_do_not_lose_updates(monkeypatch):
+    real_persist = y_store._persist_snapshot
+    calls = {"n": 0}
+
+    def slow_first(path, updates):
+        calls["n"] += 1
+        if calls["n"] == 1:
+            import time
+
+            time.sleep(0.3)
+        return real_persist(path, updates)
+
+    monkeypatch.setattr(y_store, "_persist_snapshot", slow_first)
+
+    async def scenario():
+        store = AdaosMemoryYStore("ws-race")
+        updates = _edits(30)
+        for update in updates[:10]:
+            await store.write(update)
+        first = asyncio.create_task(store.backup_to_disk())
+        await asyncio.sleep(0.05)
+        for update in updates[10:20]:
+            await store.write(update)
+        second = asyncio.create_task(store.compact())
+        await asyncio.sleep(0.05)
+        for update in updates[20:]:
+            await store.write(update)
+        await asyncio.gather(first, second)
+
+        expected = await _state(store)
+        assert expected["k0"] == 28
+        store.update_log.close()
+        assert await _state(AdaosMemoryYStore("ws-race")) == expected
+
+    asyncio.run(scenario())
@@ -0,0 +1,71 @@
+"""Micro-benchmark for LocalEventBus.publish throughput.
+
+Usage:
+    python tools/bench_eventbus.py [--events 20000]
+
+For 10/100/1000 subscriptions (mostly exact skill topics plus a few broad
+prefixes, as produced by ``register_subscriptions``) measures publish()/s for
+the trie-indexed bus and for a reference linear scan over all prefixes.
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+from collections import defaultdict
+
+from adaos.domain import Event
+from adaos.services.eventbus import LocalEventBus
+
+
+class LinearBus:
+    """Reference implementation: copy all subscriber lists, startswith() on every prefix."""
+
+    def __init__(self) -> None:
+        self._subs = defaultdict(list)
+
+    def subscribe(self, prefix, handler) -> None:
+        self._subs[prefix].append(handler)
+
+    def publish(self, event) -> None:
+        pairs = [(p, hs[:]) for p, hs in self._subs.items()]
+        for prefix, handlers in pairs:
+            if prefix == "*" or prefix == "" or event.type.startswith(prefix):
+                for h in handlers:
+                    h(event)
+
+
+def _populate(bus, count: int) -> None:
+    noop = lambda ev: None  # noqa: E731
+    for prefix in ("", "ui.", "sys."):
+        bus.subscribe(prefix, noop)
+    for i in range(count - 3):
+        bus.subscribe(f"nlp.intent.skill{i}.get", noop)
+
+
+def _measure(bus, topics: list[str], events: int) -> float:
+    batch = [Event(type=topics[i % len(topics)], payload={}, source="bench", ts=0.0) for i in range(events)]
+    started = time.perf_counter()
+    for ev in batch:
+        bus.publish(ev)
+    return events / (time.perf_counter() - started)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--events", type=int, default=20000)
+    args = parser.parse_args()
+
+    topics = ["ui.notify", "sys.heartbeat", "nlp.intent.skill5.get", "io.out.chat.append"]
+    print(f"{'subs':>6} {'trie ev/s':>14} {'linear ev/s':>14} {'speedup':>8}")
+    for count in (10, 100, 1000):
+        trie, linear = LocalEventBus(), LinearBus()
+        _populate(trie, count)
+        _populate(linear, count)
+        trie_rate = _measure(trie, topics, args.events)
+        linear_rate = _measure(linear, topics, args.events)
+        print(f"{count:>6} {trie_rate:>14,.0f} {linear_rate:>14,.0f} {trie_rate / linear_rate:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""Benchmark I18n translate() throughput with and without the shared catalog cache.
+
+Usage:
+    python tools/bench_i18n.py [--calls 50000]
+
+"before" reproduces the previous sdk behaviour: a fresh I18nService per call,
+so the locale JSON is read and parsed every time. "cached" goes through the
+process-wide compiled catalogs of adaos.services.i18n.service, both for a plain
+message and for one with placeholders.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import tempfile
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+from adaos.services.i18n.service import DEFAULT_LANG, I18nService
+
+
+class _Paths:
+    def __init__(self, root: Path) -> None:
+        self.root = root
+
+    def locales_dir(self) -> Path:
+        return self.root / "locales"
+
+    def skills_locales_dir(self) -> Path:
+        return self.root / "i18n"
+
+
+def _legacy_translate(paths: _Paths, key: str, lang: str, params: dict) -> str:
+    messages = {}
+    for p in (paths.locales_dir() / f"{lang}.json", paths.locales_dir() / f"{DEFAULT_LANG}.json"):
+        if p.exists():
+            messages = json.loads(p.read_text(encoding="utf-8"))
+            break
+    text = messages.get(key, key)
+    try:
+        return text.format(**params)
+    except Exception:
+        return text
+
+
+def _rate(fn, calls: int) -> float:
+    started = time.perf_counter()
+    for _ in range(calls):
+        fn()
+    return calls / (time.perf_counter() - started)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--calls", type=int, default=50000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = _Paths(Path(tmp))
+        paths.locales_dir().mkdir(parents=True)
+        catalog = {f"bench.key{i}": f"Message number {i}" for i in range(500)}
+        catalog["bench.greet"] = "Hello, {name}!"
+        (paths.locales_dir() / "en.json").write_text(json.dumps(catalog), encoding="utf-8")
+        ctx = SimpleNamespace(paths=paths, settings=SimpleNamespace(lang="en"))
+
+        legacy_calls = max(1, args.calls // 20)
+        before = _rate(lambda: _legacy_translate(paths, "bench.key7", "en", {}), legacy_calls)
+        svc = I18nService(ctx)
+        plain = _rate(lambda: svc.translate("bench.key7", lang="en"), args.calls)
+        fmt = _rate(lambda: svc.translate("bench.greet", lang="en", params={"name": "Ada"}), args.calls)
+        fresh = _rate(lambda: I18nService(ctx).translate("bench.greet", lang="en", params={"name": "Ada"}), args.calls)
+
+    print(f"{'mode':>22} {'calls/s':>14}")
+    print(f"{'before (re-parse)':>22} {before:>14,.0f}")
+    print(f"{'cached plain':>22} {plain:>14,.0f}")
+    print(f"{'cached format':>22} {fmt:>14,.0f}")
+    print(f"{'cached, new service':>22} {fresh:>14,.0f}")
+    print(f"speedup (plain): {plain / before:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
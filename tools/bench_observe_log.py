@@ -0,0 +1,82 @@
+"""Benchmark for the observe events.log writer.
+
+Usage:
+    python tools/bench_observe_log.py [--rate 10000] [--seconds 3]
+
+Emits events at a fixed target rate (default 10k/s) from an asyncio loop, as
+the observe emit wrapper does, and reports achieved throughput, the worst
+producer-side stall and how long the final flush took. For reference it also
+times the previous open/append/close-per-event strategy.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import tempfile
+import time
+from pathlib import Path
+
+from adaos.services.event_log import EventLogWriter
+
+
+def _event(i: int) -> dict:
+    return {"ts": time.time(), "topic": "bench.event", "payload": {"i": i, "text": "hello"}, "node_id": "bench", "role": "hub"}
+
+
+async def _produce(write, rate: int, seconds: float) -> tuple[int, float]:
+    total = int(rate * seconds)
+    tick = 0.01
+    per_tick = max(1, int(rate * tick))
+    started = time.perf_counter()
+    worst = 0.0
+    sent = 0
+    while sent < total:
+        t0 = time.perf_counter()
+        for _ in range(min(per_tick, total - sent)):
+            write(_event(sent))
+            sent += 1
+        worst = max(worst, time.perf_counter() - t0)
+        deadline = started + sent / rate
+        await asyncio.sleep(max(0.0, deadline - time.perf_counter()))
+    return sent, worst
+
+
+def _legacy_write(path: Path):
+    def write(e: dict) -> None:
+        with path.open("a", encoding="utf-8") as f:
+            f.write(json.dumps(e, ensure_ascii=False) + "\n")
+
+    return write
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rate", type=int, default=10000)
+    parser.add_argument("--seconds", type=float, default=3.0)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        writer = EventLogWriter(Path(tmp) / "events.log")
+        started = time.perf_counter()
+        sent, worst = asyncio.run(_produce(writer.write, args.rate, args.seconds))
+        produced = time.perf_counter() - started
+        t0 = time.perf_counter()
+        writer.close()
+        flushed = time.perf_counter() - t0
+        stats = writer.stats()
+        print(f"writer: {sent / produced:,.0f} ev/s offered, {stats['written']:,} written, " f"{stats['dropped']} dropped, {stats['rotations']} rotations, " f"worst tick {worst * 1000:.2f} ms, final flush {flushed * 1000:.1f} ms")
+
+        legacy = Path(tmp) / "legacy.log"
+        count = min(sent, 20000)
+        t0 = time.perf_counter()
+        write = _legacy_write(legacy)
+        for i in range(count):
+            write(_event(i))
+        elapsed = time.perf_counter() - t0
+        print(f"legacy open/append/close: {count / elapsed:,.0f} ev/s max")
+
+
+if __name__ == "__main__":
+    main()
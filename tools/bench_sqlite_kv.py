@@ -0,0 +1,82 @@
+"""Benchmark SQLiteKV get/set throughput before and after connection pooling.
+
+Usage:
+    python tools/bench_sqlite_kv.py [--ops 5000]
+
+"before" reproduces the previous SQLite.connect(): a fresh sqlite3 connection
+plus PRAGMA foreign_keys per call, never explicitly closed. "pooled" uses the
+pooled writer/reader connections of adaos.adapters.db.sqlite_store.SQLite with
+the KV read cache disabled; "cached" enables the LRU read cache and
+"wb" additionally coalesces sets with write-behind (flushed at the end).
+"""
+
+from __future__ import annotations
+
+import argparse
+import sqlite3
+import tempfile
+import time
+from pathlib import Path
+
+from adaos.adapters.db.sqlite_store import SQLite, SQLiteKV
+
+
+class _Paths:
+    def __init__(self, root: Path) -> None:
+        self.root = root
+
+    def state_dir(self) -> Path:
+        return self.root
+
+
+class LegacySQLite:
+    def __init__(self, paths: _Paths) -> None:
+        self._db_path = Path(paths.state_dir()) / "adaos.db"
+        with sqlite3.connect(self._db_path) as con:
+            con.execute("PRAGMA journal_mode=WAL")
+
+    def connect(self) -> sqlite3.Connection:
+        con = sqlite3.connect(self._db_path)
+        con.execute("PRAGMA foreign_keys=ON")
+        return con
+
+    read = connect
+
+
+def _run(kv: SQLiteKV, ops: int) -> tuple[float, float]:
+    started = time.perf_counter()
+    for i in range(ops):
+        kv.set(f"key{i % 256}", {"i": i, "text": "value"})
+    if hasattr(kv, "flush"):
+        kv.flush()
+    set_rate = ops / (time.perf_counter() - started)
+    started = time.perf_counter()
+    for i in range(ops):
+        kv.get(f"key{i % 256}")
+    get_rate = ops / (time.perf_counter() - started)
+    return set_rate, get_rate
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--ops", type=int, default=5000)
+    args = parser.parse_args()
+
+    variants = (
+        ("before", LegacySQLite, {"cache_size": 0}),
+        ("pooled", SQLite, {"cache_size": 0}),
+        ("cached", SQLite, {}),
+        ("wb", SQLite, {"write_behind": 60.0}),
+    )
+    print(f"{'variant':>8} {'set ops/s':>12} {'get ops/s':>12}")
+    for name, factory, kv_opts in variants:
+        with tempfile.TemporaryDirectory() as tmp:
+            sql = factory(_Paths(Path(tmp)))
+            set_rate, get_rate = _run(SQLiteKV(sql, **kv_opts), args.ops)
+            print(f"{name:>8} {set_rate:>12,.0f} {get_rate:>12,.0f}")
+            if hasattr(sql, "close"):
+                sql.close()
+
+
+if __name__ == "__main__":
+    main()